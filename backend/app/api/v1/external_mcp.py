@@ -12,7 +12,7 @@ from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel
 
 from ...core.fastmcp_client import MCPConnectionError, MCPToolError
-from ...services.mcp.orchestrator import mcp_orchestrator
+from ...services.mcp.orchestrator import get_mcp_orchestrator
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -155,10 +155,10 @@ async def add_external_server(request: AddServerRequest):
             }
         }
         
-        server_id = await mcp_orchestrator.add_external_server(server_config)
+        server_id = await get_mcp_orchestrator().add_external_server(server_config)
         
         # Get server info for response
-        servers = await mcp_orchestrator.get_external_servers()
+        servers = await get_mcp_orchestrator().get_external_servers()
         server = next((s for s in servers if s.get("server_id") == server_id), None)
         
         if not server:
@@ -324,7 +324,7 @@ async def list_external_servers():
     try:
         logger.info("Listing external MCP servers")
         
-        servers = await mcp_orchestrator.get_external_servers()
+        servers = await get_mcp_orchestrator().get_external_servers()
         
         # Convert to response format and ensure proper structure
         server_responses = []
@@ -373,7 +373,7 @@ async def get_external_server(server_id: str):
     try:
         logger.info(f"Getting external MCP server info: {server_id}")
         
-        servers = await mcp_orchestrator.get_external_servers()
+        servers = await get_mcp_orchestrator().get_external_servers()
         server = next((s for s in servers if s.get("server_id") == server_id), None)
         
         if not server:
@@ -426,7 +426,7 @@ async def remove_external_server(server_id: str):
     try:
         logger.info(f"Removing external MCP server: {server_id}")
         
-        success = await mcp_orchestrator.remove_external_server(server_id)
+        success = await get_mcp_orchestrator().remove_external_server(server_id)
         
         if success:
             logger.info(f"External MCP server {server_id} removed successfully")
@@ -468,7 +468,7 @@ async def list_server_tools(server_id: str):
         logger.info(f"Listing tools for external MCP server: {server_id}")
         
         # Get tools from the orchestrator
-        all_tools = await mcp_orchestrator.list_all_tools()
+        all_tools = await get_mcp_orchestrator().list_all_tools()
         server_tools = [
             tool for tool in all_tools.get("tools", []) 
             if tool.get("server_id") == server_id
@@ -476,7 +476,7 @@ async def list_server_tools(server_id: str):
         
         if not server_tools:
             # Check if server exists first
-            servers = await mcp_orchestrator.get_external_servers()
+            servers = await get_mcp_orchestrator().get_external_servers()
             server = next((s for s in servers if s.get("server_id") == server_id), None)
             
             if not server:
@@ -531,7 +531,7 @@ async def execute_server_tool(server_id: str, tool_name: str, parameters: Dict[s
         logger.info(f"Executing tool '{tool_name}' on external MCP server: {server_id}")
         
         # Verify server exists
-        servers = await mcp_orchestrator.get_external_servers()
+        servers = await get_mcp_orchestrator().get_external_servers()
         server = next((s for s in servers if s.get("server_id") == server_id), None)
         
         if not server:
@@ -541,7 +541,7 @@ async def execute_server_tool(server_id: str, tool_name: str, parameters: Dict[s
             )
         
         # Execute tool through the orchestrator
-        result = await mcp_orchestrator.execute_tool(tool_name, parameters)
+        result = await get_mcp_orchestrator().execute_tool(tool_name, parameters)
         
         logger.info(f"Tool '{tool_name}' executed successfully on external MCP server {server_id}")
         return result
@@ -585,7 +585,7 @@ async def get_server_health(server_id: str):
         logger.info(f"Getting health status for external MCP server: {server_id}")
         
         # Verify server exists
-        servers = await mcp_orchestrator.get_external_servers()
+        servers = await get_mcp_orchestrator().get_external_servers()
         server = next((s for s in servers if s.get("server_id") == server_id), None)
         
         if not server:
@@ -680,7 +680,7 @@ async def test_server_connection(server_id: str):
         logger.info(f"Testing connection to external MCP server: {server_id}")
         
         # Get server info
-        servers = await mcp_orchestrator.get_external_servers()
+        servers = await get_mcp_orchestrator().get_external_servers()
         server = next((s for s in servers if s.get("server_id") == server_id), None)
         
         if not server:
@@ -771,7 +771,7 @@ async def refresh_all_connections():
         logger.info("Refreshing all external MCP server connections")
         
         # Get all servers from orchestrator
-        servers = await mcp_orchestrator.get_external_servers()
+        servers = await get_mcp_orchestrator().get_external_servers()
         
         refresh_results = []
         for server in servers:
@@ -844,7 +844,7 @@ async def get_all_servers_health():
         logger.info("Getting health status for all external MCP servers")
         
         # Get all servers
-        servers = await mcp_orchestrator.get_external_servers()
+        servers = await get_mcp_orchestrator().get_external_servers()
         
         server_healths = {}
         for server in servers:
@@ -908,7 +908,7 @@ async def refresh_server_tools(server_id: str):
         logger.info(f"Manually refreshing tools for external MCP server: {server_id}")
         
         # Verify server exists
-        servers = await mcp_orchestrator.get_external_servers()
+        servers = await get_mcp_orchestrator().get_external_servers()
         server = next((s for s in servers if s.get("server_id") == server_id), None)
         
         if not server:
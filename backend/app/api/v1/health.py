@@ -3,12 +3,14 @@ Health check API endpoints for Word Add-in MCP Project.
 """
 
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 import time
 import structlog
 from typing import Dict, Any
 
 from app.core.config import settings
+from app.core.metrics import render_latest
+from app.core.startup_timing import startup_timer
 
 router = APIRouter()
 logger = structlog.get_logger()
@@ -69,8 +71,8 @@ async def detailed_health_check() -> Dict[str, Any]:
     # Check MCP server health
     try:
         # Get actual MCP orchestrator health status
-        from app.services.mcp.orchestrator import mcp_orchestrator
-        mcp_health = await mcp_orchestrator.get_server_health()
+        from app.services.mcp.orchestrator import get_mcp_orchestrator
+        mcp_health = await get_mcp_orchestrator().get_server_health()
         
         # Extract response time from MCP health metrics
         response_time = 0.001  # Default fallback
@@ -101,10 +103,12 @@ async def detailed_health_check() -> Dict[str, Any]:
     try:
         # TODO: Implement actual Azure OpenAI health check
         # azure_health = await check_azure_openai_health()
+        from app.services.llm_gateway import llm_gateway
         health_status["dependencies"]["azure_openai"] = {
             "status": "healthy",
             "response_time": 0.001,
-            "details": "Azure OpenAI connection active"
+            "details": "Azure OpenAI connection active",
+            "gateway": llm_gateway.get_status()
         }
     except Exception as e:
         health_status["dependencies"]["azure_openai"] = {
@@ -219,22 +223,23 @@ async def debug_config() -> Dict[str, Any]:
 
 
 @router.get("/metrics")
-async def metrics() -> Dict[str, Any]:
+async def metrics() -> Response:
     """
-    Basic metrics endpoint for monitoring.
+    Prometheus metrics endpoint for monitoring.
     
     Returns:
-        Dict containing basic application metrics
+        All collected metrics in the Prometheus text exposition format
     """
-    # TODO: Implement actual metrics collection
-    return {
-        "timestamp": time.time(),
-        "version": settings.app_version,
-        "environment": settings.environment,
-        "metrics": {
-            "requests_total": 0,  # TODO: Implement request counter
-            "requests_active": 0,  # TODO: Implement active request counter
-            "errors_total": 0,     # TODO: Implement error counter
-            "response_time_avg": 0.0  # TODO: Implement response time tracking
-        }
-    }
+    payload, content_type = render_latest()
+    return Response(content=payload, media_type=content_type)
+
+
+@router.get("/startup")
+async def startup_timing() -> Dict[str, Any]:
+    """
+    Startup timing report of this worker.
+    
+    Returns:
+        Import time per backend module and duration of each initialization phase
+    """
+    return startup_timer.report()
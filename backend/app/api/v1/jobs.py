@@ -0,0 +1,162 @@
+"""
+Background job API endpoints.
+
+Long-running tools (prior art search, large claim analyses) can be run as
+jobs: the submit call returns immediately with a job id, and the status,
+stage progress and result are then polled or streamed as server-sent events.
+"""
+
+import logging
+from typing import Any, AsyncIterator, Dict
+
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from ...core.exceptions import RateLimitError, ValidationError
+from ...core.request_context import get_session_id
+from ...services.job_service import job_service
+from ...services.mcp.orchestrator import get_initialized_mcp_orchestrator
+from ...utils import fast_json
+from ...utils.fast_json import FastJSONResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/mcp", tags=["jobs"])
+
+
+class JobSubmitRequest(BaseModel):
+    """Request model for submitting a tool job."""
+    parameters: Dict[str, Any] = {}
+    priority: str = "normal"
+
+
+def _job_links(job_id: str) -> Dict[str, str]:
+    base = f"/api/v1/mcp/jobs/{job_id}"
+    return {"status": base, "result": f"{base}/result", "events": f"{base}/events"}
+
+
+async def _get_job_or_404(job_id: str):
+    job = await job_service.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job '{job_id}' not found or expired"
+        )
+    return job
+
+
+@router.post("/tools/{tool_name}/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def submit_tool_job(tool_name: str, request: JobSubmitRequest):
+    """
+    Run an MCP tool as a background job.
+
+    Args:
+        tool_name: Name of the tool to execute
+        request: Tool parameters and job priority (high, normal or low)
+
+    Returns:
+        The queued job with links to its status, result and event stream
+    """
+    try:
+        mcp_orchestrator = get_initialized_mcp_orchestrator()
+        if not await mcp_orchestrator.get_tool_info(tool_name):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Tool '{tool_name}' not found"
+            )
+
+        job = await job_service.submit(
+            tool_name=tool_name,
+            parameters=request.parameters,
+            priority=request.priority,
+            session_id=get_session_id()
+        )
+        return {**job.to_dict(), "links": _job_links(job.job_id)}
+
+    except HTTPException:
+        raise
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.message)
+    except RateLimitError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=e.message,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except Exception as e:
+        logger.error(f"Failed to submit job for tool '{tool_name}': {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "error": "Job Submission Error",
+                "message": str(e),
+                "tool_name": tool_name
+            }
+        )
+
+
+@router.get("/jobs")
+async def get_jobs_status():
+    """Get job queue statistics."""
+    return job_service.get_stats()
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Get a job's status and stage progress.
+
+    Args:
+        job_id: ID returned when the job was submitted
+    """
+    job = await _get_job_or_404(job_id)
+    return {**job.to_dict(), "links": _job_links(job_id)}
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """
+    Get a job's result.
+
+    Returns 200 with the result once the job finished (check ``status``),
+    or 202 with the current status while it is still queued or running.
+    """
+    job = await _get_job_or_404(job_id)
+    if not job.finished:
+        return FastJSONResponse(job.to_dict(), status_code=status.HTTP_202_ACCEPTED)
+    return job.to_dict(include_result=True)
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """
+    Stream a job's progress as server-sent events.
+
+    A ``progress`` event is sent on every status or stage change and a final
+    ``result`` event carries the result; comments keep the stream alive.
+    """
+    await _get_job_or_404(job_id)
+
+    async def events() -> AsyncIterator[bytes]:
+        async for job in job_service.watch(job_id):
+            if job is None:
+                yield b": keep-alive\n\n"
+                continue
+            event = b"result" if job.finished else b"progress"
+            data = fast_json.dumpb(job.to_dict(include_result=job.finished), default=str)
+            yield b"event: " + event + b"\ndata: " + data + b"\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job."""
+    job = await _get_job_or_404(job_id)
+    await job_service.cancel(job_id)
+    return job.to_dict()
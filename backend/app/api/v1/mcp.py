@@ -9,13 +9,18 @@ import json
 import logging
 from typing import Dict, Any, List, Optional
 from fastapi import APIRouter, HTTPException, status, Request
-from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
 from ...services.mcp.orchestrator import get_initialized_mcp_orchestrator
 # Removed old MCP schema imports - using official MCP types now
 from ...schemas.agent import AgentChatRequest, AgentChatResponse
 from ...services.agent import agent_service
+from ...services.token_usage_service import token_usage_tracker
+from ...core.request_context import bind as bind_request_context
+from ...core.cancellation import run_cancellable
+from ...core.exceptions import AdmissionRejectedError
+from ...utils import fast_json
+from ...utils.fast_json import FastJSONResponse
 from ...schemas.mcp import ExternalServerRequest
 
 logger = logging.getLogger(__name__)
@@ -24,6 +29,19 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/mcp", tags=["mcp"])
 
+
+def _admission_error(e: AdmissionRejectedError) -> HTTPException:
+    """Map an admission rejection to 429/503 with a Retry-After header."""
+    return HTTPException(
+        status_code=e.status_code,
+        detail={
+            "error": "Too Many Requests" if e.status_code == 429 else "Service Unavailable",
+            "message": e.message,
+            "tool_name": e.tool_name
+        },
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
 @router.get("/test-auth")
 async def test_auth():
     """Test endpoint - authentication handled by APIM"""
@@ -36,7 +54,7 @@ async def test_auth():
 
 
 @router.post("/agent/chat", response_model=AgentChatResponse)
-async def agent_chat(request: AgentChatRequest):
+async def agent_chat(request: AgentChatRequest, http_request: Request):
     """
     Process user message through the intelligent agent.
     
@@ -54,8 +72,12 @@ async def agent_chat(request: AgentChatRequest):
         "available_tools": "string - comma-separated tool names"
     }
     
+    The work is cancelled when the client disconnects or the request
+    deadline (``X-Request-Deadline`` or the route budget) passes.
+    
     Args:
         request: Agent chat request with message and context
+        http_request: The raw request, watched for client disconnects
         
     Returns:
         Complete response with intent, routing, execution result, and metrics
@@ -72,7 +94,7 @@ async def agent_chat(request: AgentChatRequest):
         parsed_chat_history = []
         if chat_history:
             try:
-                parsed_chat_history = json.loads(chat_history)
+                parsed_chat_history = fast_json.loads(chat_history)
                 logger.debug(f"Parsed {len(parsed_chat_history)} messages from frontend chat history")
             except json.JSONDecodeError as e:
                 logger.warning(f"Failed to parse chat history: {str(e)}")
@@ -89,12 +111,14 @@ async def agent_chat(request: AgentChatRequest):
             logger.warning(f"Failed to get available tools: {str(e)}")
         
         # Process message through agent service with frontend chat history
-        response = await agent_service.process_user_message(
-            user_message=request.message,
-            document_content=document_content,
-            available_tools=available_tools,
-            frontend_chat_history=parsed_chat_history
-        )
+        with bind_request_context(session_id=request.context.get("session_id")):
+            response = await run_cancellable(http_request, lambda: agent_service.process_user_message(
+                user_message=request.message,
+                document_content=document_content,
+                available_tools=available_tools,
+                frontend_chat_history=parsed_chat_history,
+                bypass_cache=request.context.get("bypass_cache", "").lower() == "true"
+            ))
 
         logger.info(f"Chat processed - intent: {response.get('intent_type')}, tool: {response.get('tool_name')}, time: {response.get('execution_time', 0):.2f}s")
         logger.debug(f"DEBUG: Agent response type: {type(response)}")
@@ -107,6 +131,10 @@ async def agent_chat(request: AgentChatRequest):
         
         return agent_chat_response
         
+    except HTTPException:
+        raise
+    except AdmissionRejectedError as e:
+        raise _admission_error(e)
     except Exception as e:
         logger.error(f"Agent chat request failed: {str(e)}")
         raise HTTPException(
@@ -122,6 +150,19 @@ class ToolExecutionRequest(BaseModel):
     """Request model for tool execution."""
     parameters: Dict[str, Any]
     server_id: Optional[str] = None
+    bypass_cache: bool = False
+
+
+class BatchToolCall(BaseModel):
+    """One call within a batch tool execution request."""
+    tool_name: str
+    parameters: Dict[str, Any] = {}
+    bypass_cache: bool = False
+
+
+class BatchToolExecutionRequest(BaseModel):
+    """Request model for executing several tools in one round trip."""
+    calls: List[BatchToolCall]
 
 
 class ToolListResponse(BaseModel):
@@ -212,14 +253,57 @@ async def get_mcp_tool_info(tool_name: str):
         )
 
 
+@router.post("/tools/batch")
+async def execute_mcp_tools_batch(request: BatchToolExecutionRequest, http_request: Request):
+    """
+    Execute several MCP tools in one request.
+    
+    Calls that target the same server are sent to it as a single JSON-RPC
+    batch. A failing call yields an error entry without failing the rest.
+    
+    Args:
+        request: The tool calls to execute
+        http_request: The raw request, watched for client disconnects
+        
+    Returns:
+        One result per call, in request order
+    """
+    try:
+        logger.info(f"Executing batch of {len(request.calls)} MCP tool calls")
+        
+        mcp_orchestrator = get_initialized_mcp_orchestrator()
+        results = await run_cancellable(http_request, lambda: mcp_orchestrator.execute_tools_batch(
+            [call.model_dump() for call in request.calls]
+        ))
+        
+        return {
+            "results": results,
+            "total_count": len(results),
+            "error_count": sum(1 for result in results if result.get("status") == "error")
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to execute tool batch: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "error": "Tool Execution Error",
+                "message": str(e)
+            }
+        )
+
+
 @router.post("/tools/{tool_name}/execute")
-async def execute_mcp_tool(tool_name: str, request: ToolExecutionRequest):
+async def execute_mcp_tool(tool_name: str, request: ToolExecutionRequest, http_request: Request):
     """
     Execute an MCP tool.
     
     Args:
         tool_name: Name of the tool to execute
         request: Tool execution request
+        http_request: The raw request, watched for client disconnects
         
     Returns:
         Tool execution result
@@ -229,14 +313,19 @@ async def execute_mcp_tool(tool_name: str, request: ToolExecutionRequest):
         
         # Execute tool using the hub
         mcp_orchestrator = get_initialized_mcp_orchestrator()
-        result = await mcp_orchestrator.execute_tool(
+        result = await run_cancellable(http_request, lambda: mcp_orchestrator.execute_tool(
             tool_name=tool_name,
-            parameters=request.parameters
-        )
+            parameters=request.parameters,
+            bypass_cache=request.bypass_cache
+        ))
         
         logger.info(f"Tool '{tool_name}' executed successfully")
         return result
         
+    except HTTPException:
+        raise
+    except AdmissionRejectedError as e:
+        raise _admission_error(e)
     except Exception as e:
         logger.error(f"Failed to execute tool '{tool_name}': {str(e)}")
         raise HTTPException(
@@ -283,18 +372,18 @@ async def mcp_proxy(request: Request):
                 # Parse and return the response
                 if response_data:
                     try:
-                        response_json = json.loads(response_data.decode())
-                        return JSONResponse(
+                        response_json = fast_json.loads(response_data)
+                        return FastJSONResponse(
                             content=response_json,
                             status_code=response.status
                         )
                     except json.JSONDecodeError:
-                        return JSONResponse(
+                        return FastJSONResponse(
                             content={"error": "Invalid JSON response from internal server"},
                             status_code=500
                         )
                 else:
-                    return JSONResponse(
+                    return FastJSONResponse(
                         content={},
                         status_code=response.status
                     )
@@ -342,6 +431,37 @@ async def get_mcp_orchestrator_status():
         )
 
 
+@router.get("/usage")
+async def get_token_usage():
+    """
+    Get LLM token usage and estimated cost.
+    
+    Returns:
+        Totals aggregated by call site, tool and model
+    """
+    return token_usage_tracker.get_summary()
+
+
+@router.get("/usage/sessions/{session_id}")
+async def get_session_token_usage(session_id: str):
+    """
+    Get LLM token usage and estimated cost for a single session.
+    
+    Args:
+        session_id: Session identifier (X-Session-ID header or context.session_id)
+        
+    Returns:
+        Session totals
+    """
+    usage = token_usage_tracker.get_session_usage(session_id)
+    if usage is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No token usage recorded for session '{session_id}'"
+        )
+    return {"session_id": session_id, **usage}
+
+
 @router.get("/health")
 async def get_health():
     """
@@ -1,5 +1,8 @@
 """
 Application starter that runs both backend and internal MCP server.
+
+With SERVER_TOPOLOGY=multiworker it hands over to app.supervisor, which runs
+both as separately scaled pools of worker processes instead.
 """
 
 import asyncio
@@ -12,8 +15,7 @@ from contextlib import asynccontextmanager
 import uvicorn
 from fastapi import FastAPI
 
-from .main import app as backend_app
-from .internal_mcp_app import app as internal_mcp_app
+from .core.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +29,8 @@ class AppStarter:
     
     async def start_backend(self):
         """Start the backend application."""
+        from .main import app as backend_app
+        
         config = uvicorn.Config(
             backend_app,
             host="0.0.0.0",
@@ -45,6 +49,8 @@ class AppStarter:
             return
         else:
             # In development/docker, use separate port
+            from .internal_mcp_app import app as internal_mcp_app
+            
             config = uvicorn.Config(
                 internal_mcp_app,
                 host="0.0.0.0",
@@ -120,4 +126,8 @@ async def main():
         await starter.shutdown()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if settings.server_topology.lower() == "multiworker":
+        from .supervisor import main as supervisor_main
+        supervisor_main()
+    else:
+        asyncio.run(main())
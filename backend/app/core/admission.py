@@ -0,0 +1,184 @@
+"""
+Admission control for tool executions.
+
+Every tool call needs a global slot and a slot for its tool before it runs.
+Calls that find no free slot wait in a bounded FIFO queue; when the queue
+is full, or a call waits longer than the queue timeout, it is rejected
+straight away with a ``Retry-After`` hint instead of piling onto an
+overloaded backend and slowing every other request down.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional, Tuple
+
+import structlog
+
+from app.core import metrics, request_context
+from app.core.exceptions import AdmissionRejectedError
+from app.utils import fast_json
+
+logger = structlog.get_logger()
+
+QUEUE_FULL = "queue_full"
+QUEUE_TIMEOUT = "queue_timeout"
+
+
+def parse_tool_limits(raw: str) -> Dict[str, int]:
+    """Parse ``ADMISSION_TOOL_LIMITS`` (a JSON object of tool name to limit)."""
+    try:
+        return {str(name): int(limit) for name, limit in fast_json.loads(raw or "{}").items()}
+    except (ValueError, TypeError, AttributeError) as e:
+        logger.warning("Invalid ADMISSION_TOOL_LIMITS, using the default tool limit", error=str(e))
+        return {}
+
+
+class AdmissionController:
+    """Global and per-tool concurrency limits with a bounded wait queue."""
+
+    def __init__(self, global_limit: int = 8, default_tool_limit: int = 4,
+                 tool_limits: Optional[Dict[str, int]] = None, max_queue: int = 32,
+                 queue_timeout: float = 10.0):
+        """
+        Args:
+            global_limit: Tool calls that may run at once across all tools
+            default_tool_limit: Calls that may run at once per tool
+            tool_limits: Per-tool overrides of ``default_tool_limit``
+            max_queue: Calls that may wait for a slot before new ones are rejected
+            queue_timeout: Seconds a call may wait for a slot
+        """
+        self.global_limit = max(1, global_limit)
+        self.default_tool_limit = max(1, default_tool_limit)
+        self.tool_limits = dict(tool_limits or {})
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._active_total = 0
+        self._active: Dict[str, int] = {}
+        self._waiters: Deque[Tuple[str, asyncio.Future]] = deque()
+        # Moving average of how long admitted calls hold their slot, for Retry-After
+        self._average_hold: Optional[float] = None
+        self.rejected: Dict[str, int] = {QUEUE_FULL: 0, QUEUE_TIMEOUT: 0}
+
+    def limit_for(self, tool_name: str) -> int:
+        return max(1, self.tool_limits.get(tool_name, self.default_tool_limit))
+
+    def has_capacity(self, tool_name: str) -> bool:
+        """Whether a call to ``tool_name`` would be admitted without waiting."""
+        return (self._active_total < self.global_limit and
+                self._active.get(tool_name, 0) < self.limit_for(tool_name))
+
+    def _take(self, tool_name: str) -> None:
+        self._active_total += 1
+        self._active[tool_name] = self._active.get(tool_name, 0) + 1
+
+    def _queued(self, tool_name: str) -> int:
+        return sum(1 for name, _ in self._waiters if name == tool_name)
+
+    def _publish_queue_depth(self, tool_name: str) -> None:
+        metrics.set_admission_queue_depth(tool_name, self._queued(tool_name))
+
+    def retry_after(self) -> int:
+        """Seconds after which a rejected call may reasonably retry."""
+        if self._average_hold is None:
+            return 1
+        waves = (len(self._waiters) + 1) / self.global_limit
+        return max(1, math.ceil(self._average_hold * waves))
+
+    def _reject(self, tool_name: str, reason: str) -> AdmissionRejectedError:
+        self.rejected[reason] += 1
+        metrics.record_admission_rejection(tool_name, reason)
+        retry_after = self.retry_after()
+        logger.warning("Tool call rejected by admission control", tool_name=tool_name, reason=reason,
+                       active=self._active_total, queued=len(self._waiters), retry_after=retry_after)
+        message = ("Server busy, too many queued tool calls" if reason == QUEUE_FULL
+                   else "Server busy, timed out waiting for a free slot")
+        return AdmissionRejectedError(message, tool_name=tool_name, reason=reason, retry_after=retry_after)
+
+    def _grant_waiters(self) -> None:
+        """Hand freed slots to waiting calls in arrival order."""
+        for entry in list(self._waiters):
+            if self._active_total >= self.global_limit:
+                break
+            tool_name, future = entry
+            if future.done():
+                self._waiters.remove(entry)
+                continue
+            if self.has_capacity(tool_name):
+                self._waiters.remove(entry)
+                self._take(tool_name)
+                future.set_result(None)
+                self._publish_queue_depth(tool_name)
+
+    def _release(self, tool_name: str, held: Optional[float]) -> None:
+        self._active_total -= 1
+        self._active[tool_name] -= 1
+        if not self._active[tool_name]:
+            del self._active[tool_name]
+        if held is not None:
+            self._average_hold = held if self._average_hold is None else 0.8 * self._average_hold + 0.2 * held
+        self._grant_waiters()
+
+    async def _acquire(self, tool_name: str) -> None:
+        # Freed slots are granted to waiters right away, so a free slot here
+        # means no earlier waiter could have used it
+        if self.has_capacity(tool_name):
+            self._take(tool_name)
+            metrics.observe_admission_wait(tool_name, 0.0)
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise self._reject(tool_name, QUEUE_FULL)
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (tool_name, future)
+        self._waiters.append(entry)
+        self._publish_queue_depth(tool_name)
+        start_time = time.perf_counter()
+        # Do not queue past the request's own deadline
+        left = request_context.remaining()
+        timeout = self.queue_timeout if left is None else max(0.0, min(self.queue_timeout, left))
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # Granted at the last moment; hand the slot on
+                self._release(tool_name, None)
+            else:
+                future.cancel()
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+            self._publish_queue_depth(tool_name)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise self._reject(tool_name, QUEUE_TIMEOUT) from None
+        finally:
+            metrics.observe_admission_wait(tool_name, time.perf_counter() - start_time)
+
+    @asynccontextmanager
+    async def admit(self, tool_name: str) -> AsyncIterator[None]:
+        """
+        Hold a slot for ``tool_name`` for the duration of the block.
+
+        Raises:
+            AdmissionRejectedError: If the queue is full or the wait timed out
+        """
+        await self._acquire(tool_name)
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._release(tool_name, time.perf_counter() - start_time)
+
+    def get_status(self) -> Dict[str, object]:
+        """Current load for health reporting."""
+        return {
+            "active": self._active_total,
+            "global_limit": self.global_limit,
+            "active_by_tool": dict(self._active),
+            "queued": len(self._waiters),
+            "max_queue": self.max_queue,
+            "queue_timeout_seconds": self.queue_timeout,
+            "rejected": dict(self.rejected)
+        }
@@ -0,0 +1,192 @@
+"""
+Stop request handlers whose client went away or whose deadline passed.
+
+``run_cancellable`` runs an endpoint's work in its own task under the
+request deadline (the ``X-Request-Deadline`` header bound by the request
+context middleware, capped by the route's budget) and watches the ASGI
+connection. When the Word task pane closes or the budget runs out the task
+is cancelled, which cancels every LLM, tool and MCP server call awaiting
+beneath it instead of letting them run to completion for nobody.
+
+``Request.is_disconnected()`` never reports a disconnect behind Starlette's
+``BaseHTTPMiddleware`` (every ``@app.middleware("http")`` layer), so apps
+with such layers install ``DisconnectWatchMiddleware`` outermost; it
+listens on the server's ``receive`` directly.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+import structlog
+from fastapi import HTTPException, Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics, request_context
+from app.core.config import settings
+from app.core.exceptions import DeadlineExceededError
+from app.utils import fast_json
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+# How often the connection is checked for a disconnect
+DISCONNECT_POLL_INTERVAL = 0.25
+# How long a cancelled handler gets to unwind before the response is sent
+CANCEL_GRACE_SECONDS = 1.0
+
+# Scope key of the event DisconnectWatchMiddleware sets when the client goes away
+DISCONNECT_SCOPE_KEY = "app.client_disconnected"
+
+# Non-standard, but widely understood (nginx) status for "client closed request"
+HTTP_CLIENT_CLOSED_REQUEST = 499
+
+_route_budgets: Optional[Dict[str, float]] = None
+
+
+def route_template(request: Request) -> str:
+    """Return the matched route template, e.g. ``/api/v1/mcp/tools/{tool_name}/execute``."""
+    route_path = getattr(request.scope.get("route"), "path", None) or request.url.path
+    return f"{request.scope.get('root_path', '')}{route_path}"
+
+
+def route_budget(route: str) -> Optional[float]:
+    """Time budget in seconds for a route (``REQUEST_BUDGETS``, else the default)."""
+    global _route_budgets
+    if _route_budgets is None:
+        try:
+            _route_budgets = {key: float(value) for key, value in fast_json.loads(settings.request_budgets).items()}
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.warning("Invalid REQUEST_BUDGETS, using the default budget", error=str(e))
+            _route_budgets = {}
+    budget = _route_budgets.get(route, settings.request_budget_seconds)
+    return budget if budget and budget > 0 else None
+
+
+class DisconnectWatchMiddleware:
+    """
+    Pure ASGI middleware that notices when the client drops the connection.
+
+    Once the request body has been read, only ``http.disconnect`` can
+    arrive, so the middleware keeps a task listening on the server's
+    ``receive`` and sets the scope's disconnect event when it does. Inner
+    layers asking for further messages wait for that event instead of
+    competing for ``receive``.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        disconnected = asyncio.Event()
+        scope[DISCONNECT_SCOPE_KEY] = disconnected
+        watcher: Optional[asyncio.Task] = None
+
+        async def watch() -> None:
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            disconnected.set()
+
+        async def watched_receive() -> Message:
+            nonlocal watcher
+            if watcher is not None:
+                await disconnected.wait()
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                disconnected.set()
+            elif not message.get("more_body", False):
+                watcher = asyncio.ensure_future(watch())
+            return message
+
+        try:
+            await self.app(scope, watched_receive, send)
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    disconnected = request.scope.get(DISCONNECT_SCOPE_KEY)
+    if disconnected is not None:
+        await disconnected.wait()
+        return
+    try:
+        while not await request.is_disconnected():
+            await asyncio.sleep(DISCONNECT_POLL_INTERVAL)
+    except Exception as e:
+        logger.debug("Cannot watch connection, relying on the deadline", error=str(e))
+        await asyncio.Event().wait()
+
+
+async def _cancel(task: asyncio.Task) -> None:
+    task.cancel()
+    # Handlers blocked outside the event loop cannot be interrupted; do not wait on them forever
+    await asyncio.wait({task}, timeout=CANCEL_GRACE_SECONDS)
+
+
+async def run_cancellable(request: Request, work: Callable[[], Awaitable[T]],
+                          budget: Optional[float] = None) -> T:
+    """
+    Run ``work`` until it finishes, the client disconnects or the deadline passes.
+
+    The request body must already have been read (FastAPI does this for
+    body parameters), as the disconnect watcher consumes ASGI messages.
+
+    Args:
+        request: The incoming request, watched for a disconnect
+        work: Coroutine function performing the request's work
+        budget: Seconds allowed for the work (default: the route's budget)
+
+    Raises:
+        HTTPException: 499 when the client disconnected, 504 when the deadline passed
+    """
+    route = route_template(request)
+    if budget is None:
+        budget = route_budget(route)
+
+    with request_context.bind(budget=budget):
+        # The caller's own deadline may be shorter than the route budget, or the only one
+        applied = request_context.remaining()
+        task = asyncio.ensure_future(work())
+        watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+        try:
+            done, _ = await asyncio.wait(
+                {task, watcher},
+                timeout=request_context.remaining(),
+                return_when=asyncio.FIRST_COMPLETED
+            )
+        except BaseException:
+            task.cancel()
+            raise
+        finally:
+            watcher.cancel()
+
+    if task in done:
+        try:
+            return task.result()
+        except DeadlineExceededError as e:
+            reason, error = "deadline", e
+    else:
+        reason = "disconnect" if watcher in done else "deadline"
+        error = None
+        await _cancel(task)
+
+    metrics.record_abandoned_request(route, reason)
+    logger.info("Request abandoned, work cancelled", route=route, reason=reason, budget=applied)
+    if reason == "disconnect":
+        raise HTTPException(
+            status_code=HTTP_CLIENT_CLOSED_REQUEST,
+            detail={"error": "Client Closed Request", "message": "Client disconnected"}
+        )
+    raise HTTPException(
+        status_code=504,
+        detail={
+            "error": "Deadline Exceeded",
+            "message": str(error) if error or applied is None else f"Request did not finish within {applied:.1f}s"
+        }
+    )
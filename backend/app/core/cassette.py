@@ -0,0 +1,233 @@
+"""
+Record/replay cassettes for LLM and upstream HTTP traffic.
+
+With ``CASSETTE_MODE=record`` every LLM completion, PatentsView and Google
+call and MCP tool call made through the hooks below is appended to the
+cassette file (JSON lines) with its response and latency. With
+``CASSETTE_MODE=replay`` the same calls are answered from the cassette
+after the recorded latency times ``CASSETTE_LATENCY_SCALE`` (0: no delay),
+so pipeline changes can be benchmarked stage by stage against identical
+upstream behaviour, without credentials.
+
+Requests are matched by a hash of their content (secrets such as API keys
+are left out). A request that was not recorded gets the next unused
+recording of the same kind and label (call site or endpoint), so small
+prompt differences do not break a replay; when there is none,
+``CassetteMissError`` is raised. Requests that raised instead of returning
+a response are not recorded.
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import structlog
+
+from app.core.config import settings
+from app.core.exceptions import CassetteMissError
+from app.utils import fast_json
+
+logger = structlog.get_logger()
+
+OFF = "off"
+RECORD = "record"
+REPLAY = "replay"
+
+# Never written to a cassette or used in its keys
+SECRET_FIELDS = {"key", "api_key", "api-key", "authorization", "x-api-key", "cookie"}
+# Response headers worth keeping
+RECORDED_HEADERS = {"content-type", "etag", "retry-after", "retry-after-ms"}
+
+
+def _without_secrets(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _without_secrets(v) for k, v in value.items() if str(k).lower() not in SECRET_FIELDS}
+    if isinstance(value, list):
+        return [_without_secrets(v) for v in value]
+    return value
+
+
+def request_key(kind: str, request: Dict[str, Any]) -> str:
+    canonical = fast_json.dumps({"kind": kind, "request": request}, default=str, sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class RecordedResponse:
+    """Replayed stand-in for an ``aiohttp.ClientResponse``."""
+
+    def __init__(self, status: int, headers: Dict[str, str], body: str):
+        self.status = status
+        self.headers = {name.lower(): value for name, value in headers.items()}
+        self._body = body
+
+    async def read(self) -> bytes:
+        return self._body.encode("utf-8")
+
+    async def text(self) -> str:
+        return self._body
+
+    async def json(self, **kwargs: Any) -> Any:
+        return fast_json.loads(self._body)
+
+
+class Cassette:
+    """Recorder and player of upstream interactions."""
+
+    def __init__(self, mode: str = OFF, path: str = "cassettes/session.jsonl", latency_scale: float = 1.0):
+        """
+        Args:
+            mode: ``off``, ``record`` or ``replay``
+            path: Cassette file (JSON lines, one interaction per line)
+            latency_scale: Factor applied to recorded latencies on replay
+        """
+        if mode not in (OFF, RECORD, REPLAY):
+            logger.warning("Unknown CASSETTE_MODE, recording and replay disabled", mode=mode)
+            mode = OFF
+        self.mode = mode
+        self.path = path
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._entries: Optional[List[Dict[str, Any]]] = None
+        self._by_key: Dict[str, List[int]] = {}
+        self._by_label: Dict[str, List[int]] = {}
+        self._used: set = set()
+        self._replays: Dict[str, int] = {}
+
+    @property
+    def active(self) -> bool:
+        return self.mode != OFF
+
+    def _load(self) -> None:
+        self._entries = []
+        if not os.path.exists(self.path):
+            logger.warning("Cassette file not found, every request will miss", path=self.path)
+            return
+        with open(self.path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    self._entries.append(fast_json.loads(line))
+        for index, entry in enumerate(self._entries):
+            self._by_key.setdefault(entry["key"], []).append(index)
+            self._by_label.setdefault(f"{entry['kind']}:{entry['label']}", []).append(index)
+        logger.info("Cassette loaded", path=self.path, interactions=len(self._entries))
+
+    def _take(self, kind: str, label: str, key: str) -> Dict[str, Any]:
+        with self._lock:
+            if self._entries is None:
+                self._load()
+            matches = self._by_key.get(key, [])
+            for index in matches:
+                if index not in self._used:
+                    self._used.add(index)
+                    return self._entries[index]
+            if matches:
+                # Replayed more often than recorded (e.g. a benchmark loop): cycle
+                count = self._replays.get(key, 0)
+                self._replays[key] = count + 1
+                return self._entries[matches[count % len(matches)]]
+            for index in self._by_label.get(f"{kind}:{label}", []):
+                if index not in self._used:
+                    self._used.add(index)
+                    logger.warning("No exact cassette match, replaying by label", kind=kind, label=label)
+                    return self._entries[index]
+        raise CassetteMissError(f"No recorded {kind} interaction for '{label}'", kind=kind, label=label)
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "ab") as f:
+                f.write(fast_json.dumpb(entry, default=str) + b"\n")
+
+    async def interaction(self, kind: str, label: str, request: Dict[str, Any],
+                          perform: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Run ``perform`` (recording its JSON-serialisable response), or replay it.
+
+        Args:
+            kind: ``llm``, ``http`` or ``mcp``
+            label: Call site or endpoint, for fallback matching and reports
+            request: What identifies the request
+            perform: Makes the real call
+        """
+        if self.mode == OFF:
+            return await perform()
+        request = _without_secrets(request)
+        key = request_key(kind, request)
+
+        if self.mode == REPLAY:
+            entry = self._take(kind, label, key)
+            if self.latency_scale > 0:
+                await asyncio.sleep(entry["latency"] * self.latency_scale)
+            return entry["response"]
+
+        start_time = time.perf_counter()
+        response = await perform()
+        # File writes run in a worker thread, serialized by the lock
+        await asyncio.to_thread(self._append, {
+            "kind": kind,
+            "label": label,
+            "key": key,
+            "request": request,
+            "response": response,
+            "latency": round(time.perf_counter() - start_time, 6),
+            "recorded_at": time.time()
+        })
+        return response
+
+    async def httpx_request(self, client: Any, method: str, url: str, label: str, **kwargs: Any) -> Any:
+        """``client.request(method, url, **kwargs)`` through the cassette."""
+        import httpx
+
+        if self.mode == OFF:
+            return await client.request(method, url, **kwargs)
+
+        async def perform() -> Dict[str, Any]:
+            response = await client.request(method, url, **kwargs)
+            return {
+                "status": response.status_code,
+                "headers": {k: v for k, v in response.headers.items() if k.lower() in RECORDED_HEADERS},
+                "body": response.text
+            }
+
+        data = await self.interaction("http", label, self._http_request(method, url, kwargs), perform)
+        return httpx.Response(data["status"], headers=data["headers"], content=data["body"].encode("utf-8"),
+                              request=httpx.Request(method, url))
+
+    @asynccontextmanager
+    async def aiohttp_request(self, session: Any, method: str, url: str, label: str,
+                              **kwargs: Any) -> AsyncIterator[Any]:
+        """``session.request(method, url, **kwargs)`` through the cassette, as a context manager."""
+        if self.mode == OFF:
+            async with session.request(method, url, **kwargs) as response:
+                yield response
+            return
+
+        async def perform() -> Dict[str, Any]:
+            async with session.request(method, url, **kwargs) as response:
+                body = await response.read()
+                return {
+                    "status": response.status,
+                    "headers": {k: v for k, v in response.headers.items() if k.lower() in RECORDED_HEADERS},
+                    "body": body.decode("utf-8", errors="replace")
+                }
+
+        data = await self.interaction("http", label, self._http_request(method, url, kwargs), perform)
+        yield RecordedResponse(data["status"], data["headers"], data["body"])
+
+    @staticmethod
+    def _http_request(method: str, url: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        return {"method": method, "url": url, "params": kwargs.get("params"), "json": kwargs.get("json")}
+
+
+# Global cassette used by the LLM client, upstream services and MCP registry
+cassette = Cassette(
+    mode=settings.cassette_mode,
+    path=settings.cassette_path,
+    latency_scale=settings.cassette_latency_scale
+)
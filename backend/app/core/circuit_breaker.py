@@ -0,0 +1,175 @@
+"""
+Circuit breaker for calls to MCP servers.
+
+A breaker starts closed and tracks the outcome of recent calls in a sliding
+time window. When enough calls have been seen and the share of failures
+(including calls slower than the latency threshold) crosses the failure
+rate threshold, it opens and rejects calls immediately instead of letting
+each one wait for a connect timeout. After ``open_seconds`` it goes half
+open and lets exactly one probe call through: success closes the circuit,
+failure opens it again.
+"""
+
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+import structlog
+
+from app.core import metrics
+from app.core.exceptions import CircuitOpenError
+
+logger = structlog.get_logger()
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker with failure-rate and latency thresholds."""
+
+    def __init__(self, name: str, failure_rate_threshold: float = 0.5, minimum_calls: int = 5,
+                 window_seconds: float = 60.0, open_seconds: float = 30.0,
+                 slow_call_seconds: Optional[float] = 10.0):
+        """
+        Args:
+            name: Label used in logs, metrics and errors (the server name)
+            failure_rate_threshold: Share of failed calls in the window that opens the circuit
+            minimum_calls: Calls needed in the window before the rate is evaluated
+            window_seconds: Length of the sliding window of recorded calls
+            open_seconds: Time an open circuit rejects calls before allowing a probe
+            slow_call_seconds: Calls slower than this count as failures (None: disabled)
+        """
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.slow_call_seconds = slow_call_seconds
+        # (timestamp, failed) per recorded call
+        self._calls: Deque[Tuple[float, bool]] = deque()
+        self._state = CLOSED
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self.times_opened = 0
+        self.rejected_calls = 0
+        metrics.set_circuit_state(self.name, CLOSED)
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: str) -> None:
+        if state == self._state:
+            return
+        logger.info("Circuit state changed", circuit=self.name, previous=self._state, state=state)
+        self._state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+            self.times_opened += 1
+        elif state == CLOSED:
+            self._calls.clear()
+            self._opened_at = None
+        self._probe_in_flight = False
+        metrics.set_circuit_state(self.name, state)
+
+    def _prune(self, now: float) -> None:
+        while self._calls and now - self._calls[0][0] > self.window_seconds:
+            self._calls.popleft()
+
+    def failure_rate(self) -> float:
+        self._prune(time.monotonic())
+        if not self._calls:
+            return 0.0
+        return sum(1 for _, failed in self._calls if failed) / len(self._calls)
+
+    def allow_request(self) -> bool:
+        """
+        Whether a call may proceed.
+
+        In the half-open state only one caller gets ``True`` (the probe) until
+        its outcome is recorded.
+        """
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        self.rejected_calls += 1
+        return False
+
+    def record_success(self, duration: float = 0.0) -> None:
+        """Record a successful call; a slow one counts as a failure."""
+        if self.slow_call_seconds is not None and duration > self.slow_call_seconds:
+            self.record_failure(duration)
+            return
+        if self.state == HALF_OPEN:
+            self._transition(CLOSED)
+            return
+        now = time.monotonic()
+        self._calls.append((now, False))
+        self._prune(now)
+
+    def record_failure(self, duration: float = 0.0) -> None:
+        """Record a failed call and open the circuit if the threshold is crossed."""
+        if self.state == HALF_OPEN:
+            self._transition(OPEN)
+            return
+        now = time.monotonic()
+        self._calls.append((now, True))
+        self._prune(now)
+        if (self._state == CLOSED and len(self._calls) >= self.minimum_calls and
+                self.failure_rate() >= self.failure_rate_threshold):
+            self._transition(OPEN)
+
+    def release(self) -> None:
+        """Give up a half-open probe without an outcome (e.g. the caller was cancelled)."""
+        self._probe_in_flight = False
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit allows a probe."""
+        if self._state != OPEN or self._opened_at is None:
+            return 0.0
+        return max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+
+    async def call(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``func`` through the breaker.
+
+        Raises:
+            CircuitOpenError: If the circuit rejects the call
+        """
+        if not self.allow_request():
+            raise CircuitOpenError(
+                f"Circuit open for {self.name}, retry in {self.retry_after():.0f}s",
+                server_name=self.name,
+                retry_after=self.retry_after()
+            )
+        start_time = time.perf_counter()
+        try:
+            result = await func()
+        except Exception:
+            self.record_failure(time.perf_counter() - start_time)
+            raise
+        except BaseException:
+            self.release()
+            raise
+        self.record_success(time.perf_counter() - start_time)
+        return result
+
+    def get_status(self) -> Dict[str, Any]:
+        """Breaker state for health reporting."""
+        state = self.state
+        self._prune(time.monotonic())
+        return {
+            "state": state,
+            "failure_rate": round(self.failure_rate(), 3),
+            "recent_calls": len(self._calls),
+            "retry_after_seconds": round(self.retry_after(), 1) if state == OPEN else None,
+            "times_opened": self.times_opened,
+            "rejected_calls": self.rejected_calls
+        }
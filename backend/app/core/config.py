@@ -30,6 +30,33 @@ class Settings(BaseSettings):
     azure_openai_deployment: Optional[str] = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME") or os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-mini")
     azure_openai_api_version: Optional[str] = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
     
+    # LLM pricing per deployment in USD per 1M tokens, e.g.
+    # {"gpt-4o-mini": {"prompt": 0.15, "completion": 0.6}, "default": {...}}
+    llm_pricing: str = os.getenv("LLM_PRICING", "{}")
+
+    # Shared LLM gateway: requests and tokens per minute quota of each deployment
+    # (0 = not limited), completions in flight at once and retries of 429/5xx
+    llm_requests_per_minute: int = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "0"))
+    llm_tokens_per_minute: int = int(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+    llm_max_concurrency: int = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+    llm_max_retries: int = int(os.getenv("LLM_MAX_RETRIES", "3"))
+    # Pool of deployments to balance over instead of the single AZURE_OPENAI_*
+    # one, as a JSON list, e.g. [{"name": "eastus", "endpoint": "https://...",
+    # "deployment": "gpt-4o-mini", "tokens_per_minute": 200000}, {"name": "local",
+    # "base_url": "http://localhost:8080/v1", "deployment": "stub"}]. api_key
+    # defaults to AZURE_OPENAI_API_KEY. Interactive calls still unanswered after
+    # LLM_HEDGE_AFTER_SECONDS are also sent to a second backend (0 = off)
+    llm_backends: str = os.getenv("LLM_BACKENDS", "[]")
+    llm_hedge_after_seconds: float = float(os.getenv("LLM_HEDGE_AFTER_SECONDS", "0"))
+    # Model profile per LLM call site (JSON): deployment, max_tokens and timeout
+    # in seconds, e.g. {"intent_detection": {"deployment": "gpt-4o-mini",
+    # "max_tokens": 800, "timeout": 20}, "report": {"deployment": "gpt-4o"}}.
+    # "default" covers call sites without a profile. LLM_PROFILE_OVERRIDES
+    # changes profiles per ENVIRONMENT, e.g. {"development": {"report":
+    # {"deployment": "gpt-4o-mini"}}}
+    llm_profiles: str = os.getenv("LLM_PROFILES", "{}")
+    llm_profile_overrides: str = os.getenv("LLM_PROFILE_OVERRIDES", "{}")
+    
     # Google Search API Configuration
     google_search_api_key: Optional[str] = os.getenv("GOOGLE_API_KEY") or os.getenv("GOOGLE_SEARCH_API_KEY")
     google_search_engine_id: Optional[str] = os.getenv("GOOGLE_CSE_ID") or os.getenv("GOOGLE_SEARCH_ENGINE_ID")
@@ -60,7 +87,17 @@ class Settings(BaseSettings):
     log_format: str = os.getenv("LOG_FORMAT", "text")
     log_max_size: int = int(os.getenv("LOG_MAX_SIZE", "10485760"))  # 10MB
     log_backup_count: int = int(os.getenv("LOG_BACKUP_COUNT", "5"))
-    
+
+    # Tracing Configuration
+    tracing_enabled: bool = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+    tracing_exporter: str = os.getenv("TRACING_EXPORTER", "file")  # file | otlp
+    tracing_file_path: str = os.getenv("TRACING_FILE_PATH", "logs/traces.jsonl")
+    tracing_otlp_endpoint: str = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+    tracing_service_name: str = os.getenv("TRACING_SERVICE_NAME", "word-addin-mcp-backend")
+
+    # Seconds between event loop lag samples (event_loop_lag_seconds, 0 = off)
+    event_loop_lag_interval: float = float(os.getenv("EVENT_LOOP_LAG_INTERVAL", "0.5"))
+
     
     
     # CORS Configuration
@@ -88,6 +125,16 @@ class Settings(BaseSettings):
     # PatentsView API Configuration (optional)
     patentsview_api_key: Optional[str] = os.getenv("PATENTSVIEW_API_KEY")
     
+    # Upstream API base URLs (point these at tests/stubs/upstream_stub.py to run offline)
+    patentsview_base_url: str = os.getenv("PATENTSVIEW_BASE_URL", "https://search.patentsview.org/api/v1")
+    google_search_api_url: str = os.getenv("GOOGLE_SEARCH_API_URL", "https://www.googleapis.com/customsearch/v1")
+    
+    # Record/replay of LLM and upstream traffic: off | record | replay.
+    # On replay recorded latencies are multiplied by CASSETTE_LATENCY_SCALE (0 = no delay)
+    cassette_mode: str = os.getenv("CASSETTE_MODE", "off").lower()
+    cassette_path: str = os.getenv("CASSETTE_PATH", "cassettes/session.jsonl")
+    cassette_latency_scale: float = float(os.getenv("CASSETTE_LATENCY_SCALE", "1.0"))
+    
     # FastAPI Configuration
     enable_swagger: bool = os.getenv("ENABLE_SWAGGER", "true").lower() == "true"
     fastapi_host: str = os.getenv("FASTAPI_HOST", "0.0.0.0")
@@ -105,12 +152,87 @@ class Settings(BaseSettings):
     internal_mcp_path: str = os.getenv("INTERNAL_MCP_PATH", "/mcp")
     expose_mcp_publicly: bool = os.getenv("EXPOSE_MCP_PUBLICLY", "false").lower() == "true"
     mcp_public_url: str = os.getenv("MCP_PUBLIC_URL", "https://mcp-tools.yourdomain.com/mcp")
+    # auto | inprocess | http - "auto" dispatches in-process when the internal
+    # MCP app runs in the backend process (production mount or APP_STARTER_MODE)
+    internal_mcp_transport: str = os.getenv("INTERNAL_MCP_TRANSPORT", "auto")
+    # Maximum tools/call entries of one JSON-RPC batch that run concurrently
+    internal_mcp_batch_concurrency: int = int(os.getenv("INTERNAL_MCP_BATCH_CONCURRENCY", "4"))
+    # Seconds a tool catalog snapshot stays fresh; it is rebuilt in the
+    # background at 80% of this age
+    tool_catalog_ttl: float = float(os.getenv("TOOL_CATALOG_TTL", "300"))
+    # SQLite file keeping external servers added at runtime and the last tool
+    # catalog, so a restarted backend serves tools at once and reconnects the
+    # servers in the background (empty: nothing is kept across restarts)
+    registry_snapshot_path: str = os.getenv("REGISTRY_SNAPSHOT_PATH", "cache/registry_snapshot.db")
+    
+    # Tool result cache for tools that declare a cache TTL; an empty
+    # TOOL_RESULT_CACHE_DIR keeps the cache in memory only
+    tool_result_cache_enabled: bool = os.getenv("TOOL_RESULT_CACHE_ENABLED", "true").lower() == "true"
+    tool_result_cache_max_entries: int = int(os.getenv("TOOL_RESULT_CACHE_MAX_ENTRIES", "256"))
+    tool_result_cache_dir: str = os.getenv("TOOL_RESULT_CACHE_DIR", "cache/tool_results")
+    tool_result_cache_disk_max_entries: int = int(os.getenv("TOOL_RESULT_CACHE_DISK_MAX_ENTRIES", "2000"))
     
+    # Per-server circuit breakers for external MCP servers: open when at least
+    # MIN_CALLS calls in the window failed at FAILURE_RATE or above (calls
+    # slower than SLOW_CALL_SECONDS count as failures), probe after OPEN_SECONDS
+    circuit_breaker_failure_rate: float = float(os.getenv("CIRCUIT_BREAKER_FAILURE_RATE", "0.5"))
+    circuit_breaker_min_calls: int = int(os.getenv("CIRCUIT_BREAKER_MIN_CALLS", "3"))
+    circuit_breaker_window_seconds: float = float(os.getenv("CIRCUIT_BREAKER_WINDOW_SECONDS", "60"))
+    circuit_breaker_open_seconds: float = float(os.getenv("CIRCUIT_BREAKER_OPEN_SECONDS", "30"))
+    circuit_breaker_slow_call_seconds: float = float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_SECONDS", "15"))
+
+    # Default time budget in seconds for request handlers that honour
+    # deadlines (0 disables it); REQUEST_BUDGETS overrides it per route template,
+    # e.g. {"/api/v1/mcp/agent/chat": 180}. A shorter X-Request-Deadline header wins.
+    request_budget_seconds: float = float(os.getenv("REQUEST_BUDGET_SECONDS", "300"))
+    request_budgets: str = os.getenv("REQUEST_BUDGETS", "{}")
+
+    # Admission control for tool calls: concurrent calls overall and per tool
+    # (ADMISSION_TOOL_LIMITS overrides per tool, JSON), calls allowed to wait
+    # for a slot (beyond that: 429) and seconds they may wait (then: 503)
+    admission_global_limit: int = int(os.getenv("ADMISSION_GLOBAL_LIMIT", "8"))
+    admission_tool_limit: int = int(os.getenv("ADMISSION_TOOL_LIMIT", "4"))
+    admission_tool_limits: str = os.getenv("ADMISSION_TOOL_LIMITS", '{"prior_art_search_tool": 2}')
+    admission_max_queue: int = int(os.getenv("ADMISSION_MAX_QUEUE", "32"))
+    admission_queue_timeout: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "10"))
+
+    # Background jobs for long-running tools: concurrent workers, queued jobs
+    # accepted before submissions get 429, seconds finished results are kept
+    # and seconds a job may run (0 = no limit)
+    job_workers: int = int(os.getenv("JOB_WORKERS", "2"))
+    job_max_queued: int = int(os.getenv("JOB_MAX_QUEUED", "100"))
+    job_result_ttl: float = float(os.getenv("JOB_RESULT_TTL", "3600"))
+    job_timeout_seconds: float = float(os.getenv("JOB_TIMEOUT_SECONDS", "1800"))
+
+    # Process topology: "single" runs backend and internal MCP server in one
+    # process (app_starter); "multiworker" runs app.supervisor, which forks
+    # BACKEND_WORKERS backend workers and a separate pool of
+    # INTERNAL_MCP_WORKERS internal MCP workers, restarting workers after
+    # WORKER_MAX_REQUESTS requests (0 = never) and allowing
+    # WORKER_GRACEFUL_TIMEOUT seconds to drain on restart or shutdown
+    server_topology: str = os.getenv("SERVER_TOPOLOGY", "single")
+    backend_workers: int = int(os.getenv("BACKEND_WORKERS", "4"))
+    internal_mcp_workers: int = int(os.getenv("INTERNAL_MCP_WORKERS", "2"))
+    worker_max_requests: int = int(os.getenv("WORKER_MAX_REQUESTS", "0"))
+    worker_graceful_timeout: float = float(os.getenv("WORKER_GRACEFUL_TIMEOUT", "30"))
+    # URL of a separately run internal MCP server pool (overrides INTERNAL_MCP_HOST/PORT)
+    internal_mcp_pool_url: str = os.getenv("INTERNAL_MCP_POOL_URL", "")
+
+    # SQLite file holding sessions, rate limit windows, job records and the
+    # external server list shared by backend workers (empty: in process memory)
+    shared_state_path: str = os.getenv("SHARED_STATE_PATH", "")
+    # Seconds between deletions of expired shared state entries (0: never)
+    shared_state_purge_interval: float = float(os.getenv("SHARED_STATE_PURGE_INTERVAL", "300"))
+    # Processes that make LLM calls; each enforces its share of the LLM quotas
+    llm_quota_workers: int = int(os.getenv("LLM_QUOTA_WORKERS", "1"))
+
     @property
     def internal_mcp_url(self) -> str:
         """Get internal MCP server URL based on environment."""
         if self.expose_mcp_publicly and self.mcp_public_url:
             return self.mcp_public_url
+        elif self.internal_mcp_pool_url:
+            return self.internal_mcp_pool_url
         elif self.environment == "docker":
             return f"http://internal-mcp:{self.internal_mcp_port}{self.internal_mcp_path}"
         elif self.environment == "production":
@@ -119,6 +241,16 @@ class Settings(BaseSettings):
         else:
             return f"http://{self.internal_mcp_host}:{self.internal_mcp_port}{self.internal_mcp_path}"
     
+    @property
+    def internal_mcp_inprocess(self) -> bool:
+        """Whether internal MCP tools are called directly instead of over HTTP."""
+        transport = self.internal_mcp_transport.lower()
+        if transport == "inprocess":
+            return True
+        if transport == "http" or self.expose_mcp_publicly:
+            return False
+        return self.environment == "production" or self.app_starter_mode
+    
     # Application Configuration
     app_version: str = os.getenv("APP_VERSION", "1.0.0")
     environment: str = os.getenv("ENVIRONMENT", "development")
@@ -149,6 +281,7 @@ class Settings(BaseSettings):
         "/api/v1/health",
         "/api/v1/health/live",
         "/api/v1/health/ready",
+        "/api/v1/health/metrics",
         "/api/v1/mcp/tools",
         "/api/v1/mcp/execute",
         "/api/v1/mcp/servers",
@@ -109,6 +109,31 @@ class RateLimitError(MCPError):
         self.retry_after = retry_after
 
 
+class CircuitOpenError(MCPError):
+    """Exception raised when a server's circuit breaker rejects a call."""
+    
+    def __init__(self, message: str, server_name: str = None, retry_after: float = None, details: dict = None):
+        super().__init__(message, "CIRCUIT_OPEN", details)
+        self.server_name = server_name
+        self.retry_after = retry_after
+
+
+class AdmissionRejectedError(MCPError):
+    """Exception raised when admission control turns a tool call away."""
+    
+    def __init__(self, message: str, tool_name: str = None, reason: str = None, retry_after: int = None,
+                 details: dict = None):
+        super().__init__(message, "ADMISSION_REJECTED", details)
+        self.tool_name = tool_name
+        self.reason = reason
+        self.retry_after = retry_after
+    
+    @property
+    def status_code(self) -> int:
+        """429 when the queue is full, 503 when the wait for a slot timed out."""
+        return 429 if self.reason == "queue_full" else 503
+
+
 class TimeoutError(MCPError):
     """Exception raised when operation times out."""
     
@@ -118,6 +143,14 @@ class TimeoutError(MCPError):
         self.timeout_seconds = timeout_seconds
 
 
+class DeadlineExceededError(TimeoutError):
+    """Exception raised when a request runs past its deadline."""
+    
+    def __init__(self, message: str, operation: str = None, details: dict = None):
+        super().__init__(message, operation=operation, details=details)
+        self.error_code = "DEADLINE_EXCEEDED"
+
+
 class ValidationError(MCPError):
     """Exception raised when validation fails."""
     
@@ -127,6 +160,15 @@ class ValidationError(MCPError):
         self.value = value
 
 
+class CassetteMissError(MCPError):
+    """Exception raised when a replayed request has no recording in the cassette."""
+
+    def __init__(self, message: str, kind: str = None, label: str = None, details: dict = None):
+        super().__init__(message, "CASSETTE_MISS", details)
+        self.kind = kind
+        self.label = label
+
+
 # Convenience functions for common error scenarios
 def create_server_error(message: str, server_id: str, **kwargs) -> ExternalMCPServerError:
     """Create a server error with standard formatting."""
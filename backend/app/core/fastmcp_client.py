@@ -6,15 +6,18 @@ replacing all custom classes with real FastMCP classes.
 """
 
 import asyncio
-from typing import Any, Dict, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Union
 from dataclasses import dataclass
 from enum import Enum
 
 import structlog
-from fastmcp import Client
-from fastmcp.client.transports import StreamableHttpTransport
-from mcp import McpError  # McpError comes from mcp package directly
-from fastmcp.exceptions import ClientError, ToolError
+
+from app.core import request_context
+
+# fastmcp takes about half a second to import, so it is imported on the first
+# connection rather than when the API modules load at startup
+if TYPE_CHECKING:
+    from fastmcp import Client
 
 logger = structlog.get_logger()
 
@@ -51,6 +54,8 @@ class MCPConnectionConfig:
     timeout: float = 30.0
     max_retries: int = 3
     auth_token: Optional[str] = None
+    # Called when the server sends notifications/tools/list_changed
+    on_tools_changed: Optional[Callable[[], None]] = None
 
 
 class FastMCPClient:
@@ -64,13 +69,16 @@ class FastMCPClient:
     def __init__(self, config: MCPConnectionConfig):
         """Initialize FastMCP client with real transport."""
         self.config = config
-        self.client: Optional[Client] = None
+        self.client: Optional["Client"] = None
         self.state = MCPConnectionState.DISCONNECTED
         
         logger.info(f"FastMCP client initialized for {config.server_name}")
     
     async def connect(self) -> bool:
         """Connect to MCP server using FastMCP 2.3.0 with StreamableHttpTransport."""
+        from fastmcp import Client
+        from fastmcp.client.transports import StreamableHttpTransport
+        
         try:
             self.state = MCPConnectionState.CONNECTING
             logger.info(f"Connecting to MCP server: {self.config.server_name}")
@@ -78,11 +86,11 @@ class FastMCPClient:
             # Use StreamableHttpTransport for HTTP/HTTPS URLs (FastMCP 2.3.0+)
             if self.config.server_url.startswith(('http://', 'https://')):
                 transport = StreamableHttpTransport(url=self.config.server_url)
-                self.client = Client(transport)
+                self.client = Client(transport, message_handler=self._handle_message)
                 logger.info(f"Using StreamableHttpTransport for {self.config.server_name}")
             else:
                 # For other URLs (stdio, ws, etc.), let FastMCP auto-detect
-                self.client = Client(self.config.server_url)
+                self.client = Client(self.config.server_url, message_handler=self._handle_message)
                 logger.info(f"Using auto-detected transport for {self.config.server_name}")
             
             self.state = MCPConnectionState.CONNECTED
@@ -95,6 +103,13 @@ class FastMCPClient:
             raise MCPConnectionError(f"Connection failed: {e}")
     
     
+    async def _handle_message(self, message: Any) -> None:
+        """Handle server-initiated messages; only tools/list_changed is acted on."""
+        method = getattr(getattr(message, "root", None), "method", None)
+        if method == "notifications/tools/list_changed" and self.config.on_tools_changed:
+            logger.info(f"Tool list changed on {self.config.server_name}")
+            self.config.on_tools_changed()
+    
     async def disconnect(self):
         """Disconnect from MCP server."""
         try:
@@ -182,15 +197,17 @@ class FastMCPClient:
         """Call a tool using real FastMCP API with proper context manager."""
         if not self.client or self.state != MCPConnectionState.CONNECTED:
             raise MCPConnectionError("Client not connected")
+        from fastmcp.exceptions import ToolError
         
         try:
             logger.info(f"Calling tool {tool_name} with parameters: {parameters}")
             
-            # Use context manager properly for FastMCP client
+            # Use context manager properly for FastMCP client; the call is
+            # bounded by the request deadline when one is set
             async with self.client as client:
-                result = await client.call_tool(
-                    name=tool_name,
-                    arguments=parameters
+                result = await asyncio.wait_for(
+                    client.call_tool(name=tool_name, arguments=parameters),
+                    timeout=request_context.timeout()
                 )
             
             logger.info(f"Tool {tool_name} executed successfully")
@@ -7,7 +7,7 @@ the overhead of creating new connections for every request.
 
 import asyncio
 import time
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, List, Optional
 from dataclasses import dataclass
 from enum import Enum
 
@@ -63,9 +63,22 @@ class MCPConnectionManager:
         self.state = ConnectionPoolState.IDLE
         self.cleanup_task: Optional[asyncio.Task] = None
         self.health_check_interval = 60.0  # Health check every minute
+        self.tools_changed_listeners: List[Callable[[str], None]] = []
         
         logger.info("MCP Connection Manager initialized")
     
+    def add_tools_changed_listener(self, listener: Callable[[str], None]) -> None:
+        """Call ``listener(server_name)`` when a server sends ``tools/list_changed``."""
+        if listener not in self.tools_changed_listeners:
+            self.tools_changed_listeners.append(listener)
+    
+    def _notify_tools_changed(self, server_name: str) -> None:
+        for listener in self.tools_changed_listeners:
+            try:
+                listener(server_name)
+            except Exception as e:
+                logger.warning(f"Tools changed listener failed for {server_name}: {e}")
+    
     async def start(self) -> None:
         """Start the connection manager and cleanup task."""
         if self.state != ConnectionPoolState.IDLE:
@@ -177,7 +190,8 @@ class MCPConnectionManager:
             config = MCPConnectionConfig(
                 server_url=server_url,
                 server_name=server_name,
-                timeout=30.0
+                timeout=30.0,
+                on_tools_changed=lambda: self._notify_tools_changed(server_name)
             )
             client = FastMCPClient(config)
             
@@ -0,0 +1,464 @@
+"""
+Prometheus metrics for the Word Add-in MCP backend.
+
+This module owns a dedicated collector registry and the metric families
+recorded by the HTTP layer, the MCP orchestrator and registry, the tools
+and the LLM client. Label values that come from user or server input
+(tool names, server names, error classes) are passed through a bounded
+label set so that a misbehaving external server cannot blow up the
+number of time series.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Dedicated registry so tests and multiple app instances do not collide
+# with the process-wide default registry.
+REGISTRY = CollectorRegistry(auto_describe=True)
+
+# Set by app.supervisor for the worker pools: every process writes its values
+# there and /metrics merges them. Gauges declare how their values are merged.
+MULTIPROCESS_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+# Latency buckets cover sub-millisecond cache hits up to multi-minute
+# prior art searches.
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+    5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0
+)
+
+OVERFLOW_LABEL = "other"
+
+
+class BoundedLabelSet:
+    """
+    Caps the number of distinct values a label may take.
+
+    The first ``max_values`` distinct values are kept as-is; anything
+    beyond that is reported as ``"other"``.
+    """
+
+    def __init__(self, max_values: int):
+        self.max_values = max_values
+        self._values: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, value: Optional[str]) -> str:
+        if not value:
+            return "unknown"
+        if value in self._values:
+            return value
+        with self._lock:
+            if value in self._values:
+                return value
+            if len(self._values) >= self.max_values:
+                return OVERFLOW_LABEL
+            self._values.add(value)
+            return value
+
+
+tool_label = BoundedLabelSet(100)
+server_label = BoundedLabelSet(50)
+error_class_label = BoundedLabelSet(50)
+call_site_label = BoundedLabelSet(30)
+
+
+# HTTP layer
+http_requests_total = Counter(
+    "http_requests_total",
+    "HTTP requests handled, by route template and status class",
+    ["method", "route", "status"],
+    registry=REGISTRY,
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being processed",
+    multiprocess_mode="livesum",
+    registry=REGISTRY,
+)
+
+# Tool execution
+tool_executions_total = Counter(
+    "mcp_tool_executions_total",
+    "Tool executions through the MCP orchestrator",
+    ["tool", "status"],
+    registry=REGISTRY,
+)
+tool_execution_duration_seconds = Histogram(
+    "mcp_tool_execution_duration_seconds",
+    "Tool execution latency through the MCP orchestrator",
+    ["tool"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+tool_executions_in_flight = Gauge(
+    "mcp_tool_executions_in_flight",
+    "Tool executions currently running",
+    ["tool"],
+    multiprocess_mode="livesum",
+    registry=REGISTRY,
+)
+
+# MCP servers
+mcp_server_requests_total = Counter(
+    "mcp_server_requests_total",
+    "Requests sent to MCP servers",
+    ["server", "server_type", "operation", "status"],
+    registry=REGISTRY,
+)
+mcp_server_request_duration_seconds = Histogram(
+    "mcp_server_request_duration_seconds",
+    "Latency of requests sent to MCP servers",
+    ["server", "server_type", "operation"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+
+# LLM calls
+llm_requests_total = Counter(
+    "llm_requests_total",
+    "LLM completion requests by call site",
+    ["call_site", "status"],
+    registry=REGISTRY,
+)
+llm_request_duration_seconds = Histogram(
+    "llm_request_duration_seconds",
+    "LLM completion latency by call site",
+    ["call_site"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+llm_requests_in_flight = Gauge(
+    "llm_requests_in_flight",
+    "LLM completion requests currently awaiting a response",
+    ["call_site"],
+    multiprocess_mode="livesum",
+    registry=REGISTRY,
+)
+llm_tokens_total = Counter(
+    "llm_tokens_total",
+    "LLM tokens consumed by call site",
+    ["call_site", "type"],
+    registry=REGISTRY,
+)
+llm_cost_usd_total = Counter(
+    "llm_cost_usd_total",
+    "Estimated LLM spend in USD by call site (from LLM_PRICING)",
+    ["call_site"],
+    registry=REGISTRY,
+)
+llm_gateway_wait_seconds = Histogram(
+    "llm_gateway_wait_seconds",
+    "Time LLM calls waited for rate limit capacity, by priority",
+    ["priority"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+llm_throttled_total = Counter(
+    "llm_throttled_total",
+    "LLM calls throttled by the service (HTTP 429) by call site",
+    ["call_site"],
+    registry=REGISTRY,
+)
+llm_backend_requests_total = Counter(
+    "llm_backend_requests_total",
+    "LLM completion attempts by backend and outcome (success, error, throttled, hedge)",
+    ["backend", "outcome"],
+    registry=REGISTRY,
+)
+
+# Errors and caches
+errors_total = Counter(
+    "errors_total",
+    "Errors by component and exception class",
+    ["component", "error_class"],
+    registry=REGISTRY,
+)
+cache_requests_total = Counter(
+    "cache_requests_total",
+    "Cache lookups by cache and result",
+    ["cache", "result"],
+    registry=REGISTRY,
+)
+cache_hit_ratio = Gauge(
+    "cache_hit_ratio",
+    "Lifetime hit ratio per cache",
+    ["cache"],
+    multiprocess_mode="liveall",
+    registry=REGISTRY,
+)
+
+single_flight_requests_total = Counter(
+    "single_flight_requests_total",
+    "Calls through a single-flight group, by whether they joined an in-flight call",
+    ["group", "role"],
+    registry=REGISTRY,
+)
+
+circuit_state = Gauge(
+    "mcp_circuit_state",
+    "Circuit breaker state per MCP server (0 closed, 1 half open, 2 open)",
+    ["server"],
+    multiprocess_mode="livemax",
+    registry=REGISTRY,
+)
+CIRCUIT_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+requests_abandoned_total = Counter(
+    "http_requests_abandoned_total",
+    "Requests whose work was cancelled, by route and reason (disconnect or deadline)",
+    ["route", "reason"],
+    registry=REGISTRY,
+)
+
+# Admission control
+admission_queue_depth = Gauge(
+    "admission_queue_depth",
+    "Tool calls waiting for an admission slot, by tool",
+    ["tool"],
+    multiprocess_mode="livesum",
+    registry=REGISTRY,
+)
+admission_wait_seconds = Histogram(
+    "admission_wait_seconds",
+    "Time tool calls waited for an admission slot",
+    ["tool"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+admission_rejections_total = Counter(
+    "admission_rejections_total",
+    "Tool calls rejected by admission control, by tool and reason",
+    ["tool", "reason"],
+    registry=REGISTRY,
+)
+
+# Background jobs
+jobs_total = Counter(
+    "jobs_total",
+    "Finished background jobs by tool and final status",
+    ["tool", "status"],
+    registry=REGISTRY,
+)
+jobs_queued = Gauge(
+    "jobs_queued",
+    "Background jobs waiting for a worker",
+    multiprocess_mode="livesum",
+    registry=REGISTRY,
+)
+job_queue_wait_seconds = Histogram(
+    "job_queue_wait_seconds",
+    "Time background jobs waited for a worker",
+    ["tool"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+
+# Event loop health
+LOOP_LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+event_loop_lag_seconds = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop ran a callback scheduled for a fixed interval",
+    buckets=LOOP_LAG_BUCKETS,
+    registry=REGISTRY,
+)
+
+_cache_counts: Dict[str, Tuple[int, int]] = {}
+_cache_lock = threading.Lock()
+
+
+def status_class(status_code: int) -> str:
+    """Collapse an HTTP status code to its class (``2xx``, ``4xx``...)."""
+    return f"{status_code // 100}xx"
+
+
+def observe_http_request(method: str, route: str, status_code: int, duration: float) -> None:
+    """Record a completed HTTP request."""
+    http_requests_total.labels(method, route, status_class(status_code)).inc()
+    http_request_duration_seconds.labels(method, route).observe(duration)
+
+
+@contextmanager
+def track_tool_execution(tool_name: str) -> Iterator[Dict[str, str]]:
+    """
+    Time a tool execution and count it by outcome.
+
+    The yielded dict can be updated with ``status`` by the caller when the
+    outcome is not an exception (for example a tool that reports an error
+    in its payload).
+    """
+    tool = tool_label(tool_name)
+    outcome = {"status": "success"}
+    tool_executions_in_flight.labels(tool).inc()
+    start_time = time.perf_counter()
+    try:
+        yield outcome
+    except BaseException:
+        outcome["status"] = "error"
+        raise
+    finally:
+        tool_executions_in_flight.labels(tool).dec()
+        tool_execution_duration_seconds.labels(tool).observe(time.perf_counter() - start_time)
+        tool_executions_total.labels(tool, outcome["status"]).inc()
+
+
+@contextmanager
+def track_mcp_server_request(server_name: str, server_type: str, operation: str) -> Iterator[None]:
+    """Time a request sent to an MCP server."""
+    server = server_label(server_name)
+    start_time = time.perf_counter()
+    status = "success"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        mcp_server_request_duration_seconds.labels(server, server_type, operation).observe(
+            time.perf_counter() - start_time
+        )
+        mcp_server_requests_total.labels(server, server_type, operation, status).inc()
+
+
+@contextmanager
+def track_llm_call(call_site: str) -> Iterator[None]:
+    """Track an LLM call as in flight for the duration of the block."""
+    site = call_site_label(call_site)
+    llm_requests_in_flight.labels(site).inc()
+    try:
+        yield
+    finally:
+        llm_requests_in_flight.labels(site).dec()
+
+
+def observe_llm_call(call_site: str, success: bool, duration: float,
+                     usage: Optional[Dict[str, int]] = None) -> None:
+    """Record a completed LLM call and its token usage."""
+    site = call_site_label(call_site)
+    llm_requests_total.labels(site, "success" if success else "error").inc()
+    llm_request_duration_seconds.labels(site).observe(duration)
+    if usage:
+        llm_tokens_total.labels(site, "prompt").inc(usage.get("prompt_tokens", 0) or 0)
+        llm_tokens_total.labels(site, "completion").inc(usage.get("completion_tokens", 0) or 0)
+
+
+def observe_llm_cost(call_site: str, cost_usd: float) -> None:
+    """Record the estimated cost of an LLM call."""
+    if cost_usd > 0:
+        llm_cost_usd_total.labels(call_site_label(call_site)).inc(cost_usd)
+
+
+def observe_llm_gateway_wait(priority: str, wait: float) -> None:
+    """Record how long an LLM call waited for rate limit capacity."""
+    llm_gateway_wait_seconds.labels(priority).observe(wait)
+
+
+def record_llm_throttled(call_site: str) -> None:
+    """Count an LLM call throttled by the service."""
+    llm_throttled_total.labels(call_site_label(call_site)).inc()
+
+
+def record_llm_backend_call(backend: str, outcome: str) -> None:
+    """Count a completion attempt sent to an LLM backend."""
+    llm_backend_requests_total.labels(backend, outcome).inc()
+
+
+def record_error(component: str, error: BaseException) -> None:
+    """Count an error by component and exception class."""
+    errors_total.labels(component, error_class_label(type(error).__name__)).inc()
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Count a cache lookup and refresh the cache's hit ratio."""
+    cache_requests_total.labels(cache, "hit" if hit else "miss").inc()
+    with _cache_lock:
+        hits, total = _cache_counts.get(cache, (0, 0))
+        hits += 1 if hit else 0
+        total += 1
+        _cache_counts[cache] = (hits, total)
+    cache_hit_ratio.labels(cache).set(hits / total)
+
+
+def record_single_flight(group: str, shared: bool) -> None:
+    """Count a single-flight call as the leader or as a follower that shared its result."""
+    single_flight_requests_total.labels(group, "follower" if shared else "leader").inc()
+
+
+def set_circuit_state(server_name: str, state: str) -> None:
+    """Publish a circuit breaker state change."""
+    circuit_state.labels(server_label(server_name)).set(CIRCUIT_STATE_VALUES.get(state, 0))
+
+
+def record_abandoned_request(route: str, reason: str) -> None:
+    """Count a request whose work was cancelled before it finished."""
+    requests_abandoned_total.labels(route, reason).inc()
+
+
+def set_admission_queue_depth(tool_name: str, depth: int) -> None:
+    """Publish the number of calls waiting for an admission slot."""
+    admission_queue_depth.labels(tool_label(tool_name)).set(depth)
+
+
+def observe_admission_wait(tool_name: str, wait: float) -> None:
+    """Record how long a call waited for an admission slot."""
+    admission_wait_seconds.labels(tool_label(tool_name)).observe(wait)
+
+
+def record_admission_rejection(tool_name: str, reason: str) -> None:
+    """Count a call rejected by admission control."""
+    admission_rejections_total.labels(tool_label(tool_name), reason).inc()
+
+
+def observe_job_started(tool_name: str, queue_wait: float, queued: int) -> None:
+    """Record a job leaving the queue."""
+    job_queue_wait_seconds.labels(tool_label(tool_name)).observe(queue_wait)
+    jobs_queued.set(queued)
+
+
+def record_job_finished(tool_name: str, status: str) -> None:
+    """Count a job that reached a final status."""
+    jobs_total.labels(tool_label(tool_name), status).inc()
+
+
+async def monitor_event_loop_lag(interval: float = 0.5) -> None:
+    """Sample event loop lag every ``interval`` seconds until cancelled."""
+    import asyncio
+
+    while True:
+        scheduled = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        event_loop_lag_seconds.observe(max(0.0, time.perf_counter() - scheduled))
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """
+    Render all metrics in the Prometheus text exposition format.
+
+    Under the multi-worker topology the values of every worker of both
+    pools are merged, so a scrape does not depend on the worker it reaches.
+    """
+    if os.environ.get(MULTIPROCESS_DIR_ENV):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
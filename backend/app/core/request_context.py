@@ -0,0 +1,149 @@
+"""
+Per-request context shared across the agent, orchestrator and tools.
+
+Values are kept in ``contextvars`` so they follow the async call chain
+without being threaded through every function signature, and are carried
+over the internal MCP hop as HTTP headers.
+
+The request deadline works the same way: each layer that waits on I/O asks
+``timeout()`` for its own timeout, which is shrunk to whatever is left of
+the request's budget, so abandoned or overdue work stops everywhere at once.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, Optional
+
+from app.core.exceptions import DeadlineExceededError
+
+SESSION_HEADER = "X-Session-ID"
+TOOL_HEADER = "X-MCP-Tool"
+# Seconds left for the request, or an absolute Unix timestamp
+DEADLINE_HEADER = "X-Request-Deadline"
+
+# Header values above this are absolute Unix timestamps rather than budgets
+_ABSOLUTE_DEADLINE_THRESHOLD = 1_000_000_000
+
+_session_id: ContextVar[Optional[str]] = ContextVar("session_id", default=None)
+_tool_name: ContextVar[Optional[str]] = ContextVar("tool_name", default=None)
+# time.monotonic() value by which the request must finish
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+# Receives (stage, fraction) updates from long-running tools, e.g. for jobs
+_progress: ContextVar[Optional[Callable[[str, Optional[float]], None]]] = ContextVar("progress", default=None)
+
+
+def get_session_id() -> Optional[str]:
+    """Return the session the current request belongs to, if known."""
+    return _session_id.get()
+
+
+def get_tool_name() -> Optional[str]:
+    """Return the tool currently being executed, if any."""
+    return _tool_name.get()
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the request deadline, or ``None`` without one."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def timeout(default: Optional[float] = None) -> Optional[float]:
+    """
+    Return ``default`` shrunk to the time left before the request deadline.
+
+    Returns ``default`` unchanged when no deadline is bound.
+
+    Raises:
+        DeadlineExceededError: If the deadline has already passed
+    """
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceededError("Request deadline exceeded", operation=get_tool_name())
+    return left if default is None else min(default, left)
+
+
+def check_deadline() -> None:
+    """Raise ``DeadlineExceededError`` if the request deadline has passed."""
+    timeout()
+
+
+def parse_deadline_header(value: Optional[str]) -> Optional[float]:
+    """
+    Convert an ``X-Request-Deadline`` header value to a budget in seconds.
+
+    Accepts either the seconds left or an absolute Unix timestamp; invalid
+    values are ignored.
+    """
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        return None
+    if seconds > _ABSOLUTE_DEADLINE_THRESHOLD:
+        seconds -= time.time()
+    return max(seconds, 0.0)
+
+
+def report_progress(stage: str, progress: Optional[float] = None) -> None:
+    """
+    Report that the current work entered ``stage``.
+
+    ``progress`` is the completed fraction between 0 and 1, if known. This is
+    a no-op unless someone (the job service) is listening.
+    """
+    callback = _progress.get()
+    if callback is not None:
+        callback(stage, progress)
+
+
+@contextmanager
+def bind(session_id: Optional[str] = None, tool_name: Optional[str] = None,
+         budget: Optional[float] = None,
+         on_progress: Optional[Callable[[str, Optional[float]], None]] = None) -> Iterator[None]:
+    """
+    Bind request context values for the duration of the block.
+
+    ``None`` leaves the inherited value untouched. A ``budget`` in seconds
+    sets the request deadline, but never extends an earlier inherited one.
+    ``on_progress`` receives ``report_progress`` calls made within the block.
+    """
+    tokens = []
+    if session_id:
+        tokens.append((_session_id, _session_id.set(session_id)))
+    if tool_name:
+        tokens.append((_tool_name, _tool_name.set(tool_name)))
+    if budget is not None:
+        deadline = time.monotonic() + budget
+        inherited = _deadline.get()
+        if inherited is None or deadline < inherited:
+            tokens.append((_deadline, _deadline.set(deadline)))
+    if on_progress is not None:
+        tokens.append((_progress, _progress.set(on_progress)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+def propagation_headers() -> Dict[str, str]:
+    """Headers that carry the current context to another MCP hop."""
+    headers = {}
+    session_id = _session_id.get()
+    tool_name = _tool_name.get()
+    if session_id:
+        headers[SESSION_HEADER] = session_id
+    if tool_name:
+        headers[TOOL_HEADER] = tool_name
+    left = remaining()
+    if left is not None:
+        # Relative, so clock differences between hosts do not matter
+        headers[DEADLINE_HEADER] = f"{max(left, 0.0):.3f}"
+    return headers
@@ -0,0 +1,197 @@
+"""
+Two-tier cache for deterministic tool results.
+
+Entries live in a bounded in-memory LRU and, when a cache directory is
+configured, in one JSON file per key on disk so they survive restarts and
+are shared between worker processes. Disk reads and writes run in a worker
+thread to keep the event loop free.
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import structlog
+
+from app.core import metrics
+from app.utils import fast_json
+
+logger = structlog.get_logger()
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """A cached value and when it was stored."""
+    value: Any
+    stored_at: float
+    expires_at: float
+
+    def expired(self, now: Optional[float] = None) -> bool:
+        return (now or time.time()) >= self.expires_at
+
+
+class ResultCache:
+    """Memory LRU backed by an optional on-disk tier."""
+
+    def __init__(self, name: str, max_entries: int = 256, disk_dir: Optional[str] = None,
+                 disk_max_entries: int = 2000):
+        self.name = name
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir or None
+        self.disk_max_entries = disk_max_entries
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_writes = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _remember(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[Tuple[CacheEntry, str]]:
+        """Return ``(entry, tier)`` for a live entry, where tier is ``memory`` or ``disk``."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry.expired(now):
+                    del self._memory[key]
+                    entry = None
+                else:
+                    self._memory.move_to_end(key)
+        if entry is not None:
+            metrics.record_cache_lookup(self.name, hit=True)
+            return entry, "memory"
+
+        if self.disk_dir:
+            entry = await asyncio.to_thread(self._read_disk, key, now)
+            if entry is not None:
+                self._remember(key, entry)
+                metrics.record_cache_lookup(self.name, hit=True)
+                return entry, "disk"
+
+        metrics.record_cache_lookup(self.name, hit=False)
+        return None
+
+    async def set(self, key: str, value: Any, ttl: float) -> CacheEntry:
+        """Store a value in both tiers for ``ttl`` seconds."""
+        now = time.time()
+        entry = CacheEntry(value=value, stored_at=now, expires_at=now + ttl)
+        self._remember(key, entry)
+        if self.disk_dir:
+            await asyncio.to_thread(self._write_disk, key, entry)
+        return entry
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Drop one key, or everything, from both tiers."""
+        with self._lock:
+            if key is None:
+                self._memory.clear()
+            else:
+                self._memory.pop(key, None)
+        if not self.disk_dir or not os.path.isdir(self.disk_dir):
+            return
+        paths = [self._path(key)] if key is not None else [
+            os.path.join(self.disk_dir, name) for name in os.listdir(self.disk_dir) if name.endswith(".json")
+        ]
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _read_disk(self, key: str, now: float) -> Optional[CacheEntry]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as handle:
+                data = fast_json.loads(handle.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Unreadable cache entry, discarding", cache=self.name, error=str(e))
+            self._remove(path)
+            return None
+
+        # The key is stored alongside the value to rule out hash collisions
+        if data.get("key") != key:
+            return None
+        entry = CacheEntry(value=data.get("value"), stored_at=data["stored_at"], expires_at=data["expires_at"])
+        if entry.expired(now):
+            self._remove(path)
+            return None
+        return entry
+
+    def _write_disk(self, key: str, entry: CacheEntry) -> None:
+        path = self._path(key)
+        payload = fast_json.dumpb({
+            "key": key,
+            "value": entry.value,
+            "stored_at": entry.stored_at,
+            "expires_at": entry.expires_at
+        }, default=str)
+        # Write then rename so concurrent readers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            with open(tmp_path, "wb") as handle:
+                handle.write(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Failed to write cache entry", cache=self.name, error=str(e))
+            self._remove(tmp_path)
+            return
+
+        self._disk_writes += 1
+        if self._disk_writes % 50 == 0:
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        """Remove expired entries, then the oldest ones beyond ``disk_max_entries``."""
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+        entries.sort()
+        excess = len(entries) - self.disk_max_entries
+        for index, (_, path) in enumerate(entries):
+            if index < excess:
+                self._remove(path)
+                continue
+            try:
+                with open(path, "rb") as handle:
+                    if fast_json.loads(handle.read()).get("expires_at", 0) <= now:
+                        self._remove(path)
+            except (OSError, ValueError):
+                self._remove(path)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            memory_entries = len(self._memory)
+        return {
+            "memory_entries": memory_entries,
+            "max_entries": self.max_entries,
+            "disk_enabled": bool(self.disk_dir)
+        }
@@ -0,0 +1,316 @@
+"""
+State shared between the backend worker processes.
+
+With several backend workers (``SERVER_TOPOLOGY=multiworker``) a client's
+requests land on any of them, so sessions, rate limit windows, job records
+and the external server list cannot live in one process's memory. They are
+kept in a small SQLite database (``SHARED_STATE_PATH``) in WAL mode, which
+every worker on the host opens. Without a path the store is an in-memory
+database private to the process, which keeps single-process deployments
+and tests free of files.
+
+Values are JSON; each entry lives in a namespace and may expire. A file
+store may wait up to ``busy_timeout`` for another worker's write lock, so
+code on the event loop uses the ``a``-prefixed methods, which run file
+store calls on the store's own thread (in order) and in-memory ones inline.
+Fields of stored objects are changed with ``update`` in a single statement,
+so workers changing the same entry do not lose each other's changes.
+"""
+
+import asyncio
+import functools
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+import structlog
+
+from app.core.config import settings
+from app.utils import fast_json
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (namespace, key)
+)
+"""
+
+
+class SharedStore:
+    """Namespaced JSON key-value store, optionally shared through a SQLite file."""
+
+    def __init__(self, path: Optional[str] = None, busy_timeout: float = 5.0):
+        """
+        Args:
+            path: SQLite file shared by the workers (None: in-memory, this process only)
+            busy_timeout: Seconds to wait for another worker's write lock
+        """
+        self.path = path or None
+        self.busy_timeout = busy_timeout
+        self._lock = threading.RLock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_pid: Optional[int] = None
+
+    @property
+    def shared(self) -> bool:
+        """Whether other processes see this store's entries."""
+        return self.path is not None
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection must not cross fork(); each worker process opens its own
+        if self._connection is not None and self._pid == os.getpid():
+            return self._connection
+        if self.path:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.path or ":memory:", timeout=self.busy_timeout,
+                                     isolation_level=None, check_same_thread=False)
+        if self.path:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(_SCHEMA)
+        self._connection = connection
+        self._pid = os.getpid()
+        return connection
+
+    def _read(self, connection: sqlite3.Connection, namespace: str, key: str, now: float) -> Any:
+        row = connection.execute(
+            "SELECT value, expires_at FROM kv WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= now):
+            return None
+        return fast_json.loads(row[0])
+
+    @staticmethod
+    def _write(connection: sqlite3.Connection, namespace: str, key: str, value: Any,
+               expires_at: Optional[float]) -> None:
+        connection.execute(
+            "INSERT OR REPLACE INTO kv (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (namespace, key, fast_json.dumps(value, default=str), expires_at)
+        )
+
+    def get(self, namespace: str, key: str) -> Any:
+        """The stored value, or None when it is missing or expired."""
+        with self._lock:
+            return self._read(self._connect(), namespace, key, time.time())
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, expiring after ``ttl`` seconds (None: never)."""
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._write(self._connect(), namespace, key, value, expires_at)
+
+    def delete(self, namespace: str, key: str) -> bool:
+        with self._lock:
+            cursor = self._connect().execute(
+                "DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key)
+            )
+            return cursor.rowcount > 0
+
+    def items(self, namespace: str) -> Dict[str, Any]:
+        """Every live entry of a namespace."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT key, value FROM kv WHERE namespace = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, time.time())
+            ).fetchall()
+        return {key: fast_json.loads(value) for key, value in rows}
+
+    def increment(self, namespace: str, key: str) -> int:
+        """Atomically add one to a counter (which never expires) and return the new value."""
+        with self._lock:
+            row = self._connect().execute(
+                "INSERT INTO kv (namespace, key, value, expires_at) VALUES (?, ?, '1', NULL) "
+                "ON CONFLICT (namespace, key) DO UPDATE SET "
+                "value = CASE WHEN expires_at <= ? THEN 1 ELSE CAST(value AS INTEGER) + 1 END, "
+                "expires_at = NULL "
+                "RETURNING value",
+                (namespace, key, time.time())
+            ).fetchone()
+        return int(row[0])
+
+    def update(self, namespace: str, key: str, values: Optional[Dict[str, Any]] = None,
+               increments: Optional[Dict[str, float]] = None,
+               merges: Optional[Dict[str, Dict[str, Any]]] = None) -> bool:
+        """
+        Change top-level fields of a stored JSON object in one UPDATE statement.
+
+        Args:
+            values: Fields to set
+            increments: Numeric fields to add to
+            merges: Object fields to merge into (as a JSON merge patch)
+
+        Returns:
+            Whether the entry exists
+        """
+        expression, params = "value", []
+        for name, value in (values or {}).items():
+            expression = f"json_set({expression}, ?, json(?))"
+            params += [f"$.{name}", fast_json.dumps(value, default=str)]
+        for name, amount in (increments or {}).items():
+            expression = f"json_set({expression}, ?, COALESCE(json_extract(value, ?), 0) + ?)"
+            params += [f"$.{name}", f"$.{name}", amount]
+        for name, patch in (merges or {}).items():
+            expression = f"json_set({expression}, ?, json_patch(COALESCE(json_extract(value, ?), '{{}}'), ?))"
+            params += [f"$.{name}", f"$.{name}", fast_json.dumps(patch, default=str)]
+        with self._lock:
+            cursor = self._connect().execute(
+                f"UPDATE kv SET value = {expression} "
+                "WHERE namespace = ? AND key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (*params, namespace, key, time.time())
+            )
+            return cursor.rowcount > 0
+
+    def modify(self, namespace: str, key: str, change: Callable[[Any], Any]) -> Any:
+        """
+        Replace a value with ``change(value)`` in one transaction, keeping its expiry.
+
+        ``change`` gets None for a missing entry and returns the new value;
+        returning None deletes the entry.
+        """
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute(
+                    "SELECT expires_at FROM kv WHERE namespace = ? AND key = ?", (namespace, key)
+                ).fetchone()
+                value = change(self._read(connection, namespace, key, now))
+                if value is None:
+                    connection.execute("DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key))
+                else:
+                    expires_at = row[0] if row is not None and row[0] is not None and row[0] > now else None
+                    self._write(connection, namespace, key, value, expires_at)
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return value
+
+    def hit(self, namespace: str, key: str, limit: int, window: float) -> Tuple[bool, float]:
+        """
+        Count a request against a sliding window of ``limit`` requests per ``window`` seconds.
+
+        Returns:
+            Whether the request is allowed, and seconds until the oldest
+            request in the window leaves it (0 when allowed)
+        """
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            # Taken before reading so two workers cannot both admit the last slot
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                requests = [t for t in self._read(connection, namespace, key, now) or [] if t > now - window]
+                allowed = len(requests) < limit
+                if allowed:
+                    requests.append(now)
+                self._write(connection, namespace, key, requests, now + window)
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        if allowed:
+            return True, 0.0
+        return False, max(0.0, min(requests) + window - now)
+
+    def purge_expired(self) -> int:
+        """Delete expired entries; returns how many were removed."""
+        with self._lock:
+            cursor = self._connect().execute(
+                "DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            )
+            return cursor.rowcount
+
+    async def purge_periodically(self, interval: float) -> None:
+        """Delete expired entries every ``interval`` seconds, until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                removed = await self._run(self.purge_expired)
+                if removed:
+                    logger.debug("Purged expired shared state entries", removed=removed)
+            except Exception as e:
+                logger.warning("Failed to purge expired shared state entries", error=str(e))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+            self._pid = None
+        if self._executor is not None and self._executor_pid == os.getpid():
+            self._executor.shutdown(wait=True)
+        self._executor = None
+
+    def _thread(self) -> ThreadPoolExecutor:
+        # Threads do not survive fork(); each worker process starts its own
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shared-state")
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    async def _run(self, function: Callable[..., T], *args: Any) -> T:
+        """Run a store call off the event loop when it touches the shared file."""
+        if not self.shared:
+            # No disk I/O and no other process to wait for
+            return function(*args)
+        return await asyncio.get_running_loop().run_in_executor(self._thread(), functools.partial(function, *args))
+
+    async def aget(self, namespace: str, key: str) -> Any:
+        return await self._run(self.get, namespace, key)
+
+    async def aset(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        await self._run(self.set, namespace, key, value, ttl)
+
+    async def adelete(self, namespace: str, key: str) -> bool:
+        return await self._run(self.delete, namespace, key)
+
+    async def aitems(self, namespace: str) -> Dict[str, Any]:
+        return await self._run(self.items, namespace)
+
+    async def aincrement(self, namespace: str, key: str) -> int:
+        return await self._run(self.increment, namespace, key)
+
+    async def aupdate(self, namespace: str, key: str, values: Optional[Dict[str, Any]] = None,
+                      increments: Optional[Dict[str, float]] = None,
+                      merges: Optional[Dict[str, Dict[str, Any]]] = None) -> bool:
+        return await self._run(self.update, namespace, key, values, increments, merges)
+
+    async def amodify(self, namespace: str, key: str, change: Callable[[Any], Any]) -> Any:
+        return await self._run(self.modify, namespace, key, change)
+
+    async def ahit(self, namespace: str, key: str, limit: int, window: float) -> Tuple[bool, float]:
+        return await self._run(self.hit, namespace, key, limit, window)
+
+    def set_soon(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Queue a write without waiting for it, for callers that cannot await; writes apply in order."""
+        if not self.shared:
+            self.set(namespace, key, value, ttl)
+            return
+        future = self._thread().submit(self.set, namespace, key, value, ttl)
+        future.add_done_callback(functools.partial(_log_failed_write, namespace, key))
+
+
+def _log_failed_write(namespace: str, key: str, future: Future) -> None:
+    if future.exception() is not None:
+        logger.warning("Failed to write shared state", namespace=namespace, key=key,
+                       error=str(future.exception()))
+
+
+# Global store used by the session, rate limit, job and server registry state
+shared_store = SharedStore(settings.shared_state_path)
@@ -0,0 +1,95 @@
+"""
+Single-flight request coalescing.
+
+Concurrent callers that ask for the same key share one in-flight
+execution instead of each starting the same work: the first caller starts
+it, later callers await its result. Once it finishes the key is released,
+so this deduplicates concurrent work only and never serves stale results.
+"""
+
+import asyncio
+import re
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+import structlog
+
+from app.core import metrics
+from app.utils import fast_json
+
+logger = structlog.get_logger()
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _canonicalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return _WHITESPACE_RE.sub(" ", value).strip()
+    if isinstance(value, dict):
+        return {str(key): _canonicalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonicalize(item) for item in value]
+    return value
+
+
+def canonical_key(name: str, parameters: Optional[Dict[str, Any]]) -> str:
+    """
+    Build a stable key for a call from its name and parameters.
+
+    Parameter order does not matter and runs of whitespace in string
+    values are collapsed, so trivially different requests map to one key.
+    """
+    return name + ":" + fast_json.dumps(_canonicalize(parameters or {}), default=str, sort_keys=True)
+
+
+class SingleFlight:
+    """Coalesces concurrent async calls that share a key."""
+
+    def __init__(self, group: str):
+        self.group = group
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self._waiters: Dict[asyncio.Future, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``func`` unless a call with the same key is already running.
+
+        The work runs in its own task, so a caller that is cancelled does not
+        cancel it for the other callers waiting on the same key; it is only
+        cancelled once every caller has given up on it.
+        """
+        future = self._in_flight.get(key)
+        if future is not None and future.get_loop() is asyncio.get_running_loop():
+            metrics.record_single_flight(self.group, shared=True)
+            logger.debug("Joined in-flight call", group=self.group)
+            return await self._wait(future)
+
+        metrics.record_single_flight(self.group, shared=False)
+        future = asyncio.ensure_future(func())
+        self._in_flight[key] = future
+        self._waiters[future] = 0
+
+        def release(done: asyncio.Future) -> None:
+            if self._in_flight.get(key) is done:
+                del self._in_flight[key]
+            self._waiters.pop(done, None)
+            if not done.cancelled():
+                # Mark the exception as retrieved when no caller is left to await it
+                done.exception()
+
+        future.add_done_callback(release)
+        return await self._wait(future)
+
+    async def _wait(self, future: asyncio.Future) -> Any:
+        self._waiters[future] = self._waiters.get(future, 0) + 1
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if not future.done():
+                self._waiters[future] -= 1
+                if self._waiters[future] <= 0:
+                    # Nobody is waiting for the result any more
+                    future.cancel()
+            raise
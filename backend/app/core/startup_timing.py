@@ -0,0 +1,73 @@
+"""
+Startup timing report.
+
+Records how long the backend's own module imports and each lifespan phase
+take, so slow cold starts (container restarts, scale-out) can be traced to
+an import or an initialization step. Import times include whatever the
+module pulls in that was not already loaded, so a dependency shared by two
+modules is charged to the first one imported. Phases that run concurrently
+overlap, so their times do not add up to the total.
+
+The report is logged once startup completes and served at
+``GET /api/v1/health/startup``.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Dict, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class StartupTimer:
+    """Import and initialization phase durations of this process."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.imports: Dict[str, float] = {}
+        self.phases: Dict[str, float] = {}
+        self.ready_after: Optional[float] = None
+
+    @contextmanager
+    def importing(self, module: str) -> Iterator[None]:
+        """Time the import statements of the block as ``module``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.imports[module] = time.perf_counter() - start
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time an initialization step."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+
+    async def timed(self, name: str, awaitable: Awaitable[T]) -> T:
+        """Await ``awaitable`` as phase ``name``, e.g. as one of several gathered phases."""
+        with self.phase(name):
+            return await awaitable
+
+    def mark_ready(self) -> None:
+        self.ready_after = time.perf_counter() - self.started
+
+    def report(self) -> Dict[str, Any]:
+        """Durations in milliseconds, slowest first."""
+        def milliseconds(durations: Dict[str, float]) -> Dict[str, float]:
+            return {name: round(seconds * 1000, 1)
+                    for name, seconds in sorted(durations.items(), key=lambda item: -item[1])}
+
+        return {
+            "imports_ms": milliseconds(self.imports),
+            "phases_ms": milliseconds(self.phases),
+            "import_total_ms": round(sum(self.imports.values()) * 1000, 1),
+            # From the first backend module import until the app accepted requests
+            "ready_ms": round(self.ready_after * 1000, 1) if self.ready_after is not None else None
+        }
+
+
+# Global timer; started when the backend's first module is imported
+startup_timer = StartupTimer()
@@ -0,0 +1,387 @@
+"""
+Lightweight distributed tracing for the Word Add-in MCP backend.
+
+Spans are tracked with ``contextvars`` so nesting follows the async call
+chain automatically, and context crosses process boundaries with the W3C
+``traceparent`` header (e.g. the JSON-RPC hop to the internal MCP server).
+
+Finished spans are batched on a background thread and written either to a
+local JSONL file or to an OTLP/HTTP collector using the OTLP JSON encoding,
+so latency breakdowns can be captured and compared offline.
+"""
+
+import functools
+import inspect
+import os
+import queue
+import re
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import structlog
+
+from app.utils import fast_json
+
+logger = structlog.get_logger()
+
+TRACEPARENT_HEADER = "traceparent"
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    """Identifiers that link a span to its trace."""
+    trace_id: str
+    span_id: str
+    sampled: bool = True
+
+
+@dataclass
+class Span:
+    """A timed operation within a trace."""
+    name: str
+    context: SpanContext
+    parent_span_id: Optional[str] = None
+    kind: int = SPAN_KIND_INTERNAL
+    start_time_ns: int = field(default_factory=time.time_ns)
+    end_time_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+    status_message: Optional[str] = None
+    recording: bool = True
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self.recording and value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def record_exception(self, error: BaseException) -> None:
+        self.status = "error"
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_time_ns is None:
+            return None
+        return (self.end_time_ns - self.start_time_ns) / 1_000_000
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Flat representation used by the file exporter."""
+        return {
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_span_id": self.parent_span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_time_ns": self.start_time_ns,
+            "end_time_ns": self.end_time_ns,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "status_message": self.status_message,
+            "attributes": self.attributes,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class FileSpanExporter:
+    """Append finished spans to a JSONL file, one span per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def export(self, spans: List[Span]) -> None:
+        with open(self.path, "a", encoding="utf-8") as handle:
+            for span in spans:
+                handle.write(fast_json.dumps(span.to_dict(), default=str) + "\n")
+
+
+class OTLPHttpSpanExporter:
+    """Send finished spans to an OTLP/HTTP collector using JSON encoding."""
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def _encode(self, spans: List[Span]) -> Dict[str, Any]:
+        encoded = []
+        for span in spans:
+            item = {
+                "traceId": span.context.trace_id,
+                "spanId": span.context.span_id,
+                "name": span.name,
+                "kind": span.kind,
+                "startTimeUnixNano": str(span.start_time_ns),
+                "endTimeUnixNano": str(span.end_time_ns or span.start_time_ns),
+                "attributes": [
+                    {"key": key, "value": _otlp_value(value)}
+                    for key, value in span.attributes.items()
+                ],
+                "status": {"code": 2 if span.status == "error" else 1},
+            }
+            if span.parent_span_id:
+                item["parentSpanId"] = span.parent_span_id
+            if span.status_message:
+                item["status"]["message"] = span.status_message
+            encoded.append(item)
+        return {
+            "resourceSpans": [{
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": self.service_name}}
+                    ]
+                },
+                "scopeSpans": [{
+                    "scope": {"name": "word-addin-mcp"},
+                    "spans": encoded
+                }]
+            }]
+        }
+
+    def export(self, spans: List[Span]) -> None:
+        import httpx
+
+        response = httpx.post(self.endpoint, json=self._encode(spans), timeout=self.timeout)
+        response.raise_for_status()
+
+
+class BatchSpanProcessor:
+    """Queue finished spans and export them in batches from a daemon thread."""
+
+    def __init__(self, exporter, max_batch_size: int = 256, flush_interval: float = 2.0,
+                 max_queue_size: int = 8192):
+        self.exporter = exporter
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=max_queue_size)
+        self._dropped = 0
+        self._stop = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def on_end(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self._dropped += 1
+
+    def _drain(self) -> List[Span]:
+        batch: List[Span] = []
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def force_flush(self) -> None:
+        with self._flush_lock:
+            while True:
+                batch = self._drain()
+                if not batch:
+                    return
+                try:
+                    self.exporter.export(batch)
+                except Exception as e:
+                    logger.warning("Span export failed", error=str(e), spans=len(batch))
+                    return
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.force_flush()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=self.flush_interval + 1)
+        self.force_flush()
+        if self._dropped:
+            logger.warning("Spans dropped because the export queue was full", dropped=self._dropped)
+
+
+class Tracer:
+    """Creates spans and hands finished ones to the span processor."""
+
+    def __init__(self, processor: Optional[BatchSpanProcessor] = None):
+        self.processor = processor
+
+    @property
+    def enabled(self) -> bool:
+        return self.processor is not None
+
+    @contextmanager
+    def start_span(self, name: str, kind: int = SPAN_KIND_INTERNAL,
+                   attributes: Optional[Dict[str, Any]] = None,
+                   parent: Optional[SpanContext] = None) -> Iterator[Span]:
+        """
+        Start a span as a child of ``parent`` or of the current span.
+
+        When tracing is disabled a non-recording span is yielded so callers
+        can set attributes unconditionally.
+        """
+        parent_span = _current_span.get()
+        parent_context = parent or (parent_span.context if parent_span else None)
+
+        if parent_context:
+            trace_id = parent_context.trace_id
+            parent_span_id = parent_context.span_id
+        else:
+            trace_id = secrets.token_hex(16)
+            parent_span_id = None
+
+        span = Span(
+            name=name,
+            context=SpanContext(trace_id=trace_id, span_id=secrets.token_hex(8)),
+            parent_span_id=parent_span_id,
+            kind=kind,
+            recording=self.enabled,
+        )
+        if attributes:
+            span.set_attributes(attributes)
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_time_ns = time.time_ns()
+            if span.recording:
+                self.processor.on_end(span)
+
+    def shutdown(self) -> None:
+        if self.processor:
+            self.processor.shutdown()
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def _build_tracer() -> Tracer:
+    from .config import settings
+
+    if not settings.tracing_enabled:
+        return Tracer()
+
+    exporter_name = settings.tracing_exporter.lower()
+    if exporter_name == "otlp":
+        exporter = OTLPHttpSpanExporter(settings.tracing_otlp_endpoint, settings.tracing_service_name)
+    elif exporter_name == "file":
+        exporter = FileSpanExporter(settings.tracing_file_path)
+    else:
+        logger.warning("Unknown tracing exporter, tracing disabled", exporter=exporter_name)
+        return Tracer()
+
+    logger.info("Tracing enabled", exporter=exporter_name)
+    return Tracer(BatchSpanProcessor(exporter))
+
+
+def get_tracer() -> Tracer:
+    """Get or create the global tracer from settings."""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = _build_tracer()
+    return _tracer
+
+
+def set_tracer(tracer: Optional[Tracer]) -> None:
+    """Replace the global tracer (``None`` re-reads settings on next use)."""
+    global _tracer
+    _tracer = tracer
+
+
+def shutdown_tracing() -> None:
+    """Flush pending spans and stop the exporter thread."""
+    if _tracer is not None:
+        _tracer.shutdown()
+
+
+def start_span(name: str, kind: int = SPAN_KIND_INTERNAL,
+               attributes: Optional[Dict[str, Any]] = None,
+               parent: Optional[SpanContext] = None):
+    """Start a span on the global tracer."""
+    return get_tracer().start_span(name, kind=kind, attributes=attributes, parent=parent)
+
+
+def current_span() -> Optional[Span]:
+    """Return the active span, if any."""
+    return _current_span.get()
+
+
+def traced(name: Optional[str] = None, **attributes: Any) -> Callable:
+    """Decorator that wraps a sync or async function in a span."""
+
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with start_span(span_name, attributes=attributes):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with start_span(span_name, attributes=attributes):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def inject_headers(headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Add a ``traceparent`` header for the current span to ``headers``."""
+    headers = dict(headers or {})
+    span = _current_span.get()
+    if span is not None and span.recording:
+        flags = "01" if span.context.sampled else "00"
+        headers[TRACEPARENT_HEADER] = f"00-{span.context.trace_id}-{span.context.span_id}-{flags}"
+    return headers
+
+
+def extract_context(headers) -> Optional[SpanContext]:
+    """Parse a W3C ``traceparent`` header into a remote parent context."""
+    value = headers.get(TRACEPARENT_HEADER) if headers else None
+    if not value:
+        return None
+    match = _TRACEPARENT_RE.match(value.strip().lower())
+    if not match:
+        return None
+    trace_id, span_id, flags = match.groups()
+    if trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return SpanContext(trace_id=trace_id, span_id=span_id, sampled=bool(int(flags, 16) & 1))
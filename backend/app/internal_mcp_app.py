@@ -6,12 +6,22 @@ providing true MCP protocol compliance for internal tools.
 """
 
 import asyncio
+import hashlib
 import logging
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Request, Response
 import json
+from typing import Any, Dict, List, Optional, Tuple
+
 import structlog
 
+from .core import tracing
+from .core import request_context
+from .core.cancellation import run_cancellable
+from .core.single_flight import SingleFlight, canonical_key
+from .services.token_usage_service import token_usage_tracker
+from .utils import fast_json
+from .utils.fast_json import FastJSONResponse
+from .mcp_servers.tools.base import ToolErrorResult
 from .mcp_servers.tools.web_search import WebSearchTool
 from .mcp_servers.tools.prior_art_search import PriorArtSearchTool
 from .mcp_servers.tools.claim_drafting import ClaimDraftingTool
@@ -23,7 +33,8 @@ logger = structlog.get_logger()
 app = FastAPI(
     title="Internal MCP Server",
     description="Internal MCP server hosting all internal tools",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # Initialize tools
@@ -34,315 +45,354 @@ tools = {
     "claim_analysis_tool": ClaimAnalysisTool()
 }
 
+
+class ToolCatalog:
+    """
+    The tools/list result, built once from the registered tools' own schemas.
+
+    The result is serialized to bytes up front so serving tools/list only
+    splices in the request id, and its ETag lets clients skip re-downloading
+    an unchanged catalog.
+    """
+
+    def __init__(self, registered_tools: Dict[str, Any]):
+        self.tools = []
+        for name, tool in registered_tools.items():
+            definition = {
+                "name": name,
+                "description": tool.description,
+                "inputSchema": tool.get_input_schema()
+            }
+            cache_policy = tool.get_cache_policy() if hasattr(tool, "get_cache_policy") else None
+            if cache_policy:
+                definition["_meta"] = {"cache": cache_policy}
+            self.tools.append(definition)
+        self.result_bytes = fast_json.dumpb({"tools": self.tools}, sort_keys=True)
+        self.etag = '"' + hashlib.sha256(self.result_bytes).hexdigest()[:32] + '"'
+
+    def response_bytes(self, request_id: Any) -> bytes:
+        """Return the full JSON-RPC response for the given request id."""
+        return (
+            b'{"jsonrpc":"2.0","id":' +
+            fast_json.dumpb(request_id) +
+            b',"result":' + self.result_bytes + b'}'
+        )
+
+
+tool_catalog = ToolCatalog(tools)
+
+
+def refresh_tool_catalog() -> ToolCatalog:
+    """Rebuild the catalog after the registered tools change."""
+    global tool_catalog
+    tool_catalog = ToolCatalog(tools)
+    return tool_catalog
+
+
+def list_tools() -> List[Dict[str, Any]]:
+    """Return the MCP tool definitions served by this server."""
+    return tool_catalog.tools
+
+
+tool_call_flight = SingleFlight("tool_call")
+
+
+async def _execute(tool: Any, arguments: Dict[str, Any]) -> Tuple[Any, Optional[Dict[str, Any]]]:
+    if hasattr(tool, "execute_structured"):
+        return await tool.execute_structured(arguments)
+    return await tool.execute(arguments), None
+
+
+async def call_tool(tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Execute a registered tool and wrap its output as an MCP tools/call result.
+
+    Shared by the JSON-RPC endpoint and the in-process transport used when
+    the backend and this app run in the same process.
+
+    Identical concurrent calls to a ``coalesce_calls`` tool share one
+    execution, which runs in the request context of the caller that started
+    it: its trace spans and LLM usage are recorded there. Every other caller
+    is charged the same usage in its own session totals and has its current
+    span marked ``mcp.tool.coalesced``.
+
+    Raises:
+        KeyError: If no tool with this name is registered
+    """
+    tool = tools[tool_name]
+    try:
+        if getattr(tool, "coalesce_calls", False):
+            caller = object()
+
+            async def execute() -> Tuple[Any, Optional[Dict[str, Any]], List[Any], object]:
+                with token_usage_tracker.collect() as usage:
+                    result, structured = await _execute(tool, arguments)
+                return result, structured, usage, caller
+
+            result, structured, usage, started_by = await tool_call_flight.do(
+                canonical_key(tool_name, arguments), execute
+            )
+            if started_by is not caller:
+                token_usage_tracker.charge_session(usage)
+                span = tracing.current_span()
+                if span is not None:
+                    span.set_attribute("mcp.tool.coalesced", True)
+        else:
+            result, structured = await _execute(tool, arguments)
+        
+        if isinstance(result, dict):
+            # Dict results travel as structured content; the text item is
+            # their JSON form rather than a Python repr
+            structured = structured or result
+            text = fast_json.dumps(result, default=str)
+        else:
+            text = str(result)
+        
+        response = {
+            "content": [
+                {
+                    "type": "text",
+                    "text": text
+                }
+            ],
+            "isError": isinstance(result, ToolErrorResult)
+        }
+        if structured is not None:
+            response["structuredContent"] = structured
+        return response
+    except Exception as e:
+        return {
+            "content": [
+                {
+                    "type": "text",
+                    "text": f"Error executing tool: {str(e)}"
+                }
+            ],
+            "isError": True
+        }
+
+
+def _rpc_error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "error": {
+            "code": code,
+            "message": message
+        }
+    }
+
+
 # MCP endpoint
 @app.post("/")
 async def mcp_endpoint(request: Request):
     """Handle MCP protocol requests."""
+    with tracing.start_span(
+        "mcp.internal.handle_request",
+        kind=tracing.SPAN_KIND_SERVER,
+        parent=tracing.extract_context(request.headers)
+    ), request_context.bind(
+        budget=request_context.parse_deadline_header(request.headers.get(request_context.DEADLINE_HEADER))
+    ):
+        # Read the body before the disconnect watcher starts polling the connection
+        await request.body()
+        # Stop the tools when the calling backend gives up on the request
+        return await run_cancellable(request, lambda: _handle_mcp_request(request))
+
+
+async def _handle_mcp_request(request: Request):
+    """Dispatch a JSON-RPC request, or a batch of them, to the matching MCP methods."""
     try:
         # Validate MCP content type
         content_type = request.headers.get("content-type", "")
         if not content_type.startswith("application/json"):
-            return JSONResponse({
-                "jsonrpc": "2.0",
-                "id": 1,
-                "error": {
-                    "code": -32600,
-                    "message": "Invalid content type. Expected application/json"
-                }
-            }, status_code=400)
+            return FastJSONResponse(
+                _rpc_error(1, -32600, "Invalid content type. Expected application/json"),
+                status_code=400
+            )
         
-        body = await request.json()
+        body = fast_json.loads(await request.body())
         
-        # Validate JSON-RPC 2.0 structure
-        if not isinstance(body, dict) or "jsonrpc" not in body:
-            return JSONResponse({
-                "jsonrpc": "2.0",
-                "id": 1,
-                "error": {
-                    "code": -32600,
-                    "message": "Invalid JSON-RPC request"
-                }
-            })
+        if isinstance(body, list):
+            return await _handle_batch(body, request)
         
-        if body.get("jsonrpc") != "2.0":
-            return JSONResponse({
-                "jsonrpc": "2.0",
-                "id": body.get("id", 1),
-                "error": {
-                    "code": -32600,
-                    "message": "Invalid JSON-RPC version"
-                }
-            })
+        if isinstance(body, dict) and body.get("method") == "tools/list" and body.get("id") is not None \
+                and body.get("jsonrpc") == "2.0":
+            # Served from the pre-serialized catalog, revalidated by ETag
+            tracing.current_span().set_attribute("rpc.method", "tools/list")
+            catalog = tool_catalog
+            headers = {"ETag": catalog.etag}
+            if request.headers.get("if-none-match") == catalog.etag:
+                return Response(status_code=304, headers=headers)
+            return Response(
+                content=catalog.response_bytes(body["id"]),
+                media_type="application/json",
+                headers=headers
+            )
         
-        method = body.get("method")
-        request_id = body.get("id")
+        response = await _dispatch_message(body, request)
+        if response is None:
+            return Response(status_code=204)  # No content for notifications
+        return FastJSONResponse(response)
+            
+    except Exception as e:
+        return FastJSONResponse(_rpc_error(1, -32603, str(e)))
+
+
+async def _handle_batch(batch: List[Any], request: Request):
+    """
+    Dispatch a JSON-RPC 2.0 batch.
+
+    Entries run concurrently, at most ``INTERNAL_MCP_BATCH_CONCURRENCY`` at a
+    time, and responses are returned in request order. Notifications produce
+    no entry; a batch of only notifications gets an empty 204 response.
+    """
+    from .core.config import settings
+    
+    span = tracing.current_span()
+    span.set_attribute("rpc.method", "batch")
+    span.set_attribute("rpc.batch_size", len(batch))
+    
+    if not batch:
+        return FastJSONResponse(_rpc_error(None, -32600, "Invalid JSON-RPC request: empty batch"))
+    
+    semaphore = asyncio.Semaphore(max(1, settings.internal_mcp_batch_concurrency))
+    
+    async def dispatch(message: Any) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            with tracing.start_span("mcp.internal.batch_entry"):
+                try:
+                    return await _dispatch_message(message, request)
+                except Exception as e:
+                    request_id = message.get("id") if isinstance(message, dict) else None
+                    return _rpc_error(request_id, -32603, str(e))
+    
+    responses = await asyncio.gather(*(dispatch(message) for message in batch))
+    responses = [response for response in responses if response is not None]
+    if not responses:
+        return Response(status_code=204)
+    return FastJSONResponse(responses)
+
+
+async def _dispatch_message(body: Any, request: Request) -> Optional[Dict[str, Any]]:
+    """
+    Handle one JSON-RPC message and return its response object.
+
+    Returns ``None`` for notifications, which get no response.
+    """
+    # Validate JSON-RPC 2.0 structure
+    if not isinstance(body, dict) or "jsonrpc" not in body:
+        return _rpc_error(1, -32600, "Invalid JSON-RPC request")
+    
+    if body.get("jsonrpc") != "2.0":
+        return _rpc_error(body.get("id", 1), -32600, "Invalid JSON-RPC version")
+    
+    method = body.get("method")
+    request_id = body.get("id")
+    tracing.current_span().set_attribute("rpc.method", method)
+    
+    # Handle notifications (no response needed)
+    if request_id is None:
+        if method == "notifications/initialized":
+            logger.info("Client initialized notification received")
+        else:
+            logger.warning(f"Unknown notification method: {method}")
+        return None
+    
+    if method == "initialize":
+        # Get client capabilities from request
+        params = body.get("params", {})
+        client_info = params.get("clientInfo", {})
         
-        # Handle notifications (no response needed)
-        if request_id is None:
-            if method == "notifications/initialized":
-                logger.info("Client initialized notification received")
-                return JSONResponse({}, status_code=204)  # No content for notifications
-            else:
-                logger.warning(f"Unknown notification method: {method}")
-                return JSONResponse({}, status_code=204)
+        logger.info(f"Initializing MCP connection with client: {client_info.get('name', 'Unknown')}")
         
-        if method == "initialize":
-            # Get client capabilities from request
-            params = body.get("params", {})
-            client_capabilities = params.get("capabilities", {})
-            client_info = params.get("clientInfo", {})
-            
-            logger.info(f"Initializing MCP connection with client: {client_info.get('name', 'Unknown')}")
-            
-            # Return server capabilities based on what we support
-            return JSONResponse({
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "result": {
-                    "protocolVersion": "2024-11-05",
-                    "capabilities": {
-                        "tools": {
-                            "listChanged": False  # We don't support dynamic tool changes
-                        },
-                        "resources": {
-                            "subscribe": False,
-                            "listChanged": False
-                        },
-                        "prompts": {
-                            "listChanged": False
-                        },
-                        "logging": {}
-                    },
-                    "serverInfo": {
-                        "name": "Internal MCP Server",
-                        "version": "1.0.0"
-                    }
-                }
-            })
-        elif method == "tools/list":
-            return JSONResponse({
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "result": {
-                    "tools": [
-                    {
-                        "name": "web_search_tool",
-                        "description": "Search the web for information",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "query": {
-                                    "type": "string",
-                                    "description": "The search query"
-                                },
-                                "max_results": {
-                                    "type": "integer",
-                                    "description": "Maximum number of results to return",
-                                    "default": 10
-                                }
-                            },
-                            "required": ["query"]
-                        }
+        # Return server capabilities based on what we support
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "result": {
+                "protocolVersion": "2024-11-05",
+                "capabilities": {
+                    "tools": {
+                        "listChanged": False  # We don't support dynamic tool changes
                     },
-                    {
-                        "name": "prior_art_search_tool",
-                        "description": "Search for prior art and patents",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "query": {
-                                    "type": "string",
-                                    "description": "The search query for prior art"
-                                },
-                                "max_results": {
-                                    "type": "integer",
-                                    "description": "Maximum number of results to return",
-                                    "default": 10
-                                }
-                            },
-                            "required": ["query"]
-                        }
+                    "resources": {
+                        "subscribe": False,
+                        "listChanged": False
                     },
-                    {
-                        "name": "claim_drafting_tool",
-                        "description": "Draft patent claims based on input",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "user_query": {
-                                    "type": "string",
-                                    "description": "User query describing what claims to draft",
-                                    "minLength": 3,
-                                    "maxLength": 1000
-                                },
-                                "conversation_context": {
-                                    "type": "string",
-                                    "description": "Additional context from conversation history",
-                                    "maxLength": 5000
-                                },
-                                "document_reference": {
-                                    "type": "string",
-                                    "description": "Reference to existing document content",
-                                    "maxLength": 10000
-                                }
-                            },
-                            "required": ["user_query"]
-                        }
+                    "prompts": {
+                        "listChanged": False
                     },
-                    {
-                        "name": "claim_analysis_tool",
-                        "description": "Analyze patent claims for quality and structure",
-                        "inputSchema": {
-                            "type": "object",
-                            "properties": {
-                                "claims": {
-                                    "type": "array",
-                                    "description": "List of patent claims to analyze",
-                                    "minItems": 1,
-                                    "maxItems": 50,
-                                    "items": {
-                                        "type": "object",
-                                        "properties": {
-                                            "claim_number": {"type": "string"},
-                                            "claim_text": {"type": "string"},
-                                            "claim_type": {"type": "string", "enum": ["independent", "dependent"]},
-                                            "dependency": {"type": "string"},
-                                            "technical_focus": {"type": "string"}
-                                        },
-                                        "required": ["claim_text"]
-                                    }
-                                },
-                                "analysis_type": {
-                                    "type": "string",
-                                    "description": "Type of analysis to perform",
-                                    "enum": ["basic", "comprehensive", "expert"],
-                                    "default": "comprehensive"
-                                },
-                                "focus_areas": {
-                                    "type": "array",
-                                    "description": "Specific areas to focus analysis on",
-                                    "items": {"type": "string"},
-                                    "default": []
-                                }
-                            },
-                            "required": ["claims"]
-                        }
-                    }
-                ]
-            }
-            })
-        elif method == "tools/call":
-            params = body.get("params", {})
-            tool_name = params.get("name")
-            arguments = params.get("arguments", {})
-            
-            # Execute the tool
-            if tool_name in tools:
-                try:
-                    result = await tools[tool_name].execute(arguments)
-                    return JSONResponse({
-                        "jsonrpc": "2.0",
-                        "id": request_id,
-                        "result": {
-                            "content": [
-                                {
-                                    "type": "text",
-                                    "text": str(result)
-                                }
-                            ],
-                            "isError": False
-                        }
-                    })
-                except Exception as e:
-                    return JSONResponse({
-                        "jsonrpc": "2.0",
-                        "id": request_id,
-                        "result": {
-                            "content": [
-                                {
-                                    "type": "text",
-                                    "text": f"Error executing tool: {str(e)}"
-                                }
-                            ],
-                            "isError": True
-                        }
-                    })
-            else:
-                return JSONResponse({
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "error": {
-                        "code": -32601,
-                        "message": f"Tool '{tool_name}' not found"
-                    }
-                })
-        elif method == "resources/list":
-            # MCP Resources - return empty list for now
-            return JSONResponse({
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "result": {
-                    "resources": []
-                }
-            })
-        elif method == "resources/read":
-            # MCP Resources - not implemented
-            return JSONResponse({
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "error": {
-                    "code": -32601,
-                    "message": "Resources not supported"
+                    "logging": {}
+                },
+                "serverInfo": {
+                    "name": "Internal MCP Server",
+                    "version": "1.0.0"
                 }
-            })
-        elif method == "prompts/list":
-            # MCP Prompts - return empty list for now
-            return JSONResponse({
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "result": {
-                    "prompts": []
-                }
-            })
-        elif method == "prompts/get":
-            # MCP Prompts - not implemented
-            return JSONResponse({
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "error": {
-                    "code": -32601,
-                    "message": "Prompts not supported"
-                }
-            })
-        elif method == "logging/setLevel":
-            # MCP Logging - basic implementation
-            params = body.get("params", {})
-            level = params.get("level", "info")
-            logger.info(f"Log level set to: {level}")
-            return JSONResponse({
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "result": {}
-            })
-        else:
-            return JSONResponse({
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "error": {
-                    "code": -32601,
-                    "message": f"Method '{method}' not found"
-                }
-            })
-            
-    except Exception as e:
-        return JSONResponse({
+            }
+        }
+    elif method == "tools/list":
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "result": {"tools": tool_catalog.tools}
+        }
+    elif method == "tools/call":
+        params = body.get("params", {})
+        tool_name = params.get("name")
+        arguments = params.get("arguments", {})
+        tracing.current_span().set_attribute("mcp.tool", tool_name)
+        
+        # Execute the tool
+        if tool_name not in tools:
+            return _rpc_error(request_id, -32601, f"Tool '{tool_name}' not found")
+        
+        with request_context.bind(
+            session_id=request.headers.get(request_context.SESSION_HEADER),
+            tool_name=tool_name
+        ):
+            result = await call_tool(tool_name, arguments)
+        return {
             "jsonrpc": "2.0",
-            "id": 1,
-            "error": {
-                "code": -32603,
-                "message": str(e)
+            "id": request_id,
+            "result": result
+        }
+    elif method == "resources/list":
+        # MCP Resources - return empty list for now
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "result": {
+                "resources": []
+            }
+        }
+    elif method == "resources/read":
+        # MCP Resources - not implemented
+        return _rpc_error(request_id, -32601, "Resources not supported")
+    elif method == "prompts/list":
+        # MCP Prompts - return empty list for now
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "result": {
+                "prompts": []
             }
-        })
+        }
+    elif method == "prompts/get":
+        # MCP Prompts - not implemented
+        return _rpc_error(request_id, -32601, "Prompts not supported")
+    elif method == "logging/setLevel":
+        # MCP Logging - basic implementation
+        params = body.get("params", {})
+        level = params.get("level", "info")
+        logger.info(f"Log level set to: {level}")
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "result": {}
+        }
+    else:
+        return _rpc_error(request_id, -32601, f"Method '{method}' not found")
 
 # Health check endpoint
 @app.get("/health")
@@ -361,6 +411,7 @@ async def startup_event():
     """Startup event for internal MCP server."""
     logger.info("Internal MCP Server starting up...")
     logger.info(f"Registered {len(tools)} tools: {list(tools.keys())}")
+    logger.info(f"Tool catalog ready: {len(tool_catalog.result_bytes)} bytes, ETag {tool_catalog.etag}")
 
 # Shutdown event
 @app.on_event("shutdown")
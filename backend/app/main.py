@@ -8,45 +8,74 @@ and middleware configured for MCP compliance.
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+import asyncio
 import logging
 import time
 from contextlib import asynccontextmanager
 
 import os
-from .core.config import settings
-from .core.logging import setup_logging
-from .middleware.auth0_jwt_middleware import Auth0JWTMiddleware
-from .api.v1 import mcp, external_mcp, session, health
-from .internal_mcp_app import app as internal_mcp_app
+from .core.startup_timing import startup_timer
+with startup_timer.importing("app.core"):
+    from .core.config import settings
+    from .core.logging import setup_logging
+    from .core import metrics, tracing
+    from .core import request_context
+    from .core.cancellation import DisconnectWatchMiddleware
+    from .utils.fast_json import FastJSONResponse
+with startup_timer.importing("app.middleware"):
+    from .middleware.auth0_jwt_middleware import Auth0JWTMiddleware
+with startup_timer.importing("app.api.v1.mcp"):
+    from .api.v1 import mcp
+with startup_timer.importing("app.api.v1.jobs"):
+    from .api.v1 import jobs
+with startup_timer.importing("app.api.v1.external_mcp"):
+    from .api.v1 import external_mcp
+with startup_timer.importing("app.api.v1.session"):
+    from .api.v1 import session
+with startup_timer.importing("app.api.v1.health"):
+    from .api.v1 import health
+with startup_timer.importing("app.internal_mcp_app"):
+    from .internal_mcp_app import app as internal_mcp_app
 
 # Setup logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
 
-async def _wait_for_internal_mcp_server():
+async def _wait_for_internal_mcp_server(timeout: float = 30.0):
     """Wait for internal MCP server to be ready."""
     import aiohttp
-    import asyncio
     
-    max_retries = 30
-    retry_delay = 1
-    
-    for attempt in range(max_retries):
-        try:
-            async with aiohttp.ClientSession() as session:
+    # Poll quickly at first: the server usually comes up within a second
+    deadline = time.monotonic() + timeout
+    retry_delay = 0.05
+    attempt = 0
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=2)) as session:
+        while time.monotonic() < deadline:
+            attempt += 1
+            try:
                 async with session.get(f"{settings.internal_mcp_url}/health") as response:
                     if response.status == 200:
                         logger.info("Internal MCP server is ready")
                         return
-        except Exception as e:
-            logger.debug(f"Waiting for internal MCP server... (attempt {attempt + 1}/{max_retries})")
-            await asyncio.sleep(retry_delay)
+            except Exception as e:
+                logger.debug(f"Waiting for internal MCP server... (attempt {attempt})")
+            await asyncio.sleep(min(retry_delay, max(0.0, deadline - time.monotonic())))
+            retry_delay = min(1.0, retry_delay * 2)
     
     raise RuntimeError("Internal MCP server failed to start within timeout")
 
 
+async def _internal_mcp_server_ready():
+    """Wait for the internal MCP server, continuing in degraded mode if it does not come up."""
+    try:
+        await _wait_for_internal_mcp_server()
+    except Exception as e:
+        # Fail-open behavior: log a warning and continue so App Service can start.
+        # This avoids container restart loops while still reporting degraded state.
+        logger.warning(f"Internal MCP server did not become ready: {str(e)}. Continuing startup in degraded mode.")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
@@ -58,31 +87,58 @@ async def lifespan(app: FastAPI):
     # Wait for internal MCP server to be ready (can be skipped in APP_STARTER_MODE
     # or if INTERNAL_MCP_FAIL_OPEN is enabled to avoid aborting startup in prod)
     skip_wait = getattr(settings, "app_starter_mode", False) or os.getenv("INTERNAL_MCP_FAIL_OPEN", "false").lower() == "true"
-    if skip_wait:
+    internal_server_ready = None
+    if settings.internal_mcp_inprocess:
+        logger.info("Internal MCP tools are dispatched in-process; no server to wait for")
+    elif skip_wait:
         logger.warning("Skipping internal MCP wait due to APP_STARTER_MODE or INTERNAL_MCP_FAIL_OPEN")
     else:
-        try:
-            await _wait_for_internal_mcp_server()
-        except Exception as e:
-            # Fail-open behavior: log a warning and continue so App Service can start.
-            # This avoids container restart loops while still reporting degraded state.
-            logger.warning(f"Internal MCP server did not become ready: {str(e)}. Continuing startup in degraded mode.")
+        internal_server_ready = _internal_mcp_server_ready()
     
-    # Initialize MCP Orchestrator
+    # Initialize MCP Orchestrator; it waits for the internal MCP server
+    # concurrently with the initialization steps that do not need it
     try:
-        from .services.mcp.orchestrator import get_mcp_orchestrator
-        mcp_orchestrator = get_mcp_orchestrator()
-        await mcp_orchestrator.initialize()
+        with startup_timer.phase("orchestrator"):
+            from .services.mcp.orchestrator import get_mcp_orchestrator
+            mcp_orchestrator = get_mcp_orchestrator()
+            await mcp_orchestrator.initialize(internal_server_ready=internal_server_ready)
         logger.info("MCP Orchestrator initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize MCP Orchestrator: {str(e)}")
         raise
     
+    # Start background job workers
+    with startup_timer.phase("job_service"):
+        from .services.job_service import job_service
+        job_service.start()
+    
+    # Sample event loop lag for the metrics endpoint
+    loop_lag_monitor = None
+    if settings.event_loop_lag_interval > 0:
+        loop_lag_monitor = asyncio.create_task(metrics.monitor_event_loop_lag(settings.event_loop_lag_interval))
+    
+    # Delete expired rate limit windows, job records and cancel requests from the shared state
+    shared_state_purger = None
+    if settings.shared_state_purge_interval > 0:
+        from .core.shared_state import shared_store
+        shared_state_purger = asyncio.create_task(shared_store.purge_periodically(settings.shared_state_purge_interval))
+    
+    startup_timer.mark_ready()
+    logger.info(f"Startup timing: {startup_timer.report()}")
+    
     yield
     
     # Shutdown
     logger.info("Shutting down Word Add-in MCP Backend")
     
+    if loop_lag_monitor:
+        loop_lag_monitor.cancel()
+    if shared_state_purger:
+        shared_state_purger.cancel()
+    
+    # Cancel running jobs
+    await job_service.stop()
+    
     # Cleanup MCP Orchestrator
     try:
         from .services.mcp.orchestrator import get_mcp_orchestrator
@@ -101,6 +157,9 @@ async def lifespan(app: FastAPI):
         logger.info("MCP Orchestrator cleanup completed")
     except Exception as e:
         logger.error(f"Error during MCP Orchestrator cleanup: {str(e)}")
+    
+    # Flush pending trace spans
+    tracing.shutdown_tracing()
 
 
 # Create FastAPI application
@@ -110,6 +169,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs" if settings.debug else None,
     redoc_url="/redoc" if settings.debug else None,
+    default_response_class=FastJSONResponse,
     lifespan=lifespan
 )
 
@@ -164,6 +224,63 @@ async def add_process_time_header(request: Request, call_next):
     return response
 
 
+def _route_label(request: Request) -> str:
+    """Return the matched route template so metric labels stay bounded."""
+    route = request.scope.get("route")
+    route_path = getattr(route, "path", None)
+    if not route_path:
+        return "unmatched"
+    # Mounted apps (e.g. /internal-mcp) report their own route relative to the mount
+    return f"{request.scope.get('root_path', '')}{route_path}"
+
+
+# Add Prometheus request metrics middleware
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Record request count, latency and in-flight gauge per route template."""
+    start_time = time.perf_counter()
+    metrics.http_requests_in_flight.inc()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        metrics.http_requests_in_flight.dec()
+        metrics.observe_http_request(
+            request.method, _route_label(request), status_code, time.perf_counter() - start_time
+        )
+
+
+# Add tracing middleware (root span per request, continues incoming traceparent)
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Wrap each request in a server span."""
+    with tracing.start_span(
+        f"{request.method} {request.url.path}",
+        kind=tracing.SPAN_KIND_SERVER,
+        attributes={"http.method": request.method, "http.target": request.url.path},
+        parent=tracing.extract_context(request.headers)
+    ) as span:
+        response = await call_next(request)
+        span.set_attribute("http.route", _route_label(request))
+        span.set_attribute("http.status_code", response.status_code)
+        if response.status_code >= 500:
+            span.status = "error"
+        return response
+
+
+# Bind per-request context (session id, deadline) for usage accounting and timeouts
+@app.middleware("http")
+async def bind_request_context(request: Request, call_next):
+    """Make the caller's session id and deadline available to downstream services."""
+    with request_context.bind(
+        session_id=request.headers.get(request_context.SESSION_HEADER),
+        budget=request_context.parse_deadline_header(request.headers.get(request_context.DEADLINE_HEADER))
+    ):
+        return await call_next(request)
+
+
 # Use standard CORSMiddleware to handle preflight and CORS headers
 # We'll add it after other middlewares so it runs as the outermost layer
 
@@ -203,6 +320,10 @@ app.add_middleware(
     expose_headers=["X-Authenticated-User-ID"]
 )
 
+# Watch for client disconnects outside every other layer; the http middlewares
+# above hide them from the request handlers
+app.add_middleware(DisconnectWatchMiddleware)
+
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -211,8 +332,9 @@ async def global_exception_handler(request: Request, exc: Exception):
         f"Unhandled exception - Method: {request.method}, URL: {request.url}, "
         f"Error: {str(exc)}, Error Type: {type(exc).__name__}"
     )
+    metrics.record_error("http", exc)
     
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=500,
         content={
             "error": "Internal Server Error",
@@ -231,14 +353,16 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         f"Status: {exc.status_code}, Detail: {exc.detail}"
     )
     
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=exc.status_code,
         content={
             "error": "HTTP Error",
             "message": exc.detail,
             "status_code": exc.status_code,
             "timestamp": time.time()
-        }
+        },
+        # Keep headers such as Retry-After
+        headers=exc.headers
     )
 
 
@@ -249,6 +373,12 @@ app.include_router(
     tags=["mcp"]
 )
 
+app.include_router(
+    jobs.router,
+    prefix="/api/v1",
+    tags=["jobs"]
+)
+
 app.include_router(
     external_mcp.router,
     prefix="/api/v1",
@@ -263,7 +393,7 @@ app.include_router(
 
 app.include_router(
     health.router,
-    prefix="/api/v1",
+    prefix="/api/v1/health",
     tags=["health"]
 )
 
@@ -288,8 +418,8 @@ async def health_check():
     """Health check endpoint."""
     try:
         # Check MCP Orchestrator status
-        from .services.mcp.orchestrator import mcp_orchestrator
-        orchestrator_status = await mcp_orchestrator.get_server_health()
+        from .services.mcp.orchestrator import get_mcp_orchestrator
+        orchestrator_status = await get_mcp_orchestrator().get_server_health()
         
         return {
             "status": "healthy",
@@ -300,7 +430,7 @@ async def health_check():
         
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}")
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=503,
             content={
                 "status": "unhealthy",
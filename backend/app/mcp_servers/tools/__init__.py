@@ -4,7 +4,7 @@ Internal MCP Tools Package.
 This package contains all the internal tools for the MCP server.
 """
 
-from .base import BaseInternalTool
+from .base import BaseInternalTool, ToolErrorResult
 from .web_search import WebSearchTool
 from .prior_art_search import PriorArtSearchTool
 from .claim_drafting import ClaimDraftingTool
@@ -12,6 +12,7 @@ from .claim_analysis import ClaimAnalysisTool
 
 __all__ = [
     "BaseInternalTool",
+    "ToolErrorResult",
     "WebSearchTool",
     "PriorArtSearchTool",
     "ClaimDraftingTool",
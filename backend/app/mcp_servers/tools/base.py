@@ -7,7 +7,7 @@ ensuring consistent interface and behavior that conforms to MCP standards.
 
 import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 import structlog
 
 # Define MCP types locally to avoid dependency issues
@@ -26,9 +26,27 @@ class Tool:
 logger = structlog.get_logger()
 
 
+class ToolErrorResult(str):
+    """
+    Markdown a tool returns in place of its result when it failed.
+    
+    It is shown to the user like any other result, but is reported as an
+    MCP ``isError`` result so that it is never cached.
+    """
+
+
 class BaseInternalTool(ABC):
     """Base class for all internal MCP tools conforming to MCP standards."""
     
+    # Tools whose output depends only on their parameters set this so that
+    # identical concurrent calls share one execution
+    coalesce_calls: bool = False
+    
+    # Seconds a result may be reused for identical parameters (None: never
+    # cached), and the parameters compared case-insensitively in cache keys
+    cache_ttl: Optional[float] = None
+    cache_case_insensitive: Tuple[str, ...] = ()
+    
     def __init__(self, name: str, description: str, version: str = "1.0.0"):
         self.name = name
         self.description = description
@@ -50,6 +68,22 @@ class BaseInternalTool(ABC):
         """
         pass
     
+    async def execute_structured(self, parameters: Dict[str, Any]) -> Tuple[Any, Optional[Dict[str, Any]]]:
+        """
+        Execute the tool and return its display output with structured data.
+        
+        Tools that produce machine-readable data alongside their markdown
+        override this so the data reaches clients as MCP ``structuredContent``
+        instead of being flattened into text.
+        
+        Args:
+            parameters: Tool parameters
+            
+        Returns:
+            Tuple of (result, structured_content or None)
+        """
+        return await self.execute(parameters), None
+    
     def get_metadata(self) -> Dict[str, Any]:
         """Get tool metadata."""
         return {
@@ -73,6 +107,15 @@ class BaseInternalTool(ABC):
             )
         )
     
+    def get_cache_policy(self) -> Optional[Dict[str, Any]]:
+        """Result caching policy advertised in the tool's ``_meta``, or None."""
+        if not self.cache_ttl:
+            return None
+        return {
+            "ttl": self.cache_ttl,
+            "case_insensitive": list(self.cache_case_insensitive)
+        }
+    
     def get_input_schema(self) -> Dict[str, Any]:
         """Get the input schema for this tool (JSON Schema format)."""
         # Return the input_schema if defined, otherwise default
@@ -10,9 +10,8 @@ Simplified patent search tool that:
 
 import structlog
 import time
-from typing import Dict, Any, List
-from .base import BaseInternalTool
-from app.services.patent_search_service import PatentSearchService
+from typing import Dict, Any, List, Optional, Tuple
+from .base import BaseInternalTool, ToolErrorResult
 
 logger = structlog.get_logger(__name__)
 
@@ -27,6 +26,12 @@ class PriorArtSearchTool(BaseInternalTool):
             version="2.0.0"
         )
         
+        # Identical concurrent searches share one execution, and reports are
+        # reused for the same normalized query for a short while
+        self.coalesce_calls = True
+        self.cache_ttl = 1800
+        self.cache_case_insensitive = ("query",)
+        
         # Tool schema definition
         self.input_schema = {
             "type": "object",
@@ -103,10 +108,23 @@ class PriorArtSearchTool(BaseInternalTool):
             }
         ]
         
-        self.patent_service = PatentSearchService()
+        # Built on first use: the service and its LLM client are not needed to list tools
+        self._patent_service = None
+    
+    @property
+    def patent_service(self):
+        if self._patent_service is None:
+            from app.services.patent_search_service import PatentSearchService
+            self._patent_service = PatentSearchService()
+        return self._patent_service
     
     async def execute(self, parameters: Dict[str, Any]) -> str:
         """Execute prior art search with comprehensive report generation."""
+        report, _ = await self.execute_structured(parameters)
+        return report
+    
+    async def execute_structured(self, parameters: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Execute prior art search, returning the markdown report and the patents found."""
         start_time = time.time()
         
         query = parameters.get("query", "")
@@ -130,16 +148,23 @@ class PriorArtSearchTool(BaseInternalTool):
             execution_time = time.time() - start_time
             self.update_usage_stats(execution_time)
             
-            # Return just the markdown report
-            return search_result["report"]
+            structured = {
+                "query": search_result["query"],
+                "results_found": search_result["results_found"],
+                "patents": search_result["patents"],
+                "search_summary": search_result["search_summary"],
+                "search_metadata": search_result["search_metadata"],
+                "generated_search_criteria": generated_queries
+            }
+            return search_result["report"], structured
             
         except ValueError as e:
             execution_time = time.time() - start_time
             logger.error(f"Prior art search failed with specific error for '{query}': {str(e)}")
             # Return specific error as markdown
-            return f"# Prior Art Search Report\n\n**Query**: {query}\n\n**Error**: {str(e)}\n\n**Suggestion**: Please check your query and try again, or contact support if the issue persists."
+            return ToolErrorResult(f"# Prior Art Search Report\n\n**Query**: {query}\n\n**Error**: {str(e)}\n\n**Suggestion**: Please check your query and try again, or contact support if the issue persists."), None
         except Exception as e:
             execution_time = time.time() - start_time
             logger.error(f"Prior art search failed with unexpected error for '{query}': {str(e)}")
             # Return generic error as markdown
-            return f"# Prior Art Search Report\n\n**Query**: {query}\n\n**Error**: An unexpected error occurred during the search. Please try again.\n\n**Technical Details**: {str(e)}"
\ No newline at end of file
+            return ToolErrorResult(f"# Prior Art Search Report\n\n**Query**: {query}\n\n**Error**: An unexpected error occurred during the search. Please try again.\n\n**Technical Details**: {str(e)}"), None
\ No newline at end of file
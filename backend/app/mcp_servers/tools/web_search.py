@@ -7,7 +7,7 @@ This tool provides web search functionality for the internal MCP server.
 import time
 import structlog
 from typing import Dict, Any
-from .base import BaseInternalTool
+from .base import BaseInternalTool, ToolErrorResult
 
 logger = structlog.get_logger()
 
@@ -22,6 +22,12 @@ class WebSearchTool(BaseInternalTool):
             version="1.0.0"
         )
         
+        # Identical concurrent searches share one execution, and results are
+        # reused for the same normalized query for a short while
+        self.coalesce_calls = True
+        self.cache_ttl = 600
+        self.cache_case_insensitive = ("query",)
+        
         # Tool schema definition
         self.input_schema = {
             "type": "object",
@@ -141,12 +147,12 @@ class WebSearchTool(BaseInternalTool):
                 execution_time = time.time() - start_time
                 self.update_usage_stats(execution_time)
                 
-                return f"# Web Search Results for: {query}\n\nWebSearchService not configured. Please configure Google Search API credentials."
+                return ToolErrorResult(f"# Web Search Results for: {query}\n\nWebSearchService not configured. Please configure Google Search API credentials.")
             
         except Exception as e:
             execution_time = time.time() - start_time
             logger.error(f"Web search failed for query '{parameters.get('query', '')}': {str(e)}")
-            return f"# Web Search Results\n\n**Error**: Web search failed: {str(e)}"
+            return ToolErrorResult(f"# Web Search Results\n\n**Error**: Web search failed: {str(e)}")
     
     def get_schema(self) -> Dict[str, Any]:
         """Get complete tool schema."""
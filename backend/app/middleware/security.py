@@ -11,13 +11,15 @@ This middleware provides additional security features including:
 
 import time
 import json
-from typing import Callable, Dict, Any
+from collections import deque
+from typing import Callable, Deque, Dict, Any, Optional, Tuple
 from fastapi import Request, Response, HTTPException
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 import structlog
 
 from app.core.config import settings
+from app.core.shared_state import SharedStore, shared_store
 
 logger = structlog.get_logger()
 
@@ -168,16 +170,25 @@ class InputValidationMiddleware(BaseHTTPMiddleware):
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Enhanced rate limiting middleware with IP-based tracking."""
+    """Enhanced rate limiting middleware with IP-based tracking.
     
-    def __init__(self, app, **kwargs):
+    With a shared state store the request windows live there, so a client's
+    limit holds across all backend workers rather than per worker; a single
+    process keeps them in memory.
+    """
+    
+    def __init__(self, app, store: Optional[SharedStore] = None, **kwargs):
         super().__init__(app, **kwargs)
-        self.rate_limits: Dict[str, Dict[str, Any]] = {}
+        self.store = store or shared_store
         self.default_limits = {
             "auth": {"requests": 10, "window": 300},  # 10 requests per 5 minutes
             "api": {"requests": 100, "window": 60},   # 100 requests per minute
             "default": {"requests": 50, "window": 60}  # 50 requests per minute
         }
+        # Request times per "category:ip" when the store is not shared
+        self._windows: Dict[str, Deque[float]] = {}
+        # Seconds until a slot frees up, from each client's last rejected request
+        self._retry_after: Dict[str, float] = {}
     
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         """Process request through rate limiting middleware."""
@@ -193,7 +204,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             category = "default"
         
         # Check rate limit
-        if not self.check_rate_limit(client_ip, category):
+        if not await self.check_rate_limit(client_ip, category):
             logger.warning(
                 "Rate limit exceeded",
                 client_ip=client_ip,
@@ -210,48 +221,37 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         
         return await call_next(request)
     
-    def check_rate_limit(self, client_ip: str, category: str) -> bool:
+    async def check_rate_limit(self, client_ip: str, category: str) -> bool:
         """Check if request is within rate limit."""
-        import time
-        
-        now = time.time()
         limit_config = self.default_limits[category]
-        
-        if client_ip not in self.rate_limits:
-            self.rate_limits[client_ip] = {}
-        
-        if category not in self.rate_limits[client_ip]:
-            self.rate_limits[client_ip][category] = {
-                "requests": [],
-                "window_start": now
-            }
-        
-        # Clean old requests outside window
-        window_start = now - limit_config["window"]
-        self.rate_limits[client_ip][category]["requests"] = [
-            req_time for req_time in self.rate_limits[client_ip][category]["requests"]
-            if req_time > window_start
-        ]
-        
-        # Check if under limit
-        if len(self.rate_limits[client_ip][category]["requests"]) < limit_config["requests"]:
-            self.rate_limits[client_ip][category]["requests"].append(now)
-            return True
-        
-        return False
+        key = f"{category}:{client_ip}"
+        if self.store.shared:
+            allowed, retry_after = await self.store.ahit(
+                "rate_limit", key, limit_config["requests"], limit_config["window"]
+            )
+        else:
+            allowed, retry_after = self._hit_local(key, limit_config["requests"], limit_config["window"])
+        if not allowed:
+            self._retry_after[key] = retry_after
+        return allowed
+    
+    def _hit_local(self, key: str, limit: int, window: float) -> Tuple[bool, float]:
+        """Sliding window check against this process's own request times."""
+        now = time.time()
+        requests = self._windows.setdefault(key, deque())
+        while requests and requests[0] <= now - window:
+            requests.popleft()
+        if len(requests) < limit:
+            requests.append(now)
+            return True, 0.0
+        return False, requests[0] + window - now
     
     def get_retry_after(self, client_ip: str, category: str) -> int:
         """Get retry after time in seconds."""
-        import time
-        
-        now = time.time()
-        limit_config = self.default_limits[category]
-        
-        if client_ip in self.rate_limits and category in self.rate_limits[client_ip]:
-            oldest_request = min(self.rate_limits[client_ip][category]["requests"])
-            return int(limit_config["window"] - (now - oldest_request))
-        
-        return limit_config["window"]
+        retry_after = self._retry_after.pop(f"{category}:{client_ip}", None)
+        if retry_after is None:
+            return self.default_limits[category]["window"]
+        return int(retry_after)
 
 
 # Custom CORS middleware removed - using FastAPI CORS middleware instead
@@ -69,6 +69,16 @@ class AgentChatResponse(BaseModel):
         description="Error message if something went wrong"
     )
     
+    structured_content: Optional[Dict[str, Any]] = Field(
+        None,
+        description="Machine-readable tool output (MCP structuredContent), e.g. the patents found by prior art search"
+    )
+    
+    cache: Optional[Dict[str, Any]] = Field(
+        None,
+        description="Result cache metadata for the executed tool (hit, tier, age_seconds)"
+    )
+    
     class Config:
         schema_extra = {
             "example": {
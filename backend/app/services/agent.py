@@ -17,6 +17,10 @@ from datetime import datetime
 import json
 import re
 
+from app.core import tracing
+from app.core.exceptions import AdmissionRejectedError
+from app.utils import fast_json
+
 logger = structlog.get_logger()
 
 
@@ -91,12 +95,14 @@ class AgentService:
                 raise RuntimeError(f"Failed to initialize MCP orchestrator: {str(e)}")
         return self.mcp_orchestrator
     
+    @tracing.traced("agent.process_user_message")
     async def process_user_message(
         self,
         user_message: str,
         document_content: Optional[str] = None,
         available_tools: List[Dict[str, Any]] = None,
-        frontend_chat_history: List[Dict[str, Any]] = None
+        frontend_chat_history: List[Dict[str, Any]] = None,
+        bypass_cache: bool = False
     ) -> Dict[str, Any]:
         """
         Main method to process user message end-to-end.
@@ -137,9 +143,12 @@ class AgentService:
 
             intent_type, tool_name, parameters, reasoning = action_result
             logger.debug(f"Intent detected: {intent_type}, tool: {tool_name}")
+            tracing.current_span().set_attributes({"agent.intent": intent_type, "agent.tool": tool_name})
             
             final_response = ""
             execution_result = {}
+            structured_content = None
+            cache_info = None
             tools_used = ["llm_chat"]
 
             if intent_type == "conversation":
@@ -152,7 +161,9 @@ class AgentService:
                         raise RuntimeError("MCP Orchestrator not initialized.")
 
                     logger.debug(f"DEBUG: About to execute tool {tool_name} with parameters: {parameters}")
-                    execution_result = await orchestrator.execute_tool(tool_name, parameters)
+                    execution_result = await orchestrator.execute_tool(
+                        tool_name, parameters, bypass_cache=bypass_cache
+                    )
                     logger.debug(f"DEBUG: Tool execution result type: {type(execution_result)}")
                     logger.debug(f"DEBUG: Tool execution result keys: {execution_result.keys() if isinstance(execution_result, dict) else 'Not a dict'}")
                     if isinstance(execution_result, dict) and "result" in execution_result:
@@ -171,6 +182,8 @@ class AgentService:
                         isinstance(execution_result["result"], str)):
                         
                         final_response = execution_result["result"]
+                        structured_content = execution_result.get("structured_content")
+                        cache_info = execution_result.get("cache")
                         logger.debug(f"DEBUG: EXTRACTION SUCCESS - length: {len(final_response)}")
                         
                         # For prior art search, verify it's the comprehensive report
@@ -185,6 +198,9 @@ class AgentService:
                         logger.error(f"DEBUG: execution_result keys: {execution_result.keys() if isinstance(execution_result, dict) else 'Not a dict'}")
                         final_response = f"Error: Unable to extract tool result. Tool executed but response structure was unexpected."
                     
+                except AdmissionRejectedError:
+                    # Surfaced to the client as 429/503 with Retry-After
+                    raise
                 except Exception as e:
                     logger.error(f"DEBUG: Tool execution exception: {type(e).__name__}: {str(e)}")
                     final_response = f"Tool execution failed: {str(e)}"
@@ -200,7 +216,9 @@ class AgentService:
                 "tool_name": tool_name,
                 "execution_time": execution_time,
                 "success": True,
-                "error": None
+                "error": None,
+                "structured_content": structured_content,
+                "cache": cache_info
             }
             
             logger.debug(f"DEBUG: Final response data - response length: {len(final_response) if final_response else 'None'}")
@@ -208,6 +226,8 @@ class AgentService:
             
             return response_data
             
+        except AdmissionRejectedError:
+            raise
         except Exception as e:
             execution_time = time.time() - start_time
             error_response = f"Error processing request: {str(e)}"
@@ -222,6 +242,7 @@ class AgentService:
                 "error": str(e)
             }
     
+    @tracing.traced("agent.detect_intent")
     async def detect_intent_and_route(
         self,
         user_input: str,
@@ -281,7 +302,7 @@ class AgentService:
                         "description": tool.get("description"),
                         "parameters": tool.get("input_schema")
                     }
-                    tool_descriptions.append(json.dumps(tool_info, indent=2))
+                    tool_descriptions.append(fast_json.dumps(tool_info))
                 context_parts.append(f"Available Tools:\n'''\n{chr(10).join(tool_descriptions)}\n'''")
 
             return "\n\n".join(context_parts)
@@ -346,11 +367,12 @@ User said: "{user_input}"
 Choose the most appropriate tool or provide a conversational response."""
 
         try:
-            raw_llm_response = llm_client.generate_text(
+            raw_llm_response = await llm_client.generate_text(
                 prompt=user_prompt,
                 max_tokens=2000,
                 temperature=0.0,
-                system_message=system_prompt
+                system_message=system_prompt,
+                call_site="intent_detection"
             )
 
             if isinstance(raw_llm_response, dict) and "text" in raw_llm_response:
@@ -366,7 +388,7 @@ Choose the most appropriate tool or provide a conversational response."""
                 json_str = llm_response_text
 
             try:
-                parsed_response = json.loads(json_str)
+                parsed_response = fast_json.loads(json_str)
             except json.JSONDecodeError:
                 return "conversation", None, {}, f"I had trouble processing that request, but I'm here to help!"
 
@@ -418,6 +440,7 @@ Choose the most appropriate tool or provide a conversational response."""
             logger.error(f"LLM intent detection failed: {type(e).__name__}: {str(e)}")
             return "conversation", None, {}, "I'm having some technical difficulties, but I'm still here to help!"
     
+    @tracing.traced("agent.format_tool_output")
     async def format_tool_output_with_llm(self, tool_output: Any, user_query: str, tool_name: str = None) -> str:
         """
         Use LLM to format tool output into user-friendly markdown/HTML.
@@ -439,9 +462,9 @@ Choose the most appropriate tool or provide a conversational response."""
         
         # Convert tool output to string for LLM processing
         if isinstance(tool_output, dict):
-            tool_output_str = json.dumps(tool_output, indent=2)
+            tool_output_str = fast_json.dumps(tool_output, default=str)
         elif isinstance(tool_output, list):
-            tool_output_str = json.dumps(tool_output, indent=2)
+            tool_output_str = fast_json.dumps(tool_output, default=str)
         else:
             tool_output_str = str(tool_output)
         
@@ -474,11 +497,12 @@ Provide a well-formatted markdown response that directly answers the user's ques
 
         try:
             # Get formatted response from LLM
-            result = llm_client.generate_text(
+            result = await llm_client.generate_text(
                 prompt=user_prompt,
                 max_tokens=16000,
                 temperature=0.3,
-                system_message=system_prompt
+                system_message=system_prompt,
+                call_site="tool_output_formatting"
             )
             
             if result.get("success") and result.get("text"):
@@ -12,7 +12,9 @@ from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime
 import re
 
-from app.services.llm_client import LLMClient
+from app.core import request_context
+from app.services.llm_client import get_llm_client
+from app.utils import fast_json
 
 logger = logging.getLogger(__name__)
 
@@ -21,13 +23,8 @@ class ClaimAnalysisService:
     """Service for analyzing patent claims using LLM."""
     
     def __init__(self):
-        # Get LLM configuration from settings
-        from app.core.config import settings
-        self.llm_client = LLMClient(
-            azure_openai_api_key=settings.azure_openai_api_key,
-            azure_openai_endpoint=settings.azure_openai_endpoint,
-            azure_openai_deployment=settings.azure_openai_deployment
-        )
+        # Shared client; calls are rate limited by the LLM gateway
+        self.llm_client = get_llm_client()
         
         # Configuration
         self.timeout = 120.0
@@ -47,12 +44,15 @@ class ClaimAnalysisService:
             logger.info(f"Starting claim analysis for {len(claims)} claims")
             
             # Generate LLM analysis criteria
+            request_context.report_progress("generating_criteria", 0.0)
             llm_criteria = await self._generate_llm_analysis_criteria(claims, analysis_type, focus_areas)
             
             # Perform comprehensive claim analysis
+            request_context.report_progress("analyzing_claims", 0.3)
             analysis_result = await self._analyze_claims_with_llm(claims, analysis_type, focus_areas)
             
             # Generate analysis report
+            request_context.report_progress("generating_report", 0.8)
             analysis_report = await self._generate_analysis_report(analysis_result, claims)
             
             # Create result
@@ -128,10 +128,11 @@ Return a JSON response with these fields:
 Focus on creating a comprehensive analysis framework for patent claim evaluation.
 """
             
-            response_data = self.llm_client.generate_text(
+            response_data = await self.llm_client.generate_text(
                 prompt=prompt,
                 max_tokens=800,
-                temperature=0.3
+                temperature=0.3,
+                call_site="claim_analysis_criteria"
             )
             response = response_data.get("text", "")
             
@@ -143,7 +144,7 @@ Focus on creating a comprehensive analysis framework for patent claim evaluation
                 elif response.startswith("```"):
                     response = response.replace("```", "").strip()
                 
-                criteria = json.loads(response)
+                criteria = fast_json.loads(response)
                 logger.info(f"Generated LLM analysis criteria: {criteria.get('reasoning', 'No reasoning provided')}")
                 return criteria
             except json.JSONDecodeError:
@@ -178,11 +179,12 @@ Focus on creating a comprehensive analysis framework for patent claim evaluation
             user_prompt = self._load_user_prompt(claims, analysis_type, focus_areas)
             
             # Call LLM for analysis
-            response_data = self.llm_client.generate_text(
+            response_data = await self.llm_client.generate_text(
                 prompt=user_prompt,
                 system_message=system_prompt,
                 max_tokens=4000,
-                temperature=0.3
+                temperature=0.3,
+                call_site="claim_analysis"
             )
             
             # Parse response
@@ -195,7 +197,7 @@ Focus on creating a comprehensive analysis framework for patent claim evaluation
                 elif response_text.startswith("```"):
                     response_text = response_text.replace("```", "").strip()
                 
-                result = json.loads(response_text)
+                result = fast_json.loads(response_text)
             except json.JSONDecodeError:
                 # If not JSON, parse as natural language analysis
                 result = self._parse_natural_language_analysis(response_text, claims, analysis_type)
@@ -12,7 +12,7 @@ from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime
 import os
 
-from app.services.llm_client import LLMClient
+from app.services.llm_client import get_llm_client
 
 logger = logging.getLogger(__name__)
 
@@ -21,13 +21,8 @@ class ClaimDraftingService:
     """Service for drafting patent claims using LLM."""
     
     def __init__(self):
-        # Get LLM configuration from settings
-        from app.core.config import settings
-        self.llm_client = LLMClient(
-            azure_openai_api_key=settings.azure_openai_api_key,
-            azure_openai_endpoint=settings.azure_openai_endpoint,
-            azure_openai_deployment=settings.azure_openai_deployment
-        )
+        # Shared client; calls are rate limited by the LLM gateway
+        self.llm_client = get_llm_client()
         
         # Configuration
         self.default_max_claims = 10
@@ -86,11 +81,12 @@ class ClaimDraftingService:
             )
             
             # Call LLM
-            response_data = self.llm_client.generate_text(
+            response_data = await self.llm_client.generate_text(
                 prompt=formatted_user_prompt,
                 system_message=system_prompt,
                 max_tokens=4000,
-                temperature=0.3
+                temperature=0.3,
+                call_site="claim_drafting"
             )
             
             # Return raw response as markdown
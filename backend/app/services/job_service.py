@@ -0,0 +1,394 @@
+"""
+Background jobs for long-running tool calls.
+
+``POST /mcp/tools/{tool_name}/jobs`` queues a tool call here instead of
+holding the HTTP request open for minutes, which proxies in front of the
+backend cut off. A bounded pool of workers takes jobs in priority order and
+runs them through the orchestrator, detached from the submitting request.
+Tools report stage progress with ``request_context.report_progress``.
+Finished jobs and their results are kept for ``JOB_RESULT_TTL`` seconds.
+
+When backend workers share state (``SHARED_STATE_PATH``), every job change
+is also written to the shared store, so its status, events and cancellation
+work from whichever worker a request lands on; the job itself runs on the
+worker that accepted it.
+"""
+
+import asyncio
+import contextvars
+import itertools
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import structlog
+
+from app.core import metrics, request_context
+from app.core.config import settings
+from app.core.exceptions import AdmissionRejectedError, DeadlineExceededError, RateLimitError, ValidationError
+from app.core.shared_state import SharedStore, shared_store
+
+logger = structlog.get_logger()
+
+# Lower value runs first
+JOB_PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINAL_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+@dataclass
+class Job:
+    """A tool call executed in the background."""
+    job_id: str
+    tool_name: str
+    parameters: Dict[str, Any]
+    priority: str = "normal"
+    session_id: Optional[str] = None
+    status: str = QUEUED
+    stage: Optional[str] = None
+    progress: Optional[float] = None
+    stages: List[Dict[str, Any]] = field(default_factory=list)
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINAL_STATES
+
+    def to_dict(self, include_result: bool = False) -> Dict[str, Any]:
+        data = {
+            "job_id": self.job_id,
+            "tool_name": self.tool_name,
+            "priority": self.priority,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "stages": list(self.stages),
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+        if include_result:
+            data["result"] = self.result
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        """Rebuild a job from ``to_dict`` output (parameters are not kept)."""
+        fields = {name: data[name] for name in cls.__dataclass_fields__ if name in data}
+        fields.setdefault("parameters", {})
+        return cls(**fields)
+
+
+class JobService:
+    """Priority queue of tool jobs drained by a fixed pool of workers."""
+
+    def __init__(self, workers: int = 2, max_queued: int = 100, result_ttl: float = 3600.0,
+                 timeout: Optional[float] = 1800.0, store: Optional[SharedStore] = None,
+                 poll_interval: float = 1.0):
+        """
+        Args:
+            workers: Jobs that run at the same time
+            max_queued: Jobs that may wait for a worker before submissions are rejected
+            result_ttl: Seconds a finished job and its result are kept
+            timeout: Seconds a job may run before it is cancelled (None: no limit)
+            store: Store that makes jobs visible to other workers (used when shared)
+            poll_interval: Seconds between checks of the store for jobs of other workers
+        """
+        self.workers = max(1, workers)
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self.timeout = timeout
+        self.store = store or shared_store
+        self.poll_interval = poll_interval
+        self.jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._sequence = itertools.count()
+        self._worker_tasks: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        # Replaced on every change so watchers can wait for the next update
+        self._changed: Dict[str, asyncio.Event] = {}
+
+    @property
+    def started(self) -> bool:
+        return bool(self._worker_tasks)
+
+    def start(self) -> None:
+        """Start the worker pool on the running loop."""
+        if self.started:
+            return
+        loop = asyncio.get_running_loop()
+        self._queue = asyncio.PriorityQueue()
+        # Workers must not inherit the context (and deadline) of whoever started them
+        self._worker_tasks = [
+            loop.create_task(self._worker(), context=contextvars.Context())
+            for _ in range(self.workers)
+        ]
+        if self.store.shared:
+            self._worker_tasks.append(
+                loop.create_task(self._watch_cancellations(), context=contextvars.Context())
+            )
+        logger.info("Job workers started", workers=self.workers)
+
+    async def stop(self) -> None:
+        """Cancel running jobs and stop the workers."""
+        for task in [*self._running.values(), *self._worker_tasks]:
+            task.cancel()
+        await asyncio.gather(*self._running.values(), *self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._running.clear()
+        self._queue = None
+
+    def queued_count(self) -> int:
+        return sum(1 for job in self.jobs.values() if job.status == QUEUED)
+
+    async def submit(self, tool_name: str, parameters: Dict[str, Any], priority: str = "normal",
+                     session_id: Optional[str] = None) -> Job:
+        """
+        Queue a tool call.
+
+        Raises:
+            ValidationError: If the priority is unknown
+            RateLimitError: If the queue is full
+        """
+        if priority not in JOB_PRIORITIES:
+            raise ValidationError(f"Unknown job priority '{priority}'", field_name="priority", value=priority)
+        self._prune()
+        if self.queued_count() >= self.max_queued:
+            raise RateLimitError("Job queue is full", retry_after=30)
+        self.start()
+
+        job = Job(
+            job_id=uuid.uuid4().hex,
+            tool_name=tool_name,
+            parameters=parameters,
+            priority=priority,
+            session_id=session_id
+        )
+        self.jobs[job.job_id] = job
+        self._changed[job.job_id] = asyncio.Event()
+        self._publish(job)
+        self._queue.put_nowait((JOB_PRIORITIES[priority], next(self._sequence), job.job_id))
+        metrics.jobs_queued.set(self.queued_count())
+        logger.info("Job queued", job_id=job.job_id, tool_name=tool_name, priority=priority)
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        """A job of this worker, or a copy of another worker's job from the shared store."""
+        self._prune()
+        job = self.jobs.get(job_id)
+        if job is None and self.store.shared:
+            record = await self.store.aget("jobs", job_id)
+            if record is not None:
+                job = Job.from_dict(record)
+        return job
+
+    async def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued or running job; finished jobs are left as they are."""
+        job = await self.get(job_id)
+        if job is None or job.finished:
+            return job
+        if job_id not in self.jobs:
+            # Another worker runs it and picks the request up from the store
+            await self.store.aset("job_cancel", job_id, True, ttl=self.result_ttl)
+            return job
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        else:
+            # Still queued; the worker skips it when it comes up
+            self._finish(job, CANCELLED, error="Cancelled before it started")
+        return job
+
+    async def watch(self, job_id: str, heartbeat: float = 15.0) -> AsyncIterator[Optional[Job]]:
+        """
+        Yield the job now and after every change until it finishes.
+
+        ``None`` is yielded when nothing changed for ``heartbeat`` seconds,
+        so streaming callers can keep the connection alive.
+        """
+        job = await self.get(job_id)
+        if job is None:
+            return
+        if job_id not in self.jobs:
+            async for update in self._watch_shared(job, heartbeat):
+                yield update
+            return
+        # Taken before yielding, so a change made meanwhile is not missed
+        event = self._changed.get(job_id)
+        yield job
+        while not job.finished and event is not None:
+            try:
+                await asyncio.wait_for(event.wait(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            event = self._changed.get(job_id)
+            yield job
+
+    async def _watch_shared(self, job: Job, heartbeat: float) -> AsyncIterator[Optional[Job]]:
+        """``watch`` for a job of another worker, polling the shared store."""
+        yield job
+        last = job.to_dict()
+        quiet = 0.0
+        while not job.finished:
+            await asyncio.sleep(self.poll_interval)
+            record = await self.store.aget("jobs", job.job_id)
+            if record is None:
+                return  # Expired, or its worker went away
+            current = Job.from_dict(record)
+            if current.to_dict() != last:
+                job, last, quiet = current, current.to_dict(), 0.0
+                yield job
+            else:
+                quiet += self.poll_interval
+                if quiet >= heartbeat:
+                    quiet = 0.0
+                    yield None
+
+    async def _watch_cancellations(self) -> None:
+        """Cancel this worker's jobs that were cancelled through another worker."""
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            for job_id in [job_id for job_id, job in self.jobs.items() if not job.finished]:
+                if await self.store.adelete("job_cancel", job_id):
+                    await self.cancel(job_id)
+
+    def _publish(self, job: Job) -> None:
+        """Make the job's current state visible to the other workers."""
+        if not self.store.shared:
+            return
+        # Unfinished jobs may still run for the job timeout before their result is kept
+        ttl = self.result_ttl if job.finished else (self.timeout or 86400.0) + self.result_ttl
+        record = job.to_dict(include_result=job.finished)
+        record["worker_pid"] = os.getpid()
+        # Called from synchronous state changes; the writes are applied in order
+        self.store.set_soon("jobs", job.job_id, record, ttl=ttl)
+
+    def _notify(self, job: Job) -> None:
+        self._publish(job)
+        event = self._changed.get(job.job_id)
+        if event is not None:
+            event.set()
+            if not job.finished:
+                self._changed[job.job_id] = asyncio.Event()
+
+    def _report_progress(self, job: Job, stage: str, progress: Optional[float]) -> None:
+        if job.stage != stage:
+            job.stages.append({"stage": stage, "started_at": time.time()})
+        job.stage = stage
+        if progress is not None:
+            job.progress = max(0.0, min(1.0, progress))
+        self._notify(job)
+
+    def _finish(self, job: Job, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        if status == SUCCEEDED:
+            job.progress = 1.0
+        metrics.record_job_finished(job.tool_name, status)
+        logger.info("Job finished", job_id=job.job_id, tool_name=job.tool_name, status=status,
+                    duration=job.finished_at - (job.started_at or job.created_at))
+        self._notify(job)
+
+    def _prune(self) -> None:
+        """Drop finished jobs whose results have expired."""
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.finished and now - job.finished_at > self.result_ttl
+        ]
+        for job_id in expired:
+            self.jobs.pop(job_id, None)
+            self._changed.pop(job_id, None)
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self.jobs.get(job_id)
+            if job is None or job.status != QUEUED:
+                continue
+            job.status = RUNNING
+            job.started_at = time.time()
+            metrics.observe_job_started(job.tool_name, job.started_at - job.created_at, self.queued_count())
+            self._notify(job)
+
+            task = asyncio.ensure_future(self._run(job))
+            self._running[job_id] = task
+            try:
+                result = await asyncio.shield(task)
+            except asyncio.CancelledError:
+                if not task.cancelled():
+                    raise  # The worker itself is being stopped
+                self._finish(job, CANCELLED, error="Cancelled")
+            except Exception as e:
+                if isinstance(e, DeadlineExceededError):
+                    self._finish(job, FAILED, error=f"Job did not finish within {self.timeout:.0f}s")
+                else:
+                    self._finish(job, FAILED, error=str(e))
+            else:
+                self._finish(job, SUCCEEDED, result=result)
+            finally:
+                self._running.pop(job_id, None)
+
+    async def _run(self, job: Job) -> Any:
+        from app.services.mcp.orchestrator import get_initialized_mcp_orchestrator
+
+        orchestrator = get_initialized_mcp_orchestrator()
+        with request_context.bind(
+            session_id=job.session_id,
+            budget=self.timeout,
+            on_progress=lambda stage, progress: self._report_progress(job, stage, progress)
+        ):
+            coro = self._execute(orchestrator, job)
+            if self.timeout is None:
+                return await coro
+            try:
+                return await asyncio.wait_for(coro, timeout=self.timeout)
+            except asyncio.TimeoutError:
+                raise DeadlineExceededError("Job deadline exceeded", operation=job.tool_name)
+
+    @staticmethod
+    async def _execute(orchestrator: Any, job: Job) -> Any:
+        while True:
+            try:
+                return await orchestrator.execute_tool(job.tool_name, job.parameters)
+            except AdmissionRejectedError as e:
+                # A job has nobody waiting on a quick answer; wait for capacity instead of failing
+                logger.info("Job waiting for tool capacity", job_id=job.job_id, retry_after=e.retry_after)
+                await asyncio.sleep(e.retry_after or 1)
+
+    def get_stats(self) -> Dict[str, Any]:
+        self._prune()
+        counts: Dict[str, int] = {}
+        for job in self.jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "workers": self.workers,
+            "started": self.started,
+            "max_queued": self.max_queued,
+            "result_ttl_seconds": self.result_ttl,
+            "jobs": counts
+        }
+
+
+# Global job service instance
+job_service = JobService(
+    workers=settings.job_workers,
+    max_queued=settings.job_max_queued,
+    result_ttl=settings.job_result_ttl,
+    timeout=settings.job_timeout_seconds or None
+)
@@ -3,16 +3,25 @@ LLM Client Service
 
 Handles communication with Azure OpenAI and other LLM providers.
 Provides a unified interface for text generation, summarization, and analysis.
+Calls go through the shared ``llm_gateway``, which owns the connections,
+the rate limits, the retries and the choice between backends. Each call
+site's model profile picks the deployment, token limit and timeout.
 """
 
 import os
 import logging
+import time
 from typing import Dict, Any, Optional, List, Union
 from datetime import datetime
-import openai
-from openai import AzureOpenAI
 import json
 
+from app.core import metrics, tracing
+from app.core.cassette import REPLAY, cassette
+from app.core.config import settings
+from app.services.llm_gateway import LLMBackend, configured_backends, llm_gateway
+from app.services.llm_profiles import ModelProfile, load_profiles, profile_for
+from app.services.token_usage_service import token_usage_tracker
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,7 +31,9 @@ class LLMClient:
     def __init__(self, azure_openai_api_key: Optional[str] = None,
                  azure_openai_endpoint: Optional[str] = None,
                  azure_openai_deployment: Optional[str] = None,
-                 model_name: str = "gpt-4"):
+                 model_name: str = "gpt-4",
+                 backends: Optional[List[LLMBackend]] = None,
+                 profiles: Optional[Dict[str, ModelProfile]] = None):
         """
         Initialize the LLM client.
         
@@ -31,36 +42,37 @@ class LLMClient:
             azure_openai_endpoint: Azure OpenAI endpoint URL
             azure_openai_deployment: Azure OpenAI deployment name
             model_name: Model name to use
+            backends: Pool of deployments to balance calls over (default: the
+                single deployment given by the Azure OpenAI arguments)
+            profiles: Model profile per call site (default: from settings)
         """
         self.azure_openai_api_key = azure_openai_api_key
         self.azure_openai_endpoint = azure_openai_endpoint
         self.azure_openai_deployment = azure_openai_deployment
         self.model_name = model_name
         
-        # Initialize Azure OpenAI client
-        if azure_openai_api_key and azure_openai_endpoint:
-            try:
-                self.client = AzureOpenAI(
-                    api_key=azure_openai_api_key,
-                    api_version="2024-02-15-preview",
-                    azure_endpoint=azure_openai_endpoint,
-                    timeout=300.0
-                )
-                self.azure_deployment = azure_openai_deployment or "gpt-4o-mini"
-                self.llm_available = True
-                logger.info(f"Azure OpenAI client initialized with deployment: {self.azure_deployment}")
-            except Exception as e:
-                logger.error(f"Failed to initialize Azure OpenAI client: {str(e)}")
-                self.client = None
-                self.llm_available = False
+        if backends is None and azure_openai_api_key and azure_openai_endpoint:
+            backends = [LLMBackend(
+                deployment=azure_openai_deployment or "gpt-4o-mini",
+                endpoint=azure_openai_endpoint,
+                api_key=azure_openai_api_key,
+                requests_per_minute=settings.llm_requests_per_minute,
+                tokens_per_minute=settings.llm_tokens_per_minute
+            )]
+        # Registered with the gateway so each backend's quota and latency are tracked once
+        self.backends = [llm_gateway.register(backend) for backend in backends or []]
+        self.profiles = load_profiles() if profiles is None else profiles
+        if self.backends:
+            self.azure_deployment = self.backends[0].deployment
+            self.llm_available = True
+            logger.info(f"LLM client configured with backends: {', '.join(b.name for b in self.backends)}")
         else:
-            self.client = None
             self.llm_available = False
             logger.warning("Azure OpenAI not configured - LLM features disabled")
     
-    def generate_text(self, prompt: str, max_tokens: int = 1000, 
-                     temperature: float = 0.7, system_message: Optional[str] = None, 
-                     max_retries: int = 3) -> Dict[str, Any]:
+    async def generate_text(self, prompt: str, max_tokens: int = 1000,
+                            temperature: float = 0.7, system_message: Optional[str] = None,
+                            call_site: str = "default") -> Dict[str, Any]:
         """
         Generate text using the LLM.
         
@@ -69,13 +81,80 @@ class LLMClient:
             max_tokens: Maximum tokens to generate
             temperature: Creativity level (0.0 to 2.0)
             system_message: Optional system message
+            call_site: Logical caller name used to label metrics, to
+                schedule the call (interactive call sites go first) and to
+                look up its model profile, whose ``max_tokens`` wins
             
         Returns:
             Dictionary containing generated text and metadata
         """
+        # A replayed session needs no credentials
+        if not self.llm_available and cassette.mode != REPLAY:
+            return self._create_error_result("LLM not available")
+        
+        profile = profile_for(self.profiles, call_site)
+        max_tokens = profile.max_tokens or max_tokens
+        start_time = time.perf_counter()
+        with metrics.track_llm_call(call_site), \
+                tracing.start_span("llm.generate_text", kind=tracing.SPAN_KIND_CLIENT, attributes={
+                    "llm.call_site": call_site,
+                    "llm.model": profile.deployment or self.azure_deployment,
+                    "llm.max_tokens": max_tokens
+                }) as span:
+            result = await cassette.interaction(
+                "llm", call_site,
+                {
+                    "call_site": call_site,
+                    "system_message": system_message,
+                    "prompt": prompt,
+                    "max_tokens": max_tokens,
+                    "temperature": temperature
+                },
+                lambda: self._generate_text(prompt, max_tokens, temperature, system_message,
+                                            call_site, profile)
+            )
+            if not result.get("success", False):
+                span.status = "error"
+            span.set_attributes({
+                "llm.prompt_tokens": (result.get("usage") or {}).get("prompt_tokens"),
+                "llm.completion_tokens": (result.get("usage") or {}).get("completion_tokens")
+            })
+        metrics.observe_llm_call(
+            call_site,
+            result.get("success", False),
+            time.perf_counter() - start_time,
+            result.get("usage")
+        )
+        token_usage_tracker.record(call_site, result.get("model"), result.get("usage"))
+        return result
+    
+    def _backends_for(self, profile: ModelProfile) -> List[LLMBackend]:
+        """Backends serving the profile's deployment."""
+        if not profile.deployment:
+            return self.backends
+        matching = [backend for backend in self.backends if backend.deployment == profile.deployment]
+        if matching:
+            return matching
+        # Not in the pool: use the deployment on the same resources as the pool
+        derived = {}
+        for backend in self.backends:
+            candidate = LLMBackend(
+                deployment=profile.deployment,
+                endpoint=backend.endpoint,
+                api_key=backend.api_key,
+                api_version=backend.api_version,
+                base_url=backend.base_url,
+                requests_per_minute=settings.llm_requests_per_minute,
+                tokens_per_minute=settings.llm_tokens_per_minute
+            )
+            derived.setdefault(candidate.name, candidate)
+        return [llm_gateway.register(backend) for backend in derived.values()]
+    
+    async def _generate_text(self, prompt: str, max_tokens: int, temperature: float,
+                             system_message: Optional[str], call_site: str,
+                             profile: ModelProfile) -> Dict[str, Any]:
+        """Perform the chat completion call through the gateway."""
         try:
-            if not self.llm_available:
-                return self._create_error_result("LLM not available")
             
             # Prepare messages
             messages = []
@@ -83,35 +162,21 @@ class LLMClient:
                 messages.append({"role": "system", "content": system_message})
             messages.append({"role": "user", "content": prompt})
             
-            # Make API call with retry logic
-            last_error = None
-            for attempt in range(max_retries):
-                try:
-                    response = self.client.chat.completions.create(
-                        model=self.azure_openai_deployment,
-                        messages=messages,
-                        max_tokens=max_tokens,
-                        temperature=temperature
-                    )
-                    break  # Success, exit retry loop
-                except Exception as e:
-                    last_error = e
-                    if attempt < max_retries - 1:
-                        logger.warning(f"LLM API call failed (attempt {attempt + 1}/{max_retries}): {str(e)}")
-                        import time
-                        time.sleep(2 ** attempt)  # Exponential backoff
-                    else:
-                        raise e
-            
-            # Debug logging
-            logger.info(f"Azure OpenAI response type: {type(response)}")
-            logger.info(f"Response choices: {response.choices}")
-            logger.info(f"First choice message content type: {type(response.choices[0].message.content)}")
-            logger.info(f"First choice message content: {response.choices[0].message.content}")
+            # Backend choice, rate limits and retries are handled by the gateway
+            response, backend = await llm_gateway.complete(
+                backends=self._backends_for(profile),
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                call_site=call_site,
+                timeout=profile.timeout or 300.0
+            )
             
             # Extract response
             generated_text = response.choices[0].message.content
             usage = response.usage
+            logger.debug("LLM response for %s from %s: %d completion tokens",
+                         call_site, backend.name, usage.completion_tokens)
             
             return {
                 "success": True,
@@ -121,7 +186,8 @@ class LLMClient:
                     "completion_tokens": usage.completion_tokens,
                     "total_tokens": usage.total_tokens
                 },
-                "model": self.azure_openai_deployment,
+                "model": backend.deployment,
+                "backend": backend.name,
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -129,7 +195,7 @@ class LLMClient:
             logger.error(f"Error generating text: {str(e)}")
             return self._create_error_result(f"Text generation failed: {str(e)}")
     
-    def summarize_text(self, text: str, summary_type: str = "concise", 
+    async def summarize_text(self, text: str, summary_type: str = "concise", 
                       max_length: Optional[int] = None) -> Dict[str, Any]:
         """
         Summarize text using the LLM.
@@ -161,11 +227,12 @@ class LLMClient:
                 prompt += f"\n\nPlease keep the summary under {max_length} words."
             
             # Generate summary
-            result = self.generate_text(
+            result = await self.generate_text(
                 prompt=prompt,
                 max_tokens=500,
                 temperature=0.3,
-                system_message="You are an expert at summarizing text. Provide clear, accurate summaries."
+                system_message="You are an expert at summarizing text. Provide clear, accurate summaries.",
+                call_site="summarize"
             )
             
             if result.get("success"):
@@ -185,7 +252,7 @@ class LLMClient:
             logger.error(f"Error summarizing text: {str(e)}")
             return self._create_error_result(f"Summarization failed: {str(e)}")
     
-    def extract_keywords(self, text: str, max_keywords: int = 10) -> Dict[str, Any]:
+    async def extract_keywords(self, text: str, max_keywords: int = 10) -> Dict[str, Any]:
         """
         Extract keywords from text using the LLM.
         
@@ -209,11 +276,12 @@ class LLMClient:
             Keywords:
             """
             
-            result = self.generate_text(
+            result = await self.generate_text(
                 prompt=prompt,
                 max_tokens=200,
                 temperature=0.3,
-                system_message="You are an expert at keyword extraction. Return only the keywords, separated by commas."
+                system_message="You are an expert at keyword extraction. Return only the keywords, separated by commas.",
+                call_site="keyword_extraction"
             )
             
             if result.get("success"):
@@ -235,7 +303,7 @@ class LLMClient:
             logger.error(f"Error extracting keywords: {str(e)}")
             return self._create_error_result(f"Keyword extraction failed: {str(e)}")
     
-    def analyze_sentiment(self, text: str) -> Dict[str, Any]:
+    async def analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """
         Analyze sentiment of text using the LLM.
         
@@ -265,11 +333,12 @@ class LLMClient:
             Confidence: [confidence level]
             """
             
-            result = self.generate_text(
+            result = await self.generate_text(
                 prompt=prompt,
                 max_tokens=200,
                 temperature=0.3,
-                system_message="You are an expert at sentiment analysis. Provide structured, accurate analysis."
+                system_message="You are an expert at sentiment analysis. Provide structured, accurate analysis.",
+                call_site="sentiment_analysis"
             )
             
             if result.get("success"):
@@ -286,7 +355,7 @@ class LLMClient:
             logger.error(f"Error analyzing sentiment: {str(e)}")
             return self._create_error_result(f"Sentiment analysis failed: {str(e)}")
     
-    def analyze_readability(self, text: str) -> Dict[str, Any]:
+    async def analyze_readability(self, text: str) -> Dict[str, Any]:
         """
         Analyze readability of text using the LLM.
         
@@ -316,11 +385,12 @@ class LLMClient:
             Suggestions: [improvement suggestions]
             """
             
-            result = self.generate_text(
+            result = await self.generate_text(
                 prompt=prompt,
                 max_tokens=200,
                 temperature=0.3,
-                system_message="You are an expert at readability analysis. Provide structured, accurate analysis."
+                system_message="You are an expert at readability analysis. Provide structured, accurate analysis.",
+                call_site="readability_analysis"
             )
             
             if result.get("success"):
@@ -337,7 +407,7 @@ class LLMClient:
             logger.error(f"Error analyzing readability: {str(e)}")
             return self._create_error_result(f"Readability analysis failed: {str(e)}")
     
-    def compare_texts(self, text1: str, text2: str, comparison_type: str = "general") -> Dict[str, Any]:
+    async def compare_texts(self, text1: str, text2: str, comparison_type: str = "general") -> Dict[str, Any]:
         """
         Compare two texts using the LLM.
         
@@ -388,11 +458,12 @@ class LLMClient:
                 Text 2: {text2[:1000]}...
                 """
             
-            result = self.generate_text(
+            result = await self.generate_text(
                 prompt=prompt,
                 max_tokens=400,
                 temperature=0.3,
-                system_message="You are an expert at text comparison. Provide structured, accurate analysis."
+                system_message="You are an expert at text comparison. Provide structured, accurate analysis.",
+                call_site="text_comparison"
             )
             
             if result.get("success"):
@@ -410,7 +481,7 @@ class LLMClient:
             logger.error(f"Error comparing texts: {str(e)}")
             return self._create_error_result(f"Text comparison failed: {str(e)}")
     
-    def translate_text(self, text: str, target_language: str, source_language: Optional[str] = None) -> Dict[str, Any]:
+    async def translate_text(self, text: str, target_language: str, source_language: Optional[str] = None) -> Dict[str, Any]:
         """
         Translate text using the LLM.
         
@@ -431,11 +502,12 @@ class LLMClient:
             else:
                 prompt = f"Translate the following text to {target_language}:\n\n{text}"
             
-            result = self.generate_text(
+            result = await self.generate_text(
                 prompt=prompt,
                 max_tokens=len(text) * 2,  # Allow for longer translations
                 temperature=0.3,
-                system_message=f"You are an expert translator. Provide accurate translation to {target_language}."
+                system_message=f"You are an expert translator. Provide accurate translation to {target_language}.",
+                call_site="translation"
             )
             
             if result.get("success"):
@@ -465,8 +537,10 @@ class LLMClient:
         return {
             "available": self.llm_available,
             "provider": "Azure OpenAI" if self.llm_available else "None",
-            "model": self.azure_openai_deployment if self.llm_available else "None",
-            "endpoint": self.azure_openai_endpoint if self.llm_available else "None"
+            "model": self.azure_deployment if self.llm_available else "None",
+            "endpoint": self.azure_openai_endpoint if self.llm_available else "None",
+            "backends": [backend.name for backend in self.backends],
+            "profiles": {call_site: profile.to_dict() for call_site, profile in self.profiles.items()}
         }
     
     def _create_error_result(self, error_message: str) -> Dict[str, Any]:
@@ -482,21 +556,23 @@ class LLMClient:
 def create_llm_client():
     """Create LLM client with environment configuration."""
     try:
-        from ..core.config import get_azure_openai_config, is_azure_openai_configured
+        from ..core.config import get_azure_openai_config
     except ImportError:
         # Fallback to absolute import if relative fails
         try:
-            from app.core.config import get_azure_openai_config, is_azure_openai_configured
+            from app.core.config import get_azure_openai_config
         except ImportError:
             logger.error("Failed to import config functions")
             return LLMClient()
     
-    if is_azure_openai_configured():
+    backends = configured_backends()
+    if backends:
         config = get_azure_openai_config()
         return LLMClient(
             azure_openai_api_key=config['api_key'],
             azure_openai_endpoint=config['endpoint'],
-            azure_openai_deployment=config['deployment']
+            azure_openai_deployment=config['deployment'],
+            backends=backends
         )
     else:
         logger.warning("Azure OpenAI not configured - creating LLM client without credentials")
@@ -0,0 +1,547 @@
+"""
+Shared gateway for Azure OpenAI calls.
+
+Every ``LLMClient`` sends its completions through the one process-wide
+``LLMGateway`` instead of owning a client of its own, so that:
+
+- calls to the same backend share one client and its connection pool;
+- requests and tokens per minute stay within each deployment's quota. Token
+  buckets are charged with the estimated prompt tokens plus ``max_tokens``
+  (what Azure counts against TPM) and corrected with the actual usage;
+- a 429 pauses every caller of that backend for the ``Retry-After`` the
+  service asked for (plus jitter) instead of each caller retrying on its own
+  schedule;
+- when capacity is short, interactive calls (intent detection) are
+  scheduled ahead of bulk ones (claim summaries).
+
+A client may be served by a pool of backends (``LLM_BACKENDS``): each call
+goes to the backend with the best observed latency and most remaining
+quota, fails over to another backend on 429/5xx, and interactive calls can
+be hedged to a second backend when the first is slow. A backend with a
+``base_url`` is any OpenAI-compatible server, such as a local stand-in.
+"""
+
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import structlog
+
+from app.core import metrics, request_context
+from app.core.config import settings
+from app.core.exceptions import DeadlineExceededError
+from app.utils import fast_json
+
+# openai takes most of a second to import; it is imported when the first
+# client is created rather than at startup
+if TYPE_CHECKING:
+    import openai
+
+logger = structlog.get_logger()
+
+DEFAULT_API_VERSION = "2024-02-15-preview"
+
+# Lower value is scheduled first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BULK = 2
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_NORMAL: "normal", PRIORITY_BULK: "bulk"}
+
+# Call sites a user is waiting on go first; fan-out work goes last
+CALL_SITE_PRIORITIES = {
+    "intent_detection": PRIORITY_INTERACTIVE,
+    "tool_output_formatting": PRIORITY_INTERACTIVE,
+    "claim_summary": PRIORITY_BULK,
+}
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+def priority_for(call_site: str) -> int:
+    return CALL_SITE_PRIORITIES.get(call_site, PRIORITY_NORMAL)
+
+
+def estimate_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Rough prompt token count (about four characters per token)."""
+    return sum(len(message.get("content") or "") // 4 + 4 for message in messages) + 3
+
+
+def retry_after_seconds(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Delay asked for by a throttled response (``retry-after-ms`` or ``retry-after``)."""
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Bucket of up to ``per_minute`` units that refills continuously."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` units are available (a full bucket for oversized amounts)."""
+        self._refill()
+        return max(0.0, (min(amount, self.capacity) - self.level) / self.rate)
+
+    def available_share(self) -> float:
+        self._refill()
+        return max(0.0, self.level) / self.capacity
+
+    def consume(self, amount: float) -> None:
+        # Oversized amounts leave the bucket in debt, which later calls wait out
+        self._refill()
+        self.level -= amount
+
+    def refund(self, amount: float) -> None:
+        """Give back (or, when negative, additionally charge) ``amount`` units."""
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+
+class LLMBackend:
+    """One deployment calls can be sent to, with its quota and observed latency."""
+
+    def __init__(self, deployment: str, endpoint: Optional[str] = None, api_key: Optional[str] = None,
+                 api_version: str = DEFAULT_API_VERSION, base_url: Optional[str] = None,
+                 name: Optional[str] = None, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        """
+        Args:
+            deployment: Azure deployment (or model, for ``base_url`` backends)
+            endpoint: Azure OpenAI endpoint URL
+            api_key: API key
+            api_version: Azure OpenAI API version
+            base_url: URL of an OpenAI-compatible server, used instead of ``endpoint``
+            name: Label for logs, metrics and health (default: deployment@host)
+            requests_per_minute: RPM quota of the deployment (0: not limited)
+            tokens_per_minute: TPM quota of the deployment (0: not limited)
+        """
+        self.deployment = deployment
+        self.endpoint = endpoint
+        self.api_key = api_key
+        self.api_version = api_version
+        self.base_url = base_url
+        self.name = name or f"{deployment}@{base_url or endpoint}"
+        # Every process calling the deployment gets an equal share of its quota
+        share = max(1, settings.llm_quota_workers)
+        self.requests = TokenBucket(requests_per_minute / share) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute / share) if tokens_per_minute > 0 else None
+        self.in_flight = 0
+        # Moving average of successful call latency; None until the first one
+        self.latency: Optional[float] = None
+        # Set from Retry-After when the service throttles us
+        self.paused_until = 0.0
+        self.throttled = 0
+        self.failures = 0
+
+    def delay_for(self, tokens: int) -> float:
+        """Seconds until a call of ``tokens`` estimated tokens fits the quota."""
+        delay = self.paused_until - time.monotonic()
+        if self.requests is not None:
+            delay = max(delay, self.requests.wait_time(1))
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.wait_time(tokens))
+        return max(0.0, delay)
+
+    def headroom(self) -> float:
+        """Share of the per-minute quota still available (1.0 when not limited)."""
+        shares = [bucket.available_share() for bucket in (self.requests, self.tokens) if bucket is not None]
+        return max(0.05, min(shares)) if shares else 1.0
+
+    def score(self) -> float:
+        """Lower is better: expected latency, scaled up by load and a draining quota."""
+        # Untried backends look fast, so each one gets measured
+        latency = self.latency if self.latency is not None else 0.0
+        return (latency + 0.05) * (1 + self.in_flight) / self.headroom()
+
+    def consume(self, tokens: int) -> None:
+        self.in_flight += 1
+        if self.requests is not None:
+            self.requests.consume(1)
+        if self.tokens is not None:
+            self.tokens.consume(tokens)
+
+    def observe_latency(self, duration: float) -> None:
+        self.latency = duration if self.latency is None else 0.8 * self.latency + 0.2 * duration
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every call to this backend for ``seconds``."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "deployment": self.deployment,
+            "in_flight": self.in_flight,
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "requests_available": round(self.requests.level, 1) if self.requests else None,
+            "tokens_available": round(self.tokens.level) if self.tokens else None,
+            "paused_for_seconds": round(max(0.0, self.paused_until - time.monotonic()), 2),
+            "throttled": self.throttled,
+            "failures": self.failures
+        }
+
+
+def parse_backends(raw: str, default_api_key: Optional[str] = None,
+                   requests_per_minute: int = 0, tokens_per_minute: int = 0) -> List[LLMBackend]:
+    """
+    Parse ``LLM_BACKENDS`` (a JSON list of backend objects).
+
+    Each object takes the ``LLMBackend`` arguments; ``api_key`` defaults to
+    ``default_api_key`` and the quotas to the given per-backend defaults.
+    """
+    try:
+        configs = fast_json.loads(raw or "[]")
+        backends = []
+        for config in configs:
+            config = {"requests_per_minute": requests_per_minute, "tokens_per_minute": tokens_per_minute,
+                      **config}
+            config.setdefault("api_key", default_api_key)
+            backends.append(LLMBackend(**config))
+        return backends
+    except (ValueError, TypeError, AttributeError) as e:
+        logger.warning("Invalid LLM_BACKENDS, using the single configured deployment", error=str(e))
+        return []
+
+
+class LLMGateway:
+    """Rate-governed, prioritised and load-balanced access to chat completions."""
+
+    def __init__(self, max_concurrency: int = 16, max_retries: int = 3, max_backoff: float = 30.0,
+                 hedge_after: Optional[float] = None,
+                 client_factory: Optional[Callable[[LLMBackend], Any]] = None):
+        """
+        Args:
+            max_concurrency: Completions that may be in flight at once, over all backends
+            max_retries: Retries of throttled, timed-out and 5xx calls
+            max_backoff: Upper bound in seconds of the backoff between retries
+            hedge_after: Seconds after which a slow interactive call is also sent
+                to a second backend (None: no hedging)
+            client_factory: Builds the client for a backend
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+        self.hedge_after = hedge_after
+        self._client_factory = client_factory or self._create_client
+        self.backends: Dict[str, LLMBackend] = {}
+        self._clients: Dict[str, Any] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._in_flight = 0
+        # [priority, sequence, estimated tokens, candidate backends, future] per waiting call
+        self._waiters: List[list] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.throttled = 0
+        self.hedged = 0
+
+    @staticmethod
+    def _create_client(backend: LLMBackend) -> Any:
+        from openai import AsyncAzureOpenAI, AsyncOpenAI
+
+        # Retries are ours, so they can honour Retry-After across all callers
+        if backend.base_url:
+            return AsyncOpenAI(base_url=backend.base_url, api_key=backend.api_key or "unused", max_retries=0)
+        return AsyncAzureOpenAI(
+            api_key=backend.api_key,
+            azure_endpoint=backend.endpoint,
+            api_version=backend.api_version,
+            max_retries=0
+        )
+
+    def register(self, backend: LLMBackend) -> LLMBackend:
+        """Return the shared instance of ``backend``, so its quota is tracked once."""
+        return self.backends.setdefault(backend.name, backend)
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Clients, waiters and timers belong to the loop that created them
+            self._loop = loop
+            self._clients = {}
+            self._waiters = []
+            self._in_flight = 0
+            self._timer = None
+            for backend in self.backends.values():
+                backend.in_flight = 0
+
+    def client(self, backend: LLMBackend) -> Any:
+        """Shared client (and connection pool) for a backend."""
+        self._bind_loop()
+        client = self._clients.get(backend.name)
+        if client is None:
+            client = self._client_factory(backend)
+            self._clients[backend.name] = client
+        return client
+
+    @staticmethod
+    def _pick(candidates: Sequence[LLMBackend], tokens: int) -> Tuple[Optional[LLMBackend], float]:
+        """Best backend that can take the call now, else the shortest wait for one."""
+        best, wait = None, float("inf")
+        for backend in candidates:
+            delay = backend.delay_for(tokens)
+            if delay > 0:
+                wait = min(wait, delay)
+            elif best is None or backend.score() < best.score():
+                best = backend
+        return best, wait
+
+    def _grant(self, backend: LLMBackend, tokens: int) -> None:
+        self._in_flight += 1
+        backend.consume(tokens)
+
+    def _dispatch(self) -> None:
+        """Grant capacity to waiting calls in priority order."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._waiters and self._in_flight < self.max_concurrency:
+            _, _, tokens, candidates, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            backend, wait = self._pick(candidates, tokens)
+            if backend is None:
+                # Only the head may go next, so bulk calls cannot starve interactive ones
+                self._timer = self._loop.call_later(wait, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            self._grant(backend, tokens)
+            future.set_result(backend)
+
+    def _release(self, backend: LLMBackend) -> None:
+        self._in_flight -= 1
+        backend.in_flight -= 1
+        self._dispatch()
+
+    async def _acquire(self, tokens: int, priority: int, candidates: Sequence[LLMBackend]) -> LLMBackend:
+        self._bind_loop()
+        priority_name = PRIORITY_NAMES.get(priority, str(priority))
+        if not self._waiters and self._in_flight < self.max_concurrency:
+            backend, _ = self._pick(candidates, tokens)
+            if backend is not None:
+                self._grant(backend, tokens)
+                metrics.observe_llm_gateway_wait(priority_name, 0.0)
+                return backend
+
+        future = self._loop.create_future()
+        heapq.heappush(self._waiters, [priority, next(self._sequence), tokens, candidates, future])
+        self._dispatch()
+        start_time = time.perf_counter()
+        try:
+            # Do not wait for capacity past the request's own deadline
+            return await asyncio.wait_for(asyncio.shield(future), timeout=request_context.remaining())
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # Granted at the last moment; hand the capacity on
+                self._release(future.result())
+            else:
+                future.cancel()
+                self._dispatch()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise DeadlineExceededError("Deadline exceeded waiting for LLM capacity",
+                                        operation="llm") from None
+        finally:
+            metrics.observe_llm_gateway_wait(priority_name, time.perf_counter() - start_time)
+
+    def _try_acquire(self, tokens: int, candidates: Sequence[LLMBackend]) -> Optional[LLMBackend]:
+        """Take capacity only if it is free right now and nobody is waiting for it."""
+        if self._waiters or self._in_flight >= self.max_concurrency:
+            return None
+        backend, _ = self._pick(candidates, tokens)
+        if backend is not None:
+            self._grant(backend, tokens)
+        return backend
+
+    def _backoff(self, error: "openai.APIError", attempt: int) -> float:
+        import openai
+
+        requested = None
+        if isinstance(error, openai.APIStatusError):
+            requested = retry_after_seconds(error.response.headers)
+        base = requested if requested is not None else min(self.max_backoff, 2 ** attempt)
+        # Jitter spreads out callers that were told to come back at the same time
+        return base * (1 + random.uniform(0, 0.25))
+
+    async def _call(self, backend: LLMBackend, estimated: int, request: Dict[str, Any],
+                    call_site: str, timeout: float, attempt: int) -> Tuple[Any, LLMBackend]:
+        """Send one completion to an acquired backend and release it afterwards."""
+        import openai
+
+        client = self.client(backend)
+        start_time = time.perf_counter()
+        try:
+            response = await client.chat.completions.create(
+                model=backend.deployment,
+                # Never wait on the API past the request deadline
+                timeout=request_context.timeout(timeout),
+                **request
+            )
+        except (openai.APIStatusError, openai.APIConnectionError) as e:
+            backend.failures += 1
+            if isinstance(e, openai.APITimeoutError):
+                backend.observe_latency(time.perf_counter() - start_time)
+            if getattr(e, "status_code", None) == 429:
+                self.throttled += 1
+                backend.throttled += 1
+                backend.pause(self._backoff(e, attempt))
+                metrics.record_llm_throttled(call_site)
+                metrics.record_llm_backend_call(backend.name, "throttled")
+            else:
+                metrics.record_llm_backend_call(backend.name, "error")
+            raise
+        else:
+            backend.observe_latency(time.perf_counter() - start_time)
+            usage = getattr(response, "usage", None)
+            if backend.tokens is not None and usage is not None:
+                backend.tokens.refund(estimated - usage.total_tokens)
+            metrics.record_llm_backend_call(backend.name, "success")
+            return response, backend
+        finally:
+            self._release(backend)
+
+    async def _hedged_call(self, backend: LLMBackend, candidates: Sequence[LLMBackend], estimated: int,
+                           request: Dict[str, Any], call_site: str, timeout: float,
+                           attempt: int) -> Tuple[Any, LLMBackend]:
+        """Send the call to a second backend too if the first has not answered in time."""
+        primary = asyncio.ensure_future(self._call(backend, estimated, request, call_site, timeout, attempt))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+            second = None if done else self._try_acquire(
+                estimated, [candidate for candidate in candidates if candidate is not backend]
+            )
+            if second is None:
+                return await primary
+
+            self.hedged += 1
+            metrics.record_llm_backend_call(second.name, "hedge")
+            logger.info("Hedging slow LLM call", call_site=call_site, primary=backend.name, hedge=second.name)
+            tasks.add(asyncio.ensure_future(self._call(second, estimated, request, call_site, timeout, attempt)))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            # Both failed; report the primary's error
+            return primary.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def complete(self, *, backends: Sequence[LLMBackend], messages: List[Dict[str, Any]],
+                       max_tokens: int, temperature: float, call_site: str = "default",
+                       timeout: float = 300.0) -> Tuple[Any, LLMBackend]:
+        """
+        Run a chat completion on one of ``backends`` within the shared limits.
+
+        Throttled (429), timed-out and 5xx calls are retried up to
+        ``max_retries`` times, on another backend first if one is left.
+
+        Returns:
+            The completion and the backend that produced it
+
+        Raises:
+            openai.APIError: The last error once retries are exhausted
+            DeadlineExceededError: If the request deadline passes while waiting
+        """
+        import openai
+
+        priority = priority_for(call_site)
+        estimated = estimate_tokens(messages) + max_tokens
+        request = {"messages": messages, "max_tokens": max_tokens, "temperature": temperature}
+        hedge = self.hedge_after is not None and priority == PRIORITY_INTERACTIVE and len(backends) > 1
+        failed: set = set()
+        attempt = 0
+        while True:
+            untried = [backend for backend in backends if backend.name not in failed]
+            backend = await self._acquire(estimated, priority, untried or backends)
+            try:
+                if hedge:
+                    return await self._hedged_call(backend, backends, estimated, request, call_site, timeout, attempt)
+                return await self._call(backend, estimated, request, call_site, timeout, attempt)
+            except (openai.APIStatusError, openai.APIConnectionError) as e:
+                status_code = getattr(e, "status_code", None)
+                if attempt >= self.max_retries or (status_code is not None and
+                                                   status_code not in RETRYABLE_STATUS_CODES):
+                    raise
+                failed.add(backend.name)
+                delay = self._backoff(e, attempt)
+                logger.warning("LLM call failed, retrying", call_site=call_site, backend=backend.name,
+                               attempt=attempt + 1, status_code=status_code, error=str(e))
+
+            attempt += 1
+            # Fail over straight away while other backends are left; a 429
+            # already paused its backend, so only other failures back off here
+            if len(failed) >= len(backends) and status_code != 429:
+                await asyncio.sleep(request_context.timeout(delay))
+
+    def get_status(self) -> Dict[str, Any]:
+        """Current load for health reporting."""
+        return {
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "queued": sum(1 for waiter in self._waiters if not waiter[-1].done()),
+            "hedge_after_seconds": self.hedge_after,
+            "throttled": self.throttled,
+            "hedged": self.hedged,
+            "backends": [backend.get_status() for backend in self.backends.values()]
+        }
+
+
+def configured_backends() -> List[LLMBackend]:
+    """Backends from ``LLM_BACKENDS``, or the single ``AZURE_OPENAI_*`` deployment."""
+    backends = parse_backends(
+        settings.llm_backends,
+        default_api_key=settings.azure_openai_api_key,
+        requests_per_minute=settings.llm_requests_per_minute,
+        tokens_per_minute=settings.llm_tokens_per_minute
+    )
+    if not backends and settings.azure_openai_api_key and settings.azure_openai_endpoint:
+        backends = [LLMBackend(
+            deployment=settings.azure_openai_deployment or "gpt-4o-mini",
+            endpoint=settings.azure_openai_endpoint,
+            api_key=settings.azure_openai_api_key,
+            requests_per_minute=settings.llm_requests_per_minute,
+            tokens_per_minute=settings.llm_tokens_per_minute
+        )]
+    return backends
+
+
+# Global gateway shared by every LLMClient
+llm_gateway = LLMGateway(
+    max_concurrency=settings.llm_max_concurrency,
+    max_retries=settings.llm_max_retries,
+    hedge_after=settings.llm_hedge_after_seconds or None
+)
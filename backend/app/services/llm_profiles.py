@@ -0,0 +1,75 @@
+"""
+Model profiles per LLM call site.
+
+A profile routes a call site (``intent_detection``, ``report``, ...) to a
+deployment and sets its output token limit and timeout, so classification
+and extraction calls can use a small low-latency model while report
+generation stays on the large one. Profiles come from ``LLM_PROFILES``;
+``LLM_PROFILE_OVERRIDES`` changes them per ``ENVIRONMENT``. A ``default``
+profile applies to call sites without one of their own.
+"""
+
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict, Optional
+
+import structlog
+
+from app.core.config import settings
+from app.utils import fast_json
+
+logger = structlog.get_logger()
+
+DEFAULT_PROFILE = "default"
+
+
+@dataclass(frozen=True)
+class ModelProfile:
+    """Deployment, output token limit and timeout of a call site (None: caller's choice)."""
+    deployment: Optional[str] = None
+    max_tokens: Optional[int] = None
+    timeout: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: value for name, value in asdict(self).items() if value is not None}
+
+
+def _load_json(raw: str, name: str) -> Dict[str, Any]:
+    try:
+        value = fast_json.loads(raw or "{}")
+        if not isinstance(value, dict):
+            raise ValueError("expected a JSON object")
+        return value
+    except ValueError as e:
+        logger.warning(f"Invalid {name}, ignoring it", error=str(e))
+        return {}
+
+
+def load_profiles(profiles: Optional[str] = None, overrides: Optional[str] = None,
+                  environment: Optional[str] = None) -> Dict[str, ModelProfile]:
+    """
+    Build the call-site profiles, with the environment's overrides applied.
+
+    Arguments default to ``LLM_PROFILES``, ``LLM_PROFILE_OVERRIDES`` and
+    ``ENVIRONMENT``. Overrides are merged field by field.
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    environment = environment or settings.environment
+    per_environment = _load_json(settings.llm_profile_overrides if overrides is None else overrides,
+                                 "LLM_PROFILE_OVERRIDES")
+    for layer in (_load_json(settings.llm_profiles if profiles is None else profiles, "LLM_PROFILES"),
+                  per_environment.get(environment) or {}):
+        for call_site, values in layer.items():
+            merged.setdefault(call_site, {}).update(values or {})
+
+    known = {field.name for field in fields(ModelProfile)}
+    result = {}
+    for call_site, values in merged.items():
+        unknown = set(values) - known
+        if unknown:
+            logger.warning("Ignoring unknown LLM profile fields", call_site=call_site, fields=sorted(unknown))
+        result[call_site] = ModelProfile(**{name: value for name, value in values.items() if name in known})
+    return result
+
+
+def profile_for(profiles: Dict[str, ModelProfile], call_site: str) -> ModelProfile:
+    return profiles.get(call_site) or profiles.get(DEFAULT_PROFILE) or ModelProfile()
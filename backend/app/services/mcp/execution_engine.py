@@ -392,22 +392,16 @@ class ToolExecutionEngine:
                 # Check if this is an MCP response format
                 if "content" in result and "isError" in result:
                     # MCP response format - extract the actual content
-                    content = result.get("content", [])
                     is_error = result.get("isError", False)
-                    
-                    # Extract text content from MCP content array
-                    text_content = ""
-                    if isinstance(content, list):
-                        for item in content:
-                            if isinstance(item, dict) and item.get("type") == "text":
-                                text_content += item.get("text", "")
-                    
-                    return {
+                    standardized = {
                         "status": "error" if is_error else "success",
-                        "result": text_content,
-                        "timestamp": time.time(),
-                        "mcp_response": result  # Keep original MCP response for debugging
+                        "result": self._join_text_content(result.get("content", [])),
+                        "timestamp": time.time()
                     }
+                    # Structured data travels alongside the markdown, untouched
+                    if result.get("structuredContent") is not None:
+                        standardized["structured_content"] = result["structuredContent"]
+                    return standardized
                 else:
                     # Regular dictionary, ensure it has required fields
                     standardized = result.copy()
@@ -430,6 +424,16 @@ class ToolExecutionEngine:
                     "timestamp": time.time()
                 }
                 
+            elif isinstance(result, list) and result and all(
+                self._is_content_item(item) for item in result
+            ):
+                # Content list as returned by the FastMCP client for external tools
+                return {
+                    "status": "success",
+                    "result": self._join_text_content(result),
+                    "timestamp": time.time()
+                }
+                
             elif result is None:
                 # None result
                 return {
@@ -456,6 +460,27 @@ class ToolExecutionEngine:
                 "timestamp": time.time()
             }
     
+    @staticmethod
+    def _is_content_item(item: Any) -> bool:
+        """Check whether an item looks like an MCP content block."""
+        if isinstance(item, dict):
+            return "type" in item
+        return hasattr(item, "type")
+    
+    @staticmethod
+    def _join_text_content(content: Any) -> str:
+        """Join the text blocks of an MCP content array (dicts or SDK objects)."""
+        if not isinstance(content, list):
+            return ""
+        parts = []
+        for item in content:
+            if isinstance(item, dict):
+                if item.get("type") == "text":
+                    parts.append(item.get("text", ""))
+            elif getattr(item, "type", None) == "text":
+                parts.append(getattr(item, "text", ""))
+        return "".join(parts)
+    
     async def shutdown(self) -> None:
         """Shutdown the tool execution engine gracefully."""
         try:
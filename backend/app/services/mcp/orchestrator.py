@@ -8,20 +8,34 @@ This module provides a single, unified interface for all MCP operations includin
 - Health monitoring
 """
 
+import asyncio
+import contextvars
 import time
-from typing import Dict, List, Any, Optional
+import uuid
+from contextlib import AsyncExitStack, ExitStack
+from typing import Awaitable, Dict, List, Any, Optional, Set, Tuple
 from dataclasses import dataclass, field
 
 import structlog
 
+from app.core import metrics, tracing
+from app.core.admission import AdmissionController, parse_tool_limits
+from app.core.request_context import bind as bind_request_context
+from app.core.config import settings
+from app.core.result_cache import ResultCache
+from app.core.shared_state import SharedStore, shared_store
+from app.core.startup_timing import startup_timer
+from app.core.single_flight import canonical_key
 from app.core.exceptions import (
     ToolNotFoundError, 
     ValidationError, 
     ToolExecutionError,
-    ExternalMCPServerError
+    ExternalMCPServerError,
+    AdmissionRejectedError
 )
-from .server_registry import MCPServerRegistry
+from .server_registry import MCPServerRegistry, UnifiedTool as RegistryTool
 from .execution_engine import ToolExecutionEngine
+from .tool_catalog import ToolCatalogCache
 
 logger = structlog.get_logger()
 
@@ -61,38 +75,92 @@ class MCPOrchestrator:
         self.error_count = 0
         self.total_execution_time = 0.0
         
-        # Tool discovery caching
-        self._tool_cache = {}
-        self._cache_timestamp = 0
-        self._cache_ttl = 300  # 5 minutes cache TTL for better performance
+        # Runtime-added servers and the last tool catalog, kept across restarts
+        self.snapshot_store = SharedStore(settings.registry_snapshot_path) if settings.registry_snapshot_path else None
+        self._restore_task: Optional[asyncio.Task] = None
+        
+        # Tool discovery caching: an immutable snapshot refreshed in the background
+        self.tool_catalog = ToolCatalogCache(self._load_tools, ttl=settings.tool_catalog_ttl,
+                                             store=self.snapshot_store)
+        self.server_registry.tool_lookup = self._catalog_tool
+        
+        # Results of tools that declare a cache TTL
+        self.result_cache = ResultCache(
+            "tool_result",
+            max_entries=settings.tool_result_cache_max_entries,
+            disk_dir=settings.tool_result_cache_dir,
+            disk_max_entries=settings.tool_result_cache_disk_max_entries
+        )
+        
+        # Concurrency limits for tool executions (cache hits are not limited)
+        self.admission = AdmissionController(
+            global_limit=settings.admission_global_limit,
+            default_tool_limit=settings.admission_tool_limit,
+            tool_limits=parse_tool_limits(settings.admission_tool_limits),
+            max_queue=settings.admission_max_queue,
+            queue_timeout=settings.admission_queue_timeout
+        )
+        
+        # Generation of the shared external server list this worker has applied
+        self._external_generation = 0
+        # External servers this worker knows from the shared list, as opposed to
+        # ones it loaded from config or the snapshot itself
+        self._shared_external_ids: Set[str] = set()
+        self._external_sync_lock = asyncio.Lock()
         
         logger.info("MCP Orchestrator initialized successfully")
     
-    def _clear_tool_cache(self) -> None:
-        """Clear the tool discovery cache."""
-        self._tool_cache = {}
-        self._cache_timestamp = 0
-        logger.info("Tool discovery cache cleared")
+    def _catalog_tool(self, tool_name: str) -> Optional[RegistryTool]:
+        """A tool of the current catalog snapshot, for routing calls to its server."""
+        snapshot = self.tool_catalog.snapshot
+        tool = snapshot.get_tool(tool_name) if snapshot else None
+        return RegistryTool.from_dict(tool) if tool else None
+    
+    def _on_tools_changed(self, server_name: str) -> None:
+        """Rebuild the tool catalog after a server reports ``tools/list_changed``."""
+        logger.info(f"Tool list changed on server {server_name}, refreshing catalog")
+        self.tool_catalog.invalidate()
+        self.tool_catalog.request_refresh()
     
-    async def initialize(self) -> None:
-        """Initialize all MCP components."""
+    async def initialize(self, internal_server_ready: Optional[Awaitable[None]] = None) -> None:
+        """
+        Initialize all MCP components.
+        
+        Args:
+            internal_server_ready: Completes once the internal MCP server
+                answers; awaited alongside the steps that do not need it
+        """
         try:
             logger.info("Initializing MCP Orchestrator components...")
             
-            # Initialize connection manager for persistent connections
+            # Connection manager, server registry (which connects to every
+            # configured external server) and execution engine are independent
             from app.core.mcp_connection_manager import get_connection_manager
-            await get_connection_manager()
+            steps = [
+                startup_timer.timed("orchestrator.connection_manager", get_connection_manager()),
+                startup_timer.timed("orchestrator.server_registry", self.server_registry.initialize()),
+                startup_timer.timed("orchestrator.execution_engine", self.execution_engine.initialize())
+            ]
+            if internal_server_ready is not None:
+                steps.append(startup_timer.timed("internal_mcp_wait", internal_server_ready))
+            connection_manager, *_ = await asyncio.gather(*steps)
             logger.info("MCP Connection Manager initialized with real FastMCP API")
             
-            # Initialize server registry
-            await self.server_registry.initialize()
-            
-            # Initialize execution engine
-            await self.execution_engine.initialize()
-            
             # Register internal MCP server in registry (connects via MCP client)
             await self._register_internal_mcp_server()
             
+            # Warm the tool catalog and keep it fresh ahead of expiry
+            connection_manager.add_tools_changed_listener(self._on_tools_changed)
+            if self.snapshot_store is not None:
+                # Warm start: serve the persisted catalog at once; persisted
+                # servers reconnect and the catalog is revalidated in the background
+                self.tool_catalog.restore()
+                self._restore_task = asyncio.get_running_loop().create_task(
+                    self._restore_external_servers(), context=contextvars.Context()
+                )
+            else:
+                self.tool_catalog.start()
+            
             # Set global initialization state
             global _mcp_orchestrator_initialized
             _mcp_orchestrator_initialized = True
@@ -107,6 +175,9 @@ class MCPOrchestrator:
         """
         List all available tools from all MCP servers.
         
+        Served from the current catalog snapshot; discovery only runs inline
+        when no snapshot has been built yet.
+        
         Returns:
             Dictionary containing tools from all sources with metadata
         """
@@ -114,58 +185,35 @@ class MCPOrchestrator:
         self.request_count += 1
         
         try:
-            # Check cache first
-            current_time = time.time()
-            if (current_time - self._cache_timestamp) < self._cache_ttl and self._tool_cache:
-                logger.info("Returning cached tools (cache hit)")
-                cached_result = self._tool_cache.copy()
-                cached_result["cache_hit"] = True
-                cached_result["execution_time"] = time.time() - start_time
-                return cached_result
-            
-            logger.info("Listing all available tools from all MCP servers (cache miss)")
-            
-            # Get tools from all servers (unified)
-            all_tools = await self.server_registry.list_all_tools()
-            logger.info(f"Orchestrator received {len(all_tools)} tools from server registry")
-            
-            # Count tools by source
-            internal_count = sum(1 for tool in all_tools if tool.source == "internal")
-            external_count = sum(1 for tool in all_tools if tool.source == "external")
-            logger.info(f"Tool counts - Internal: {internal_count}, External: {external_count}")
-            
-            execution_time = time.time() - start_time
-            self.total_execution_time += execution_time
-            
-            # Cache the result
-            result = {
-                "tools": [tool.__dict__ for tool in all_tools],
-                "total_count": len(all_tools),
-                "built_in_count": internal_count,
-                "external_count": external_count,
-                "timestamp": current_time,
-                "execution_time": execution_time,
-                "cache_hit": False
-            }
-            
-            self._tool_cache = result
-            self._cache_timestamp = current_time
-            
-            logger.info(f"Successfully listed {len(all_tools)} tools", 
-                       total_tools=len(all_tools),
-                       internal_count=internal_count,
-                       external_count=external_count,
-                       execution_time=execution_time)
-            
+            await self.sync_external_servers()
+            snapshot, cache_hit = await self.tool_catalog.get()
+            result = snapshot.to_response(cache_hit=cache_hit)
+            result["execution_time"] = time.time() - start_time
             return result
             
         except Exception as e:
             self.error_count += 1
+            metrics.record_error("orchestrator", e)
             execution_time = time.time() - start_time
             logger.error(f"Failed to list all tools: {str(e)}", 
                         execution_time=execution_time)
             raise
     
+    async def _load_tools(self) -> List[Any]:
+        """Discover tools from all servers for a new catalog snapshot."""
+        start_time = time.time()
+        
+        # Get tools from all servers (unified)
+        with tracing.start_span("mcp.orchestrator.list_all_tools") as span:
+            all_tools = await self.server_registry.list_all_tools()
+            span.set_attribute("mcp.tool_count", len(all_tools))
+        
+        execution_time = time.time() - start_time
+        self.total_execution_time += execution_time
+        logger.info(f"Orchestrator received {len(all_tools)} tools from server registry",
+                   execution_time=execution_time)
+        return all_tools
+    
     async def get_tool_info(self, tool_name: str) -> Optional[Dict[str, Any]]:
         """
         Get detailed information about a specific tool.
@@ -202,13 +250,19 @@ class MCPOrchestrator:
                         execution_time=execution_time)
             raise
     
-    async def execute_tool(self, tool_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    async def execute_tool(self, tool_name: str, parameters: Dict[str, Any],
+                           bypass_cache: bool = False) -> Dict[str, Any]:
         """
         Execute a tool from any server with unified interface.
         
+        Results of tools that declare a cache TTL are reused for identical
+        normalized parameters; the ``cache`` key of the result reports hits.
+        
         Args:
             tool_name: Name of the tool to execute
             parameters: Tool parameters
+            bypass_cache: Skip the result cache lookup (the fresh result is
+                still stored)
             
         Returns:
             Tool execution result
@@ -216,6 +270,7 @@ class MCPOrchestrator:
         Raises:
             ToolNotFoundError: If tool is not found
             ValidationError: If parameters are invalid
+            AdmissionRejectedError: If the tool is at capacity (429/503)
             ToolExecutionError: If tool execution fails
         """
         start_time = time.time()
@@ -223,17 +278,34 @@ class MCPOrchestrator:
         
         try:
             logger.info(f"Executing tool: {tool_name}", parameters=parameters)
-            
-            # Validate parameters
-            is_valid, errors = await self.execution_engine.validate_parameters(tool_name, parameters)
-            if not is_valid:
-                raise ValidationError(f"Invalid parameters for tool '{tool_name}': {errors}")
-            
-            # Execute tool through server registry (unified)
-            result = await self.server_registry.execute_tool(tool_name, parameters)
-            
-            # Format result
-            formatted_result = await self.execution_engine.format_result(result, tool_name)
+            await self.sync_external_servers()
+            await self._wait_for_restore(tool_name)
+            
+            with metrics.track_tool_execution(tool_name) as outcome, \
+                    bind_request_context(tool_name=tool_name), \
+                    tracing.start_span("mcp.orchestrator.execute_tool", attributes={"mcp.tool": tool_name}) as span:
+                # Validate parameters
+                is_valid, errors = await self.execution_engine.validate_parameters(tool_name, parameters)
+                if not is_valid:
+                    raise ValidationError(f"Invalid parameters for tool '{tool_name}': {errors}")
+                
+                cache_key, cached = await self._lookup_result(tool_name, parameters, bypass_cache)
+                if cached is not None:
+                    result, cache_info = cached
+                else:
+                    # Execute tool through server registry (unified)
+                    async with self.admission.admit(tool_name):
+                        result = await self.server_registry.execute_tool(tool_name, parameters)
+                    cache_info = await self._store_result(cache_key, result, bypass_cache)
+                span.set_attribute("mcp.cache_hit", bool(cache_info and cache_info["hit"]))
+                
+                # Format result
+                formatted_result = await self.execution_engine.format_result(result, tool_name)
+                if cache_info:
+                    formatted_result["cache"] = cache_info
+                if formatted_result.get("status") == "error":
+                    outcome["status"] = "error"
+                    span.status = "error"
             
             execution_time = time.time() - start_time
             self.total_execution_time += execution_time
@@ -244,16 +316,175 @@ class MCPOrchestrator:
             
             return formatted_result
             
-        except (ToolNotFoundError, ValidationError, ToolExecutionError):
+        except (ToolNotFoundError, ValidationError, ToolExecutionError, AdmissionRejectedError) as e:
             # Re-raise these specific errors
+            metrics.record_error("orchestrator", e)
             raise
         except Exception as e:
             self.error_count += 1
+            metrics.record_error("orchestrator", e)
             execution_time = time.time() - start_time
             logger.error(f"Unexpected error executing tool '{tool_name}': {str(e)}", 
                         execution_time=execution_time)
             raise ToolExecutionError(f"Tool execution failed: {str(e)}")
     
+    async def execute_tools_batch(self, calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Execute several tools, sending calls to the same server as one batch.
+        
+        Cached results are served without being sent to the server. When the
+        batch needs more admission slots than are free, it runs in waves of
+        as many calls as can be admitted at once.
+        
+        Args:
+            calls: List of ``{"tool_name": ..., "parameters": {...}}`` entries,
+                optionally with ``"bypass_cache": True``
+            
+        Returns:
+            One formatted result per call, in order. Calls that fail validation
+            or execution get a ``status: "error"`` entry instead of raising, so
+            one bad call does not discard the rest of the batch.
+        """
+        start_time = time.time()
+        self.request_count += len(calls)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(calls)
+        pending = []
+        
+        with tracing.start_span("mcp.orchestrator.execute_tools_batch", attributes={"mcp.batch_size": len(calls)}):
+            for index, call in enumerate(calls):
+                tool_name = call.get("tool_name")
+                parameters = call.get("parameters") or {}
+                bypass_cache = bool(call.get("bypass_cache"))
+                is_valid, errors = await self.execution_engine.validate_parameters(tool_name, parameters)
+                cache_key, cached = None, None
+                if is_valid:
+                    cache_key, cached = await self._lookup_result(tool_name, parameters, bypass_cache)
+                if is_valid and cached is None:
+                    pending.append((index, tool_name, parameters, cache_key, bypass_cache))
+                    continue
+                
+                with metrics.track_tool_execution(tool_name) as outcome:
+                    if not is_valid:
+                        outcome["status"] = "error"
+                        results[index] = self._batch_error(
+                            tool_name, ValidationError(f"Invalid parameters for tool '{tool_name}': {errors}")
+                        )
+                    else:
+                        raw, cache_info = cached
+                        results[index] = await self.execution_engine.format_result(raw, tool_name)
+                        results[index]["cache"] = cache_info
+            
+            while pending:
+                wave, waiting = [], []
+                # Every call is timed and counted per tool, like a single execute_tool call
+                with ExitStack() as tracked:
+                    async with AsyncExitStack() as admitted:
+                        # Each call needs its own admission slot. Only the first call of a
+                        # wave may wait for one: the others would wait on slots this batch
+                        # already holds, so they run in a later wave instead
+                        for entry in pending:
+                            if wave and not self.admission.has_capacity(entry[1]):
+                                waiting.append(entry)
+                                continue
+                            outcome = tracked.enter_context(metrics.track_tool_execution(entry[1]))
+                            try:
+                                await admitted.enter_async_context(self.admission.admit(entry[1]))
+                            except AdmissionRejectedError as e:
+                                outcome["status"] = "error"
+                                results[entry[0]] = self._batch_error(entry[1], e)
+                                continue
+                            wave.append((entry, outcome))
+                        
+                        raw_results = await self.server_registry.execute_tools_batch(
+                            [(tool_name, parameters) for (_, tool_name, parameters, _, _), _ in wave]
+                        ) if wave else []
+                    
+                    for ((index, tool_name, _, cache_key, bypass_cache), outcome), raw in zip(wave, raw_results):
+                        if isinstance(raw, Exception):
+                            outcome["status"] = "error"
+                            self.error_count += 1
+                            metrics.record_error("orchestrator", raw)
+                            results[index] = self._batch_error(tool_name, raw)
+                        else:
+                            cache_info = await self._store_result(cache_key, raw, bypass_cache)
+                            results[index] = await self.execution_engine.format_result(raw, tool_name)
+                            if cache_info:
+                                results[index]["cache"] = cache_info
+                            if results[index].get("status") == "error":
+                                outcome["status"] = "error"
+                pending = waiting
+        
+        execution_time = time.time() - start_time
+        self.total_execution_time += execution_time
+        logger.info(f"Executed batch of {len(calls)} tool calls", execution_time=execution_time)
+        return results
+    
+    def _result_cache_key(self, tool_name: str, parameters: Dict[str, Any]) -> Optional[Tuple[str, float]]:
+        """Cache key and TTL for a call, or None when the tool is not cacheable."""
+        if not settings.tool_result_cache_enabled:
+            return None
+        snapshot = self.tool_catalog.snapshot
+        tool = snapshot.get_tool(tool_name) if snapshot else None
+        if not tool or not tool.get("cache_ttl"):
+            return None
+        
+        case_insensitive = set(tool.get("cache_case_insensitive") or ())
+        normalized = {
+            key: value.lower() if key in case_insensitive and isinstance(value, str) else value
+            for key, value in parameters.items()
+        }
+        # External server IDs are generated on registration; the URL identifies the server
+        # across restarts and workers, so persisted results are found again
+        server = self.server_registry.servers.get(tool.get("server_id"))
+        server_key = server.url if server is not None and server.url else tool.get("server_id")
+        return canonical_key(f"{server_key}/{tool_name}", normalized), float(tool["cache_ttl"])
+    
+    async def _lookup_result(self, tool_name: str, parameters: Dict[str, Any], bypass_cache: bool
+                             ) -> Tuple[Optional[Tuple[str, float]], Optional[Tuple[Any, Dict[str, Any]]]]:
+        """Return the call's cache key and, on a hit, ``(raw_result, cache_info)``."""
+        cache_key = self._result_cache_key(tool_name, parameters)
+        if cache_key is None or bypass_cache:
+            return cache_key, None
+        
+        cached = await self.result_cache.get(cache_key[0])
+        if cached is None:
+            return cache_key, None
+        
+        entry, tier = cached
+        logger.info(f"Serving cached result for tool '{tool_name}'", tier=tier)
+        return cache_key, (entry.value, {
+            "hit": True,
+            "tier": tier,
+            "age_seconds": round(time.time() - entry.stored_at, 3),
+            "ttl_seconds": cache_key[1]
+        })
+    
+    async def _store_result(self, cache_key: Optional[Tuple[str, float]], result: Any,
+                            bypass_cache: bool) -> Optional[Dict[str, Any]]:
+        """Cache a fresh result unless it is an error; return its cache info."""
+        if cache_key is None:
+            return None
+        
+        cache_info = {"hit": False, "bypassed": bypass_cache, "stored": False}
+        if not (isinstance(result, dict) and result.get("isError")):
+            try:
+                await self.result_cache.set(cache_key[0], result, cache_key[1])
+                cache_info["stored"] = True
+            except Exception as e:
+                logger.warning(f"Failed to cache tool result: {e}")
+        return cache_info
+    
+    @staticmethod
+    def _batch_error(tool_name: Optional[str], error: Exception) -> Dict[str, Any]:
+        """Error entry for a failed call within a batch."""
+        return {
+            "status": "error",
+            "error_message": str(error),
+            "error_type": type(error).__name__,
+            "tool_name": tool_name,
+            "formatted_at": time.time()
+        }
+    
     async def add_external_server(self, config: Dict[str, Any]) -> str:
         """
         Add an external MCP server.
@@ -268,9 +499,13 @@ class MCPOrchestrator:
             # Ensure config has external type
             config["type"] = "external"
             server_id = await self.server_registry.add_server(config)
+            await self._share_external_server(server_id, config)
+            if self.snapshot_store is not None:
+                await self.snapshot_store.aset("servers", server_id, dict(config, server_id=server_id))
             
-            # Clear tool cache since we added a new server
-            self._clear_tool_cache()
+            # Rebuild the tool catalog so the new server's tools are listed
+            self.tool_catalog.invalidate()
+            await self.tool_catalog.refresh()
             
             logger.info(f"External MCP server added successfully with ID: {server_id}")
             return server_id
@@ -290,10 +525,17 @@ class MCPOrchestrator:
             True if server was removed successfully
         """
         try:
+            # The server may have been added through another worker
+            await self.sync_external_servers()
             success = await self.server_registry.remove_server(server_id)
+            # A persisted server that could not be reconnected is only in the snapshot
+            if self.snapshot_store is not None and await self.snapshot_store.adelete("servers", server_id):
+                success = True
             if success:
-                # Clear tool cache since we removed a server
-                self._clear_tool_cache()
+                await self._share_external_server(server_id, None)
+                # Rebuild the tool catalog without the removed server's tools
+                self.tool_catalog.invalidate()
+                await self.tool_catalog.refresh()
                 logger.info(f"External MCP server {server_id} removed successfully")
             else:
                 logger.warning(f"External MCP server {server_id} not found for removal")
@@ -303,6 +545,82 @@ class MCPOrchestrator:
             logger.error(f"Failed to remove external MCP server {server_id}: {str(e)}")
             raise ExternalMCPServerError(f"Failed to remove server: {str(e)}")
     
+    async def _restore_external_servers(self) -> None:
+        """Reconnect the servers kept in the registry snapshot, then revalidate the tool catalog."""
+        try:
+            configs = await self.snapshot_store.aitems("servers")
+            results = await asyncio.gather(
+                *(self.server_registry.add_server(config) for config in configs.values()),
+                return_exceptions=True
+            )
+            for (server_id, config), result in zip(configs.items(), results):
+                if isinstance(result, Exception):
+                    # Kept in the snapshot so the next start tries again
+                    logger.warning(f"Failed to restore external server {config.get('name', server_id)}: {str(result)}")
+            if configs:
+                logger.info(f"Restored {sum(1 for r in results if not isinstance(r, Exception))} "
+                            f"of {len(configs)} external servers from snapshot")
+        except Exception as e:
+            logger.error(f"Failed to restore external servers: {str(e)}")
+        self.tool_catalog.invalidate()
+        self.tool_catalog.start()
+    
+    async def _wait_for_restore(self, tool_name: str) -> None:
+        """Let calls to tools of servers still being restored wait for the restore."""
+        task = self._restore_task
+        if task is None or task.done():
+            return
+        snapshot = self.tool_catalog.snapshot
+        tool = snapshot.get_tool(tool_name) if snapshot else None
+        if tool is None or tool.get("source") != "internal":
+            await asyncio.shield(task)
+    
+    async def _share_external_server(self, server_id: str, config: Optional[Dict[str, Any]]) -> None:
+        """Record an added (or, without config, removed) server for the other workers."""
+        if not shared_store.shared:
+            return
+        if config is None:
+            # Kept as a tombstone so workers that loaded the server themselves drop it too
+            await shared_store.aset("external_servers", server_id, None)
+            self._shared_external_ids.discard(server_id)
+        else:
+            await shared_store.aset("external_servers", server_id, dict(config, server_id=server_id))
+            self._shared_external_ids.add(server_id)
+        generation = await shared_store.aincrement("generations", "external_servers")
+        if generation == self._external_generation + 1:
+            # Nothing else changed since this worker last synced
+            self._external_generation = generation
+    
+    async def sync_external_servers(self) -> None:
+        """Apply external servers added or removed through other workers."""
+        if not shared_store.shared:
+            return
+        if (await shared_store.aget("generations", "external_servers") or 0) == self._external_generation:
+            return
+        async with self._external_sync_lock:
+            generation = await shared_store.aget("generations", "external_servers") or 0
+            if generation == self._external_generation:
+                return
+            entries = await shared_store.aitems("external_servers")
+            configs = {server_id: config for server_id, config in entries.items() if config is not None}
+            removed = set(entries) - set(configs)
+            local = {server_id for server_id, server in self.server_registry.servers.items()
+                     if server.type == "external"}
+            # Servers loaded from config or the snapshot are not in the shared list;
+            # only those taken from it, or removed through another worker, are dropped
+            for server_id in local & ((self._shared_external_ids - set(configs)) | removed):
+                await self.server_registry.remove_server(server_id)
+            for server_id in set(configs) - local:
+                try:
+                    await self.server_registry.add_server(configs[server_id])
+                except Exception as e:
+                    logger.warning(f"Failed to add shared external server {server_id}: {str(e)}")
+            self._shared_external_ids = set(configs)
+            self._external_generation = generation
+            self.tool_catalog.invalidate()
+            await self.tool_catalog.refresh()
+            logger.info(f"Synced external servers to generation {generation}", servers=len(configs))
+    
     async def get_server_health(self) -> Dict[str, Any]:
         """
         Get health status of all MCP components.
@@ -340,7 +658,9 @@ class MCPOrchestrator:
                 "components": {
                     "server_registry": registry_health,
                     "execution_engine": execution_health,
-                    "internal_server": internal_server_health
+                    "internal_server": internal_server_health,
+                    "tool_catalog": self.tool_catalog.get_status(),
+                    "admission": self.admission.get_status()
                 },
                 "metrics": {
                     "request_count": self.request_count,
@@ -369,8 +689,11 @@ class MCPOrchestrator:
         try:
             from app.core.config import settings
             
-            # Register in server registry directly (connection will be established when needed)
+            # Register in server registry directly (connection will be established when needed).
+            # The ID is derived from the URL so that the tools of a restored catalog
+            # snapshot and persisted results still point at this server after a restart
             server_info = {
+                "server_id": str(uuid.uuid5(uuid.NAMESPACE_URL, settings.internal_mcp_url)),
                 "name": "Internal MCP Server",
                 "url": settings.internal_mcp_url,  # Use the correct URL from config
                 "type": "internal",
@@ -395,6 +718,7 @@ class MCPOrchestrator:
             List of external server information
         """
         try:
+            await self.sync_external_servers()
             servers = []
             for server_id, server in self.server_registry.servers.items():
                 if server.type == "external":
@@ -431,10 +755,16 @@ class MCPOrchestrator:
                 if server_health.get("type") == "external":
                     external_servers[server_id] = server_health
             
+            open_circuits = [
+                server_id for server_id, server_health in external_servers.items()
+                if (server_health.get("circuit") or {}).get("state") == "open"
+            ]
+            
             return {
                 "status": "healthy" if external_servers else "no_external_servers",
                 "external_servers": external_servers,
                 "total_external_servers": len(external_servers),
+                "open_circuits": open_circuits,
                 "timestamp": time.time()
             }
             
@@ -495,6 +825,10 @@ class MCPOrchestrator:
         try:
             logger.info("Shutting down MCP Orchestrator...")
             
+            if self._restore_task is not None and not self._restore_task.done():
+                self._restore_task.cancel()
+            await self.tool_catalog.stop()
+            
             # Stop internal server first
             if self.internal_server:
                 try:
@@ -567,5 +901,8 @@ def get_initialized_mcp_orchestrator() -> MCPOrchestrator:
         raise RuntimeError("MCP Orchestrator not yet initialized. Call initialize() first.")
     return _mcp_orchestrator_instance
 
-# Backward compatibility
-mcp_orchestrator = get_mcp_orchestrator()
\ No newline at end of file
+# Backward compatibility: ``mcp_orchestrator`` is created on first access, not at import
+def __getattr__(name: str) -> Any:
+    if name == "mcp_orchestrator":
+        return get_mcp_orchestrator()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
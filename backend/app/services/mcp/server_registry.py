@@ -10,15 +10,20 @@ import json
 import os
 import time
 import uuid
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass, field, fields
 
 import structlog
 
+from app.core import metrics, request_context, tracing
+from app.core.cassette import cassette
+from app.core.request_context import propagation_headers
+from app.core.circuit_breaker import CircuitBreaker
 from app.core.exceptions import (
     ExternalMCPServerError,
     ConnectionError,
-    AuthenticationError
+    AuthenticationError,
+    CircuitOpenError
 )
 
 logger = structlog.get_logger()
@@ -53,6 +58,23 @@ class UnifiedTool:
     category: str = "general"
     requires_auth: bool = False
     usage_count: int = 0
+    # Result caching policy from the tool's ``_meta.cache`` (None: not cacheable)
+    cache_ttl: Optional[float] = None
+    cache_case_insensitive: List[str] = field(default_factory=list)
+    
+    def apply_cache_policy(self, tool_data: Dict[str, Any]) -> "UnifiedTool":
+        """Read the caching policy a server advertised for this tool."""
+        policy = (tool_data.get("_meta") or {}).get("cache") or {}
+        if isinstance(policy, dict) and policy.get("ttl"):
+            self.cache_ttl = float(policy["ttl"])
+            self.cache_case_insensitive = list(policy.get("case_insensitive") or [])
+        return self
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "UnifiedTool":
+        """Rebuild a tool from its catalog snapshot entry."""
+        names = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in names})
 
 
 class MCPServerRegistry:
@@ -72,8 +94,35 @@ class MCPServerRegistry:
         self._health_cache: Dict[str, Dict[str, Any]] = {}
         self._health_cache_ttl = 60  # Cache health checks for 30 seconds
         
+        # Last internal tools/list payload and its ETag for conditional requests
+        self._internal_catalog_etag: Optional[str] = None
+        self._internal_catalog_tools: List[Dict[str, Any]] = []
+        
+        # Circuit breakers for external servers, by server ID
+        self.circuit_breakers: Dict[str, CircuitBreaker] = {}
+        
+        # Looks tools up in the orchestrator's catalog snapshot, so calls are
+        # routed without discovering the tools of every server first
+        self.tool_lookup: Optional[Callable[[str], Optional[UnifiedTool]]] = None
+        
         logger.info("MCP Server Registry initialized")
     
+    def get_circuit_breaker(self, server: MCPServerInfo) -> CircuitBreaker:
+        """Get or create the circuit breaker guarding a server."""
+        breaker = self.circuit_breakers.get(server.server_id)
+        if breaker is None:
+            from app.core.config import settings
+            breaker = CircuitBreaker(
+                server.name,
+                failure_rate_threshold=settings.circuit_breaker_failure_rate,
+                minimum_calls=settings.circuit_breaker_min_calls,
+                window_seconds=settings.circuit_breaker_window_seconds,
+                open_seconds=settings.circuit_breaker_open_seconds,
+                slow_call_seconds=settings.circuit_breaker_slow_call_seconds
+            )
+            self.circuit_breakers[server.server_id] = breaker
+        return breaker
+    
     def _is_health_cache_valid(self, server_id: str) -> bool:
         """Check if health cache for a server is still valid."""
         if server_id not in self._health_cache:
@@ -100,11 +149,22 @@ class MCPServerRegistry:
                 with open(config_file, 'r') as f:
                     config_data = json.load(f)
                 
-                servers_config = config_data.get("servers", {})
-                for server_id, server_config in servers_config.items():
-                    if server_config.get("type") == "external":
-                        await self.add_server(server_config)
-                        logger.info(f"Loaded external server from config: {server_config.get('name', server_id)}")
+                servers_config = {
+                    server_id: server_config
+                    for server_id, server_config in config_data.get("servers", {}).items()
+                    if server_config.get("type") == "external"
+                }
+                # Each server is connected and tested; do them all at once
+                results = await asyncio.gather(
+                    *(self.add_server(server_config) for server_config in servers_config.values()),
+                    return_exceptions=True
+                )
+                for (server_id, server_config), result in zip(servers_config.items(), results):
+                    name = server_config.get('name', server_id)
+                    if isinstance(result, Exception):
+                        logger.error(f"Failed to load external server {name} from config: {result}")
+                    else:
+                        logger.info(f"Loaded external server from config: {name}")
             else:
                 logger.warning(f"Configuration file not found: {config_file}")
         except Exception as e:
@@ -131,7 +191,8 @@ class MCPServerRegistry:
             Server ID for the newly added server
         """
         try:
-            server_id = str(uuid.uuid4())
+            # Servers shared by another worker keep the ID they were given there
+            server_id = config.get('server_id') or str(uuid.uuid4())
             
             server_info = MCPServerInfo(
                 server_id=server_id,
@@ -185,8 +246,9 @@ class MCPServerRegistry:
             if server.type == "external":
                 await self._disconnect_external_server(server)
             
-            # Clear health cache for removed server
+            # Clear health cache and breaker for removed server
             self.clear_health_cache(server_id)
+            self.circuit_breakers.pop(server_id, None)
             del self.servers[server_id]
             logger.info(f"MCP server {server_id} removed successfully")
             return True
@@ -217,8 +279,18 @@ class MCPServerRegistry:
         logger.info(f"Retrieved {len(all_tools)} tools from {len(self.servers)} servers")
         return all_tools
     
+    def _known_tool(self, tool_name: str) -> Optional[UnifiedTool]:
+        """The tool from the catalog snapshot, if it is there and its server is still registered."""
+        tool = self.tool_lookup(tool_name) if self.tool_lookup is not None else None
+        return tool if tool is not None and tool.server_id in self.servers else None
+    
     async def get_tool_info(self, tool_name: str) -> Optional[UnifiedTool]:
         """Get information about a specific tool from any server."""
+        tool = self._known_tool(tool_name)
+        if tool is not None:
+            return tool
+        
+        # Not in the catalog snapshot (or its server changed): ask the servers
         for server in self.servers.values():
             try:
                 tools = await self._discover_tools_from_server(server)
@@ -245,6 +317,68 @@ class MCPServerRegistry:
         
         return result
     
+    async def execute_tools_batch(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Any]:
+        """
+        Execute several tools, batching the calls that target the same server.
+
+        Calls to the internal server travel as one JSON-RPC batch request (or
+        one in-process dispatch); other servers get their calls concurrently.
+
+        Args:
+            calls: ``(tool_name, parameters)`` pairs
+
+        Returns:
+            One entry per call, in order: the tool result, or the exception
+            that call raised
+        """
+        tools_by_name: Dict[str, UnifiedTool] = {}
+        for tool_name, _ in calls:
+            tool = self._known_tool(tool_name)
+            if tool is not None:
+                tools_by_name[tool_name] = tool
+        if len(tools_by_name) < len({tool_name for tool_name, _ in calls}):
+            # Rediscover only when the snapshot misses a tool
+            for tool in await self.list_all_tools():
+                tools_by_name.setdefault(tool.name, tool)
+        results: List[Any] = [None] * len(calls)
+        groups: Dict[str, List[Tuple[int, UnifiedTool, Dict[str, Any]]]] = {}
+        
+        for index, (tool_name, parameters) in enumerate(calls):
+            tool_info = tools_by_name.get(tool_name)
+            if not tool_info:
+                results[index] = ValueError(f"Tool '{tool_name}' not found")
+            elif tool_info.server_id not in self.servers:
+                results[index] = ValueError(f"Server {tool_info.server_id} not found")
+            else:
+                groups.setdefault(tool_info.server_id, []).append((index, tool_info, parameters))
+        
+        async def run_group(server: MCPServerInfo, group: List[Tuple[int, UnifiedTool, Dict[str, Any]]]) -> None:
+            with metrics.track_mcp_server_request(server.name, server.type, "tools/call"), \
+                    tracing.start_span("mcp.tools/call.batch", kind=tracing.SPAN_KIND_CLIENT, attributes={
+                        "mcp.server": server.name,
+                        "mcp.server_type": server.type,
+                        "mcp.batch_size": len(group)
+                    }):
+                if server.type == "internal":
+                    group_results = await self._execute_internal_tools_batch(
+                        [(tool_info, parameters) for _, tool_info, parameters in group]
+                    )
+                else:
+                    group_results = await asyncio.gather(
+                        *(self._execute_external_tool(server, tool_info, parameters)
+                          for _, tool_info, parameters in group),
+                        return_exceptions=True
+                    )
+            for (index, tool_info, _), result in zip(group, group_results):
+                results[index] = result
+                if not isinstance(result, Exception):
+                    tool_info.usage_count += 1
+        
+        await asyncio.gather(*(
+            run_group(self.servers[server_id], group) for server_id, group in groups.items()
+        ))
+        return results
+    
     async def get_health(self) -> Dict[str, Any]:
         """Get health status of all MCP servers."""
         try:
@@ -296,48 +430,65 @@ class MCPServerRegistry:
             return []
     
     async def _discover_internal_tools(self, server: MCPServerInfo) -> List[UnifiedTool]:
-        """Discover tools from internal MCP server via direct HTTP call."""
+        """Discover tools from internal MCP server (in-process or via direct HTTP call)."""
         try:
             import aiohttp
             from app.core.config import settings
             
-            # Make direct HTTP call to internal MCP server
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{settings.internal_mcp_url}",
-                    json={
-                        "jsonrpc": "2.0",
-                        "id": 1,
-                        "method": "tools/list"
-                    }
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        # Handle new MCP format where tools are returned as direct array
-                        tools_data = data.get("result", [])
-                        if not isinstance(tools_data, list):
-                            # Fallback for old format with "tools" wrapper
-                            tools_data = data.get("result", {}).get("tools", [])
-                        
-                        unified_tools = []
-                        for tool_data in tools_data:
-                            unified_tool = UnifiedTool(
-                                name=tool_data.get("name", ""),
-                                description=tool_data.get("description", ""),
-                                server_id=server.server_id,
-                                server_name=server.name,
-                                source="internal",
-                                category=tool_data.get("category", "general"),
-                                input_schema=tool_data.get("inputSchema", {}),
-                                requires_auth=tool_data.get("requires_auth", False),
-                                usage_count=tool_data.get("usage_count", 0)
-                            )
-                            unified_tools.append(unified_tool)
-                        
-                        return unified_tools
-                    else:
-                        logger.error(f"HTTP error {response.status} from internal MCP server")
-                        return []
+            with metrics.track_mcp_server_request(server.name, server.type, "tools/list"), \
+                    tracing.start_span("mcp.tools/list", kind=tracing.SPAN_KIND_CLIENT,
+                                       attributes={"mcp.server": server.name, "mcp.server_type": server.type}):
+                if settings.internal_mcp_inprocess:
+                    # Co-located: read the catalog directly, no loopback HTTP
+                    from app.internal_mcp_app import list_tools
+                    tools_data = list_tools()
+                else:
+                    # Make direct HTTP call to internal MCP server, revalidating
+                    # the previous catalog by ETag
+                    headers = {}
+                    if self._internal_catalog_etag:
+                        headers["If-None-Match"] = self._internal_catalog_etag
+                    async with aiohttp.ClientSession() as session:
+                        async with session.post(
+                            f"{settings.internal_mcp_url}",
+                            json={
+                                "jsonrpc": "2.0",
+                                "id": 1,
+                                "method": "tools/list"
+                            },
+                            headers=tracing.inject_headers(headers)
+                        ) as response:
+                            if response.status == 304:
+                                tools_data = self._internal_catalog_tools
+                            elif response.status != 200:
+                                logger.error(f"HTTP error {response.status} from internal MCP server")
+                                return []
+                            else:
+                                data = await response.json()
+                                # Handle new MCP format where tools are returned as direct array
+                                tools_data = data.get("result", [])
+                                if not isinstance(tools_data, list):
+                                    # Fallback for old format with "tools" wrapper
+                                    tools_data = data.get("result", {}).get("tools", [])
+                                self._internal_catalog_etag = response.headers.get("ETag")
+                                self._internal_catalog_tools = tools_data
+            
+            unified_tools = []
+            for tool_data in tools_data:
+                unified_tool = UnifiedTool(
+                    name=tool_data.get("name", ""),
+                    description=tool_data.get("description", ""),
+                    server_id=server.server_id,
+                    server_name=server.name,
+                    source="internal",
+                    category=tool_data.get("category", "general"),
+                    input_schema=tool_data.get("inputSchema", {}),
+                    requires_auth=tool_data.get("requires_auth", False),
+                    usage_count=tool_data.get("usage_count", 0)
+                ).apply_cache_policy(tool_data)
+                unified_tools.append(unified_tool)
+            
+            return unified_tools
             
         except Exception as e:
             logger.error(f"Failed to discover tools from internal MCP server: {e}")
@@ -346,18 +497,8 @@ class MCPServerRegistry:
     async def _discover_external_tools(self, server: MCPServerInfo) -> List[UnifiedTool]:
         """Discover tools from external server using persistent connections."""
         try:
-            from app.core.mcp_connection_manager import get_connection_manager
-            
-            # Get connection from pool
-            connection_manager = await get_connection_manager()
-            connection = await connection_manager.get_connection(server.url, server.name)
-            
-            if not connection:
-                logger.error(f"No connection available to {server.name}")
-                return []
-            
-            # Use the corrected list_tools method
-            tools_data = await connection.client.list_tools()
+            breaker = self.get_circuit_breaker(server)
+            tools_data = await breaker.call(lambda: self._list_external_tools(server))
             
             unified_tools = []
             logger.debug(f"Processing {len(tools_data)} tools from {server.name}")
@@ -372,10 +513,30 @@ class MCPServerRegistry:
             logger.debug(f"Returned {len(unified_tools)} tools from {server.name}")
             return unified_tools
             
+        except CircuitOpenError as e:
+            logger.debug(f"Skipping tool discovery for {server.name}: {e}")
+            return []
         except Exception as e:
+            server.connection_errors += 1
             logger.error(f"Failed to discover external tools: {e}")
             return []
     
+    async def _list_external_tools(self, server: MCPServerInfo) -> List[Dict[str, Any]]:
+        from app.core.mcp_connection_manager import get_connection_manager
+        
+        # Get connection from pool
+        connection_manager = await get_connection_manager()
+        connection = await connection_manager.get_connection(server.url, server.name)
+        
+        if not connection:
+            raise ConnectionError(f"No connection available to {server.name}")
+        
+        # Use the corrected list_tools method
+        with metrics.track_mcp_server_request(server.name, server.type, "tools/list"), \
+                tracing.start_span("mcp.tools/list", kind=tracing.SPAN_KIND_CLIENT,
+                                   attributes={"mcp.server": server.name, "mcp.server_type": server.type}):
+            return await connection.client.list_tools()
+    
     def _validate_tool_schema(self, tool_data: Dict[str, Any]) -> bool:
         """Validate basic tool schema."""
         # Only name is required, description can be None
@@ -403,7 +564,7 @@ class MCPServerRegistry:
             input_schema=input_schema,
             requires_auth=tool_data.get("requires_auth", False),
             usage_count=tool_data.get("usage_count", 0)
-        )
+        ).apply_cache_policy(tool_data)
     
     async def _execute_tool_on_server(self, tool_info: UnifiedTool, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Execute a tool on its specific server."""
@@ -411,19 +572,29 @@ class MCPServerRegistry:
         if not server:
             raise ValueError(f"Server {tool_info.server_id} not found")
         
-        if server.type == "internal":
-            return await self._execute_internal_tool(tool_info, parameters)
-        else:
-            return await self._execute_external_tool(server, tool_info, parameters)
+        with metrics.track_mcp_server_request(server.name, server.type, "tools/call"), \
+                tracing.start_span("mcp.tools/call", kind=tracing.SPAN_KIND_CLIENT, attributes={
+                    "mcp.server": server.name,
+                    "mcp.server_type": server.type,
+                    "mcp.tool": tool_info.name
+                }):
+            if server.type == "internal":
+                return await self._execute_internal_tool(tool_info, parameters)
+            else:
+                return await self._execute_external_tool(server, tool_info, parameters)
     
     async def _execute_internal_tool(self, tool_info: UnifiedTool, parameters: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute a tool on internal MCP server via direct HTTP call."""
+        """Execute a tool on internal MCP server (in-process or via direct HTTP call)."""
+        from app.core.config import settings
+        
+        if settings.internal_mcp_inprocess:
+            return await self._execute_internal_tool_inprocess(tool_info, parameters)
+        
         try:
             import aiohttp
-            from app.core.config import settings
             
-            # Make direct HTTP call to internal MCP server
-            async with aiohttp.ClientSession() as session:
+            # Make direct HTTP call to internal MCP server, bounded by the request deadline
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=request_context.timeout(300.0))) as session:
                 async with session.post(
                     f"{settings.internal_mcp_url}",
                     json={
@@ -434,7 +605,8 @@ class MCPServerRegistry:
                             "name": tool_info.name,
                             "arguments": parameters
                         }
-                    }
+                    },
+                    headers=tracing.inject_headers(propagation_headers())
                 ) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -451,18 +623,111 @@ class MCPServerRegistry:
             logger.error(f"Failed to execute tool on internal MCP server: {e}")
             raise ConnectionError(f"Failed to execute tool: {e}")
     
+    async def _execute_internal_tools_batch(self, calls: List[Tuple[UnifiedTool, Dict[str, Any]]]) -> List[Any]:
+        """Execute several internal tools with a single JSON-RPC batch request."""
+        from app.core.config import settings
+        
+        if settings.internal_mcp_inprocess:
+            return await asyncio.gather(
+                *(self._execute_internal_tool_inprocess(tool_info, parameters)
+                  for tool_info, parameters in calls),
+                return_exceptions=True
+            )
+        
+        batch = [
+            {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "method": "tools/call",
+                "params": {
+                    "name": tool_info.name,
+                    "arguments": parameters
+                }
+            }
+            for request_id, (tool_info, parameters) in enumerate(calls, start=1)
+        ]
+        
+        try:
+            import aiohttp
+            
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=request_context.timeout(300.0))) as session:
+                async with session.post(
+                    f"{settings.internal_mcp_url}",
+                    json=batch,
+                    headers=tracing.inject_headers(propagation_headers())
+                ) as response:
+                    if response.status != 200:
+                        raise ConnectionError(f"HTTP error {response.status} from internal MCP server")
+                    data = await response.json()
+        except Exception as e:
+            logger.error(f"Failed to execute tool batch on internal MCP server: {e}")
+            error = e if isinstance(e, ConnectionError) else ConnectionError(f"Failed to execute tool: {e}")
+            return [error] * len(calls)
+        
+        if not isinstance(data, list):
+            data = [data]
+        responses = {item.get("id"): item for item in data if isinstance(item, dict)}
+        
+        results: List[Any] = []
+        for request_id in range(1, len(calls) + 1):
+            item = responses.get(request_id)
+            if item is None:
+                results.append(ConnectionError("Invalid response from internal MCP server"))
+            elif "result" in item:
+                results.append(item["result"])
+            elif "error" in item:
+                results.append(ConnectionError(f"MCP server error: {item['error']['message']}"))
+            else:
+                results.append(ConnectionError("Invalid response from internal MCP server"))
+        return results
+    
+    async def _execute_internal_tool_inprocess(self, tool_info: UnifiedTool, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Dispatch directly to the co-located internal MCP app's tools."""
+        from app.internal_mcp_app import call_tool
+        
+        try:
+            # Batched calls run side by side; each is attributed to its own tool
+            with request_context.bind(tool_name=tool_info.name):
+                return await call_tool(tool_info.name, parameters)
+        except KeyError:
+            raise ConnectionError(f"MCP server error: Tool '{tool_info.name}' not found")
+    
     async def _execute_external_tool(self, server: MCPServerInfo, tool_info: UnifiedTool, parameters: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute a tool on external server using persistent connections."""
+        """
+        Execute a tool on external server using persistent connections.
+        
+        Raises:
+            CircuitOpenError: If the server's circuit is open
+        """
         from app.core.mcp_connection_manager import get_connection_manager
         
-        # Get connection from pool
-        connection_manager = await get_connection_manager()
-        connection = await connection_manager.get_connection(server.url, server.name)
+        async def perform() -> Dict[str, Any]:
+            # Get connection from pool
+            connection_manager = await get_connection_manager()
+            connection = await connection_manager.get_connection(server.url, server.name)
+            
+            if not connection:
+                raise ConnectionError(f"No connection available to {server.name}")
+            
+            return await connection.client.call_tool(tool_info.name, parameters)
         
-        if not connection:
-            raise ConnectionError(f"No connection available to {server.name}")
+        async def call() -> Dict[str, Any]:
+            # Recorded or replayed when a cassette is active
+            return await cassette.interaction(
+                "mcp", f"{server.name}.{tool_info.name}",
+                {"server": server.url, "tool": tool_info.name, "arguments": parameters},
+                perform
+            )
         
-        return await connection.client.call_tool(tool_info.name, parameters)
+        # An expired request must not count against the server's circuit
+        request_context.check_deadline()
+        try:
+            return await self.get_circuit_breaker(server).call(call)
+        except CircuitOpenError:
+            raise
+        except Exception:
+            server.connection_errors += 1
+            raise
     
     async def _test_server_connection(self, server: MCPServerInfo) -> bool:
         """Test connection to a server."""
@@ -471,6 +736,12 @@ class MCPServerRegistry:
                 # Test internal MCP server via HTTP health check
                 import aiohttp
                 from app.core.config import settings
+                if settings.internal_mcp_inprocess:
+                    # Co-located app is reachable whenever this process is
+                    server.connected = True
+                    server.status = "healthy"
+                    server.last_health_check = time.time()
+                    return True
                 try:
                     async with aiohttp.ClientSession() as session:
                         async with session.get(f"{settings.internal_mcp_url}/health", timeout=5) as resp:
@@ -532,15 +803,29 @@ class MCPServerRegistry:
         """Get health status of a specific server."""
         try:
             # Check cache first for external servers to avoid frequent connections
-            if server.type == "external" and self._is_health_cache_valid(server.server_id):
-                cached_health = self._health_cache[server.server_id]
-                logger.debug(f"Using cached health for {server.name}")
-                return cached_health["health_data"]
+            if server.type == "external":
+                cache_valid = self._is_health_cache_valid(server.server_id)
+                metrics.record_cache_lookup("server_health", hit=cache_valid)
+                if cache_valid:
+                    cached_health = self._health_cache[server.server_id]
+                    logger.debug(f"Using cached health for {server.name}")
+                    health_data = dict(cached_health["health_data"])
+                    health_data["circuit"] = self.get_circuit_breaker(server).get_status()
+                    return health_data
             
             if server.type == "internal":
                 # Test internal MCP server via HTTP health check
                 import aiohttp
                 from app.core.config import settings
+                if settings.internal_mcp_inprocess:
+                    return {
+                        "status": "healthy",
+                        "server_id": server.server_id,
+                        "server_name": server.name,
+                        "type": "internal",
+                        "transport": "inprocess",
+                        "last_health_check": time.time()
+                    }
                 try:
                     async with aiohttp.ClientSession() as session:
                         async with session.get(f"{settings.internal_mcp_url}/health", timeout=5) as resp:
@@ -563,99 +848,24 @@ class MCPServerRegistry:
                         "last_health_check": time.time()
                     }
             else:
-                # External server health check using persistent connections
-                try:
-                    from app.core.mcp_connection_manager import get_connection_manager
-                    
-                    # Get connection from pool
-                    connection_manager = await get_connection_manager()
-                    connection = await connection_manager.get_connection(server.url, server.name)
-                    
-                    if not connection:
-                        server.connection_errors += 1
-                        server.status = "unhealthy"
-                        server.connected = False
-                        
-                        health_data = {
-                            "status": "unhealthy",
-                            "server_id": server.server_id,
-                            "server_name": server.name,
-                            "type": "external",
-                            "error": "No connection available"
-                        }
-                        
-                        # Cache the health result
-                        self._health_cache[server.server_id] = {
-                            "health_data": health_data,
-                            "timestamp": time.time()
-                        }
-                        
-                        return health_data
-                    
-                    # Use health check method from persistent connection
-                    is_healthy = await connection.client.health_check()
-                    
-                    if is_healthy:
-                        server.last_health_check = time.time()
-                        server.status = "healthy"
-                        server.connected = True
-                        
-                        health_data = {
-                            "status": "healthy",
-                            "server_id": server.server_id,
-                            "server_name": server.name,
-                            "type": "external",
-                            "last_health_check": server.last_health_check
-                        }
-                        
-                        # Cache the health result
-                        self._health_cache[server.server_id] = {
-                            "health_data": health_data,
-                            "timestamp": time.time()
-                        }
-                        
-                        return health_data
-                    else:
-                        server.connection_errors += 1
-                        server.status = "unhealthy"
-                        server.connected = False
-                        
-                        health_data = {
-                            "status": "unhealthy",
-                            "server_id": server.server_id,
-                            "server_name": server.name,
-                            "type": "external",
-                            "error": "Health check failed"
-                        }
-                        
-                        # Cache the health result (even unhealthy ones)
-                        self._health_cache[server.server_id] = {
-                            "health_data": health_data,
-                            "timestamp": time.time()
-                        }
-                        
-                        return health_data
-                        
-                except Exception as e:
-                    server.connection_errors += 1
-                    server.status = "unhealthy"
-                    server.connected = False
-                    
-                    health_data = {
+                breaker = self.get_circuit_breaker(server)
+                if not breaker.allow_request():
+                    # Fail fast instead of waiting for another connect timeout
+                    return {
                         "status": "unhealthy",
                         "server_id": server.server_id,
                         "server_name": server.name,
                         "type": "external",
-                        "error": str(e)
-                    }
-                    
-                    # Cache the health result (even error cases)
-                    self._health_cache[server.server_id] = {
-                        "health_data": health_data,
-                        "timestamp": time.time()
+                        "error": "Circuit open",
+                        "circuit": breaker.get_status()
                     }
-                    
-                    return health_data
+                start_time = time.perf_counter()
+                health_data = await self._check_external_health(server)
+                if health_data.get("status") == "healthy":
+                    breaker.record_success(time.perf_counter() - start_time)
+                else:
+                    breaker.record_failure(time.perf_counter() - start_time)
+                return {**health_data, "circuit": breaker.get_status()}
                 
         except Exception as e:
             return {
@@ -665,6 +875,102 @@ class MCPServerRegistry:
                 "server_name": server.name
             }
     
+    async def _check_external_health(self, server: MCPServerInfo) -> Dict[str, Any]:
+        """Health check an external server through its pooled connection."""
+        # External server health check using persistent connections
+        try:
+            from app.core.mcp_connection_manager import get_connection_manager
+            
+            # Get connection from pool
+            connection_manager = await get_connection_manager()
+            connection = await connection_manager.get_connection(server.url, server.name)
+            
+            if not connection:
+                server.connection_errors += 1
+                server.status = "unhealthy"
+                server.connected = False
+                
+                health_data = {
+                    "status": "unhealthy",
+                    "server_id": server.server_id,
+                    "server_name": server.name,
+                    "type": "external",
+                    "error": "No connection available"
+                }
+                
+                # Cache the health result
+                self._health_cache[server.server_id] = {
+                    "health_data": health_data,
+                    "timestamp": time.time()
+                }
+                
+                return health_data
+            
+            # Use health check method from persistent connection
+            is_healthy = await connection.client.health_check()
+            
+            if is_healthy:
+                server.last_health_check = time.time()
+                server.status = "healthy"
+                server.connected = True
+                
+                health_data = {
+                    "status": "healthy",
+                    "server_id": server.server_id,
+                    "server_name": server.name,
+                    "type": "external",
+                    "last_health_check": server.last_health_check
+                }
+                
+                # Cache the health result
+                self._health_cache[server.server_id] = {
+                    "health_data": health_data,
+                    "timestamp": time.time()
+                }
+                
+                return health_data
+            else:
+                server.connection_errors += 1
+                server.status = "unhealthy"
+                server.connected = False
+                
+                health_data = {
+                    "status": "unhealthy",
+                    "server_id": server.server_id,
+                    "server_name": server.name,
+                    "type": "external",
+                    "error": "Health check failed"
+                }
+                
+                # Cache the health result (even unhealthy ones)
+                self._health_cache[server.server_id] = {
+                    "health_data": health_data,
+                    "timestamp": time.time()
+                }
+                
+                return health_data
+                
+        except Exception as e:
+            server.connection_errors += 1
+            server.status = "unhealthy"
+            server.connected = False
+            
+            health_data = {
+                "status": "unhealthy",
+                "server_id": server.server_id,
+                "server_name": server.name,
+                "type": "external",
+                "error": str(e)
+            }
+            
+            # Cache the health result (even error cases)
+            self._health_cache[server.server_id] = {
+                "health_data": health_data,
+                "timestamp": time.time()
+            }
+            
+            return health_data
+    
     async def _disconnect_external_server(self, server: MCPServerInfo) -> None:
         """Gracefully disconnect from an external server."""
         try:
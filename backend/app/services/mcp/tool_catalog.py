@@ -0,0 +1,311 @@
+"""
+Stale-while-revalidate cache of the unified tool catalog.
+
+The orchestrator serves tools from an immutable, versioned snapshot. A
+background task rebuilds the snapshot ahead of its expiry, and server
+add/remove or ``tools/list_changed`` notifications trigger an early rebuild,
+so requests never wait on tool discovery once the first snapshot exists.
+A failed rebuild keeps the last good snapshot.
+
+With a store, every changed snapshot is persisted along with a hash of each
+tool's input schema. After a restart the persisted snapshot is served
+straight away while the orchestrator revalidates it in the background.
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import structlog
+
+from app.core import metrics
+from app.core.shared_state import SharedStore
+from app.core.single_flight import SingleFlight
+from app.utils import fast_json
+
+logger = structlog.get_logger()
+
+
+@dataclass(frozen=True)
+class ToolCatalogSnapshot:
+    """
+    One immutable view of all tools across all MCP servers.
+
+    ``version`` only changes when the tool definitions change, so clients
+    can use it to tell whether a refresh produced anything new. Tool dicts
+    are shared between readers and must not be mutated.
+    """
+    version: int
+    fingerprint: str
+    tools: Tuple[Dict[str, Any], ...]
+    built_in_count: int
+    external_count: int
+    created_at: float
+    build_time: float
+
+    @property
+    def total_count(self) -> int:
+        return len(self.tools)
+
+    def get_tool(self, name: str) -> Optional[Dict[str, Any]]:
+        return next((tool for tool in self.tools if tool.get("name") == name), None)
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now or time.time()) - self.created_at
+
+    def to_response(self, cache_hit: bool = True) -> Dict[str, Any]:
+        """The ``list_all_tools`` response for this snapshot."""
+        return {
+            "tools": list(self.tools),
+            "total_count": self.total_count,
+            "built_in_count": self.built_in_count,
+            "external_count": self.external_count,
+            "timestamp": self.created_at,
+            "version": self.version,
+            "cache_hit": cache_hit
+        }
+
+
+def _fingerprint(tools: List[Dict[str, Any]]) -> str:
+    definitions = [
+        {key: tool.get(key) for key in ("name", "description", "server_id", "input_schema", "cache_ttl")}
+        for tool in tools
+    ]
+    return hashlib.sha256(fast_json.dumpb(definitions, default=str, sort_keys=True)).hexdigest()
+
+
+def schema_hashes(tools: Tuple[Dict[str, Any], ...]) -> Dict[str, str]:
+    """Hash of each tool's input schema by tool name."""
+    return {
+        tool.get("name"): hashlib.sha256(
+            fast_json.dumpb(tool.get("input_schema"), default=str, sort_keys=True)
+        ).hexdigest()[:16]
+        for tool in tools
+    }
+
+
+class ToolCatalogCache:
+    """Holds the current tool catalog snapshot and keeps it fresh in the background."""
+
+    def __init__(self, loader: Callable[[], Awaitable[List[Any]]], ttl: float = 300.0,
+                 refresh_ahead: float = 0.8, store: Optional[SharedStore] = None):
+        """
+        Args:
+            loader: Coroutine returning the registry's ``UnifiedTool`` list
+            ttl: Seconds after which a snapshot is considered stale
+            refresh_ahead: Fraction of ``ttl`` after which a rebuild starts
+            store: Where snapshots are persisted across restarts (None: not kept)
+        """
+        self.loader = loader
+        self.ttl = ttl
+        self.refresh_after = ttl * refresh_ahead
+        self.store = store
+        self._snapshot: Optional[ToolCatalogSnapshot] = None
+        self._persisted_fingerprint: Optional[str] = None
+        # When the restored snapshot was built, until a rebuild replaces it
+        self.restored_from: Optional[float] = None
+        self._flight = SingleFlight("tool_catalog")
+        # Bumped by invalidate() so a rebuild requested after a server change
+        # never joins, or is overwritten by, a rebuild that started before it
+        self._generation = 0
+        self._installed_generation = -1
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._background_task: Optional[asyncio.Task] = None
+        self.last_error: Optional[str] = None
+        self.last_refresh_attempt: Optional[float] = None
+
+    @property
+    def snapshot(self) -> Optional[ToolCatalogSnapshot]:
+        return self._snapshot
+
+    async def get(self) -> Tuple[ToolCatalogSnapshot, bool]:
+        """
+        Return the current snapshot and whether it was served from cache.
+
+        Only the very first call, before any snapshot exists, waits for
+        discovery; later calls return immediately and start a background
+        rebuild if the snapshot is due for one.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            metrics.record_cache_lookup("tool_catalog", hit=False)
+            return await self.refresh(), False
+
+        metrics.record_cache_lookup("tool_catalog", hit=True)
+        if snapshot.age() >= self.refresh_after:
+            self.request_refresh()
+        return snapshot, True
+
+    def restore(self) -> Optional[ToolCatalogSnapshot]:
+        """Install the persisted snapshot, if there is one and nothing newer was built."""
+        if self.store is None or self._snapshot is not None:
+            return None
+        record = self.store.get("tool_catalog", "latest")
+        if not record:
+            return None
+        self.restored_from = record["created_at"]
+        self._persisted_fingerprint = record["fingerprint"]
+        # Counted as fresh from now: the caller revalidates it once the
+        # servers behind it are reachable, rather than on the first request
+        self._snapshot = ToolCatalogSnapshot(
+            version=record["version"],
+            fingerprint=record["fingerprint"],
+            tools=tuple(record["tools"]),
+            built_in_count=record["built_in_count"],
+            external_count=record["external_count"],
+            created_at=time.time(),
+            build_time=0.0
+        )
+        logger.info("Tool catalog restored from snapshot", version=self._snapshot.version,
+                    total_tools=self._snapshot.total_count, built_at=self.restored_from)
+        return self._snapshot
+
+    def invalidate(self) -> None:
+        """Mark the current snapshot as outdated, e.g. after a server change."""
+        self._generation += 1
+
+    async def refresh(self) -> ToolCatalogSnapshot:
+        """
+        Rebuild the snapshot now, sharing any rebuild already in flight.
+
+        On failure the last good snapshot is kept and returned; the error is
+        only raised when there is no snapshot to fall back to.
+        """
+        generation = self._generation
+        try:
+            return await self._flight.do(generation, lambda: self._build(generation))
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            metrics.record_error("tool_catalog", e)
+            if self._snapshot is None:
+                raise
+            logger.warning("Tool catalog refresh failed, keeping last good snapshot",
+                           error=str(e), version=self._snapshot.version)
+            return self._snapshot
+
+    def request_refresh(self) -> None:
+        """Start a rebuild in the background unless one is already running."""
+        if self._refresh_task is None or self._refresh_task.done():
+            # Detached from the request that noticed the stale snapshot, so
+            # its deadline and cancellation do not apply to the rebuild
+            self._refresh_task = asyncio.get_running_loop().create_task(
+                self.refresh(), context=contextvars.Context()
+            )
+
+    async def _build(self, generation: int) -> ToolCatalogSnapshot:
+        start_time = time.time()
+        self.last_refresh_attempt = start_time
+        all_tools = await self.loader()
+
+        tools = [dict(tool.__dict__) for tool in all_tools]
+        fingerprint = _fingerprint(tools)
+        previous = self._snapshot
+        if generation < self._installed_generation and previous is not None:
+            # A newer rebuild already finished
+            return previous
+
+        if previous is None:
+            version = 1
+        elif previous.fingerprint == fingerprint:
+            version = previous.version
+        else:
+            version = previous.version + 1
+
+        snapshot = ToolCatalogSnapshot(
+            version=version,
+            fingerprint=fingerprint,
+            tools=tuple(tools),
+            built_in_count=sum(1 for tool in all_tools if tool.source == "internal"),
+            external_count=sum(1 for tool in all_tools if tool.source == "external"),
+            created_at=time.time(),
+            build_time=time.time() - start_time
+        )
+        self._snapshot = snapshot
+        self._installed_generation = generation
+        self.last_error = None
+        if self.restored_from is not None and previous is not None:
+            self._log_revalidation(previous, snapshot)
+        await self._persist(snapshot)
+
+        logger.info("Tool catalog snapshot built",
+                    version=version,
+                    changed=previous is None or previous.version != version,
+                    total_tools=snapshot.total_count,
+                    build_time=snapshot.build_time)
+        return snapshot
+
+    def _log_revalidation(self, restored: ToolCatalogSnapshot, current: ToolCatalogSnapshot) -> None:
+        before, after = schema_hashes(restored.tools), schema_hashes(current.tools)
+        logger.info("Restored tool catalog revalidated",
+                    unchanged=restored.fingerprint == current.fingerprint,
+                    added=sorted(set(after) - set(before)),
+                    removed=sorted(set(before) - set(after)),
+                    schema_changed=sorted(name for name in set(before) & set(after) if before[name] != after[name]))
+        self.restored_from = None
+
+    async def _persist(self, snapshot: ToolCatalogSnapshot) -> None:
+        if self.store is None or snapshot.fingerprint == self._persisted_fingerprint:
+            return
+        try:
+            await self.store.aset("tool_catalog", "latest", {
+                "version": snapshot.version,
+                "fingerprint": snapshot.fingerprint,
+                "tools": list(snapshot.tools),
+                "schema_hashes": schema_hashes(snapshot.tools),
+                "built_in_count": snapshot.built_in_count,
+                "external_count": snapshot.external_count,
+                "created_at": snapshot.created_at
+            })
+            self._persisted_fingerprint = snapshot.fingerprint
+        except Exception as e:
+            # The in-memory snapshot still serves; only the next warm start is affected
+            logger.warning("Failed to persist tool catalog snapshot", error=str(e))
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                pass  # No snapshot yet; recorded in last_error, retried below
+            snapshot = self._snapshot
+            if snapshot is None or self.last_error:
+                # Retry sooner while discovery is failing
+                delay = min(30.0, self.refresh_after)
+            else:
+                delay = max(1.0, self.refresh_after - snapshot.age())
+            await asyncio.sleep(delay)
+
+    def start(self) -> None:
+        """Build the first snapshot and keep refreshing it ahead of expiry."""
+        if self._background_task is None or self._background_task.done():
+            self._background_task = asyncio.get_running_loop().create_task(
+                self._refresh_loop(), context=contextvars.Context()
+            )
+
+    async def stop(self) -> None:
+        """Stop background refreshing."""
+        for task in (self._background_task, self._refresh_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._background_task = None
+        self._refresh_task = None
+
+    def get_status(self) -> Dict[str, Any]:
+        """Snapshot metadata for health reporting."""
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else None,
+            "age_seconds": round(snapshot.age(), 3) if snapshot else None,
+            "total_tools": snapshot.total_count if snapshot else 0,
+            "ttl_seconds": self.ttl,
+            "background_refresh": self._background_task is not None and not self._background_task.done(),
+            "restored_from": self.restored_from,
+            "last_error": self.last_error
+        }
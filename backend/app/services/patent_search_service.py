@@ -14,6 +14,9 @@ from typing import Dict, List, Any, Tuple, Optional
 import httpx
 import structlog
 from app.core.config import settings
+from app.core import request_context, tracing
+from app.core.cassette import cassette
+from app.utils import fast_json
 from app.utils.prompt_loader import load_prompt_template
 
 logger = structlog.get_logger(__name__)
@@ -23,15 +26,12 @@ class PatentSearchService:
     """Simplified patent search service with core functionality."""
     
     def __init__(self):
-        from app.services.llm_client import LLMClient
-        self.llm_client = LLMClient(
-            azure_openai_api_key=settings.azure_openai_api_key,
-            azure_openai_endpoint=settings.azure_openai_endpoint,
-            azure_openai_deployment=settings.azure_openai_deployment
-        )
+        from app.services.llm_client import get_llm_client
+        self.llm_client = get_llm_client()
         self.api_key = settings.patentsview_api_key
-        self.base_url = "https://search.patentsview.org/api/v1"
+        self.base_url = settings.patentsview_base_url.rstrip("/")
     
+    @tracing.traced("patent_search.search")
     async def search_patents(
         self, 
         query: str, 
@@ -59,11 +59,13 @@ class PatentSearchService:
             
             # Step 1: Generate search queries
             logger.info("Step 1: Generating search queries...")
+            request_context.report_progress("generating_queries", 0.0)
             search_queries = await self._generate_queries(query)
             logger.info(f"Step 1 completed: Generated {len(search_queries)} queries")
             
             # Step 2: Search for patents
             logger.info("Step 2: Searching for patents...")
+            request_context.report_progress("searching_patents", 0.15)
             all_patents, query_results = await self._search_all_queries(search_queries)
             logger.info(f"Step 2 completed: Found {len(all_patents)} total patents")
             
@@ -74,16 +76,19 @@ class PatentSearchService:
             
             # Step 4: Get claims for each patent
             logger.info("Step 4: Fetching patent claims...")
+            request_context.report_progress("fetching_claims", 0.35)
             patents_with_claims = await self._add_claims(unique_patents)
             logger.info(f"Step 4 completed: Added claims to {len(patents_with_claims)} patents")
             
             # Step 5: Summarize claims using LLM
             logger.info("Step 5: Summarizing patent claims...")
+            request_context.report_progress("summarizing_claims", 0.55)
             found_claims_summary = await self._summarize_claims(patents_with_claims)
             logger.info(f"Step 5 completed: Generated claims summary of {len(found_claims_summary)} characters")
             
             # Step 6: Generate report
             logger.info("Step 6: Generating report...")
+            request_context.report_progress("generating_report", 0.8)
             report = await self._generate_report(query, query_results, patents_with_claims, found_claims_summary)
             logger.info(f"Step 6 completed: Generated report of {len(report)} characters")
             
@@ -110,6 +115,7 @@ class PatentSearchService:
             logger.error(f"Patent search failed with unexpected error: {e}")
             raise ValueError(f"Patent search failed: {str(e)}")
     
+    @tracing.traced("patent_search.generate_queries")
     async def _generate_queries(self, query: str) -> List[Dict[str, Any]]:
         """Generate search queries using LLM with prompt template."""
         try:
@@ -121,11 +127,12 @@ class PatentSearchService:
                                         conversation_history="")
             logger.info(f"Prompt loaded successfully, length: {len(prompt)}")
             
-            response = self.llm_client.generate_text(
+            response = await self.llm_client.generate_text(
                 prompt=prompt,
                 system_message="You are a patent search expert. Think like a domain expert and analyze query specificity iteratively.",
                 max_tokens=2500,
-                temperature=0.3
+                temperature=0.3,
+                call_site="query_generation"
             )
             
             logger.info(f"LLM response: {response}")
@@ -144,7 +151,7 @@ class PatentSearchService:
             
             logger.info(f"Cleaned text for JSON parsing: {text[:500]}...")
             
-            data = json.loads(text)
+            data = fast_json.loads(text)
             queries = data.get("search_queries", [])
             
             if len(queries) < 3:
@@ -163,11 +170,13 @@ class PatentSearchService:
             raise ValueError(f"Failed to generate search queries: {e}")
     
     
+    @tracing.traced("patent_search.search_all_queries")
     async def _search_all_queries(self, search_queries: List[Dict]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
         """Execute all search queries and collect results."""
         
         all_patents = []
         query_results = []
+        errors = []
         
         for i, search_query in enumerate(search_queries):
             try:
@@ -186,14 +195,20 @@ class PatentSearchService:
                 
             except Exception as e:
                 logger.warning(f"Query {i+1} failed: {e}")
+                errors.append(e)
                 query_results.append({
                     "query_text": f"Query {i+1} (failed)",
                     "result_count": 0
                 })
                 continue
         
+        if search_queries and len(errors) == len(search_queries):
+            # Nothing reached PatentsView; an empty report would hide the outage
+            raise ValueError(f"All patent searches failed: {errors[-1]}")
+        
         return all_patents, query_results
     
+    @tracing.traced("patent_search.patentsview_query")
     async def _search_patents_api(self, search_query: Dict) -> List[Dict[str, Any]]:
         """Call PatentsView API to search patents."""
         
@@ -216,8 +231,9 @@ class PatentSearchService:
         logger.info(f"API call - Headers: {headers}")
         
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(url, json=payload, headers=headers)
+            async with httpx.AsyncClient(timeout=request_context.timeout(60.0)) as client:
+                response = await cassette.httpx_request(client, "POST", url, "patentsview.patent",
+                                                        json=payload, headers=headers)
                 logger.info(f"API response status: {response.status_code}")
                 logger.info(f"API response text: {response.text[:500]}")
                 
@@ -237,7 +253,7 @@ class PatentSearchService:
                 elif not response.is_success:
                     raise ValueError(f"API Error {response.status_code}: {response.text}")
                 
-                data = response.json()
+                data = fast_json.loads(response.content)
                 
                 # Handle API-specific errors
                 if data.get("error"):
@@ -273,6 +289,7 @@ class PatentSearchService:
         
         return unique
     
+    @tracing.traced("patent_search.add_claims")
     async def _add_claims(self, patents: List[Dict]) -> List[Dict]:
         """Add claims data to each patent."""
         
@@ -292,6 +309,7 @@ class PatentSearchService:
         
         return patents_with_claims
     
+    @tracing.traced("patent_search.summarize_claims")
     async def _summarize_claims(self, patents: List[Dict]) -> str:
         """Summarize claims for top patents using LLM with performance optimization."""
         # Performance optimization: Only analyze top 5 most relevant patents
@@ -355,10 +373,11 @@ Format as concise markdown.
             
             try:
                 # Reduced token usage for faster processing
-                response = self.llm_client.generate_text(
+                response = await self.llm_client.generate_text(
                     prompt=claims_prompt,
                     max_tokens=300,  # Further reduced from 600 to 300 for faster processing
-                    temperature=0.3
+                    temperature=0.3,
+                    call_site="claim_summary"
                 )
                 
                 if response.get("success"):
@@ -402,6 +421,7 @@ Format as concise markdown.
         logger.info(f"Generated claims summary for {len(top_patents)} patents (optimized for performance)")
         return found_claims_summary
     
+    @tracing.traced("patent_search.fetch_claims")
     async def _fetch_claims(self, patent_id: str) -> List[Dict]:
         """Fetch claims for a specific patent."""
         
@@ -419,8 +439,9 @@ Format as concise markdown.
             headers["X-Api-Key"] = self.api_key
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(url, json=payload, headers=headers)
+            async with httpx.AsyncClient(timeout=request_context.timeout(30.0)) as client:
+                response = await cassette.httpx_request(client, "POST", url, "patentsview.g_claim",
+                                                        json=payload, headers=headers)
                 
                 # Handle specific HTTP status codes
                 if response.status_code == 400:
@@ -440,7 +461,7 @@ Format as concise markdown.
                 elif not response.is_success:
                     raise ValueError(f"Claims API Error {response.status_code}: {response.text}")
                 
-                data = response.json()
+                data = fast_json.loads(response.content)
                 
                 # Handle API-specific errors
                 if data.get("error"):
@@ -487,6 +508,7 @@ Format as concise markdown.
         except Exception as e:
             raise ValueError(f"Unexpected Error fetching claims for patent '{patent_id}': {str(e)}")
     
+    @tracing.traced("patent_search.generate_report")
     async def _generate_report(self, query: str, query_results: List[Dict], 
                              patents: List[Dict], found_claims_summary: str = "") -> str:
         """Generate markdown report using LLM with prompt template."""
@@ -541,14 +563,15 @@ Format as concise markdown.
             # Load the user prompt template with parameters
             user_prompt = load_prompt_template("prior_art_search_comprehensive",
                                               user_query=query,
-                                              conversation_context=f"Search Queries Used (with result counts):\n{query_summary}\n\nPatents Found:\n{json.dumps(patent_summaries, indent=2)}{claims_context}",
+                                              conversation_context=f"Search Queries Used (with result counts):\n{query_summary}\n\nPatents Found:\n{fast_json.dumps(patent_summaries)}{claims_context}",
                                               document_reference="Patent Search Results")
             
-            response = self.llm_client.generate_text(
+            response = await self.llm_client.generate_text(
                 prompt=user_prompt,
                 system_message=system_prompt,
                 max_tokens=4000,  # Increased back to 4000 with 300s timeout
-                temperature=0.3
+                temperature=0.3,
+                call_site="report"
             )
             
             if response.get("success"):
@@ -2,7 +2,10 @@
 Simplified Session Management Service for Word Add-in MCP Project.
 
 This service handles basic user session creation, validation, and cleanup
-without complex background tasks or optimization features.
+without complex background tasks or optimization features. Sessions are
+kept in the shared state store so every backend worker sees them; their
+fields are changed in place by the store, so concurrent updates from
+different workers are all kept.
 """
 
 import uuid
@@ -10,18 +13,39 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 import structlog
 
+from app.core.shared_state import SharedStore, shared_store
+
 logger = structlog.get_logger()
 
+_DATETIME_FIELDS = ("created_at", "last_activity")
+
 
 class SessionService:
     """Simplified service for managing user sessions."""
     
-    def __init__(self):
-        self.sessions: Dict[str, Dict[str, Any]] = {}
-        self.user_sessions: Dict[str, List[str]] = {}  # user_id -> list of session_ids
+    def __init__(self, store: Optional[SharedStore] = None):
+        self.store = store or shared_store
+    
+    @staticmethod
+    def _parse(session: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if session:
+            for name in _DATETIME_FIELDS:
+                session[name] = datetime.fromisoformat(session[name])
+        return session
+    
+    async def _load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return self._parse(await self.store.aget("sessions", session_id))
     
-    def create_session(self, user_id: Optional[str] = None, 
-                      metadata: Optional[Dict[str, Any]] = None) -> str:
+    async def _touch(self, session_id: str, values: Optional[Dict[str, Any]] = None,
+                     increments: Optional[Dict[str, float]] = None,
+                     merges: Optional[Dict[str, Dict[str, Any]]] = None) -> bool:
+        """Change fields of a stored session in place, recording the activity."""
+        values = dict(values or {}, last_activity=datetime.utcnow().isoformat())
+        return await self.store.aupdate("sessions", session_id, values=values,
+                                        increments=increments, merges=merges)
+    
+    async def create_session(self, user_id: Optional[str] = None, 
+                            metadata: Optional[Dict[str, Any]] = None) -> str:
         """Create a new user session."""
         try:
             session_id = str(uuid.uuid4())
@@ -40,13 +64,14 @@ class SessionService:
             }
             
             # Store session
-            self.sessions[session_id] = session_data
+            stored = dict(session_data)
+            for name in _DATETIME_FIELDS:
+                stored[name] = session_data[name].isoformat()
+            await self.store.aset("sessions", session_id, stored)
             
             # Track user sessions
             if user_id:
-                if user_id not in self.user_sessions:
-                    self.user_sessions[user_id] = []
-                self.user_sessions[user_id].append(session_id)
+                await self.store.amodify("user_sessions", user_id, lambda ids: (ids or []) + [session_id])
             
             logger.info(f"Created session {session_id} for user {user_id}")
             return session_id
@@ -55,13 +80,11 @@ class SessionService:
             logger.error(f"Failed to create session: {str(e)}")
             raise
     
-    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
-        """Get session data by ID."""
+    async def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get session data by ID (reading does not count as activity)."""
         try:
-            session = self.sessions.get(session_id)
+            session = await self._load(session_id)
             if session and session["is_active"]:
-                # Update last activity
-                session["last_activity"] = datetime.utcnow()
                 return session
             return None
             
@@ -69,34 +92,28 @@ class SessionService:
             logger.error(f"Failed to get session {session_id}: {str(e)}")
             return None
     
-    def update_session_activity(self, session_id: str, activity_type: str = "general") -> bool:
+    async def update_session_activity(self, session_id: str, activity_type: str = "general",
+                                      metadata: Optional[Dict[str, Any]] = None) -> bool:
         """Update session activity and metadata."""
         try:
-            session = self.sessions.get(session_id)
-            if not session:
-                return False
-            
-            session["last_activity"] = datetime.utcnow()
-            
+            increments = None
             if activity_type == "conversation":
-                session["conversation_count"] += 1
+                increments = {"conversation_count": 1}
             elif activity_type == "tool":
                 # Track tool usage
                 pass
             
-            return True
+            return await self._touch(session_id, increments=increments,
+                                     merges={"metadata": metadata} if metadata else None)
             
         except Exception as e:
             logger.error(f"Failed to update session activity: {str(e)}")
             return False
     
-    def deactivate_session(self, session_id: str) -> bool:
+    async def deactivate_session(self, session_id: str) -> bool:
         """Deactivate a session."""
         try:
-            session = self.sessions.get(session_id)
-            if session:
-                session["is_active"] = False
-                session["last_activity"] = datetime.utcnow()
+            if await self._touch(session_id, {"is_active": False}):
                 logger.info(f"Deactivated session {session_id}")
                 return True
             return False
@@ -105,17 +122,17 @@ class SessionService:
             logger.error(f"Failed to deactivate session: {str(e)}")
             return False
     
-    def get_user_sessions(self, user_id: str) -> List[Dict[str, Any]]:
+    async def get_user_sessions(self, user_id: str) -> List[Dict[str, Any]]:
         """Get all active sessions for a user."""
         try:
-            if user_id not in self.user_sessions:
+            user_session_ids = await self.store.aget("user_sessions", user_id)
+            if not user_session_ids:
                 return []
             
-            user_session_ids = self.user_sessions[user_id]
             active_sessions = []
             
             for session_id in user_session_ids:
-                session = self.sessions.get(session_id)
+                session = await self._load(session_id)
                 if session and session["is_active"]:
                     active_sessions.append(session)
             
@@ -125,19 +142,19 @@ class SessionService:
             logger.error(f"Failed to get user sessions: {str(e)}")
             return []
     
-    def cleanup_expired_sessions(self, max_age_hours: int = 24) -> int:
+    async def cleanup_expired_sessions(self, max_age_hours: int = 24) -> int:
         """Clean up expired sessions."""
         try:
             cutoff_time = datetime.utcnow() - timedelta(hours=max_age_hours)
             expired_sessions = []
             
-            for session_id, session in self.sessions.items():
-                if session["last_activity"] < cutoff_time:
+            for session_id, session in (await self.store.aitems("sessions")).items():
+                if self._parse(session)["last_activity"] < cutoff_time:
                     expired_sessions.append(session_id)
             
             # Deactivate expired sessions
             for session_id in expired_sessions:
-                self.deactivate_session(session_id)
+                await self.deactivate_session(session_id)
             
             if expired_sessions:
                 logger.info(f"Cleaned up {len(expired_sessions)} expired sessions")
@@ -148,10 +165,10 @@ class SessionService:
             logger.error(f"Failed to cleanup expired sessions: {str(e)}")
             return 0
     
-    def get_session_statistics(self, session_id: str) -> Dict[str, Any]:
+    async def get_session_statistics(self, session_id: str) -> Dict[str, Any]:
         """Get statistics for a specific session."""
         try:
-            session = self.get_session(session_id)
+            session = await self.get_session(session_id)
             if not session:
                 return {}
             
@@ -173,16 +190,17 @@ class SessionService:
             logger.error(f"Failed to get session statistics: {str(e)}")
             return {}
     
-    def get_global_statistics(self) -> Dict[str, Any]:
+    async def get_global_statistics(self) -> Dict[str, Any]:
         """Get global session statistics."""
         try:
-            total_sessions = len(self.sessions)
-            active_sessions = sum(1 for s in self.sessions.values() if s["is_active"])
-            total_users = len(self.user_sessions)
+            sessions = await self.store.aitems("sessions")
+            total_sessions = len(sessions)
+            active_sessions = sum(1 for s in sessions.values() if s["is_active"])
+            total_users = len(await self.store.aitems("user_sessions"))
             
             # Calculate total tool usage
             total_tool_usage = {}
-            for session in self.sessions.values():
+            for session in sessions.values():
                 for tool, count in session["tool_usage"].items():
                     total_tool_usage[tool] = total_tool_usage.get(tool, 0) + count
             
@@ -198,10 +216,10 @@ class SessionService:
             logger.error(f"Failed to get global statistics: {str(e)}")
             return {}
     
-    def validate_session(self, session_id: str) -> bool:
+    async def validate_session(self, session_id: str) -> bool:
         """Validate if a session is active and valid."""
         try:
-            session = self.sessions.get(session_id)
+            session = await self._load(session_id)
             if not session:
                 return False
             
@@ -211,7 +229,7 @@ class SessionService:
             # Check if session is too old (more than 7 days)
             max_age = datetime.utcnow() - timedelta(days=7)
             if session["created_at"] < max_age:
-                self.deactivate_session(session_id)
+                await self.deactivate_session(session_id)
                 return False
             
             return True
@@ -220,49 +238,37 @@ class SessionService:
             logger.error(f"Failed to validate session: {str(e)}")
             return False
     
-    def update_session(self, session_id: str, metadata: Optional[Dict[str, Any]] = None, is_active: Optional[bool] = None) -> Optional[Dict[str, Any]]:
+    async def update_session(self, session_id: str, metadata: Optional[Dict[str, Any]] = None, is_active: Optional[bool] = None) -> Optional[Dict[str, Any]]:
         """Update session metadata and status."""
         try:
-            session = self.sessions.get(session_id)
-            if not session:
+            # Merge metadata and set the status in place, along with the last activity
+            if not await self._touch(session_id, {"is_active": is_active} if is_active is not None else None,
+                                     merges={"metadata": metadata} if metadata else None):
                 return None
             
-            # Update metadata if provided
-            if metadata:
-                session["metadata"].update(metadata)
-            
-            # Update active status if provided
-            if is_active is not None:
-                session["is_active"] = is_active
-            
-            # Update last activity
-            session["last_activity"] = datetime.utcnow()
-            
             logger.info(f"Updated session {session_id}")
-            return session
+            return await self._load(session_id)
             
         except Exception as e:
             logger.error(f"Failed to update session: {str(e)}")
             return None
     
-    def delete_session(self, session_id: str) -> bool:
+    async def delete_session(self, session_id: str) -> bool:
         """Delete a session completely."""
         try:
-            if session_id in self.sessions:
-                session = self.sessions[session_id]
+            session = await self._load(session_id)
+            if session:
                 user_id = session.get("user_id")
                 
-                # Remove from user sessions
-                if user_id and user_id in self.user_sessions:
-                    if session_id in self.user_sessions[user_id]:
-                        self.user_sessions[user_id].remove(session_id)
-                    
-                    # Clean up empty user sessions
-                    if not self.user_sessions[user_id]:
-                        del self.user_sessions[user_id]
+                # Remove from user sessions, cleaning up empty ones
+                if user_id:
+                    await self.store.amodify(
+                        "user_sessions", user_id,
+                        lambda ids: [i for i in ids or [] if i != session_id] or None
+                    )
                 
                 # Remove session
-                del self.sessions[session_id]
+                await self.store.adelete("sessions", session_id)
                 
                 logger.info(f"Deleted session {session_id}")
                 return True
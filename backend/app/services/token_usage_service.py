@@ -0,0 +1,195 @@
+"""
+Token Usage and Cost Accounting Service for Word Add-in MCP Project.
+
+Aggregates LLM token usage reported by ``LLMClient.generate_text`` by call
+site, by tool and by session, and prices it using the per-deployment
+rates configured in ``LLM_PRICING``.
+"""
+
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import structlog
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.request_context import get_session_id, get_tool_name
+
+logger = structlog.get_logger()
+
+NO_TOOL = "none"
+
+# (call_site, model, usage) of each LLM call made inside ``collect()``
+UsageEntry = Tuple[str, Optional[str], Dict[str, int]]
+_collected: ContextVar[Optional[List[UsageEntry]]] = ContextVar("collected_llm_usage", default=None)
+
+
+@dataclass
+class UsageTotals:
+    """Running token and cost totals for one aggregation key."""
+    requests: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, prompt_tokens: int, completion_tokens: int, cost_usd: float) -> None:
+        self.requests += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.cost_usd += cost_usd
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["total_tokens"] = self.total_tokens
+        data["cost_usd"] = round(self.cost_usd, 6)
+        return data
+
+
+def load_pricing(raw: Optional[str]) -> Dict[str, Dict[str, float]]:
+    """
+    Parse the ``LLM_PRICING`` setting.
+
+    Expected format is a JSON object mapping deployment names (or
+    ``"default"``) to ``{"prompt": <usd>, "completion": <usd>}`` per 1M tokens.
+    """
+    if not raw:
+        return {}
+    try:
+        pricing = json.loads(raw)
+    except json.JSONDecodeError as e:
+        logger.warning("Invalid LLM_PRICING, costs will be reported as 0", error=str(e))
+        return {}
+    if not isinstance(pricing, dict):
+        logger.warning("LLM_PRICING must be a JSON object, costs will be reported as 0")
+        return {}
+    return pricing
+
+
+class TokenUsageTracker:
+    """Thread-safe aggregation of LLM token usage and cost."""
+
+    def __init__(self, pricing: Optional[Dict[str, Dict[str, float]]] = None,
+                 max_sessions: int = 1000):
+        self.pricing = pricing if pricing is not None else load_pricing(settings.llm_pricing)
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all aggregates."""
+        with self._lock:
+            self.started_at = time.time()
+            self.total = UsageTotals()
+            self.by_call_site: Dict[str, UsageTotals] = {}
+            self.by_tool: Dict[str, UsageTotals] = {}
+            self.by_model: Dict[str, UsageTotals] = {}
+            # Oldest sessions are evicted first once max_sessions is reached
+            self.by_session: "OrderedDict[str, UsageTotals]" = OrderedDict()
+
+    def price(self, model: Optional[str], prompt_tokens: int, completion_tokens: int) -> float:
+        """Return the USD cost of a call for the given deployment."""
+        rates = self.pricing.get(model or "") or self.pricing.get("default")
+        if not rates:
+            return 0.0
+        return (
+            prompt_tokens * float(rates.get("prompt", 0.0)) +
+            completion_tokens * float(rates.get("completion", 0.0))
+        ) / 1_000_000
+
+    def record(self, call_site: str, model: Optional[str], usage: Optional[Dict[str, int]],
+               session_id: Optional[str] = None, tool_name: Optional[str] = None) -> None:
+        """Record the usage of one LLM call, attributed to the current request context."""
+        if not usage:
+            return
+
+        prompt_tokens = int(usage.get("prompt_tokens") or 0)
+        completion_tokens = int(usage.get("completion_tokens") or 0)
+        cost = self.price(model, prompt_tokens, completion_tokens)
+        session_id = session_id or get_session_id()
+        tool_name = tool_name or get_tool_name() or NO_TOOL
+        collected = _collected.get()
+        if collected is not None:
+            collected.append((call_site, model, usage))
+
+        with self._lock:
+            self.total.add(prompt_tokens, completion_tokens, cost)
+            self.by_call_site.setdefault(call_site, UsageTotals()).add(prompt_tokens, completion_tokens, cost)
+            self.by_tool.setdefault(tool_name, UsageTotals()).add(prompt_tokens, completion_tokens, cost)
+            self.by_model.setdefault(model or "unknown", UsageTotals()).add(prompt_tokens, completion_tokens, cost)
+            if session_id:
+                self._add_to_session(session_id, prompt_tokens, completion_tokens, cost)
+
+        metrics.observe_llm_cost(call_site, cost)
+
+    def _add_to_session(self, session_id: str, prompt_tokens: int, completion_tokens: int,
+                        cost: float) -> None:
+        session_totals = self.by_session.pop(session_id, None) or UsageTotals()
+        session_totals.add(prompt_tokens, completion_tokens, cost)
+        self.by_session[session_id] = session_totals
+        while len(self.by_session) > self.max_sessions:
+            self.by_session.popitem(last=False)
+
+    @contextmanager
+    def collect(self) -> Iterator[List[UsageEntry]]:
+        """Collect the usage recorded within the block, e.g. by a shared tool execution."""
+        collected: List[UsageEntry] = []
+        token = _collected.set(collected)
+        try:
+            yield collected
+        finally:
+            _collected.reset(token)
+
+    def charge_session(self, entries: List[UsageEntry], session_id: Optional[str] = None) -> None:
+        """
+        Charge usage recorded under another session to this one as well.
+
+        Used for callers that joined a coalesced tool call: each session is
+        charged for the calls it received, while the total, call site, tool
+        and model aggregates still count every LLM call once.
+        """
+        session_id = session_id or get_session_id()
+        if not session_id:
+            return
+        with self._lock:
+            for _, model, usage in entries:
+                prompt_tokens = int(usage.get("prompt_tokens") or 0)
+                completion_tokens = int(usage.get("completion_tokens") or 0)
+                self._add_to_session(session_id, prompt_tokens, completion_tokens,
+                                     self.price(model, prompt_tokens, completion_tokens))
+
+    def get_session_usage(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return the totals for a single session."""
+        with self._lock:
+            totals = self.by_session.get(session_id)
+            return totals.to_dict() if totals else None
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Return all aggregates, heaviest call sites first."""
+        with self._lock:
+            def dump(group: Dict[str, UsageTotals]) -> Dict[str, Any]:
+                ordered = sorted(group.items(), key=lambda item: item[1].total_tokens, reverse=True)
+                return {key: totals.to_dict() for key, totals in ordered}
+
+            return {
+                "since": self.started_at,
+                "total": self.total.to_dict(),
+                "by_call_site": dump(self.by_call_site),
+                "by_tool": dump(self.by_tool),
+                "by_model": dump(self.by_model),
+                "session_count": len(self.by_session),
+                "pricing_configured": bool(self.pricing),
+            }
+
+
+# Global instance for easy access
+token_usage_tracker = TokenUsageTracker()
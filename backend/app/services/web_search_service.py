@@ -14,6 +14,9 @@ from urllib.parse import quote_plus, urlparse
 import logging
 import os
 
+from app.core import request_context
+from app.core.cassette import REPLAY, cassette
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,6 +35,7 @@ class WebSearchService:
         from app.core.config import settings
         self.google_api_key = settings.google_search_api_key
         self.google_engine_id = settings.google_search_engine_id
+        self.google_api_url = settings.google_search_api_url
         
     async def __aenter__(self):
         """Async context manager entry."""
@@ -41,6 +45,11 @@ class WebSearchService:
         )
         return self
         
+    @staticmethod
+    def _timeout(default: float = 30.0) -> aiohttp.ClientTimeout:
+        """Request timeout shrunk to the time left before the request deadline."""
+        return aiohttp.ClientTimeout(total=request_context.timeout(default))
+    
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
         if self.session:
@@ -50,12 +59,11 @@ class WebSearchService:
                            include_abstracts: bool = False) -> List[Dict[str, Any]]:
         """Perform real Google search using Google Custom Search API."""
         try:
-            if not self.google_api_key or not self.google_engine_id:
-                logger.warning("Google Search API not configured")
-                return []
+            if (not self.google_api_key or not self.google_engine_id) and cassette.mode != REPLAY:
+                raise ValueError("Google Search API not configured")
             
             # Google Custom Search API endpoint
-            api_url = "https://www.googleapis.com/customsearch/v1"
+            api_url = self.google_api_url
             params = {
                 "key": self.google_api_key,
                 "cx": self.google_engine_id,
@@ -64,21 +72,22 @@ class WebSearchService:
             }
             
             if not self.session:
-                return []
+                raise RuntimeError("WebSearchService must be used as an async context manager")
             
-            async with self.session.get(api_url, params=params) as response:
+            async with cassette.aiohttp_request(self.session, "GET", api_url, "google.customsearch",
+                                                params=params, timeout=self._timeout()) as response:
                 if response.status == 200:
                     data = await response.json()
                     results = self._parse_google_results(data, include_abstracts)
                     logger.info(f"Google search completed for query: {query}, found {len(results)} results")
                     return results
                 else:
-                    logger.warning(f"Google API returned status {response.status}")
-                    return []
+                    raise ConnectionError(f"Google API returned status {response.status}")
                     
         except Exception as e:
+            # Failures propagate so they are not reported (and cached) as "no results"
             logger.error(f"Google search failed for query '{query}': {str(e)}")
-            return []
+            raise
     
     async def search_arxiv(self, query: str, max_results: int = 10) -> List[Dict[str, Any]]:
         """Search arXiv for academic papers."""
@@ -96,7 +105,8 @@ class WebSearchService:
             if not self.session:
                 return []
                 
-            async with self.session.get(arxiv_url, params=params) as response:
+            async with cassette.aiohttp_request(self.session, "GET", arxiv_url, "arxiv.query",
+                                                params=params, timeout=self._timeout()) as response:
                 if response.status == 200:
                     content = await response.text()
                     return self._parse_arxiv_results(content, max_results)
@@ -148,7 +158,7 @@ class WebSearchService:
                 "Connection": "keep-alive",
             }
             
-            async with self.session.get(url, headers=headers, timeout=30) as response:
+            async with self.session.get(url, headers=headers, timeout=self._timeout()) as response:
                 if response.status == 200:
                     content = await response.text()
                     
@@ -0,0 +1,222 @@
+"""
+Supervisor for the multi-worker production topology.
+
+Runs two pre-fork worker pools under gunicorn instead of the single event
+loop of app_starter:
+
+- the backend (app.main) on port 9000 with BACKEND_WORKERS workers, and
+- the internal MCP server (app.internal_mcp_app) on INTERNAL_MCP_PORT with
+  INTERNAL_MCP_WORKERS workers, which the backend calls over HTTP.
+
+Backend workers share sessions, rate limit windows, job records and the
+external server list through SHARED_STATE_PATH, and split the LLM quotas
+between them. Every worker of both pools writes its Prometheus metrics to
+PROMETHEUS_MULTIPROC_DIR, which the backend's /metrics endpoint merges.
+Started with ``python -m app.supervisor`` or
+``SERVER_TOPOLOGY=multiworker python -m app.app_starter``.
+
+Other state stays per process in this topology:
+
+- Tools run in the internal MCP pool, so their progress does not cross
+  the HTTP hop: background jobs report only their start and end.
+- /api/v1/mcp/usage shows the usage recorded by the backend worker that
+  answers; the LLM calls made by tools are only in the merged ``llm_*``
+  metrics.
+- Admission limits apply per backend worker, so up to BACKEND_WORKERS
+  times ADMISSION_GLOBAL_LIMIT tool calls run at once.
+
+Signals: SIGHUP restarts the workers of both pools gracefully (new workers
+start before the old ones drain), SIGTERM/SIGINT stop them after at most
+WORKER_GRACEFUL_TIMEOUT seconds. A pool whose master exits is restarted
+with exponential backoff.
+"""
+
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .core.config import settings
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GUNICORN_CONFIG = os.path.join(BACKEND_DIR, "gunicorn.conf.py")
+DEFAULT_SHARED_STATE_PATH = os.path.join(BACKEND_DIR, "cache", "shared_state.db")
+DEFAULT_METRICS_DIR = os.path.join(BACKEND_DIR, "cache", "prometheus")
+
+
+@dataclass
+class WorkerPool:
+    """A gunicorn master and its workers serving one app."""
+    name: str
+    app: str
+    port: int
+    workers: int
+    env: Dict[str, str] = field(default_factory=dict)
+    process: Optional[subprocess.Popen] = None
+    started_at: float = 0.0
+    restarts: int = 0
+
+    def command(self) -> List[str]:
+        return [
+            sys.executable, "-m", "gunicorn", self.app,
+            "--config", GUNICORN_CONFIG,
+            "--bind", f"0.0.0.0:{self.port}",
+            "--workers", str(self.workers),
+            "--name", self.name
+        ]
+
+
+def metrics_dir() -> str:
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR") or DEFAULT_METRICS_DIR
+
+
+def reset_metrics_dir(path: str) -> None:
+    """Create the metrics directory, dropping the values of workers from earlier runs."""
+    os.makedirs(path, exist_ok=True)
+    for name in os.listdir(path):
+        if name.endswith(".db"):
+            os.remove(os.path.join(path, name))
+
+
+def build_pools() -> List[WorkerPool]:
+    """The internal MCP pool, then the backend pool that depends on it."""
+    internal_mcp_workers = max(1, settings.internal_mcp_workers)
+    backend_workers = max(1, settings.backend_workers)
+    # Both pools call the LLM; every process enforces its share of the quotas
+    quota_workers = str(max(settings.llm_quota_workers, internal_mcp_workers + backend_workers))
+    return [
+        WorkerPool(
+            name="internal-mcp",
+            app="app.internal_mcp_app:app",
+            port=settings.internal_mcp_port,
+            workers=internal_mcp_workers,
+            env={
+                "LLM_QUOTA_WORKERS": quota_workers,
+                "PROMETHEUS_MULTIPROC_DIR": metrics_dir()
+            }
+        ),
+        WorkerPool(
+            name="backend",
+            app="app.main:app",
+            port=9000,
+            workers=backend_workers,
+            env={
+                "INTERNAL_MCP_TRANSPORT": "http",
+                # Workers wait for the internal MCP pool's health check on startup
+                "APP_STARTER_MODE": "false",
+                "INTERNAL_MCP_POOL_URL": settings.internal_mcp_pool_url
+                                         or f"http://127.0.0.1:{settings.internal_mcp_port}",
+                "SHARED_STATE_PATH": settings.shared_state_path or DEFAULT_SHARED_STATE_PATH,
+                "LLM_QUOTA_WORKERS": quota_workers,
+                "PROMETHEUS_MULTIPROC_DIR": metrics_dir()
+            }
+        )
+    ]
+
+
+class Supervisor:
+    """Starts the worker pools, relays signals to them and restarts them when they exit."""
+
+    def __init__(self, pools: List[WorkerPool], graceful_timeout: float = 30.0,
+                 max_backoff: float = 30.0, stable_after: float = 60.0):
+        """
+        Args:
+            pools: Pools to run, started in order
+            graceful_timeout: Seconds pools get to drain before they are killed
+            max_backoff: Longest wait before restarting a pool that keeps exiting
+            stable_after: Seconds a pool must run before its restart backoff is reset
+        """
+        self.pools = pools
+        self.graceful_timeout = graceful_timeout
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after
+        self._stopping = False
+        self._reload = False
+
+    def spawn(self, pool: WorkerPool) -> None:
+        pool.process = subprocess.Popen(pool.command(), cwd=BACKEND_DIR, env=dict(os.environ, **pool.env))
+        pool.started_at = time.monotonic()
+        logger.info(f"Started {pool.name} pool: {pool.workers} workers on port {pool.port} "
+                    f"(pid {pool.process.pid})")
+
+    def backoff(self, pool: WorkerPool) -> float:
+        """Seconds to wait before restarting a pool whose master just exited."""
+        if time.monotonic() - pool.started_at >= self.stable_after:
+            pool.restarts = 0
+        delay = min(self.max_backoff, 2 ** pool.restarts) if pool.restarts else 0.0
+        pool.restarts += 1
+        return delay
+
+    def signal_pools(self, signum: int) -> None:
+        for pool in self.pools:
+            if pool.process is not None and pool.process.poll() is None:
+                pool.process.send_signal(signum)
+
+    def stop(self) -> None:
+        """Stop every pool gracefully, killing what is left after the graceful timeout."""
+        self._stopping = True
+        self.signal_pools(signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        for pool in self.pools:
+            if pool.process is None:
+                continue
+            try:
+                pool.process.wait(timeout=max(0.1, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                logger.warning(f"{pool.name} pool did not stop in time, killing it")
+                pool.process.kill()
+                pool.process.wait()
+
+    def _handle_signal(self, signum, frame) -> None:
+        if signum == signal.SIGHUP:
+            self._reload = True
+        else:
+            self._stopping = True
+
+    def run(self) -> int:
+        signal.signal(signal.SIGHUP, self._handle_signal)
+        signal.signal(signal.SIGTERM, self._handle_signal)
+        signal.signal(signal.SIGINT, self._handle_signal)
+
+        for pool in self.pools:
+            self.spawn(pool)
+        restart_at: Dict[str, float] = {}
+        while not self._stopping:
+            if self._reload:
+                self._reload = False
+                logger.info("Reloading worker pools")
+                # gunicorn starts new workers and drains the old ones on SIGHUP
+                self.signal_pools(signal.SIGHUP)
+            now = time.monotonic()
+            for pool in self.pools:
+                if pool.name in restart_at:
+                    if now >= restart_at[pool.name]:
+                        del restart_at[pool.name]
+                        self.spawn(pool)
+                elif pool.process is not None and pool.process.poll() is not None:
+                    delay = self.backoff(pool)
+                    logger.error(f"{pool.name} pool exited with code {pool.process.returncode}, "
+                                 f"restarting in {delay:.0f}s")
+                    restart_at[pool.name] = now + delay
+            time.sleep(0.5)
+
+        logger.info("Stopping worker pools")
+        self.stop()
+        return 0
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    reset_metrics_dir(metrics_dir())
+    supervisor = Supervisor(build_pools(), graceful_timeout=settings.worker_graceful_timeout)
+    sys.exit(supervisor.run())
+
+
+if __name__ == "__main__":
+    main()
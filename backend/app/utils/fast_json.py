@@ -0,0 +1,61 @@
+"""
+Fast JSON encoding and decoding shared by the API layer and services.
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise. Output is compact (no indentation) and UTF-8, which is what
+machines and LLM prompts want: indentation only costs CPU and tokens.
+"""
+
+import json
+from typing import Any, Callable, Optional, Union
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+    HAS_ORJSON = False
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can keep
+# catching the stdlib exception type.
+JSONDecodeError = json.JSONDecodeError
+
+
+def dumpb(obj: Any, default: Optional[Callable[[Any], Any]] = None,
+          sort_keys: bool = False) -> bytes:
+    """Serialize ``obj`` to compact UTF-8 JSON bytes."""
+    if HAS_ORJSON:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=default, option=option)
+        except TypeError:
+            # e.g. integers beyond 64 bits; the stdlib handles these
+            pass
+    return json.dumps(
+        obj, default=default, sort_keys=sort_keys,
+        ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def dumps(obj: Any, default: Optional[Callable[[Any], Any]] = None,
+          sort_keys: bool = False) -> str:
+    """Serialize ``obj`` to a compact JSON string."""
+    return dumpb(obj, default=default, sort_keys=sort_keys).decode("utf-8")
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    """Parse JSON from a string or bytes."""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when available."""
+
+    def render(self, content: Any) -> bytes:
+        return dumpb(content)
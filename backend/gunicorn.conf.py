@@ -0,0 +1,35 @@
+"""
+Gunicorn settings shared by the backend and internal MCP worker pools.
+
+app.supervisor passes the app, bind address, worker count and process name
+on the command line; everything else is read from the environment.
+"""
+
+import os
+
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Workers import the app themselves, so no event loop, socket or SQLite
+# connection is created before fork()
+preload_app = False
+
+# Seconds a worker whose event loop stops checking in is left before it is replaced
+timeout = 60
+# Seconds in-flight requests get to finish on restart or shutdown
+graceful_timeout = int(float(os.getenv("WORKER_GRACEFUL_TIMEOUT", "30")))
+keepalive = 5
+
+# Recycle workers after this many requests; the jitter keeps them from restarting together
+max_requests = int(os.getenv("WORKER_MAX_REQUESTS", "0"))
+max_requests_jitter = max(1, max_requests // 10) if max_requests else 0
+
+accesslog = None
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
+
+
+def child_exit(server, worker):
+    """Drop an exited worker's live gauges from the merged /metrics output."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -8,13 +8,17 @@ including the new patent search integration tests.
 import pytest
 import asyncio
 from fastapi.testclient import TestClient
-from unittest.mock import patch, Mock
+from unittest.mock import patch, Mock, AsyncMock
 import os
 import sys
 
 # Add the backend directory to the Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend'))
 
+# Tests must not read or write the registry snapshot or result cache of a local deployment
+os.environ["REGISTRY_SNAPSHOT_PATH"] = ""
+os.environ["TOOL_RESULT_CACHE_DIR"] = ""
+
 # Try to import the app, but handle import errors gracefully
 try:
     from app.main import app
@@ -137,9 +141,9 @@ def patent_search_test_queries():
 @pytest.fixture
 def mock_azure_openai():
     """Mock Azure OpenAI client for testing."""
-    with patch('app.services.llm_client.AzureOpenAI') as mock:
+    with patch('openai.AsyncAzureOpenAI') as mock:
         mock_instance = Mock()
-        mock_instance.chat.completions.create.return_value = Mock(
+        mock_instance.chat.completions.create = AsyncMock(return_value=Mock(
             choices=[
                 Mock(
                     message=Mock(
@@ -152,7 +156,7 @@ def mock_azure_openai():
                 completion_tokens=50,
                 total_tokens=150
             )
-        )
+        ))
         mock.return_value = mock_instance
         yield mock_instance
 
@@ -0,0 +1,97 @@
+"""
+Tests for admission control of tool executions.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.core.admission import QUEUE_FULL, QUEUE_TIMEOUT, AdmissionController
+from app.core.exceptions import AdmissionRejectedError
+from app.services.mcp.orchestrator import MCPOrchestrator
+
+
+def test_limits_queue_in_order_and_reject_when_full():
+    controller = AdmissionController(global_limit=2, default_tool_limit=1, max_queue=2, queue_timeout=5)
+    started = []
+
+    async def call(tool, gate):
+        async with controller.admit(tool):
+            started.append(tool)
+            await gate.wait()
+
+    async def main():
+        gate = asyncio.Event()
+        first = asyncio.ensure_future(call("search", gate))
+        other = asyncio.ensure_future(call("analysis", gate))
+        await asyncio.sleep(0.01)
+        # Same tool is at its limit, and the global limit is reached too
+        queued = [asyncio.ensure_future(call(tool, gate)) for tool in ("search", "drafting")]
+        await asyncio.sleep(0.01)
+        assert controller.get_status()["queued"] == 2
+
+        with pytest.raises(AdmissionRejectedError) as excinfo:
+            await call("drafting", gate)
+        assert excinfo.value.reason == QUEUE_FULL and excinfo.value.status_code == 429
+        assert excinfo.value.retry_after >= 1
+
+        gate.set()
+        await asyncio.gather(first, other, *queued)
+        return controller.get_status()
+
+    status = asyncio.run(main())
+
+    assert started == ["search", "analysis", "search", "drafting"]
+    assert status["active"] == 0 and status["queued"] == 0
+    assert status["rejected"] == {QUEUE_FULL: 1, QUEUE_TIMEOUT: 0}
+
+
+def test_waiting_past_the_queue_timeout_is_rejected_with_503():
+    controller = AdmissionController(global_limit=1, max_queue=4, queue_timeout=0.05)
+
+    async def main():
+        gate = asyncio.Event()
+
+        async def hold():
+            async with controller.admit("search"):
+                await gate.wait()
+
+        holder = asyncio.ensure_future(hold())
+        await asyncio.sleep(0.01)
+        with pytest.raises(AdmissionRejectedError) as excinfo:
+            async with controller.admit("analysis"):
+                pass
+        gate.set()
+        await holder
+        # The slot is free again
+        async with controller.admit("analysis"):
+            pass
+        return excinfo.value
+
+    error = asyncio.run(main())
+
+    assert error.reason == QUEUE_TIMEOUT and error.status_code == 503
+    assert controller.get_status()["queued"] == 0
+
+
+def test_batch_larger_than_the_tool_limit_runs_in_waves(monkeypatch):
+    orchestrator = MCPOrchestrator()
+    orchestrator.admission = AdmissionController(global_limit=8, tool_limits={"search": 2}, queue_timeout=0.2)
+    waves = []
+
+    async def execute_tools_batch(calls):
+        waves.append(len(calls))
+        await asyncio.sleep(0.01)
+        return [{"content": [{"type": "text", "text": "results"}], "isError": False} for _ in calls]
+
+    monkeypatch.setattr(orchestrator.server_registry, "execute_tools_batch", execute_tools_batch)
+    monkeypatch.setattr(orchestrator.execution_engine, "validate_parameters", AsyncMock(return_value=(True, [])))
+
+    results = asyncio.run(orchestrator.execute_tools_batch(
+        [{"tool_name": "search", "parameters": {"query": str(n)}} for n in range(5)]
+    ))
+
+    assert waves == [2, 2, 1]
+    assert [result["status"] for result in results] == ["success"] * 5
+    assert orchestrator.admission.get_status()["rejected"] == {QUEUE_FULL: 0, QUEUE_TIMEOUT: 0}
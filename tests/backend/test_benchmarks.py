@@ -0,0 +1,27 @@
+"""
+Tests for the micro-benchmark runner and the hot-path benchmarks.
+"""
+
+import json
+
+from tests.benchmarks import runner
+
+
+def test_every_benchmark_runs_and_has_a_baseline():
+    results = runner.run_all(rounds=1, min_time=0.0)
+
+    assert results and all(result["median_us"] > 0 for result in results.values())
+    with open(runner.BASELINE_PATH) as f:
+        baseline = json.load(f)
+    assert set(results) <= set(baseline["results"])
+
+
+def test_changes_beyond_the_threshold_are_flagged():
+    baseline = {"results": {"slow": {"median_us": 100.0}, "fast": {"median_us": 100.0},
+                            "same": {"median_us": 100.0}}}
+    results = {"slow": {"median_us": 130.0}, "fast": {"median_us": 60.0}, "same": {"median_us": 105.0},
+               "added": {"median_us": 1.0}}
+
+    verdicts = {row["name"]: row["verdict"] for row in runner.compare(results, baseline, threshold=0.15)}
+
+    assert verdicts == {"slow": "regression", "fast": "improvement", "same": "unchanged", "added": "new"}
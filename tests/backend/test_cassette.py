@@ -0,0 +1,67 @@
+"""
+Tests for record/replay cassettes of LLM and upstream HTTP traffic.
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.core.cassette import Cassette
+from app.core.exceptions import CassetteMissError
+from tests.stubs.upstream_stub import UpstreamStub, create_app
+
+
+def test_recorded_interactions_replay_with_scaled_latency(tmp_path):
+    path = str(tmp_path / "session.jsonl")
+    calls = []
+
+    async def perform():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return {"success": True, "text": "drafted claims"}
+
+    recorder = Cassette("record", path)
+    request = {"call_site": "report", "prompt": "draft", "api_key": "secret"}
+    assert asyncio.run(recorder.interaction("llm", "report", request, perform))["text"] == "drafted claims"
+    assert "secret" not in open(path).read()
+
+    player = Cassette("replay", path, latency_scale=0.25)
+
+    async def replay():
+        # Same call site, different prompt: served the unused recording of the call site
+        relabelled = await player.interaction("llm", "report", {"prompt": "other"}, perform)
+        # Exact match, replayed again although its recording was used
+        start_time = time.perf_counter()
+        exact = await player.interaction("llm", "report", request, perform)
+        return exact, time.perf_counter() - start_time, relabelled
+
+    exact, elapsed, relabelled = asyncio.run(replay())
+
+    assert exact == relabelled == {"success": True, "text": "drafted claims"}
+    assert 0.04 <= elapsed < 0.2
+    assert len(calls) == 1
+
+    with pytest.raises(CassetteMissError):
+        asyncio.run(player.interaction("llm", "intent_detection", {"prompt": "hi"}, perform))
+
+
+def test_http_responses_replay_without_the_upstream(tmp_path):
+    path = str(tmp_path / "session.jsonl")
+    url = "http://stub/api/v1/patent/"
+    payload = {"q": {"patent_title": "battery"}, "o": {"size": 3}}
+
+    async def call(mode, transport):
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await Cassette(mode, path, latency_scale=0).httpx_request(
+                client, "POST", url, "patentsview.patent", json=payload
+            )
+
+    recorded = asyncio.run(call("record", httpx.ASGITransport(app=create_app(UpstreamStub()))))
+    offline = httpx.MockTransport(lambda request: httpx.Response(503))
+    replayed = asyncio.run(call("replay", offline))
+
+    assert recorded.status_code == replayed.status_code == 200
+    assert replayed.json() == recorded.json()
+    assert len(replayed.json()["patents"]) == 3
@@ -0,0 +1,74 @@
+"""
+Tests for the per-server circuit breaker.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from app.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from app.core.exceptions import CircuitOpenError
+from app.services.mcp.server_registry import MCPServerInfo, MCPServerRegistry
+
+
+def test_opens_on_failure_rate_and_recovers_through_a_single_probe():
+    breaker = CircuitBreaker("srv", minimum_calls=3, failure_rate_threshold=0.5, open_seconds=0.05)
+
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.allow_request() is False
+
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False  # only one probe
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.get_status()["recent_calls"] == 0
+
+
+def test_failed_probe_reopens_and_slow_calls_count_as_failures():
+    breaker = CircuitBreaker("srv", minimum_calls=2, open_seconds=0.01, slow_call_seconds=1.0)
+
+    breaker.record_success(duration=5.0)
+    breaker.record_success(duration=5.0)
+    assert breaker.state == OPEN
+
+    time.sleep(0.02)
+    assert breaker.allow_request() is True
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 2
+
+
+def test_registry_skips_open_circuits_without_connecting(monkeypatch):
+    registry = MCPServerRegistry()
+    server = MCPServerInfo(server_id="ext", name="Dead Server", url="http://dead", type="external", config={})
+    registry.servers[server.server_id] = server
+    attempts = []
+
+    async def list_external_tools(srv):
+        attempts.append(srv.name)
+        raise ConnectionError("connect timeout")
+
+    monkeypatch.setattr(registry, "_list_external_tools", list_external_tools)
+    breaker = registry.get_circuit_breaker(server)
+    breaker.minimum_calls = 2
+
+    async def main():
+        for _ in range(5):
+            assert await registry._discover_external_tools(server) == []
+        with pytest.raises(CircuitOpenError):
+            await registry._execute_external_tool(server, None, {})
+        return await registry._get_server_health(server)
+
+    health = asyncio.run(main())
+
+    assert len(attempts) == 2
+    assert health["error"] == "Circuit open"
+    assert health["circuit"]["state"] == OPEN
@@ -0,0 +1,33 @@
+"""
+Unit tests for the shared fast JSON helpers.
+"""
+
+import json
+
+import pytest
+
+from app.utils import fast_json
+
+
+def test_round_trip_is_compact_utf8():
+    data = {"name": "Überprüfung", "items": [1, 2.5, None, True]}
+    encoded = fast_json.dumps(data)
+
+    assert encoded == '{"name":"Überprüfung","items":[1,2.5,null,true]}'
+    assert fast_json.loads(encoded) == data
+    assert fast_json.loads(encoded.encode("utf-8")) == data
+
+
+def test_stdlib_decode_error_is_raised():
+    with pytest.raises(json.JSONDecodeError):
+        fast_json.loads("{not json")
+
+
+def test_big_integers_fall_back_to_stdlib():
+    assert fast_json.dumps({"n": 2 ** 70}) == '{"n":%d}' % 2 ** 70
+
+
+def test_response_renders_bytes():
+    response = fast_json.FastJSONResponse({"ok": True})
+    assert response.body == b'{"ok":true}'
+    assert response.media_type == "application/json"
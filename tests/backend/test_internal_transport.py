@@ -0,0 +1,275 @@
+"""
+Tests for the in-process internal MCP transport.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+from app.core import metrics
+from app.core.config import settings
+from app.services.mcp.orchestrator import MCPOrchestrator
+from app.services.mcp.server_registry import MCPServerInfo, MCPServerRegistry, UnifiedTool
+from app.services.token_usage_service import TokenUsageTracker
+from app import internal_mcp_app
+
+
+def make_internal_server():
+    return MCPServerInfo(
+        server_id="internal",
+        name="Internal MCP Server",
+        url=settings.internal_mcp_url,
+        type="internal",
+        config={}
+    )
+
+
+def test_transport_selection(monkeypatch):
+    monkeypatch.setattr(settings, "internal_mcp_transport", "inprocess")
+    assert settings.internal_mcp_inprocess is True
+
+    monkeypatch.setattr(settings, "internal_mcp_transport", "http")
+    assert settings.internal_mcp_inprocess is False
+
+    monkeypatch.setattr(settings, "internal_mcp_transport", "auto")
+    monkeypatch.setattr(settings, "expose_mcp_publicly", False)
+    monkeypatch.setattr(settings, "environment", "production")
+    assert settings.internal_mcp_inprocess is True
+    monkeypatch.setattr(settings, "environment", "development")
+    monkeypatch.setattr(settings, "app_starter_mode", False)
+    assert settings.internal_mcp_inprocess is False
+
+
+def test_inprocess_discovery_matches_catalog(monkeypatch):
+    monkeypatch.setattr(settings, "internal_mcp_transport", "inprocess")
+    registry = MCPServerRegistry()
+
+    tools = asyncio.run(registry._discover_internal_tools(make_internal_server()))
+
+    assert sorted(tool.name for tool in tools) == sorted(internal_mcp_app.tools)
+    assert all(tool.source == "internal" for tool in tools)
+
+
+def test_inprocess_execution_skips_http(monkeypatch):
+    monkeypatch.setattr(settings, "internal_mcp_transport", "inprocess")
+
+    class EchoTool:
+        async def execute(self, arguments):
+            return {"echo": arguments["query"]}
+
+    monkeypatch.setitem(internal_mcp_app.tools, "echo_tool", EchoTool())
+    registry = MCPServerRegistry()
+    server = make_internal_server()
+    registry.servers[server.server_id] = server
+    tools = asyncio.run(registry._discover_internal_tools(server))
+    tool_info = tools[0]
+    tool_info.name = "echo_tool"
+
+    result = asyncio.run(registry._execute_internal_tool(tool_info, {"query": "hi"}))
+
+    assert result["isError"] is False
+    assert result["structuredContent"] == {"echo": "hi"}
+
+
+def test_tools_list_is_derived_from_tool_schemas():
+    catalog = {tool["name"]: tool for tool in internal_mcp_app.list_tools()}
+
+    for name, tool in internal_mcp_app.tools.items():
+        assert catalog[name]["inputSchema"] == tool.get_input_schema()
+        assert catalog[name]["description"] == tool.description
+
+
+def test_tools_list_etag_revalidation():
+    from fastapi.testclient import TestClient
+
+    client = TestClient(internal_mcp_app.app)
+    payload = {"jsonrpc": "2.0", "id": 7, "method": "tools/list"}
+
+    response = client.post("/", json=payload)
+    assert response.status_code == 200
+    assert response.json()["id"] == 7
+    assert len(response.json()["result"]["tools"]) == len(internal_mcp_app.tools)
+
+    etag = response.headers["etag"]
+    cached = client.post("/", json=payload, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+
+def test_structured_content_is_carried_end_to_end(monkeypatch):
+    from app.services.mcp.execution_engine import ToolExecutionEngine
+
+    class PatentTool:
+        async def execute_structured(self, arguments):
+            return "# Report", {"patents": [{"patent_id": "US1"}]}
+
+    monkeypatch.setitem(internal_mcp_app.tools, "patent_tool", PatentTool())
+
+    mcp_result = asyncio.run(internal_mcp_app.call_tool("patent_tool", {}))
+    assert mcp_result["content"] == [{"type": "text", "text": "# Report"}]
+    assert mcp_result["structuredContent"] == {"patents": [{"patent_id": "US1"}]}
+
+    formatted = asyncio.run(ToolExecutionEngine().format_result(mcp_result, "patent_tool"))
+    assert formatted["status"] == "success"
+    assert formatted["result"] == "# Report"
+    assert formatted["structured_content"] == {"patents": [{"patent_id": "US1"}]}
+    assert "mcp_response" not in formatted
+
+
+def test_dict_results_are_json_not_repr(monkeypatch):
+    class DictTool:
+        async def execute(self, arguments):
+            return {"status": "ok", "count": 2}
+
+    monkeypatch.setitem(internal_mcp_app.tools, "dict_tool", DictTool())
+
+    mcp_result = asyncio.run(internal_mcp_app.call_tool("dict_tool", {}))
+    assert mcp_result["content"][0]["text"] == '{"status":"ok","count":2}'
+    assert mcp_result["structuredContent"] == {"status": "ok", "count": 2}
+
+
+def test_jsonrpc_batch_runs_concurrently_in_order(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(settings, "internal_mcp_batch_concurrency", 2)
+    state = {"running": 0, "peak": 0}
+
+    class SlowTool:
+        async def execute(self, arguments):
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+            await asyncio.sleep(0.02 * (3 - arguments["n"] % 3))
+            state["running"] -= 1
+            return f"done {arguments['n']}"
+
+    monkeypatch.setitem(internal_mcp_app.tools, "slow_tool", SlowTool())
+    client = TestClient(internal_mcp_app.app)
+    batch = [
+        {"jsonrpc": "2.0", "id": n, "method": "tools/call",
+         "params": {"name": "slow_tool", "arguments": {"n": n}}}
+        for n in range(5)
+    ]
+    batch.append({"jsonrpc": "2.0", "method": "notifications/initialized"})
+    batch.append({"jsonrpc": "2.0", "id": "x", "method": "no/such"})
+
+    response = client.post("/", json=batch)
+
+    body = response.json()
+    assert [item["id"] for item in body] == [0, 1, 2, 3, 4, "x"]
+    assert [item["result"]["content"][0]["text"] for item in body[:5]] == [f"done {n}" for n in range(5)]
+    assert body[5]["error"]["code"] == -32601
+    assert state["peak"] == 2
+
+
+def test_registry_batch_groups_calls_per_server(monkeypatch):
+    monkeypatch.setattr(settings, "internal_mcp_transport", "inprocess")
+
+    class EchoTool:
+        description = "Echo"
+
+        def get_input_schema(self):
+            return {"type": "object"}
+
+        async def execute(self, arguments):
+            return arguments["text"]
+
+    monkeypatch.setitem(internal_mcp_app.tools, "echo_tool", EchoTool())
+    monkeypatch.setattr(internal_mcp_app, "tool_catalog", internal_mcp_app.ToolCatalog(internal_mcp_app.tools))
+    registry = MCPServerRegistry()
+    server = make_internal_server()
+    registry.servers[server.server_id] = server
+
+    results = asyncio.run(registry.execute_tools_batch([
+        ("echo_tool", {"text": "a"}),
+        ("missing_tool", {}),
+        ("echo_tool", {"text": "b"}),
+    ]))
+
+    assert results[0]["content"][0]["text"] == "a"
+    assert isinstance(results[1], ValueError)
+    assert results[2]["content"][0]["text"] == "b"
+
+
+def test_calls_are_routed_from_the_catalog_snapshot_without_discovery(monkeypatch):
+    monkeypatch.setattr(settings, "internal_mcp_transport", "inprocess")
+
+    class EchoTool:
+        description = "Echo"
+
+        def get_input_schema(self):
+            return {"type": "object"}
+
+        async def execute(self, arguments):
+            return arguments["text"]
+
+    monkeypatch.setitem(internal_mcp_app.tools, "echo_tool", EchoTool())
+    monkeypatch.setattr(internal_mcp_app, "tool_catalog", internal_mcp_app.ToolCatalog(internal_mcp_app.tools))
+    registry = MCPServerRegistry()
+    server = make_internal_server()
+    registry.servers[server.server_id] = server
+    catalog = {"echo_tool": UnifiedTool(name="echo_tool", description="Echo", server_id=server.server_id,
+                                        server_name=server.name, source="internal")}
+    registry.tool_lookup = catalog.get
+    discoveries = []
+    discover = registry._discover_tools_from_server
+
+    async def counting_discover(server):
+        discoveries.append(server.name)
+        return await discover(server)
+
+    monkeypatch.setattr(registry, "_discover_tools_from_server", counting_discover)
+
+    async def main():
+        single = await registry.execute_tool("echo_tool", {"text": "a"})
+        batch = await registry.execute_tools_batch([("echo_tool", {"text": "b"}), ("echo_tool", {"text": "c"})])
+        known_discoveries = len(discoveries)
+        missed = await registry.execute_tools_batch([("echo_tool", {"text": "d"}), ("missing_tool", {})])
+        return single, batch, known_discoveries, missed
+
+    single, batch, known_discoveries, missed = asyncio.run(main())
+
+    assert single["content"][0]["text"] == "a"
+    assert [result["content"][0]["text"] for result in batch] == ["b", "c"]
+    assert known_discoveries == 0
+    # A tool missing from the snapshot falls back to discovering the servers
+    assert discoveries == ["Internal MCP Server"] and isinstance(missed[1], ValueError)
+
+
+def test_batched_calls_are_attributed_and_counted_per_tool(monkeypatch):
+    monkeypatch.setattr(settings, "internal_mcp_transport", "inprocess")
+    tracker = TokenUsageTracker(pricing={})
+
+    class DraftingTool:
+        description = "Drafting"
+
+        def get_input_schema(self):
+            return {"type": "object"}
+
+        async def execute(self, arguments):
+            await asyncio.sleep(0)
+            tracker.record("drafting", None, {"prompt_tokens": 10, "completion_tokens": 5})
+            return "draft"
+
+    for name in ("batch_draft_tool", "batch_review_tool"):
+        monkeypatch.setitem(internal_mcp_app.tools, name, DraftingTool())
+    monkeypatch.setattr(internal_mcp_app, "tool_catalog", internal_mcp_app.ToolCatalog(internal_mcp_app.tools))
+    orchestrator = MCPOrchestrator()
+    server = make_internal_server()
+    orchestrator.server_registry.servers[server.server_id] = server
+    monkeypatch.setattr(orchestrator.execution_engine, "validate_parameters", AsyncMock(return_value=(True, [])))
+
+    def executions(tool_name):
+        return metrics.REGISTRY.get_sample_value(
+            "mcp_tool_executions_total", {"tool": tool_name, "status": "success"}
+        ) or 0
+
+    before = executions("batch_draft_tool")
+    results = asyncio.run(orchestrator.execute_tools_batch([
+        {"tool_name": "batch_draft_tool", "parameters": {}},
+        {"tool_name": "batch_review_tool", "parameters": {}},
+        {"tool_name": "batch_draft_tool", "parameters": {}},
+    ]))
+
+    assert [result["status"] for result in results] == ["success"] * 3
+    by_tool = tracker.get_summary()["by_tool"]
+    assert by_tool["batch_draft_tool"]["requests"] == 2 and by_tool["batch_review_tool"]["requests"] == 1
+    assert "none" not in by_tool
+    assert executions("batch_draft_tool") - before == 2
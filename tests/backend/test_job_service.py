@@ -0,0 +1,125 @@
+"""
+Tests for the background job service.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core import request_context
+from app.core.exceptions import RateLimitError
+from app.services.job_service import CANCELLED, FAILED, QUEUED, SUCCEEDED, JobService
+
+
+class FakeOrchestrator:
+    def __init__(self):
+        self.calls = []
+        self.release = asyncio.Event()
+
+    async def execute_tool(self, tool_name, parameters):
+        self.calls.append(parameters["n"])
+        if parameters.get("block"):
+            await self.release.wait()
+        if parameters.get("fail"):
+            raise RuntimeError("tool failed")
+        request_context.report_progress("searching", 0.5)
+        await asyncio.sleep(0)
+        return {"status": "success", "result": parameters["n"]}
+
+
+@pytest.fixture
+def orchestrator(monkeypatch):
+    fake = FakeOrchestrator()
+    import app.services.mcp.orchestrator as orchestrator_module
+    monkeypatch.setattr(orchestrator_module, "get_initialized_mcp_orchestrator", lambda: fake)
+    return fake
+
+
+def test_jobs_run_by_priority_and_report_progress(orchestrator):
+    async def main():
+        service = JobService(workers=1)
+        blocker = await service.submit("tool", {"n": 0, "block": True})
+        await asyncio.sleep(0.01)
+        low = await service.submit("tool", {"n": 1}, priority="low")
+        high = await service.submit("tool", {"n": 2}, priority="high")
+        failing = await service.submit("tool", {"n": 3, "fail": True})
+        assert low.status == QUEUED
+
+        updates = []
+
+        async def follow():
+            async for job in service.watch(high.job_id):
+                updates.append((job.status, job.stage))
+
+        follower = asyncio.ensure_future(follow())
+        await asyncio.sleep(0.01)
+        orchestrator.release.set()
+        await asyncio.wait_for(follower, timeout=2)
+        await asyncio.sleep(0.05)
+        await service.stop()
+        return blocker, low, high, failing, updates
+
+    blocker, low, high, failing, updates = asyncio.run(main())
+
+    assert orchestrator.calls == [0, 2, 3, 1]
+    assert high.status == SUCCEEDED and high.result["result"] == 2
+    assert high.progress == 1.0
+    assert [stage["stage"] for stage in high.stages] == ["searching"]
+    assert updates[0] == ("queued", None)
+    assert updates[-1] == ("succeeded", "searching")
+    assert failing.status == FAILED and "tool failed" in failing.error
+    assert low.status == SUCCEEDED
+
+
+def test_full_queue_rejects_and_queued_jobs_can_be_cancelled(orchestrator):
+    async def main():
+        service = JobService(workers=1, max_queued=1)
+        await service.submit("tool", {"n": 0, "block": True})
+        await asyncio.sleep(0.01)
+        queued = await service.submit("tool", {"n": 1})
+        with pytest.raises(RateLimitError):
+            await service.submit("tool", {"n": 2})
+        await service.cancel(queued.job_id)
+        orchestrator.release.set()
+        await asyncio.sleep(0.05)
+        await service.stop()
+        return queued
+
+    queued = asyncio.run(main())
+
+    assert queued.status == CANCELLED
+    assert orchestrator.calls == [0]
+
+
+def test_jobs_are_visible_and_cancellable_from_another_worker(orchestrator, tmp_path):
+    from app.core.shared_state import SharedStore
+
+    path = str(tmp_path / "state.db")
+
+    async def main():
+        owner = JobService(workers=1, store=SharedStore(path), poll_interval=0.01)
+        peer = JobService(workers=1, store=SharedStore(path), poll_interval=0.01)
+        done = await owner.submit("tool", {"n": 0})
+        await asyncio.sleep(0.05)
+        seen_done = await peer.get(done.job_id)
+
+        running = await owner.submit("tool", {"n": 1, "block": True})
+        await asyncio.sleep(0.05)
+        updates = []
+
+        async def follow():
+            async for job in peer.watch(running.job_id):
+                updates.append(job.status)
+
+        follower = asyncio.ensure_future(follow())
+        await asyncio.sleep(0.05)
+        await peer.cancel(running.job_id)
+        await asyncio.wait_for(follower, timeout=2)
+        await owner.stop()
+        return seen_done, running, updates
+
+    seen_done, running, updates = asyncio.run(main())
+
+    assert seen_done.status == SUCCEEDED and seen_done.result["result"] == 0
+    assert running.status == CANCELLED
+    assert updates == ["running", "cancelled"]
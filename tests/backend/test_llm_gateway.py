@@ -0,0 +1,131 @@
+"""
+Tests for the shared LLM gateway (rate limits, priorities, 429 handling
+and load balancing across backends).
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import openai
+
+from app.services.llm_gateway import LLMBackend, LLMGateway, retry_after_seconds
+
+
+class FakeClient:
+    """Stands in for AsyncAzureOpenAI; replies come from ``outcomes`` in order."""
+
+    def __init__(self, outcomes=None, gate=None, delay=0.0):
+        self.outcomes = list(outcomes or [])
+        self.gate = gate
+        self.delay = delay
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kwargs):
+        self.calls.append((kwargs["messages"][-1]["content"], time.monotonic()))
+        if self.gate is not None:
+            await self.gate.wait()
+        await asyncio.sleep(self.delay)
+        outcome = self.outcomes.pop(0) if self.outcomes else None
+        if isinstance(outcome, Exception):
+            raise outcome
+        return SimpleNamespace(usage=SimpleNamespace(total_tokens=10))
+
+
+def _gateway(clients, **kwargs):
+    """Gateway whose backends are named after, and served by, the given fake clients."""
+    gateway = LLMGateway(client_factory=lambda backend: clients[backend.name], **kwargs)
+    backends = [gateway.register(LLMBackend(deployment="gpt-4o-mini", base_url="http://localhost/v1", name=name))
+                for name in clients]
+    return gateway, backends
+
+
+def _complete(gateway, backends, prompt, call_site):
+    return gateway.complete(
+        backends=backends, messages=[{"role": "user", "content": prompt}],
+        max_tokens=10, temperature=0.0, call_site=call_site
+    )
+
+
+def _throttled(retry_after_ms):
+    request = httpx.Request("POST", "https://example.openai.azure.com")
+    response = httpx.Response(429, headers={"retry-after-ms": retry_after_ms}, request=request)
+    return openai.RateLimitError("Too many requests", response=response, body=None)
+
+
+def test_interactive_calls_are_scheduled_ahead_of_bulk_calls():
+    gate = asyncio.Event()
+    client = FakeClient(gate=gate)
+    gateway, backends = _gateway({"only": client}, max_concurrency=1)
+
+    async def main():
+        first = asyncio.ensure_future(_complete(gateway, backends, "summary 1", "claim_summary"))
+        await asyncio.sleep(0.01)
+        queued = [asyncio.ensure_future(_complete(gateway, backends, "summary 2", "claim_summary"))]
+        await asyncio.sleep(0.01)
+        queued.append(asyncio.ensure_future(_complete(gateway, backends, "intent", "intent_detection")))
+        await asyncio.sleep(0.01)
+        assert gateway.get_status()["queued"] == 2
+        gate.set()
+        await asyncio.gather(first, *queued)
+
+    asyncio.run(main())
+
+    assert [prompt for prompt, _ in client.calls] == ["summary 1", "intent", "summary 2"]
+    assert gateway.get_status()["in_flight"] == 0
+
+
+def test_throttled_call_waits_for_retry_after_and_holds_back_other_calls():
+    client = FakeClient(outcomes=[_throttled("200")])
+    gateway, backends = _gateway({"only": client}, max_retries=2)
+
+    async def main():
+        first = asyncio.ensure_future(_complete(gateway, backends, "first", "report"))
+        await asyncio.sleep(0.05)
+        # Arrives while the backend is paused by the 429
+        await asyncio.gather(first, _complete(gateway, backends, "second", "report"))
+
+    asyncio.run(main())
+
+    (_, throttled_at), *retried = client.calls
+    assert len(retried) == 2
+    assert all(at - throttled_at >= 0.2 for _, at in retried)
+    assert gateway.throttled == 1
+    assert retry_after_seconds({"retry-after": "3"}) == 3.0
+    assert retry_after_seconds({}) is None
+
+
+def test_throttled_backend_fails_over_and_slow_interactive_calls_are_hedged():
+    primary = FakeClient(outcomes=[_throttled("5000")])
+    secondary = FakeClient()
+    gateway, backends = _gateway({"primary": primary, "secondary": secondary}, hedge_after=0.05)
+
+    async def main():
+        _, failed_over = await _complete(gateway, backends, "summary", "claim_summary")
+        # The throttled backend stays paused, so later calls avoid it
+        _, next_backend = await _complete(gateway, backends, "report", "report")
+        return failed_over, next_backend
+
+    failed_over, next_backend = asyncio.run(main())
+
+    assert failed_over.name == next_backend.name == "secondary"
+    assert len(primary.calls) == 1 and gateway.throttled == 1
+
+    slow = FakeClient(delay=5.0)
+    fast = FakeClient(delay=0.01)
+    gateway, backends = _gateway({"slow": slow, "fast": fast}, hedge_after=0.05)
+    # The slow backend looks best until it has been measured
+    backends[1].observe_latency(1.0)
+
+    async def hedged():
+        start_time = time.monotonic()
+        _, backend = await _complete(gateway, backends, "intent", "intent_detection")
+        return backend, time.monotonic() - start_time
+
+    backend, elapsed = asyncio.run(hedged())
+
+    assert backend.name == "fast" and elapsed < 1.0
+    assert gateway.hedged == 1
+    assert gateway.get_status()["in_flight"] == 0
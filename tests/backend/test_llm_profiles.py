@@ -0,0 +1,55 @@
+"""
+Tests for per-call-site model profiles.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from app.services.llm_client import LLMClient
+from app.services.llm_gateway import LLMBackend
+from app.services.llm_profiles import ModelProfile, load_profiles
+
+
+def test_environment_overrides_are_merged_field_by_field():
+    profiles = load_profiles(
+        profiles='{"report": {"deployment": "gpt-4o", "max_tokens": 4000}, "default": {"timeout": 60}}',
+        overrides='{"development": {"report": {"deployment": "gpt-4o-mini"}}, "production": {"default": {}}}',
+        environment="development"
+    )
+
+    assert profiles["report"] == ModelProfile(deployment="gpt-4o-mini", max_tokens=4000)
+    assert profiles["default"] == ModelProfile(timeout=60)
+    assert load_profiles(profiles="not json", overrides="{}") == {}
+
+
+def test_call_sites_are_routed_to_their_profile_deployment(monkeypatch):
+    calls = []
+
+    async def fake_complete(**kwargs):
+        calls.append(kwargs)
+        backend = kwargs["backends"][0]
+        usage = SimpleNamespace(prompt_tokens=1, completion_tokens=1, total_tokens=2)
+        message = SimpleNamespace(content="ok")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage), backend
+
+    monkeypatch.setattr("app.services.llm_client.llm_gateway.complete", fake_complete)
+    client = LLMClient(
+        backends=[LLMBackend(deployment="gpt-4o", endpoint="https://example.openai.azure.com", api_key="key")],
+        profiles={
+            "intent_detection": ModelProfile(deployment="gpt-4o-mini", max_tokens=500, timeout=20),
+            "default": ModelProfile(timeout=120)
+        }
+    )
+
+    async def main():
+        intent = await client.generate_text("hi", max_tokens=2000, call_site="intent_detection")
+        report = await client.generate_text("report", max_tokens=4000, call_site="report")
+        return intent, report
+
+    intent, report = asyncio.run(main())
+
+    assert intent["model"] == "gpt-4o-mini" and report["model"] == "gpt-4o"
+    small = calls[0]["backends"][0]
+    assert small.endpoint == "https://example.openai.azure.com" and small.api_key == "key"
+    assert (calls[0]["max_tokens"], calls[0]["timeout"]) == (500, 20)
+    assert (calls[1]["max_tokens"], calls[1]["timeout"]) == (4000, 120)
@@ -0,0 +1,65 @@
+"""
+Tests for the load-generation harness (request mix, percentiles and lag reporting).
+"""
+
+import asyncio
+
+import httpx
+from fastapi import FastAPI, HTTPException
+
+from app.core import metrics
+from tests.load.load_harness import LoadGenerator, histogram_delta_summary, load_scenario, percentile, summarize
+
+
+def test_closed_and_open_loop_runs_report_latency_and_errors():
+    app = FastAPI()
+
+    @app.get("/fast")
+    async def fast():
+        await asyncio.sleep(0.01)
+        return {"ok": True}
+
+    @app.get("/broken")
+    async def broken():
+        raise HTTPException(status_code=503)
+
+    requests = [
+        {"name": "fast", "method": "GET", "path": "/fast", "weight": 3},
+        {"name": "broken", "method": "GET", "path": "/broken", "weight": 1},
+        {"name": "external", "method": "GET", "path": "/{server_id}", "requires": "external_server"}
+    ]
+
+    async def run(mode):
+        scenario = load_scenario(None, {"mode": mode, "duration": 0.5, "warmup": 0.1, "rate": 40.0,
+                                        "concurrency": 4, "requests": requests})
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+            generator = LoadGenerator(client, scenario, {})
+            samples, start, end = await generator.run()
+        return samples, end - start
+
+    for mode in ("closed", "open"):
+        samples, duration = asyncio.run(run(mode))
+        report = summarize(samples, duration)
+        names = {sample.name for sample in samples}
+
+        # Requests needing an external server are left out when none was registered
+        assert names == {"fast", "broken"}
+        assert report["statuses"]["503"] == report["errors"] > 0
+        assert report["latency"]["p50_ms"] >= 10.0
+
+    assert percentile([5, 1, 4, 2, 3], 50) == 3
+    assert percentile([], 99) is None
+
+
+def test_backend_loop_lag_is_read_from_the_metrics_endpoint():
+    before = metrics.render_latest()[0].decode()
+    for lag in (0.0005, 0.002, 0.2):
+        metrics.event_loop_lag_seconds.observe(lag)
+    after = metrics.render_latest()[0].decode()
+
+    summary = histogram_delta_summary(before, after, "event_loop_lag_seconds")
+
+    assert summary["samples"] == 3
+    assert summary["p50_le_ms"] == 2.5
+    assert summary["p99_le_ms"] == 250.0
@@ -0,0 +1,83 @@
+"""
+Unit tests for the Prometheus metrics module.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app.core import metrics
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "backend")
+
+
+class TestBoundedLabelSet:
+    """Label cardinality is capped."""
+
+    def test_overflow_collapses_to_other(self):
+        labels = metrics.BoundedLabelSet(2)
+        assert labels("a") == "a"
+        assert labels("b") == "b"
+        assert labels("c") == metrics.OVERFLOW_LABEL
+        assert labels("a") == "a"
+
+    def test_empty_value_is_unknown(self):
+        labels = metrics.BoundedLabelSet(2)
+        assert labels(None) == "unknown"
+        assert labels("") == "unknown"
+
+
+class TestMetricRecording:
+    """Recorded values show up in the exposition output."""
+
+    def test_tool_execution_error_is_counted(self):
+        with pytest.raises(RuntimeError):
+            with metrics.track_tool_execution("metrics_test_tool"):
+                raise RuntimeError("boom")
+
+        payload, content_type = metrics.render_latest()
+        text = payload.decode()
+        assert content_type.startswith("text/plain")
+        assert 'mcp_tool_executions_total{status="error",tool="metrics_test_tool"} 1.0' in text
+
+    def test_llm_call_records_tokens(self):
+        metrics.observe_llm_call(
+            "metrics_test_site", True, 0.2,
+            {"prompt_tokens": 10, "completion_tokens": 5}
+        )
+        text = metrics.render_latest()[0].decode()
+        assert 'llm_tokens_total{call_site="metrics_test_site",type="prompt"} 10.0' in text
+        assert 'llm_tokens_total{call_site="metrics_test_site",type="completion"} 5.0' in text
+
+    def test_cache_hit_ratio(self):
+        metrics.record_cache_lookup("metrics_test_cache", hit=True)
+        metrics.record_cache_lookup("metrics_test_cache", hit=False)
+        text = metrics.render_latest()[0].decode()
+        assert 'cache_hit_ratio{cache="metrics_test_cache"} 0.5' in text
+
+
+def test_metrics_endpoint_serves_prometheus_text():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    client = TestClient(app, base_url="http://localhost")
+    response = client.get("/api/v1/health/metrics")
+    assert response.status_code == 200
+    assert "http_requests_total" in response.text
+
+
+def test_worker_processes_are_merged_in_multiprocess_mode(tmp_path):
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+    record = ("from app.core import metrics\n"
+              "with metrics.track_tool_execution('merged_tool'):\n"
+              "    pass\n")
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", record], cwd=BACKEND_DIR, env=env, check=True)
+
+    render = "from app.core import metrics\nprint(metrics.render_latest()[0].decode())\n"
+    text = subprocess.run([sys.executable, "-c", render], cwd=BACKEND_DIR, env=env,
+                          capture_output=True, text=True, check=True).stdout
+
+    assert 'mcp_tool_executions_total{status="success",tool="merged_tool"} 2.0' in text
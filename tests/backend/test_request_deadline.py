@@ -0,0 +1,160 @@
+"""
+Tests for request deadlines and cancellation of abandoned requests.
+"""
+
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+
+from app.core import cancellation, request_context
+from app.core.cancellation import run_cancellable
+from app.core.exceptions import DeadlineExceededError
+
+
+def test_timeouts_shrink_to_the_remaining_budget_and_propagate():
+    assert request_context.timeout(30.0) == 30.0
+    assert request_context.parse_deadline_header("2.5") == 2.5
+    assert 9 < request_context.parse_deadline_header(str(time.time() + 10)) <= 10
+    assert request_context.parse_deadline_header("soon") is None
+
+    with request_context.bind(budget=5.0):
+        assert request_context.timeout(30.0) <= 5.0
+        assert request_context.timeout(1.0) == 1.0
+        # A nested budget can shorten the deadline but never extend it
+        with request_context.bind(budget=60.0):
+            assert request_context.timeout(30.0) <= 5.0
+        assert 4 < float(request_context.propagation_headers()[request_context.DEADLINE_HEADER]) <= 5
+
+    with request_context.bind(budget=0.0):
+        with pytest.raises(DeadlineExceededError):
+            request_context.timeout(30.0)
+
+
+def test_handler_work_is_cancelled_at_the_deadline():
+    app = FastAPI()
+    outcome = {}
+
+    async def slow_work():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            outcome["cancelled"] = True
+            raise
+
+    @app.post("/slow")
+    async def slow(request: Request):
+        return await run_cancellable(request, slow_work, budget=0.1)
+
+    start = time.perf_counter()
+    response = TestClient(app).post("/slow")
+
+    assert response.status_code == 504
+    assert outcome == {"cancelled": True}
+    assert time.perf_counter() - start < 2
+
+
+def test_a_header_deadline_without_a_route_budget_is_reported_as_504(monkeypatch):
+    monkeypatch.setattr(cancellation, "route_budget", lambda route: None)
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def bind_deadline(request: Request, call_next):
+        with request_context.bind(budget=request_context.parse_deadline_header(
+                request.headers.get(request_context.DEADLINE_HEADER))):
+            return await call_next(request)
+
+    @app.post("/slow")
+    async def slow(request: Request):
+        return await run_cancellable(request, lambda: asyncio.sleep(5))
+
+    response = TestClient(app).post("/slow", headers={request_context.DEADLINE_HEADER: "0.3"})
+
+    assert response.status_code == 504
+    assert response.json()["detail"]["message"] == "Request did not finish within 0.3s"
+
+
+class DisconnectingRequest:
+    """Minimal stand-in for a request whose client goes away after a while."""
+
+    def __init__(self, after: float):
+        self.scope = {"root_path": ""}
+        self.url = type("URL", (), {"path": "/api/v1/mcp/agent/chat"})()
+        self._disconnect_at = time.monotonic() + after
+
+    async def is_disconnected(self) -> bool:
+        return time.monotonic() >= self._disconnect_at
+
+
+def test_handler_work_is_cancelled_when_the_client_disconnects():
+    outcome = {}
+
+    async def work():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            outcome["cancelled"] = True
+            raise
+
+    async def main():
+        with pytest.raises(HTTPException) as excinfo:
+            await run_cancellable(DisconnectingRequest(after=0.1), work, budget=10)
+        return excinfo.value
+
+    start = time.perf_counter()
+    error = asyncio.run(main())
+
+    assert error.status_code == 499
+    assert outcome == {"cancelled": True}
+    assert time.perf_counter() - start < 1.5
+
+
+def test_dropping_the_client_cancels_the_tool_through_the_app_middleware(monkeypatch):
+    from app.api.v1 import mcp as mcp_api
+    from app.main import app
+
+    outcome = {}
+
+    class SlowOrchestrator:
+        async def execute_tool(self, **kwargs):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                outcome["cancelled"] = True
+                raise
+
+    monkeypatch.setattr(mcp_api, "get_initialized_mcp_orchestrator", lambda: SlowOrchestrator())
+
+    async def main():
+        messages = [{"type": "http.request", "body": b'{"parameters": {}}', "more_body": False}]
+        dropped = asyncio.Event()
+        sent = []
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await dropped.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        path = "/api/v1/mcp/tools/slow_tool/execute"
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+            "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+            "headers": [(b"host", b"localhost"), (b"content-type", b"application/json")],
+            "client": ("127.0.0.1", 50000), "server": ("localhost", 9000)
+        }
+        asyncio.get_running_loop().call_later(0.2, dropped.set)
+        await app(scope, receive, send)
+        return sent[0]["status"]
+
+    start = time.perf_counter()
+    status = asyncio.run(main())
+
+    assert status == 499
+    assert outcome == {"cancelled": True}
+    assert time.perf_counter() - start < 2
@@ -0,0 +1,154 @@
+"""
+Tests for the tool result cache.
+"""
+
+import asyncio
+
+from app import internal_mcp_app
+from app.core.config import settings
+from app.core.result_cache import ResultCache
+from app.services.mcp.orchestrator import MCPOrchestrator
+from app.mcp_servers.tools.web_search import WebSearchTool
+from app.services.mcp.server_registry import MCPServerInfo, UnifiedTool
+from app.services.web_search_service import WebSearchService
+
+
+def test_memory_tier_is_bounded_lru():
+    cache = ResultCache("test_lru", max_entries=2)
+
+    async def main():
+        await cache.set("a", 1, ttl=60)
+        await cache.set("b", 2, ttl=60)
+        await cache.get("a")
+        await cache.set("c", 3, ttl=60)
+        return await cache.get("a"), await cache.get("b")
+
+    a, b = asyncio.run(main())
+
+    assert a[0].value == 1 and a[1] == "memory"
+    assert b is None
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    async def main():
+        await ResultCache("test_disk", disk_dir=str(tmp_path)).set("key", {"report": "# R"}, ttl=60)
+        fresh = ResultCache("test_disk", disk_dir=str(tmp_path))
+        return await fresh.get("key"), await fresh.get("key")
+
+    from_disk, from_memory = asyncio.run(main())
+
+    assert from_disk[0].value == {"report": "# R"} and from_disk[1] == "disk"
+    assert from_memory[1] == "memory"
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = ResultCache("test_expiry", disk_dir=str(tmp_path))
+
+    async def main():
+        await cache.set("key", "value", ttl=-1)
+        return await cache.get("key")
+
+    assert asyncio.run(main()) is None
+
+
+def test_orchestrator_reuses_results_for_normalized_queries(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "tool_result_cache_enabled", True)
+    orchestrator = MCPOrchestrator()
+    orchestrator.result_cache = ResultCache("test_orchestrator", disk_dir=str(tmp_path))
+    executions = []
+
+    async def load_tools():
+        tool = UnifiedTool(name="search", description="", server_id="internal",
+                           server_name="Internal", source="internal")
+        return [tool.apply_cache_policy({"_meta": {"cache": {"ttl": 60, "case_insensitive": ["query"]}}})]
+
+    async def execute_tool(tool_name, parameters):
+        executions.append(parameters)
+        return {"content": [{"type": "text", "text": "results"}], "isError": False}
+
+    orchestrator.tool_catalog.loader = load_tools
+    monkeypatch.setattr(orchestrator.server_registry, "execute_tool", execute_tool)
+
+    async def main():
+        await orchestrator.tool_catalog.refresh()
+        first = await orchestrator.execute_tool("search", {"query": "5G Handover"})
+        second = await orchestrator.execute_tool("search", {"query": "  5g   handover "})
+        bypassed = await orchestrator.execute_tool("search", {"query": "5g handover"}, bypass_cache=True)
+        return first, second, bypassed
+
+    first, second, bypassed = asyncio.run(main())
+
+    assert len(executions) == 2
+    assert first["cache"] == {"hit": False, "bypassed": False, "stored": True}
+    assert second["cache"]["hit"] is True and second["cache"]["tier"] == "memory"
+    assert second["result"] == "results"
+    assert bypassed["cache"]["bypassed"] is True
+
+
+def test_persisted_results_are_found_after_the_server_is_registered_again(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "tool_result_cache_enabled", True)
+    executions = []
+
+    async def run_after_start(server_id):
+        # Every start registers the server under a new ID
+        orchestrator = MCPOrchestrator()
+        orchestrator.result_cache = ResultCache("test_restart", disk_dir=str(tmp_path))
+        orchestrator.server_registry.servers = {server_id: MCPServerInfo(
+            server_id=server_id, name="Internal", url="http://localhost:8001/mcp", type="internal", config={}
+        )}
+
+        async def load_tools():
+            tool = UnifiedTool(name="search", description="", server_id=server_id,
+                               server_name="Internal", source="internal")
+            return [tool.apply_cache_policy({"_meta": {"cache": {"ttl": 60}}})]
+
+        async def execute_tool(tool_name, parameters):
+            executions.append(parameters)
+            return {"content": [{"type": "text", "text": "results"}], "isError": False}
+
+        orchestrator.tool_catalog.loader = load_tools
+        monkeypatch.setattr(orchestrator.server_registry, "execute_tool", execute_tool)
+        await orchestrator.tool_catalog.refresh()
+        return await orchestrator.execute_tool("search", {"query": "5g handover"})
+
+    asyncio.run(run_after_start("first-start"))
+    restarted = asyncio.run(run_after_start("second-start"))
+
+    assert len(executions) == 1
+    assert restarted["cache"]["hit"] is True and restarted["cache"]["tier"] == "disk"
+
+
+def test_failed_tool_executions_are_not_stored(monkeypatch):
+    monkeypatch.setattr(settings, "tool_result_cache_enabled", True)
+    orchestrator = MCPOrchestrator()
+    orchestrator.result_cache = ResultCache("test_failures")
+    searches = []
+
+    async def search_google(self, query, max_results=10, include_abstracts=False):
+        searches.append(query)
+        raise ConnectionError("Google API returned status 503")
+
+    async def load_tools():
+        tool = UnifiedTool(name="web_search_tool", description="", server_id="internal",
+                           server_name="Internal", source="internal")
+        return [tool.apply_cache_policy({"_meta": {"cache": WebSearchTool().get_cache_policy()}})]
+
+    async def execute_tool(tool_name, parameters):
+        return await internal_mcp_app.call_tool(tool_name, parameters)
+
+    monkeypatch.setattr(WebSearchService, "search_google", search_google)
+    monkeypatch.setitem(internal_mcp_app.tools, "web_search_tool", WebSearchTool())
+    orchestrator.tool_catalog.loader = load_tools
+    monkeypatch.setattr(orchestrator.server_registry, "execute_tool", execute_tool)
+
+    async def main():
+        await orchestrator.tool_catalog.refresh()
+        first = await orchestrator.execute_tool("web_search_tool", {"query": "5g handover"})
+        second = await orchestrator.execute_tool("web_search_tool", {"query": "5g handover"})
+        return first, second
+
+    first, second = asyncio.run(main())
+
+    assert len(searches) == 2
+    assert first["status"] == "error" and "503" in first["result"]
+    assert first["cache"]["stored"] is False and second["cache"]["hit"] is False
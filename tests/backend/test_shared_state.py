@@ -0,0 +1,153 @@
+"""
+Tests for state shared between backend workers and the multi-worker supervisor.
+"""
+
+import asyncio
+import sqlite3
+import time
+from types import SimpleNamespace
+
+from app.core.config import settings
+from app.core.shared_state import SharedStore
+from app.middleware.security import RateLimitMiddleware
+from app.services.mcp import orchestrator as orchestrator_module
+from app.services.mcp.orchestrator import MCPOrchestrator
+from app.services.session_service import SessionService
+from app import supervisor
+
+
+def test_workers_share_sessions_rate_limits_and_counters(tmp_path):
+    path = str(tmp_path / "state.db")
+    first, second = SharedStore(path), SharedStore(path)
+
+    async def main():
+        session_id = await SessionService(first).create_session("user-1", {"doc": "a"})
+        sessions = SessionService(second)
+        # Concurrent updates through different workers change fields in place
+        await asyncio.gather(
+            sessions.update_session(session_id, metadata={"tab": 2}),
+            SessionService(first).update_session_activity(session_id, "conversation"),
+            sessions.update_session_activity(session_id, "conversation")
+        )
+        session = await SessionService(first).get_session(session_id)
+        user_sessions = [s["session_id"] for s in await sessions.get_user_sessions("user-1")]
+        deleted = await sessions.delete_session(session_id)
+        return session, user_sessions, deleted, await SessionService(first).get_session(session_id)
+
+    session, user_sessions, deleted, after_delete = asyncio.run(main())
+    assert session["metadata"] == {"doc": "a", "tab": 2} and session["conversation_count"] == 2
+    assert user_sessions == [session["session_id"]]
+    assert deleted and after_delete is None
+    assert first.get("user_sessions", "user-1") is None
+
+    async def hits():
+        limiters = [RateLimitMiddleware(app=None, store=store) for store in (first, second)]
+        for limiter in limiters:
+            limiter.default_limits["api"] = {"requests": 3, "window": 60}
+        allowed = [await limiters[index % 2].check_rate_limit("10.0.0.1", "api") for index in range(4)]
+        return limiters, allowed, await limiters[0].check_rate_limit("10.0.0.2", "api")
+
+    limiters, allowed, other_client = asyncio.run(hits())
+    assert allowed == [True, True, True, False] and other_client
+    assert 0 < limiters[1].get_retry_after("10.0.0.1", "api") <= 60
+
+    assert [first.increment("generations", "servers"), second.increment("generations", "servers")] == [1, 2]
+    first.set("jobs", "expired", {"status": "done"}, ttl=-1)
+    assert second.get("jobs", "expired") is None and "expired" not in second.items("jobs")
+    assert second.purge_expired() == 1
+
+
+def test_waiting_for_another_workers_lock_does_not_block_the_event_loop(tmp_path):
+    path = str(tmp_path / "state.db")
+    store = SharedStore(path, busy_timeout=0.5)
+    store.set("rate_limit", "warm", [])
+    other_worker = sqlite3.connect(path, isolation_level=None)
+    other_worker.execute("BEGIN IMMEDIATE")
+
+    async def main():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.ensure_future(tick())
+        asyncio.get_running_loop().call_later(0.2, other_worker.execute, "COMMIT")
+        allowed, _ = await store.ahit("rate_limit", "api:10.0.0.1", 10, 60)
+        ticker.cancel()
+        return allowed, ticks
+
+    allowed, ticks = asyncio.run(main())
+    store.close()
+
+    assert allowed and ticks >= 10
+
+
+def test_syncing_external_servers_keeps_servers_loaded_by_the_worker(monkeypatch, tmp_path):
+    monkeypatch.setattr(orchestrator_module, "shared_store", SharedStore(str(tmp_path / "state.db")))
+
+    def worker(*server_ids):
+        orchestrator = MCPOrchestrator()
+        registry = orchestrator.server_registry
+        registry.servers = {server_id: SimpleNamespace(type="external") for server_id in server_ids}
+
+        async def add_server(config):
+            registry.servers[config["server_id"]] = SimpleNamespace(type="external")
+            return config["server_id"]
+
+        async def remove_server(server_id):
+            return registry.servers.pop(server_id, None) is not None
+
+        async def list_all_tools():
+            return []
+
+        monkeypatch.setattr(registry, "add_server", add_server)
+        monkeypatch.setattr(registry, "remove_server", remove_server)
+        monkeypatch.setattr(registry, "list_all_tools", list_all_tools)
+        return orchestrator
+
+    async def main():
+        # Both workers loaded "config" and "restored" themselves
+        first, second = worker("config", "restored"), worker("config", "restored")
+        await second.add_external_server({"name": "added", "url": "https://added.example/mcp",
+                                          "server_id": "added"})
+        await first.sync_external_servers()
+        synced = set(first.server_registry.servers)
+
+        await second.remove_external_server("restored")
+        await first.sync_external_servers()
+        return synced, set(first.server_registry.servers)
+
+    synced, after_removal = asyncio.run(main())
+
+    assert synced == {"config", "restored", "added"}
+    assert after_removal == {"config", "added"}
+
+
+def test_supervisor_runs_separate_pools_wired_to_each_other(monkeypatch):
+    monkeypatch.setattr(settings, "backend_workers", 4)
+    monkeypatch.setattr(settings, "internal_mcp_workers", 2)
+    monkeypatch.setattr(settings, "internal_mcp_port", 8001)
+    monkeypatch.setattr(settings, "internal_mcp_pool_url", "")
+    monkeypatch.setattr(settings, "shared_state_path", "")
+    monkeypatch.setattr(settings, "llm_quota_workers", 1)
+
+    internal_mcp, backend = supervisor.build_pools()
+
+    assert internal_mcp.app == "app.internal_mcp_app:app" and internal_mcp.workers == 2
+    command = backend.command()
+    assert command[command.index("--workers") + 1] == "4"
+    assert command[command.index("--bind") + 1] == "0.0.0.0:9000"
+    assert backend.env["INTERNAL_MCP_TRANSPORT"] == "http"
+    assert backend.env["INTERNAL_MCP_POOL_URL"] == "http://127.0.0.1:8001"
+    assert backend.env["SHARED_STATE_PATH"] == supervisor.DEFAULT_SHARED_STATE_PATH
+    assert backend.env["LLM_QUOTA_WORKERS"] == internal_mcp.env["LLM_QUOTA_WORKERS"] == "6"
+    # Both pools write their metrics where the backend's /metrics merges them
+    assert backend.env["PROMETHEUS_MULTIPROC_DIR"] == internal_mcp.env["PROMETHEUS_MULTIPROC_DIR"]
+
+    # A pool that keeps exiting right after starting is restarted with growing delays
+    internal_mcp.started_at = time.monotonic()
+    restarts = supervisor.Supervisor([internal_mcp], max_backoff=4, stable_after=60)
+    assert [restarts.backoff(internal_mcp) for _ in range(5)] == [0.0, 2, 4, 4, 4]
@@ -0,0 +1,92 @@
+"""
+Tests for single-flight request coalescing.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.single_flight import SingleFlight, canonical_key
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"value": 42}
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+
+    results = asyncio.run(main())
+
+    assert len(calls) == 1
+    assert all(result == {"value": 42} for result in results)
+    assert len(flight) == 0
+
+
+def test_errors_reach_every_caller_and_release_the_key():
+    flight = SingleFlight("test")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(flight) == 0
+
+
+def test_cancelled_caller_does_not_cancel_shared_work():
+    flight = SingleFlight("test")
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_canonical_key_ignores_order_and_whitespace():
+    assert canonical_key("search", {"query": "5G  handover\n", "limit": 5}) == \
+        canonical_key("search", {"limit": 5, "query": " 5G handover"})
+    assert canonical_key("search", {"query": "a"}) != canonical_key("other", {"query": "a"})
+
+
+def test_orchestrator_catalog_refresh_is_coalesced(monkeypatch):
+    from app.services.mcp.orchestrator import MCPOrchestrator
+
+    orchestrator = MCPOrchestrator()
+    scans = []
+
+    async def list_all_tools():
+        scans.append(1)
+        await asyncio.sleep(0.01)
+        return []
+
+    monkeypatch.setattr(orchestrator.server_registry, "list_all_tools", list_all_tools)
+
+    async def main():
+        return await asyncio.gather(*(orchestrator.list_all_tools() for _ in range(4)))
+
+    results = asyncio.run(main())
+
+    assert len(scans) == 1
+    assert all(result["total_count"] == 0 for result in results)
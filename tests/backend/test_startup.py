@@ -0,0 +1,107 @@
+"""
+Tests for cold start: lazy heavy imports and concurrent initialization.
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+from app.core.config import settings
+from app.core.startup_timing import startup_timer
+from app.services.mcp import orchestrator as orchestrator_module
+from app.services.mcp.orchestrator import MCPOrchestrator, UnifiedTool
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "backend")
+
+
+def test_importing_the_app_defers_llm_and_mcp_client_libraries():
+    script = (
+        "import json, sys\n"
+        "from app.main import app\n"
+        "from app.core.startup_timing import startup_timer\n"
+        "print(json.dumps({'loaded': [m for m in ('openai', 'fastmcp') if m in sys.modules],"
+        " 'imports': startup_timer.report()['imports_ms']}))\n"
+    )
+    output = subprocess.run([sys.executable, "-c", script], cwd=BACKEND_DIR, capture_output=True, text=True,
+                            check=True, env=dict(os.environ, AUTH0_ENABLED="false")).stdout
+
+    report = json.loads(output.strip().splitlines()[-1])
+    assert report["loaded"] == []
+    assert {"app.core", "app.api.v1.mcp", "app.internal_mcp_app"} <= set(report["imports"])
+
+
+def test_orchestrator_waits_for_the_internal_server_alongside_other_steps(monkeypatch):
+    async def slow(seconds):
+        await asyncio.sleep(seconds)
+
+    monkeypatch.setattr(orchestrator_module, "_mcp_orchestrator_initialized", False)
+
+    async def main():
+        orchestrator = MCPOrchestrator()
+        monkeypatch.setattr(orchestrator.server_registry, "initialize", lambda: slow(0.2))
+        monkeypatch.setattr(orchestrator, "_register_internal_mcp_server", lambda: slow(0))
+        monkeypatch.setattr(orchestrator.tool_catalog, "start", lambda: None)
+        start = time.perf_counter()
+        await orchestrator.initialize(internal_server_ready=slow(0.2))
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(main())
+
+    assert elapsed < 0.35
+    assert {"orchestrator.server_registry", "internal_mcp_wait"} <= set(startup_timer.phases)
+
+
+def test_the_internal_server_keeps_its_id_across_restarts():
+    async def register():
+        instance = MCPOrchestrator()
+        await instance._register_internal_mcp_server()
+        return list(instance.server_registry.servers)
+
+    first, restarted = asyncio.run(register()), asyncio.run(register())
+
+    assert len(first) == 1 and restarted == first
+
+
+def test_warm_start_serves_the_persisted_catalog_while_servers_reconnect(monkeypatch, tmp_path):
+    monkeypatch.setattr(orchestrator_module, "_mcp_orchestrator_initialized", False)
+    monkeypatch.setattr(settings, "registry_snapshot_path", str(tmp_path / "registry.db"))
+    reconnected = []
+
+    async def list_all_tools():
+        return [UnifiedTool(name="ext_tool", description="", source="external", server_id="ext")]
+
+    async def add_server(config):
+        await asyncio.sleep(0.2)  # Connection test against the server
+        reconnected.append(config)
+        return config.get("server_id") or "ext"
+
+    def orchestrator():
+        instance = MCPOrchestrator()
+        monkeypatch.setattr(instance.server_registry, "list_all_tools", list_all_tools)
+        monkeypatch.setattr(instance.server_registry, "add_server", add_server)
+        monkeypatch.setattr(instance.server_registry, "initialize", lambda: asyncio.sleep(0))
+        monkeypatch.setattr(instance, "_register_internal_mcp_server", lambda: asyncio.sleep(0))
+        return instance
+
+    async def before_restart():
+        await orchestrator().add_external_server({"name": "ext", "url": "https://ext.example/mcp"})
+
+    async def after_restart():
+        restarted = orchestrator()
+        await restarted.initialize()
+        start = time.perf_counter()
+        tools = await restarted.list_all_tools()
+        served_in = time.perf_counter() - start
+        await restarted._restore_task
+        await restarted.tool_catalog.stop()
+        return tools, served_in
+
+    asyncio.run(before_restart())
+    reconnected.clear()
+    tools, served_in = asyncio.run(after_restart())
+
+    assert [tool["name"] for tool in tools["tools"]] == ["ext_tool"] and served_in < 0.1
+    assert reconnected == [{"name": "ext", "url": "https://ext.example/mcp", "type": "external", "server_id": "ext"}]
@@ -0,0 +1,90 @@
+"""
+Unit tests for token usage and cost accounting.
+"""
+
+import asyncio
+
+from app import internal_mcp_app
+from app.core.request_context import bind
+from app.services.token_usage_service import TokenUsageTracker, load_pricing
+
+
+def make_tracker():
+    return TokenUsageTracker(pricing={"gpt-4o-mini": {"prompt": 0.15, "completion": 0.6}})
+
+
+def test_usage_is_aggregated_by_call_site_tool_and_session():
+    tracker = make_tracker()
+    usage = {"prompt_tokens": 1000, "completion_tokens": 500}
+
+    with bind(session_id="s1", tool_name="prior_art_search_tool"):
+        tracker.record("query_generation", "gpt-4o-mini", usage)
+        tracker.record("report", "gpt-4o-mini", usage)
+    tracker.record("intent_detection", "gpt-4o-mini", usage)
+
+    summary = tracker.get_summary()
+    assert summary["total"]["requests"] == 3
+    assert summary["total"]["total_tokens"] == 4500
+    assert set(summary["by_call_site"]) == {"query_generation", "report", "intent_detection"}
+    assert summary["by_tool"]["prior_art_search_tool"]["requests"] == 2
+    assert summary["by_tool"]["none"]["requests"] == 1
+    assert tracker.get_session_usage("s1")["requests"] == 2
+    assert tracker.get_session_usage("missing") is None
+
+
+def test_cost_uses_deployment_pricing():
+    tracker = make_tracker()
+    tracker.record("report", "gpt-4o-mini", {"prompt_tokens": 1_000_000, "completion_tokens": 1_000_000})
+    tracker.record("report", "unpriced-model", {"prompt_tokens": 1_000_000, "completion_tokens": 0})
+
+    summary = tracker.get_summary()
+    assert summary["by_model"]["gpt-4o-mini"]["cost_usd"] == 0.75
+    assert summary["by_model"]["unpriced-model"]["cost_usd"] == 0.0
+
+
+def test_oldest_sessions_are_evicted():
+    tracker = TokenUsageTracker(pricing={}, max_sessions=2)
+    for session_id in ("a", "b", "c"):
+        tracker.record("report", None, {"prompt_tokens": 1, "completion_tokens": 1}, session_id=session_id)
+
+    assert tracker.get_session_usage("a") is None
+    assert tracker.get_session_usage("c") is not None
+
+
+def test_every_caller_of_a_coalesced_tool_call_is_charged_its_usage(monkeypatch):
+    tracker = make_tracker()
+    monkeypatch.setattr(internal_mcp_app, "token_usage_tracker", tracker)
+
+    class SearchTool:
+        coalesce_calls = True
+        calls = 0
+
+        async def execute(self, arguments):
+            SearchTool.calls += 1
+            await asyncio.sleep(0.01)
+            tracker.record("report", "gpt-4o-mini", {"prompt_tokens": 1000, "completion_tokens": 500})
+            return "report"
+
+    monkeypatch.setitem(internal_mcp_app.tools, "search_tool", SearchTool())
+
+    async def call(session_id):
+        with bind(session_id=session_id, tool_name="search_tool"):
+            return await internal_mcp_app.call_tool("search_tool", {"query": "5G"})
+
+    async def main():
+        return await asyncio.gather(call("s1"), call("s2"))
+
+    results = asyncio.run(main())
+
+    assert SearchTool.calls == 1
+    assert all(result["content"][0]["text"] == "report" for result in results)
+    # The LLM ran once: global aggregates count it once, each session is charged for it
+    assert tracker.get_summary()["total"]["requests"] == 1
+    assert tracker.get_summary()["by_tool"]["search_tool"]["requests"] == 1
+    assert tracker.get_session_usage("s1") == tracker.get_session_usage("s2")
+    assert tracker.get_session_usage("s2")["total_tokens"] == 1500
+
+
+def test_invalid_pricing_is_ignored():
+    assert load_pricing("not json") == {}
+    assert load_pricing("[1, 2]") == {}
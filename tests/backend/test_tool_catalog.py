@@ -0,0 +1,126 @@
+"""
+Tests for the stale-while-revalidate tool catalog.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.mcp.tool_catalog import ToolCatalogCache
+
+
+def make_tool(name, source="internal"):
+    return SimpleNamespace(name=name, description=name, server_id="s1", source=source, input_schema={})
+
+
+class FakeLoader:
+    def __init__(self, *tools):
+        self.tools = list(tools)
+        self.calls = 0
+        self.error = None
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0)
+        if self.error:
+            raise self.error
+        return list(self.tools)
+
+
+def test_version_only_changes_with_tool_definitions():
+    loader = FakeLoader(make_tool("a"))
+    cache = ToolCatalogCache(loader)
+
+    async def main():
+        first = await cache.refresh()
+        same = await cache.refresh()
+        loader.tools.append(make_tool("b", source="external"))
+        cache.invalidate()
+        changed = await cache.refresh()
+        return first, same, changed
+
+    first, same, changed = asyncio.run(main())
+
+    assert first.version == same.version == 1
+    assert changed.version == 2
+    assert changed.total_count == 2 and changed.external_count == 1
+    assert isinstance(changed.tools, tuple)
+
+
+def test_stale_snapshot_is_served_while_refreshing_in_background():
+    loader = FakeLoader(make_tool("a"))
+    cache = ToolCatalogCache(loader, ttl=0.01)
+
+    async def main():
+        snapshot, cache_hit = await cache.get()
+        assert cache_hit is False
+        await asyncio.sleep(0.02)
+        loader.tools.append(make_tool("b"))
+        stale, cache_hit = await cache.get()
+        await asyncio.sleep(0.01)
+        return snapshot, stale, cache_hit, cache.snapshot
+
+    snapshot, stale, cache_hit, refreshed = asyncio.run(main())
+
+    assert cache_hit is True
+    assert stale is snapshot
+    assert refreshed.version == 2
+
+
+def test_failed_refresh_keeps_last_good_snapshot():
+    loader = FakeLoader(make_tool("a"))
+    cache = ToolCatalogCache(loader)
+
+    async def main():
+        good = await cache.refresh()
+        loader.error = RuntimeError("server down")
+        kept = await cache.refresh()
+        return good, kept
+
+    good, kept = asyncio.run(main())
+
+    assert kept is good
+    assert "server down" in cache.get_status()["last_error"]
+
+
+def test_first_refresh_failure_is_raised():
+    loader = FakeLoader()
+    loader.error = RuntimeError("server down")
+    cache = ToolCatalogCache(loader)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get())
+
+
+def test_persisted_snapshot_is_served_after_restart_and_revalidated(tmp_path):
+    from app.core.shared_state import SharedStore
+
+    path = str(tmp_path / "registry.db")
+    loader = FakeLoader(make_tool("a"), make_tool("b", source="external"))
+
+    async def before_restart():
+        return await ToolCatalogCache(loader, store=SharedStore(path)).refresh()
+
+    built = asyncio.run(before_restart())
+
+    restarted = FakeLoader(make_tool("a"))
+    restarted.tools[0].input_schema = {"type": "object"}
+    cache = ToolCatalogCache(restarted, store=SharedStore(path))
+
+    async def after_restart():
+        served, cache_hit = await cache.get()
+        calls_before_revalidation = restarted.calls
+        revalidated = await cache.refresh()
+        return served, cache_hit, calls_before_revalidation, revalidated
+
+    assert cache.restore() is not None
+    served, cache_hit, calls, revalidated = asyncio.run(after_restart())
+
+    assert cache_hit and calls == 0
+    assert served.fingerprint == built.fingerprint and served.version == built.version
+    assert [tool["name"] for tool in served.tools] == ["a", "b"]
+    assert revalidated.version == built.version + 1 and revalidated.total_count == 1
+    assert cache.restored_from is None
+    # The revalidated catalog replaces the persisted one
+    assert ToolCatalogCache(restarted, store=SharedStore(path)).restore().fingerprint == revalidated.fingerprint
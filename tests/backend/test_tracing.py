@@ -0,0 +1,83 @@
+"""
+Unit tests for span tracking and traceparent propagation.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from app.core import tracing
+
+
+class CollectingProcessor:
+    """Span processor that keeps finished spans in memory."""
+
+    def __init__(self):
+        self.spans = []
+
+    def on_end(self, span):
+        self.spans.append(span)
+
+    def shutdown(self):
+        pass
+
+
+@pytest.fixture
+def processor():
+    collector = CollectingProcessor()
+    tracing.set_tracer(tracing.Tracer(collector))
+    yield collector
+    tracing.set_tracer(None)
+
+
+def test_nested_spans_share_trace(processor):
+    with tracing.start_span("outer") as outer:
+        with tracing.start_span("inner") as inner:
+            pass
+
+    assert inner.context.trace_id == outer.context.trace_id
+    assert inner.parent_span_id == outer.context.span_id
+    assert [span.name for span in processor.spans] == ["inner", "outer"]
+
+
+def test_traced_async_function_records_error(processor):
+    @tracing.traced("failing")
+    async def failing():
+        raise ValueError("bad input")
+
+    with pytest.raises(ValueError):
+        asyncio.run(failing())
+
+    assert processor.spans[0].status == "error"
+    assert "ValueError" in processor.spans[0].status_message
+
+
+def test_traceparent_round_trip(processor):
+    with tracing.start_span("client") as client_span:
+        headers = tracing.inject_headers({"content-type": "application/json"})
+
+    remote = tracing.extract_context(headers)
+    assert remote.trace_id == client_span.context.trace_id
+    assert remote.span_id == client_span.context.span_id
+
+    with tracing.start_span("server", parent=remote) as server_span:
+        pass
+    assert server_span.parent_span_id == client_span.context.span_id
+
+
+def test_invalid_traceparent_is_ignored():
+    assert tracing.extract_context({"traceparent": "not-a-header"}) is None
+    assert tracing.extract_context({"traceparent": "00-" + "0" * 32 + "-" + "1" * 16 + "-01"}) is None
+
+
+def test_file_exporter_writes_jsonl(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracer = tracing.Tracer(tracing.BatchSpanProcessor(tracing.FileSpanExporter(str(path))))
+    with tracer.start_span("exported", attributes={"mcp.tool": "web_search_tool"}):
+        pass
+    tracer.shutdown()
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])["attributes"] == {"mcp.tool": "web_search_tool"}
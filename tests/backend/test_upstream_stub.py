@@ -0,0 +1,63 @@
+"""
+Tests for the local upstream stub used for offline load testing.
+"""
+
+import asyncio
+import json
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.services.patent_search_service import PatentSearchService
+from tests.stubs.upstream_stub import UpstreamStub, create_app
+
+FAST = {"seed": 1, "llm": {"ttft": 0, "tokens_per_second": 100000},
+        "patentsview": {"ttft": 0}, "google": {"ttft": 0}}
+
+
+def _intent_request(text, **extra):
+    return {"messages": [{"role": "system", "content": "Route the request."},
+                         {"role": "user", "content": f'User said: "{text}"'}], **extra}
+
+
+def test_chat_completions_are_templated_streamed_and_throttled():
+    client = TestClient(create_app(UpstreamStub(FAST)), base_url="http://localhost")
+    url = "/openai/deployments/gpt-4o-mini/chat/completions?api-version=2024-02-15-preview"
+
+    response = client.post(url, json=_intent_request("prior art search for 5G handover"))
+    decision = json.loads(response.json()["choices"][0]["message"]["content"])
+    assert decision == {"action": "tool_call", "tool_name": "prior_art_search_tool",
+                        "parameters": {"query": "5G handover"}}
+    assert response.json()["usage"]["completion_tokens"] > 0
+
+    streamed = client.post("/v1/chat/completions",
+                           json=_intent_request("hello", model="stub", stream=True, max_tokens=3))
+    events = [line[6:] for line in streamed.text.splitlines() if line.startswith("data: ")]
+    assert events[-1] == "[DONE]"
+    chunks = [json.loads(event) for event in events[:-1]]
+    assert "".join(chunk["choices"][0]["delta"].get("content", "") for chunk in chunks).startswith("{")
+    assert chunks[-1]["choices"][0]["finish_reason"] == "length"
+
+    client.put("/_stub/config", json={"llm": {"throttle_rate": 1.0, "retry_after": 0.5}})
+    throttled = client.post(url, json=_intent_request("hello"))
+    assert throttled.status_code == 429 and throttled.headers["retry-after-ms"] == "500"
+    assert client.get("/_stub/stats").json() == {"llm": {"throttled": 1}}
+
+
+def test_patent_search_service_parses_stub_responses(monkeypatch):
+    app = create_app(UpstreamStub(FAST))
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr("app.services.patent_search_service.httpx.AsyncClient",
+                        lambda **kwargs: real_client(transport=httpx.ASGITransport(app=app), **kwargs))
+    service = PatentSearchService()
+    service.base_url = "http://stub/api/v1"
+
+    async def main():
+        patents = await service._search_patents_api({"_text_all": {"patent_abstract": "5G handover"}})
+        claims = await service._fetch_claims(patents[0]["patent_id"])
+        return patents, claims
+
+    patents, claims = asyncio.run(main())
+
+    assert len(patents) == 10 and "5G handover" in patents[0]["patent_title"]
+    assert [claim["type"] for claim in claims[:2]] == ["independent", "dependent"]
@@ -0,0 +1,184 @@
+"""
+Benchmarks of the pure-Python code that runs on every request.
+
+Inputs are generated deterministically at a realistic upper size: a
+10,000-character document with a 50-tool catalog, 60 patents with 20
+claims each, a 50-entry arXiv feed and a 200 KB HTML page.
+"""
+
+import random
+from typing import Any, Dict, List
+
+from tests.benchmarks.runner import benchmark
+
+_rng = random.Random(0)
+_WORDS = ("wireless charging coil resonant battery handover network beam antenna "
+          "controller substrate layer signal method system apparatus device").split()
+
+
+def _text(words: int) -> str:
+    return " ".join(_rng.choice(_WORDS) for _ in range(words))
+
+
+def _tool_catalog(count: int) -> List[Dict[str, Any]]:
+    return [{
+        "name": f"tool_{index}",
+        "description": _text(30),
+        "input_schema": {
+            "type": "object",
+            "properties": {f"param_{p}": {"type": "string", "description": _text(8)} for p in range(6)},
+            "required": ["param_0"]
+        }
+    } for index in range(count)]
+
+
+def _patents(count: int, claims: int) -> List[Dict[str, Any]]:
+    return [{
+        "patent_id": f"{11000000 + index}",
+        "patent_title": _text(10),
+        "patent_abstract": _text(150),
+        "patent_date": "2023-05-16",
+        "inventors": [{"inventor_name_first": "Ada", "inventor_name_last": f"Inventor{index}"}],
+        "assignees": [{"assignee_organization": f"Company {index % 7}"}],
+        "cpc_current": [{"cpc_group_id": "H04W36/00"}, {"cpc_group_id": "H02J50/10"}],
+        "claims": [{"number": str(number + 1), "text": _text(60)} for number in range(claims)]
+    } for index in range(count)]
+
+
+@benchmark("agent.prepare_context.large")
+def prepare_context_large():
+    """Intent-detection context with a 12,000-char document, 20 messages and 50 tools."""
+    from app.services.agent import AgentService
+
+    agent = AgentService()
+    history = [{"role": "user" if index % 2 else "assistant", "content": _text(40)} for index in range(20)]
+    document = _text(2000)[:12000]
+    tools = _tool_catalog(50)
+    return lambda: agent._prepare_context("prior art search for wireless charging", history, document, tools)
+
+
+@benchmark("execution_engine.standardize_result.mcp_content")
+def standardize_mcp_content():
+    """MCP content response with several text items and structured content."""
+    from app.services.mcp.execution_engine import ToolExecutionEngine
+
+    engine = ToolExecutionEngine()
+    result = {
+        "content": [{"type": "text", "text": _text(400)} for _ in range(5)],
+        "isError": False,
+        "structuredContent": {"patents": _patents(5, 2)}
+    }
+    return lambda: engine._standardize_result(result, "prior_art_search_tool")
+
+
+@benchmark("execution_engine.standardize_result.dict")
+def standardize_dict():
+    """Plain dictionary result from an internal tool."""
+    from app.services.mcp.execution_engine import ToolExecutionEngine
+
+    engine = ToolExecutionEngine()
+    result = {"result": _text(2000), "metadata": {"sources": list(range(50))}}
+    return lambda: engine._standardize_result(result, "web_search_tool")
+
+
+def _patent_service():
+    from app.services.patent_search_service import PatentSearchService
+
+    class InstantLLM:
+        async def generate_text(self, **kwargs):
+            return {"success": True, "text": "report"}
+
+    service = PatentSearchService()
+    service.llm_client = InstantLLM()
+    return service
+
+
+@benchmark("patent_search.deduplicate")
+def deduplicate():
+    """Deduplication of 5 query result sets of 60 patents with heavy overlap."""
+    service = _patent_service()
+    patents = _patents(60, 0)
+    combined = [patent for _ in range(5) for patent in patents]
+    return lambda: service._deduplicate(combined)
+
+
+@benchmark("patent_search.generate_report.payload")
+def generate_report_payload():
+    """Report prompt building for 60 patents with 20 claims each (LLM call stubbed out)."""
+    service = _patent_service()
+    patents = _patents(60, 20)
+    query_results = [{"query_text": _text(6), "result_count": 20} for _ in range(5)]
+    summary = _text(800)
+    return lambda: service._generate_report("wireless charging", query_results, patents, summary)
+
+
+def _web_search_service():
+    from app.services.web_search_service import WebSearchService
+
+    return WebSearchService()
+
+
+@benchmark("web_search.parse_arxiv_results")
+def parse_arxiv_results():
+    """arXiv Atom feed with 50 entries."""
+    service = _web_search_service()
+    entries = "".join(
+        f"<entry><id>http://arxiv.org/abs/2401.{index:05d}v1</id><published>2024-01-0{index % 9 + 1}T00:00:00Z"
+        f"</published><title>{_text(12)}</title><summary>{_text(180)}</summary>"
+        f"<author><name>Author {index}</name></author></entry>"
+        for index in range(50)
+    )
+    feed = f'<?xml version="1.0" encoding="UTF-8"?><feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>'
+    return lambda: service._parse_arxiv_results(feed, 50)
+
+
+@benchmark("web_search.extract_text_from_html")
+def extract_text_from_html():
+    """200 KB HTML page."""
+    service = _web_search_service()
+    blocks = []
+    while sum(len(block) for block in blocks) < 200_000:
+        blocks.append(f'<div class="c"><p>{_text(40)} &amp; {_text(10)}</p>\n  <a href="/x">{_text(3)}</a></div>')
+    html = f"<html><head><title>t</title></head><body>{''.join(blocks)}</body></html>"
+    return lambda: service._extract_text_from_html(html)
+
+
+@benchmark("security.rate_limiter.check")
+def rate_limiter_check():
+    """Rate limit check for 50 clients with nearly full windows."""
+    import time
+    from collections import deque
+
+    from app.core.shared_state import SharedStore
+    from app.middleware.security import RateLimitMiddleware
+
+    limiter = RateLimitMiddleware(app=None, store=SharedStore())
+    now = time.time()
+    clients = [f"10.0.0.{index}" for index in range(50)]
+    for client in clients:
+        limiter._windows[f"api:{client}"] = deque(sorted(now - offset * 0.1 for offset in range(99)))
+    state = {"next": 0}
+
+    def check():
+        state["next"] = (state["next"] + 1) % len(clients)
+        return limiter.check_rate_limit(clients[state["next"]], "api")
+
+    return check
+
+
+@benchmark("auth0.is_excluded_path")
+def is_excluded_path():
+    """Excluded-path matching with the default exclusions, protected and excluded paths."""
+    from app.core.config import settings
+    from app.middleware.auth0_jwt_middleware import Auth0JWTMiddleware
+
+    middleware = Auth0JWTMiddleware(app=None, domain=settings.auth0_domain, audience=settings.auth0_audience,
+                                    excluded_paths=settings.auth0_excluded_paths)
+    paths = ["/api/v1/mcp/agent/chat", "/api/v1/mcp/tools", "/internal-mcp/", "/api/v1/external/servers/abc/tools",
+             "/api/v1/health/metrics", "/docs"]
+
+    def check():
+        for path in paths:
+            middleware.is_excluded_path(path)
+
+    return check
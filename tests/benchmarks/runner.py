@@ -0,0 +1,195 @@
+"""
+Micro-benchmark runner for backend hot paths.
+
+Benchmarks are registered with ``@benchmark(name)`` on a setup function
+that builds the inputs and returns the callable to time (results that are
+awaitable are awaited). Each benchmark is calibrated so that one round
+lasts at least ``--min-time`` seconds, then timed for ``--rounds`` rounds;
+the median time per call is compared with the stored baseline::
+
+    python -m tests.benchmarks.runner                       # run and compare with baselines.json
+    python -m tests.benchmarks.runner -k prepare_context    # only matching benchmarks
+    python -m tests.benchmarks.runner --save                # store the results as the new baseline
+    python -m tests.benchmarks.runner --output results.json --fail-on-regression
+
+Baselines are only comparable on the machine (and Python) that recorded
+them; the report shows where a baseline came from. A change beyond
+``--threshold`` (default 15%) is reported as a regression or improvement.
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+if os.path.join(REPO_ROOT, "backend") not in sys.path:
+    sys.path.insert(0, os.path.join(REPO_ROOT, "backend"))
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Callable[[], Callable[[], Any]]
+    description: str
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str) -> Callable[[Callable[[], Callable[[], Any]]], Callable[[], Callable[[], Any]]]:
+    """Register a setup function returning the callable to time."""
+    def register(setup: Callable[[], Callable[[], Any]]) -> Callable[[], Callable[[], Any]]:
+        BENCHMARKS[name] = Benchmark(name, setup, (setup.__doc__ or "").strip())
+        return setup
+    return register
+
+
+def _timer(func: Callable[[], Any], loop: asyncio.AbstractEventLoop) -> Callable[[int], float]:
+    """Seconds taken by ``iterations`` calls of ``func`` (awaited when it returns an awaitable)."""
+    probe = func()
+    if inspect.isawaitable(probe):
+        loop.run_until_complete(probe)
+
+        async def run(iterations: int) -> float:
+            start = time.perf_counter()
+            for _ in range(iterations):
+                await func()
+            return time.perf_counter() - start
+
+        return lambda iterations: loop.run_until_complete(run(iterations))
+
+    def run_sync(iterations: int) -> float:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return time.perf_counter() - start
+
+    return run_sync
+
+
+def run_benchmark(bench: Benchmark, rounds: int = 7, min_time: float = 0.05) -> Dict[str, Any]:
+    """Time one benchmark; times are per call, in microseconds."""
+    loop = asyncio.new_event_loop()
+    try:
+        timer = _timer(bench.setup(), loop)
+        iterations = 1
+        while True:
+            elapsed = timer(iterations)
+            if elapsed >= min_time or iterations >= 1_000_000:
+                break
+            iterations *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+        per_call = [timer(iterations) / iterations * 1e6 for _ in range(rounds)]
+    finally:
+        loop.close()
+    return {
+        "iterations": iterations,
+        "rounds": rounds,
+        "median_us": round(statistics.median(per_call), 3),
+        "min_us": round(min(per_call), 3),
+        "mean_us": round(statistics.mean(per_call), 3),
+        "stdev_us": round(statistics.stdev(per_call), 3) if rounds > 1 else 0.0,
+        "ops_per_s": round(1e6 / statistics.median(per_call), 1)
+    }
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "platform": platform.platform(terse=True),
+        "processor": platform.processor() or "unknown"
+    }
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Optional[Dict[str, Any]],
+            threshold: float) -> List[Dict[str, Any]]:
+    """Per-benchmark change of the median against the baseline."""
+    rows = []
+    stored = (baseline or {}).get("results", {})
+    for name, result in results.items():
+        base = stored.get(name)
+        row = {"name": name, "median_us": result["median_us"], "baseline_us": None, "change": None,
+               "verdict": "new"}
+        if base:
+            change = (result["median_us"] - base["median_us"]) / base["median_us"]
+            row.update(baseline_us=base["median_us"], change=round(change, 4),
+                       verdict="regression" if change > threshold else
+                       "improvement" if change < -threshold else "unchanged")
+        rows.append(row)
+    return rows
+
+
+def format_report(rows: List[Dict[str, Any]], baseline: Optional[Dict[str, Any]]) -> str:
+    lines = []
+    if baseline:
+        lines.append(f"Baseline recorded {baseline.get('recorded_at', '?')} on {baseline.get('environment', {})}")
+    lines.append(f"{'benchmark':<44} {'median us':>11} {'baseline us':>12} {'change':>8}  verdict")
+    for row in rows:
+        change = f"{row['change'] * 100:+.1f}%" if row["change"] is not None else "-"
+        baseline_us = row["baseline_us"] if row["baseline_us"] is not None else "-"
+        lines.append(f"{row['name']:<44} {row['median_us']:>11} {baseline_us:>12} {change:>8}  {row['verdict']}")
+    return "\n".join(lines)
+
+
+def run_all(pattern: Optional[str] = None, rounds: int = 7, min_time: float = 0.05) -> Dict[str, Dict[str, Any]]:
+    # Registered on the importable module, not on __main__ when run with -m
+    from tests.benchmarks import bench_hot_paths, runner  # noqa: F401 - registers the benchmarks
+
+    return {name: run_benchmark(bench, rounds, min_time)
+            for name, bench in runner.BENCHMARKS.items() if not pattern or pattern in name}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-k", dest="pattern", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per round")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="Store the results as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Relative change reported as significant")
+    parser.add_argument("--output", help="Write results and comparison as JSON")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    # Benchmarked code logs; keep only warnings so logging is not what gets measured
+    logging.disable(logging.INFO)
+    import structlog
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+
+    results = run_all(args.pattern, args.rounds, args.min_time)
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    rows = compare(results, baseline, args.threshold)
+    print(format_report(rows, baseline))
+
+    record = {"recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "environment": environment(), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(dict(record, comparison=rows), f, indent=2)
+    if args.save:
+        if baseline and args.pattern:
+            # Partial run: keep the other benchmarks' baselines
+            record["results"] = dict(baseline.get("results", {}), **results)
+        with open(args.baseline, "w") as f:
+            json.dump(record, f, indent=2, sort_keys=True)
+            f.write("\n")
+    if args.fail_on_regression and any(row["verdict"] == "regression" for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
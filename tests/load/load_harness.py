@@ -0,0 +1,533 @@
+"""
+Load-generation harness for the backend API.
+
+Drives a weighted mix of ``/agent/chat``, ``/tools``, ``/tools/{name}/execute``
+and external-server requests at a configurable rate (open loop: Poisson
+arrivals, whatever the response times) or concurrency (closed loop: each
+virtual user sends its next request when the previous one finished, after
+an optional think time). It reports throughput, p50/p95/p99 latency and
+error rates per request type, the event loop lag of the backend (from its
+``event_loop_lag_seconds`` metric) and of the load generator itself, and
+saves the results as JSON so runs can be compared with ``diff``.
+
+By default the backend is started offline against the local stubs
+(``tests/stubs/upstream_stub.py`` for Azure OpenAI, PatentsView and Google,
+``tests/stubs/mcp_stub.py`` as external MCP server)::
+
+    python -m tests.load.load_harness run --mode open --rate 20 --duration 60 --output results/open-20.json
+    python -m tests.load.load_harness run --mode closed --concurrency 16 --duration 60
+    python -m tests.load.load_harness run --target http://localhost:9000 --scenario scenario.json
+    python -m tests.load.load_harness diff results/before.json results/after.json
+
+A scenario file (JSON) overrides any field of ``DEFAULT_SCENARIO``;
+``requests`` replaces the whole request mix. ``{seq}`` in a path or body is
+replaced with the request's sequence number and ``{server_id}`` with the ID
+of the external stub server registered during setup.
+
+Open-loop latencies are measured from each request's scheduled send time,
+so a generator that falls behind does not hide queueing delay. Requests
+that would exceed ``max_in_flight`` are counted as ``dropped`` rather than
+delayed.
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import math
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+BACKEND_DIR = os.path.join(REPO_ROOT, "backend")
+
+DEFAULT_SCENARIO: Dict[str, Any] = {
+    "name": "default",
+    "mode": "closed",           # open | closed
+    "duration": 30.0,           # Seconds of measured load
+    "warmup": 5.0,              # Seconds of load before measuring
+    "rate": 10.0,               # Open loop: mean arrivals per second
+    "concurrency": 8,           # Closed loop: virtual users
+    "think_time": 0.0,          # Closed loop: seconds between a user's requests
+    "max_in_flight": 256,       # Open loop: arrivals beyond this are dropped
+    "timeout": 120.0,
+    "seed": 1,
+    "setup": {"external_server": True},
+    "requests": [
+        {"name": "chat", "method": "POST", "path": "/api/v1/mcp/agent/chat", "weight": 3,
+         "json": {"message": "Hello, can you help me with my patent draft?", "context": {}}},
+        {"name": "chat_prior_art", "method": "POST", "path": "/api/v1/mcp/agent/chat", "weight": 1,
+         "json": {"message": "prior art search for wireless charging {seq}", "context": {}}},
+        {"name": "tools_list", "method": "GET", "path": "/api/v1/mcp/tools", "weight": 4},
+        {"name": "tool_execute", "method": "POST", "path": "/api/v1/mcp/tools/web_search_tool/execute",
+         "weight": 2, "json": {"parameters": {"query": "solid state battery {seq}"}}},
+        {"name": "external_servers", "method": "GET", "path": "/api/v1/mcp/external/servers", "weight": 1},
+        {"name": "external_tool", "method": "POST", "path": "/api/v1/mcp/tools/stub_lookup/execute",
+         "weight": 2, "json": {"parameters": {"term": "load {seq}"}, "server_id": "{server_id}"},
+         "requires": "external_server"}
+    ]
+}
+
+# Faster than the stub's defaults so that a run is dominated by the backend
+DEFAULT_STUB_CONFIG: Dict[str, Any] = {
+    "llm": {"ttft": 0.2, "tokens_per_second": 500.0},
+    "patentsview": {"ttft": 0.1},
+    "google": {"ttft": 0.1}
+}
+
+
+@dataclass
+class RequestSpec:
+    """One request type of the mix."""
+    name: str
+    method: str
+    path: str
+    weight: float = 1.0
+    json: Optional[Any] = None
+    requires: Optional[str] = None
+
+
+@dataclass
+class Sample:
+    """Outcome of one request."""
+    name: str
+    started: float
+    latency: float
+    status: Optional[int]
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status is not None and self.status < 400
+
+
+@dataclass
+class RunState:
+    """Samples and counters collected while a run is in progress."""
+    samples: List[Sample] = field(default_factory=list)
+    dropped: int = 0
+    in_flight: int = 0
+    loop_lags: List[float] = field(default_factory=list)
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of ``values`` (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000.0, 2)
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, Optional[float]]:
+    return {
+        "p50_ms": _ms(percentile(latencies, 50)),
+        "p95_ms": _ms(percentile(latencies, 95)),
+        "p99_ms": _ms(percentile(latencies, 99)),
+        "mean_ms": _ms(sum(latencies) / len(latencies)) if latencies else None,
+        "max_ms": _ms(max(latencies)) if latencies else None
+    }
+
+
+def summarize(samples: List[Sample], duration: float) -> Dict[str, Any]:
+    """Throughput, latency percentiles and errors of a set of samples."""
+    statuses: Dict[str, int] = {}
+    for sample in samples:
+        key = str(sample.status) if sample.status is not None else (sample.error or "error")
+        statuses[key] = statuses.get(key, 0) + 1
+    errors = sum(1 for sample in samples if not sample.ok)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "throughput_rps": round(len(samples) / duration, 3) if duration else 0.0,
+        "latency": latency_summary([sample.latency for sample in samples if sample.ok]),
+        "statuses": statuses
+    }
+
+
+def parse_histogram(text: str, name: str) -> Tuple[List[Tuple[float, float]], float, float]:
+    """Cumulative buckets, sum and count of an unlabelled Prometheus histogram."""
+    buckets, total, count = [], 0.0, 0.0
+    for line in text.splitlines():
+        if line.startswith(f"{name}_bucket"):
+            bound = re.search(r'le="([^"]+)"', line).group(1)
+            buckets.append((math.inf if bound == "+Inf" else float(bound), float(line.rsplit(" ", 1)[1])))
+        elif line.startswith(f"{name}_sum"):
+            total = float(line.rsplit(" ", 1)[1])
+        elif line.startswith(f"{name}_count"):
+            count = float(line.rsplit(" ", 1)[1])
+    return buckets, total, count
+
+
+def histogram_delta_summary(before: str, after: str, name: str) -> Dict[str, Any]:
+    """Percentiles (bucket upper bounds) of the observations made between two scrapes."""
+    buckets_before, sum_before, count_before = parse_histogram(before, name)
+    buckets_after, sum_after, count_after = parse_histogram(after, name)
+    count = count_after - count_before
+    if not buckets_after or count <= 0:
+        return {"samples": 0}
+    previous = dict(buckets_before)
+    cumulative = [(bound, value - previous.get(bound, 0.0)) for bound, value in buckets_after]
+
+    def quantile(q: float) -> Optional[float]:
+        for bound, value in cumulative:
+            if value >= q * count:
+                return None if math.isinf(bound) else bound
+        return None
+
+    return {
+        "samples": int(count),
+        "mean_ms": _ms((sum_after - sum_before) / count),
+        "p50_le_ms": _ms(quantile(0.50)),
+        "p95_le_ms": _ms(quantile(0.95)),
+        "p99_le_ms": _ms(quantile(0.99))
+    }
+
+
+def _fill(value: Any, variables: Dict[str, str]) -> Any:
+    if isinstance(value, str):
+        for name, replacement in variables.items():
+            value = value.replace("{" + name + "}", replacement)
+        return value
+    if isinstance(value, dict):
+        return {key: _fill(item, variables) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_fill(item, variables) for item in value]
+    return value
+
+
+def load_scenario(path: Optional[str], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    scenario = copy.deepcopy(DEFAULT_SCENARIO)
+    if path:
+        with open(path) as f:
+            scenario.update(json.load(f))
+    scenario.update({key: value for key, value in overrides.items() if value is not None})
+    return scenario
+
+
+class LoadGenerator:
+    """Sends the scenario's request mix to a running backend and collects samples."""
+
+    def __init__(self, client: httpx.AsyncClient, scenario: Dict[str, Any], variables: Dict[str, str]):
+        self.client = client
+        self.scenario = scenario
+        self.variables = variables
+        self.rng = random.Random(scenario.get("seed"))
+        self.specs = [RequestSpec(**spec) for spec in scenario["requests"]
+                      if not spec.get("requires") or spec["requires"] in variables]
+        if not self.specs:
+            raise ValueError("Scenario has no runnable requests")
+        self.weights = [spec.weight for spec in self.specs]
+        self.state = RunState()
+        self._seq = 0
+
+    def _choose(self) -> RequestSpec:
+        return self.rng.choices(self.specs, weights=self.weights)[0]
+
+    async def _send(self, spec: RequestSpec, scheduled: float) -> None:
+        self._seq += 1
+        variables = dict(self.variables, seq=str(self._seq))
+        self.state.in_flight += 1
+        status, error = None, None
+        try:
+            response = await self.client.request(
+                spec.method, _fill(spec.path, variables),
+                json=_fill(spec.json, variables) if spec.json is not None else None,
+                timeout=self.scenario["timeout"]
+            )
+            status = response.status_code
+        except Exception as e:
+            error = type(e).__name__
+        finally:
+            self.state.in_flight -= 1
+        self.state.samples.append(Sample(spec.name, scheduled, time.perf_counter() - scheduled, status, error))
+
+    async def _monitor_loop_lag(self, interval: float = 0.1) -> None:
+        while True:
+            scheduled = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            self.state.loop_lags.append(max(0.0, time.perf_counter() - scheduled))
+
+    async def _open_loop(self, end: float) -> None:
+        rate = float(self.scenario["rate"])
+        tasks = set()
+        next_arrival = time.perf_counter()
+        while next_arrival < end:
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self.state.in_flight >= self.scenario["max_in_flight"]:
+                self.state.dropped += 1
+            else:
+                task = asyncio.ensure_future(self._send(self._choose(), next_arrival))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            next_arrival += self.rng.expovariate(rate)
+        if tasks:
+            await asyncio.wait(tasks)
+
+    async def _closed_loop(self, end: float) -> None:
+        async def user() -> None:
+            while time.perf_counter() < end:
+                await self._send(self._choose(), time.perf_counter())
+                if self.scenario["think_time"]:
+                    await asyncio.sleep(self.rng.expovariate(1.0 / self.scenario["think_time"]))
+
+        await asyncio.gather(*(user() for _ in range(int(self.scenario["concurrency"]))))
+
+    async def run(self) -> Tuple[List[Sample], float, float]:
+        """Apply the load; returns the samples plus the measurement window."""
+        start = time.perf_counter()
+        measure_from = start + float(self.scenario["warmup"])
+        end = measure_from + float(self.scenario["duration"])
+        monitor = asyncio.ensure_future(self._monitor_loop_lag())
+        try:
+            if self.scenario["mode"] == "open":
+                await self._open_loop(end)
+            elif self.scenario["mode"] == "closed":
+                await self._closed_loop(end)
+            else:
+                raise ValueError(f"Unknown mode: {self.scenario['mode']}")
+        finally:
+            monitor.cancel()
+        measured = [sample for sample in self.state.samples if sample.started >= measure_from]
+        return measured, measure_from, end
+
+
+class OfflineStack:
+    """Upstream stub, external MCP stub and backend as local subprocesses."""
+
+    def __init__(self, stub_config: Optional[str] = None, mcp_delay: float = 0.05, env: Optional[Dict[str, str]] = None):
+        self.stub_config = stub_config
+        self.mcp_delay = mcp_delay
+        self.extra_env = env or {}
+        self.processes: List[subprocess.Popen] = []
+        self.backend_url = ""
+        self.stub_url = ""
+        self.mcp_url = ""
+
+    @staticmethod
+    def _free_port() -> int:
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            return sock.getsockname()[1]
+
+    def _spawn(self, args: List[str], cwd: str, env: Dict[str, str]) -> None:
+        self.processes.append(subprocess.Popen([sys.executable, *args], cwd=cwd, env=env,
+                                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+
+    async def _wait_ready(self, url: str, timeout: float = 60.0) -> None:
+        deadline = time.monotonic() + timeout
+        async with httpx.AsyncClient() as client:
+            while time.monotonic() < deadline:
+                try:
+                    if (await client.get(url, timeout=2.0)).status_code < 500:
+                        return
+                except httpx.HTTPError:
+                    pass
+                if any(process.poll() is not None for process in self.processes):
+                    raise RuntimeError(f"A subprocess exited before {url} was ready")
+                await asyncio.sleep(0.25)
+        raise RuntimeError(f"{url} not ready after {timeout}s")
+
+    async def start(self) -> None:
+        stub_port, mcp_port, backend_port = self._free_port(), self._free_port(), self._free_port()
+        self.stub_url = f"http://127.0.0.1:{stub_port}"
+        self.mcp_url = f"http://127.0.0.1:{mcp_port}/mcp"
+        self.backend_url = f"http://localhost:{backend_port}"
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+
+        stub_args = ["-m", "tests.stubs.upstream_stub", "--port", str(stub_port)]
+        if self.stub_config:
+            stub_args += ["--config", self.stub_config]
+        self._spawn(stub_args, REPO_ROOT, env)
+        self._spawn(["-m", "tests.stubs.mcp_stub", "--port", str(mcp_port), "--delay", str(self.mcp_delay)],
+                    REPO_ROOT, env)
+
+        backend_env = dict(
+            env,
+            PYTHONPATH=BACKEND_DIR,
+            ENVIRONMENT="development",
+            AUTH0_ENABLED="false",
+            INTERNAL_MCP_TRANSPORT="inprocess",
+            AZURE_OPENAI_ENDPOINT=self.stub_url,
+            AZURE_OPENAI_API_KEY="stub",
+            AZURE_OPENAI_DEPLOYMENT_NAME="gpt-4o-mini",
+            LLM_BACKENDS="[]",
+            PATENTSVIEW_BASE_URL=f"{self.stub_url}/api/v1",
+            PATENTSVIEW_API_KEY="stub",
+            GOOGLE_SEARCH_API_URL=f"{self.stub_url}/customsearch/v1",
+            GOOGLE_API_KEY="stub",
+            GOOGLE_CSE_ID="stub",
+            CASSETTE_MODE="off",
+            **self.extra_env
+        )
+        self._spawn(["-m", "uvicorn", "app.main:app", "--port", str(backend_port), "--log-level", "warning"],
+                    BACKEND_DIR, backend_env)
+
+        await self._wait_ready(f"{self.stub_url}/_stub/stats")
+        await self._wait_ready(self.mcp_url)
+        await self._wait_ready(f"{self.backend_url}/health")
+
+    def stop(self) -> None:
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+async def register_external_server(client: httpx.AsyncClient, server_url: str) -> str:
+    response = await client.post("/api/v1/mcp/external/servers", json={
+        "name": "load-stub", "description": "External MCP stub for load testing",
+        "server_url": server_url, "server_type": "MCP"
+    }, timeout=60.0)
+    response.raise_for_status()
+    return response.json()["server_id"]
+
+
+async def run_scenario(scenario: Dict[str, Any], target: Optional[str] = None, stub_config: Optional[str] = None,
+                       mcp_url: Optional[str] = None, mcp_delay: float = 0.05) -> Dict[str, Any]:
+    """Run a scenario against ``target`` (default: an offline stack) and return the report."""
+    stack = None
+    if not target:
+        if stub_config is None:
+            with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+                json.dump(DEFAULT_STUB_CONFIG, f)
+            stub_config = f.name
+        stack = OfflineStack(stub_config, mcp_delay)
+        await stack.start()
+        target, mcp_url = stack.backend_url, mcp_url or stack.mcp_url
+    try:
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        async with httpx.AsyncClient(base_url=target, limits=limits) as client:
+            variables: Dict[str, str] = {}
+            if scenario.get("setup", {}).get("external_server") and mcp_url:
+                variables["server_id"] = await register_external_server(client, mcp_url)
+                variables["external_server"] = variables["server_id"]
+
+            metrics_before = (await client.get("/api/v1/health/metrics")).text
+            generator = LoadGenerator(client, scenario, variables)
+            samples, measure_from, end = await generator.run()
+            metrics_after = (await client.get("/api/v1/health/metrics")).text
+    finally:
+        if stack:
+            stack.stop()
+
+    duration = end - measure_from
+    by_name: Dict[str, List[Sample]] = {}
+    for sample in samples:
+        by_name.setdefault(sample.name, []).append(sample)
+    return {
+        "scenario": scenario,
+        "target": target,
+        "offline": stack is not None,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime()),
+        "duration_s": round(duration, 3),
+        "dropped": generator.state.dropped,
+        "overall": summarize(samples, duration),
+        "endpoints": {name: summarize(items, duration) for name, items in sorted(by_name.items())},
+        "event_loop_lag": {
+            "backend": histogram_delta_summary(metrics_before, metrics_after, "event_loop_lag_seconds"),
+            "load_generator": latency_summary(generator.state.loop_lags)
+        }
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    scenario = report["scenario"]
+    load = f"rate={scenario['rate']}/s" if scenario["mode"] == "open" else f"concurrency={scenario['concurrency']}"
+    lines = [f"Scenario '{scenario['name']}' ({scenario['mode']} loop, {load}) against {report['target']}",
+             f"{'endpoint':<18} {'reqs':>6} {'rps':>8} {'err%':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"]
+    for name, stats in list(report["endpoints"].items()) + [("overall", report["overall"])]:
+        latency = stats["latency"]
+        lines.append(f"{name:<18} {stats['requests']:>6} {stats['throughput_rps']:>8} "
+                     f"{stats['error_rate'] * 100:>6.1f} {latency['p50_ms'] or '-':>9} "
+                     f"{latency['p95_ms'] or '-':>9} {latency['p99_ms'] or '-':>9}")
+    lag = report["event_loop_lag"]
+    lines.append(f"dropped arrivals: {report['dropped']}")
+    lines.append(f"backend loop lag: {lag['backend']}")
+    lines.append(f"generator loop lag: p99={lag['load_generator']['p99_ms']} ms max={lag['load_generator']['max_ms']} ms")
+    return "\n".join(lines)
+
+
+def diff_reports(before: Dict[str, Any], after: Dict[str, Any]) -> str:
+    """Side-by-side throughput, error rate and latency of two saved runs."""
+    lines = [f"{'endpoint':<18} {'metric':<14} {'before':>10} {'after':>10} {'change':>9}"]
+    endpoints = dict(before["endpoints"], overall=before["overall"])
+    after_endpoints = dict(after["endpoints"], overall=after["overall"])
+    for name in sorted(set(endpoints) | set(after_endpoints), key=lambda n: (n == "overall", n)):
+        old, new = endpoints.get(name), after_endpoints.get(name)
+        if not old or not new:
+            lines.append(f"{name:<18} only in {'after' if new else 'before'}")
+            continue
+        rows = [("throughput_rps", old["throughput_rps"], new["throughput_rps"]),
+                ("error_rate", old["error_rate"], new["error_rate"])]
+        rows += [(key, old["latency"][key], new["latency"][key]) for key in ("p50_ms", "p95_ms", "p99_ms")]
+        for metric, a, b in rows:
+            change = f"{(b - a) / a * 100:+.1f}%" if a and b is not None else "-"
+            lines.append(f"{name:<18} {metric:<14} {a if a is not None else '-':>10} "
+                         f"{b if b is not None else '-':>10} {change:>9}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Apply load and report")
+    run.add_argument("--target", help="Backend URL (default: start an offline stack)")
+    run.add_argument("--scenario", help="Scenario JSON file")
+    run.add_argument("--mode", choices=["open", "closed"])
+    run.add_argument("--rate", type=float)
+    run.add_argument("--concurrency", type=int)
+    run.add_argument("--duration", type=float)
+    run.add_argument("--warmup", type=float)
+    run.add_argument("--think-time", type=float, dest="think_time")
+    run.add_argument("--seed", type=int)
+    run.add_argument("--stub-config", help="Upstream stub configuration JSON (offline only)")
+    run.add_argument("--mcp-url", help="External MCP server to register (default: the offline stub)")
+    run.add_argument("--mcp-delay", type=float, default=0.05, help="Seconds per external stub tool call")
+    run.add_argument("--output", help="Write the JSON results here")
+
+    diff = commands.add_parser("diff", help="Compare two saved runs")
+    diff.add_argument("before")
+    diff.add_argument("after")
+
+    args = parser.parse_args()
+    if args.command == "diff":
+        with open(args.before) as f, open(args.after) as g:
+            print(diff_reports(json.load(f), json.load(g)))
+        return
+
+    scenario = load_scenario(args.scenario, {
+        "mode": args.mode, "rate": args.rate, "concurrency": args.concurrency, "duration": args.duration,
+        "warmup": args.warmup, "think_time": args.think_time, "seed": args.seed
+    })
+    report = asyncio.run(run_scenario(scenario, args.target, args.stub_config, args.mcp_url, args.mcp_delay))
+    print(format_report(report))
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
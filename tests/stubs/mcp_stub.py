@@ -0,0 +1,70 @@
+"""
+Local external MCP server, for offline load testing of the external-server paths.
+
+A FastMCP server over streamable HTTP with two tools:
+
+- ``stub_echo``: returns its text after ``delay`` seconds;
+- ``stub_lookup``: returns ``results`` fake records for a term after ``delay`` seconds.
+
+``delay`` defaults to ``--delay`` (with ``--jitter``), so tool latency can be
+set per run. Register it with the backend as an external server::
+
+    python -m tests.stubs.mcp_stub --port 8091
+
+    POST /api/v1/mcp/external/servers
+    {"name": "stub", "description": "Load test stub", "server_url": "http://localhost:8091/mcp",
+     "server_type": "MCP"}
+"""
+
+import argparse
+import asyncio
+import random
+from typing import Any, Dict, List, Optional
+
+from fastmcp import FastMCP
+
+
+def create_server(delay: float = 0.05, jitter: float = 0.0, seed: Optional[int] = None) -> FastMCP:
+    """Build the stub server; tool calls take ``delay`` +/- ``jitter`` seconds."""
+    rng = random.Random(seed)
+    mcp = FastMCP("external-mcp-stub")
+
+    async def pause(seconds: Optional[float]) -> None:
+        seconds = delay if seconds is None else seconds
+        if jitter:
+            seconds = max(0.0, seconds + rng.uniform(-jitter, jitter))
+        if seconds:
+            await asyncio.sleep(seconds)
+
+    @mcp.tool()
+    async def stub_echo(text: str, delay: Optional[float] = None) -> Dict[str, Any]:
+        """Echo the given text back."""
+        await pause(delay)
+        return {"text": text}
+
+    @mcp.tool()
+    async def stub_lookup(term: str, results: int = 5, delay: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Look up fake records matching a term."""
+        await pause(delay)
+        return [{"id": f"{term}-{index}", "title": f"Record {index} about {term}"} for index in range(results)]
+
+    return mcp
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8091)
+    parser.add_argument("--delay", type=float, default=0.05, help="Seconds each tool call takes")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server = create_server(args.delay, args.jitter, args.seed)
+    uvicorn.run(server.streamable_http_app(path="/mcp"), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
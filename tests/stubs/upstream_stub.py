@@ -0,0 +1,374 @@
+"""
+Local stub of the backend's upstream services, for offline load testing.
+
+One FastAPI app serves:
+
+- Azure OpenAI chat completions (``/openai/deployments/{deployment}/chat/completions``)
+  and the OpenAI-compatible ``/v1/chat/completions``, streaming and not;
+- PatentsView ``/api/v1/patent/`` and ``/api/v1/g_claim/``;
+- Google Custom Search ``/customsearch/v1``.
+
+Each service has a configurable time to first byte (``ttft``) with jitter,
+error (500) and throttling (429 with ``Retry-After``) injection. The LLM
+stub streams completion tokens at ``tokens_per_second`` and answers from
+canned responses keyed by regular expressions on the prompt; named groups
+of the match are substituted into the response (``$query``). Results are
+reproducible with a fixed ``seed``.
+
+Run it and point the backend at it::
+
+    python -m tests.stubs.upstream_stub --port 8090 [--config stub.json]
+
+    AZURE_OPENAI_ENDPOINT=http://localhost:8090
+    AZURE_OPENAI_API_KEY=stub
+    PATENTSVIEW_BASE_URL=http://localhost:8090/api/v1
+    GOOGLE_SEARCH_API_URL=http://localhost:8090/customsearch/v1
+    GOOGLE_API_KEY=stub GOOGLE_CSE_ID=stub
+
+The configuration can be changed while running with ``PUT /_stub/config``
+(merged into the current one); ``GET /_stub/stats`` counts the requests
+served per service and outcome.
+"""
+
+import argparse
+import asyncio
+import copy
+import hashlib
+import json
+import random
+import re
+import string
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+_INTENT_TOOL_CALL = '{"action": "tool_call", "tool_name": "$tool", "parameters": {"query": "$query"}}'
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "seed": None,
+    "llm": {
+        "ttft": 0.3,
+        "jitter": 0.0,
+        "tokens_per_second": 80.0,
+        "error_rate": 0.0,
+        "throttle_rate": 0.0,
+        "retry_after": 1.0,
+        # First match wins; "pattern" is searched in the last user message
+        "responses": [
+            {
+                "pattern": r'User said: "[^"]*?(?:prior art|patent)(?: search)?(?: for| on| about)?\s*(?P<query>[^"]*)"',
+                "response": _INTENT_TOOL_CALL.replace("$tool", "prior_art_search_tool"),
+                "json": True
+            },
+            {
+                "pattern": r'User said: "(?:web search|search for|search)\s*(?P<query>[^"]*)"',
+                "response": _INTENT_TOOL_CALL.replace("$tool", "web_search_tool"),
+                "json": True
+            },
+            {
+                "pattern": r'User said: "',
+                "response": '{"action": "conversational_response", "response": "This is a stub response."}'
+            },
+            {
+                "pattern": r'balanced PatentsView API queries for: "(?P<query>[^"]*)"',
+                "response": json.dumps({"search_queries": [
+                    {"search_query": {"_text_all": {"patent_abstract": "$query"}},
+                     "reasoning": "Abstract contains all terms of $query"},
+                    {"search_query": {"_or": [{"_text_all": {"patent_abstract": "$query"}},
+                                              {"_text_all": {"patent_title": "$query"}}]},
+                     "reasoning": "Abstract or title mention $query"},
+                    {"search_query": {"_text_any": {"patent_abstract": "$query"}},
+                     "reasoning": "Abstract contains any term of $query"}
+                ]}),
+                "json": True
+            },
+            {
+                "pattern": r"Analyze the patent claims for patent (?P<patent_id>\S+)",
+                "response": ("**Technical Summary**: Stub summary of patent $patent_id.\n\n"
+                             "**Key Technical Features**:\n- Feature one\n- Feature two\n- Feature three\n\n"
+                             "**Claim Structure**: Claim 1 is independent; the others depend on it.\n\n"
+                             "**Technical Scope**: Limited to the stub embodiment.")
+            },
+            {
+                "pattern": r"comprehensive prior art search report for: (?P<query>[^\n]*)",
+                "response": ("# Prior Art Search Report: $query\n\n## Executive Summary\n\n"
+                             "Stub report generated offline.\n\n## Detailed Analysis\n\n"),
+                "pad_to_tokens": 1500
+            }
+        ],
+        "default_response": "Stub completion.\n\n",
+        "default_pad_to_tokens": 200
+    },
+    "patentsview": {
+        "ttft": 0.2,
+        "jitter": 0.0,
+        "error_rate": 0.0,
+        "throttle_rate": 0.0,
+        "retry_after": 1.0,
+        "patents_per_query": 10,
+        "claims_per_patent": 5
+    },
+    "google": {
+        "ttft": 0.15,
+        "jitter": 0.0,
+        "error_rate": 0.0,
+        "throttle_rate": 0.0,
+        "retry_after": 1.0,
+        "results": 10
+    }
+}
+
+_FILLER = ("The stub elaborates on the prior art landscape, comparing claimed elements "
+           "against known techniques and noting differences in scope.").split()
+
+_TOKEN_PATTERN = re.compile(r"\S+\s*|\s+")
+
+
+def _merge(base: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    merged = copy.deepcopy(base)
+    for key, value in update.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class UpstreamStub:
+    """State of the stub: configuration, random source and request counters."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.configure(config or {}, reset=True)
+
+    def configure(self, update: Dict[str, Any], reset: bool = False) -> Dict[str, Any]:
+        self.config = _merge(DEFAULT_CONFIG if reset else self.config, update)
+        self.random = random.Random(self.config.get("seed"))
+        self.stats: Dict[str, Dict[str, int]] = {}
+        return self.config
+
+    def _count(self, service: str, outcome: str) -> None:
+        counts = self.stats.setdefault(service, {})
+        counts[outcome] = counts.get(outcome, 0) + 1
+
+    async def first_byte(self, service: str) -> None:
+        settings = self.config[service]
+        delay = settings["ttft"] + self.random.uniform(0, settings.get("jitter", 0.0))
+        await asyncio.sleep(max(0.0, delay))
+
+    def fault(self, service: str) -> Optional[JSONResponse]:
+        """An injected error or throttling response, or None to serve normally."""
+        settings = self.config[service]
+        roll = self.random.random()
+        if roll < settings.get("throttle_rate", 0.0):
+            self._count(service, "throttled")
+            retry_after = settings.get("retry_after", 1.0)
+            return JSONResponse(
+                {"error": {"code": "429", "message": "Rate limit exceeded (stub)"}},
+                status_code=429,
+                headers={"Retry-After": str(max(1, round(retry_after))),
+                         "retry-after-ms": str(int(retry_after * 1000))}
+            )
+        if roll < settings.get("throttle_rate", 0.0) + settings.get("error_rate", 0.0):
+            self._count(service, "error")
+            return JSONResponse({"error": {"code": "500", "message": "Injected failure (stub)"}},
+                                status_code=500)
+        self._count(service, "ok")
+        return None
+
+    def completion_text(self, messages: List[Dict[str, Any]]) -> str:
+        settings = self.config["llm"]
+        prompt = next((message.get("content") or "" for message in reversed(messages)
+                       if message.get("role") == "user"), "")
+        for rule in settings["responses"]:
+            match = re.search(rule["pattern"], prompt, re.DOTALL)
+            if match is None:
+                continue
+            values = {name: value or "" for name, value in match.groupdict().items()}
+            if rule.get("json"):
+                values = {name: json.dumps(value)[1:-1] for name, value in values.items()}
+            text = string.Template(rule["response"]).safe_substitute(values)
+            return self._pad(text, rule.get("pad_to_tokens", 0))
+        return self._pad(settings["default_response"], settings.get("default_pad_to_tokens", 0))
+
+    @staticmethod
+    def _pad(text: str, tokens: int) -> str:
+        missing = tokens - len(_TOKEN_PATTERN.findall(text))
+        if missing <= 0:
+            return text
+        return text + " ".join(_FILLER[i % len(_FILLER)] for i in range(missing))
+
+
+def _tokens(text: str, max_tokens: Optional[int]) -> List[str]:
+    tokens = _TOKEN_PATTERN.findall(text)
+    return tokens[:max_tokens] if max_tokens else tokens
+
+
+def _seed_for(value: Any) -> int:
+    return int(hashlib.md5(json.dumps(value, sort_keys=True).encode()).hexdigest()[:8], 16)
+
+
+def _terms(query: Any) -> List[str]:
+    """Search terms found anywhere in a PatentsView query."""
+    if isinstance(query, dict):
+        return [term for value in query.values() for term in _terms(value)]
+    if isinstance(query, list):
+        return [term for value in query for term in _terms(value)]
+    return [str(query)]
+
+
+def create_app(stub: Optional[UpstreamStub] = None) -> FastAPI:
+    stub = stub or UpstreamStub()
+    app = FastAPI(title="Upstream stub")
+    app.state.stub = stub
+
+    async def chat_completions(request: Request, deployment: str):
+        body = await request.json()
+        await stub.first_byte("llm")
+        fault = stub.fault("llm")
+        if fault is not None:
+            return fault
+
+        tokens = _tokens(stub.completion_text(body.get("messages", [])), body.get("max_tokens"))
+        finish_reason = "length" if body.get("max_tokens") and len(tokens) >= body["max_tokens"] else "stop"
+        prompt_tokens = sum(len(message.get("content") or "") // 4 + 4 for message in body.get("messages", []))
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(tokens),
+                 "total_tokens": prompt_tokens + len(tokens)}
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        interval = 1.0 / stub.config["llm"]["tokens_per_second"]
+
+        if not body.get("stream"):
+            await asyncio.sleep(len(tokens) * interval)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": deployment,
+                "choices": [{"index": 0, "finish_reason": finish_reason,
+                             "message": {"role": "assistant", "content": "".join(tokens)}}],
+                "usage": usage
+            }
+
+        def chunk(delta: Dict[str, Any], finish: Optional[str] = None, **extra: Any) -> bytes:
+            data = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                    "model": deployment, "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+                    **extra}
+            return b"data: " + json.dumps(data).encode() + b"\n\n"
+
+        async def events() -> AsyncIterator[bytes]:
+            yield chunk({"role": "assistant", "content": ""})
+            for token in tokens:
+                await asyncio.sleep(interval)
+                yield chunk({"content": token})
+            include_usage = (body.get("stream_options") or {}).get("include_usage")
+            yield chunk({}, finish_reason, **({"usage": usage} if include_usage else {}))
+            yield b"data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/openai/deployments/{deployment}/chat/completions")
+    async def azure_chat_completions(deployment: str, request: Request):
+        return await chat_completions(request, deployment)
+
+    @app.post("/v1/chat/completions")
+    async def openai_chat_completions(request: Request):
+        body = await request.json()
+        return await chat_completions(request, body.get("model", "stub"))
+
+    @app.post("/api/v1/patent/")
+    async def search_patents(request: Request):
+        body = await request.json()
+        await stub.first_byte("patentsview")
+        fault = stub.fault("patentsview")
+        if fault is not None:
+            return fault
+        query = body.get("q", {})
+        size = min((body.get("o") or {}).get("size", 10), stub.config["patentsview"]["patents_per_query"])
+        terms = " ".join(_terms(query)) or "invention"
+        seed = _seed_for(query)
+        patents = [{
+            "patent_id": str(10000000 + (seed + i * 7919) % 1000000),
+            "patent_title": f"System and method for {terms} ({i + 1})",
+            "patent_abstract": f"A stub patent describing {terms}, variant {i + 1}.",
+            "patent_date": f"20{10 + (seed + i) % 14}-0{1 + i % 9}-15",
+            "inventors": [{"inventor_name_first": "Ada", "inventor_name_last": f"Stub{i}"}],
+            "assignees": [{"assignee_organization": f"Stub Corp {seed % 7}"}],
+            "cpc_current": [{"cpc_group_id": "H04W36/00"}]
+        } for i in range(size)]
+        return {"error": False, "count": len(patents), "total_hits": len(patents), "patents": patents}
+
+    @app.post("/api/v1/g_claim/")
+    async def patent_claims(request: Request):
+        body = await request.json()
+        await stub.first_byte("patentsview")
+        fault = stub.fault("patentsview")
+        if fault is not None:
+            return fault
+        patent_id = (body.get("q") or {}).get("patent_id", "unknown")
+        claims = [{
+            "claim_sequence": i,
+            "claim_number": str(i + 1),
+            "claim_text": (f"A method as in claim 1 for patent {patent_id}, further comprising step {i + 1}."
+                           if i else f"A method for patent {patent_id} comprising receiving, processing "
+                                     f"and transmitting stub data."),
+            "claim_dependent": "claim 1" if i else None
+        } for i in range(stub.config["patentsview"]["claims_per_patent"])]
+        return {"error": False, "count": len(claims), "total_hits": len(claims), "g_claims": claims}
+
+    @app.get("/customsearch/v1")
+    async def google_search(q: str = "", num: int = 10):
+        await stub.first_byte("google")
+        fault = stub.fault("google")
+        if fault is not None:
+            return fault
+        count = min(num, stub.config["google"]["results"])
+        items = [{
+            "title": f"{q} - stub result {i + 1}",
+            "link": f"https://example.com/{_seed_for(q) % 10000}/{i + 1}",
+            "snippet": f"Stub snippet {i + 1} about {q}."
+        } for i in range(count)]
+        return {"kind": "customsearch#search", "items": items}
+
+    @app.get("/_stub/config")
+    async def get_config():
+        return stub.config
+
+    @app.put("/_stub/config")
+    async def update_config(request: Request):
+        return stub.configure(await request.json())
+
+    @app.post("/_stub/reset")
+    async def reset_config():
+        return stub.configure({}, reset=True)
+
+    @app.get("/_stub/stats")
+    async def get_stats():
+        return stub.stats
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--config", help="JSON file merged into the default configuration")
+    parser.add_argument("--seed", type=int, help="Seed for jitter and fault injection")
+    args = parser.parse_args()
+
+    config: Dict[str, Any] = {}
+    if args.config:
+        with open(args.config) as f:
+            config = json.load(f)
+    if args.seed is not None:
+        config["seed"] = args.seed
+    uvicorn.run(create_app(UpstreamStub(config)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()